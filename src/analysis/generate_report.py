@@ -16,6 +16,8 @@ from statsmodels.nonparametric.smoothers_lowess import lowess
 import argparse
 
 from .data_quality import DataQualityAnalyzer
+from ..noaa.core.region_dataset import read_region_records
+from ..noaa.historical.process_raw_flood_data import DATASET_NAME
 
 def load_station_names(region: str) -> Dict[str, str]:
     """Load station names from configuration file."""
@@ -276,7 +278,7 @@ def generate_analysis_outputs(region: str = 'gulf_coast') -> None:
     output_dir.mkdir(parents=True, exist_ok=True)
     
     # Load data
-    data = pd.read_parquet(f'output/historical/historical_htf_{region}.parquet')
+    data = read_region_records(Path('output/historical'), DATASET_NAME, regions=[region])
     
     # Load station names
     station_names = load_station_names(region)
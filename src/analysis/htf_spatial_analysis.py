@@ -20,23 +20,13 @@ def analyze_flood_data(historical_dir: Path) -> dict:
     """Analyze the HTF dataset focusing on flood patterns.
     
     Args:
-        historical_dir: Directory containing historical HTF data files
+        historical_dir: Directory containing the historical HTF dataset
     
     Returns:
         Dictionary containing analysis results
     """
-    # Load all regional files
-    region_files = list(historical_dir.glob("historical_htf_*.parquet"))
-    if not region_files:
-        raise FileNotFoundError(f"No historical HTF files found in {historical_dir}")
-    
-    # Combine regional data
-    dfs = []
-    for file in region_files:
-        df = pd.read_parquet(file)
-        dfs.append(df)
-    
-    df = pd.concat(dfs, ignore_index=True)
+    # Load the region-partitioned dataset
+    df = temporal.load_regional_data(historical_dir)
     
     # Calculate flood statistics
     stats = {
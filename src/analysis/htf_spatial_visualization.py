@@ -15,6 +15,9 @@ import logging
 from typing import Tuple, List
 import numpy as np
 
+from ..noaa.core.region_dataset import read_region_records
+from ..noaa.historical.process_raw_flood_data import DATASET_NAME
+
 # Note: Do not call logging.basicConfig here - let the application configure logging
 logger = logging.getLogger(__name__)
 
@@ -167,13 +170,8 @@ def main():
         if not historical_dir.exists():
             raise FileNotFoundError("Historical data directory not found")
         
-        # Load and combine regional data
-        dfs = []
-        for file in historical_dir.glob("historical_htf_*.parquet"):
-            df = pd.read_parquet(file)
-            dfs.append(df)
-        
-        htf_df = pd.concat(dfs, ignore_index=True)
+        # Load the region-partitioned dataset
+        htf_df = read_region_records(historical_dir, DATASET_NAME)
         
         # Load county geometries
         counties = gpd.read_file("data/processed/county_geometries.geojson")
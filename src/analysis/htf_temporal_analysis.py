@@ -17,27 +17,21 @@ import logging
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from ..noaa.core.region_dataset import read_region_records
+from ..noaa.historical.process_raw_flood_data import DATASET_NAME
+
 logger = logging.getLogger(__name__)
 
 def load_regional_data(historical_dir: Path) -> pd.DataFrame:
     """Load and combine all regional HTF data.
     
     Args:
-        historical_dir: Directory containing historical HTF data files
+        historical_dir: Directory containing the historical HTF dataset
         
     Returns:
         Combined DataFrame with all regional data
     """
-    region_files = list(historical_dir.glob("historical_htf_*.parquet"))
-    if not region_files:
-        raise FileNotFoundError(f"No historical HTF files found in {historical_dir}")
-    
-    dfs = []
-    for file in region_files:
-        df = pd.read_parquet(file)
-        dfs.append(df)
-    
-    return pd.concat(dfs, ignore_index=True)
+    return read_region_records(historical_dir, DATASET_NAME)
 
 def analyze_temporal_trends(df: pd.DataFrame) -> Dict:
     """Analyze temporal trends in HTF data.
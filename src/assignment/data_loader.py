@@ -8,6 +8,9 @@ from pathlib import Path
 from typing import Tuple, Dict
 import logging
 
+from ..noaa.core.region_dataset import read_region_records
+from ..noaa.historical.process_raw_flood_data import DATASET_NAME
+
 logger = logging.getLogger(__name__)
 
 def load_gauge_county_mapping(filepath: str | Path) -> pd.DataFrame:
@@ -45,19 +48,9 @@ def load_historical_htf(filepath: str | Path) -> pd.DataFrame:
     Returns:
         DataFrame with historical HTF data
     """
-    filepath = Path(filepath)
-    
-    # Load all regional files
-    dfs = []
-    for file in filepath.glob("historical_htf_*.parquet"):
-        df = pd.read_parquet(file)
-        dfs.append(df)
-    
-    if not dfs:
-        raise FileNotFoundError(f"No historical HTF files found in {filepath}")
-    
-    # Combine all regions
-    df = pd.concat(dfs, ignore_index=True)
+    # Region-partitioned dataset written by process_raw_flood_data, plus
+    # standalone regional files (e.g. Alaska) not covered by the dataset
+    df = read_region_records(filepath, DATASET_NAME)
     
     # Verify we have the required columns
     required_cols = [
@@ -14,6 +14,8 @@ import logging
 from typing import Dict, Optional
 
 from src.config import IMPUTATION_DATA_DIR, IMPUTATION_DIR
+from src.imputation.incremental import COMBINED_FILENAME, ImputationManifest
+from src.imputation.weight_matrix import save_weight_matrices
 
 logger = logging.getLogger(__name__)
 
@@ -21,15 +23,23 @@ logger = logging.getLogger(__name__)
 def get_latest_regional_files(data_dir: Path) -> Dict[str, Path]:
     """Find the most recent imputation file for each region.
 
+    Regions recorded in the imputation manifest use the file whose
+    fingerprint matches their current inputs; other regions fall back to the
+    newest file by timestamp in the filename.
+
     Args:
         data_dir: Directory containing imputation parquet files
 
     Returns:
         Dictionary mapping region name to file path
     """
+    manifest = ImputationManifest.load(data_dir)
+    recorded = {region: manifest.region_file(region) for region in manifest.regions}
+    recorded = {region: path for region, path in recorded.items() if path is not None}
+
     all_files = list(data_dir.glob("imputation_structure_*_2*.parquet"))
 
-    if not all_files:
+    if not all_files and not recorded:
         raise FileNotFoundError(f"No imputation files found in {data_dir}")
 
     # Group by region and get most recent
@@ -50,6 +60,7 @@ def get_latest_regional_files(data_dir: Path) -> Dict[str, Path]:
         if region not in region_files or f.name > region_files[region].name:
             region_files[region] = f
 
+    region_files.update(recorded)
     return region_files
 
 
@@ -72,7 +83,7 @@ def combine_imputation_files(
     if input_dir is None:
         input_dir = IMPUTATION_DATA_DIR
     if output_path is None:
-        output_path = IMPUTATION_DIR / "imputation_structure_all_regions.parquet"
+        output_path = IMPUTATION_DIR / COMBINED_FILENAME
 
     input_dir = Path(input_dir)
     output_path = Path(output_path)
@@ -97,8 +108,9 @@ def combine_imputation_files(
     # Ensure output directory exists
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Save combined file
+    # Save combined file and its sparse weight matrices
     combined_df.to_parquet(output_path, index=False)
+    save_weight_matrices(combined_df, output_path.parent)
 
     logger.info(f"\nCombined imputation structure:")
     logger.info(f"  Total records: {len(combined_df):,}")
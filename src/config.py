@@ -132,6 +132,9 @@ IMPUTATION_DATA_DIR = IMPUTATION_DIR / "data"
 IMPUTATION_LOGS_DIR = IMPUTATION_DIR / "logs"
 IMPUTATION_MAPS_DIR = MAPS_DIR / "imputation"
 
+# Persisted station spatial index (one subdirectory per configuration hash)
+STATION_INDEX_DIR = CACHE_DIR / "station_index"
+
 # Spatial reference systems
 ALBERS_CRS = "+proj=aea +lat_1=20 +lat_2=60 +lat_0=40 +lon_0=-96 +x_0=0 +y_0=0 +ellps=GRS80 +datum=NAD83 +units=m +no_defs"
 WGS84_EPSG = 4326
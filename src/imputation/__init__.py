@@ -12,7 +12,11 @@ This module provides functionality for:
 from .main import ImputationManager
 from .data_loader import DataLoader
 from .spatial_ops import NearestGaugeFinder
+from .station_index import StationIndex, load_station_index
+from .shared_points import SharedReferencePoints, slice_regions
+from .weight_matrix import WeightMatrix, save_weight_matrices
 from .weight_calculator import WeightCalculator
+from .temporal_ops import GaugeMatrix, WaterLevelProcessor
 
 __version__ = "0.1.0"
 __author__ = "RPA SLR Team"
@@ -22,7 +26,15 @@ __all__ = [
     "ImputationManager",
     "DataLoader",
     "NearestGaugeFinder",
+    "StationIndex",
+    "load_station_index",
+    "SharedReferencePoints",
+    "slice_regions",
+    "WeightMatrix",
+    "save_weight_matrices",
     "WeightCalculator",
+    "GaugeMatrix",
+    "WaterLevelProcessor",
 ]
 
 # Module metadata
@@ -34,6 +46,8 @@ metadata = {
     ],
     "output_files": [
         "imputation_structure.parquet",
+        "imputation_weights_points.npz",
+        "imputation_weights_counties.npz",
         "imputation_report.html"
     ],
     "dependencies": [
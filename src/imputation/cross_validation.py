@@ -0,0 +1,364 @@
+"""
+Leave-one-station-out (LOSO) cross-validation of imputation parameters.
+
+The weighting parameters used by process_region (inverse distance power,
+maximum distance, minimum weight, neighbor count) are scored by hiding each
+gauge station in turn and predicting its annual flood day series from the
+other stations of its region, exactly as a reference point at the station's
+location would be imputed:
+
+- Neighbors are searched per subregion with the same single-tree rule as
+  NearestGaugeFinder, within the maximum distance and up to k_max, with the
+  single nearest station as fallback
+- Weights come from WeightCalculator.calculate_weight_matrix, and every
+  year's prediction is the NaN-aware weighted average over neighbors with
+  data, summed over subregions like the points weight matrix
+
+Station-to-station neighbors are computed once per region from the persisted
+StationIndex trees for the largest k_max of the grid. Every grid combination
+then only slices that table and weights it with whole-array operations over
+stations and years, and regions are evaluated in parallel worker processes,
+so a full grid takes seconds to minutes rather than re-running the spatial
+stage per combination.
+
+Errors are reported per region and combination as RMSE, MAE and bias in
+flood days, with the number of station-years predicted.
+
+Usage:
+    python -m src.imputation.cross_validation --output output/imputation/loso_cv.csv
+"""
+
+import argparse
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from src.config import HISTORICAL_DIR, STATION_INDEX_DIR
+from src.noaa.historical.process_raw_flood_data import DATASET_NAME
+from .station_index import StationIndex, group_key, load_station_index
+from .spatial_ops import chord_to_meters
+from .weight_calculator import WEIGHT_METHODS, WeightCalculator
+
+logger = logging.getLogger(__name__)
+
+# Parameter grid evaluated by default; the current process_region settings are
+# method idw, power 2, 100 km, min_weight 0.1 and k_max 6
+PARAMETER_GRID = {
+    'method': WEIGHT_METHODS,
+    'power': (1, 2, 3),
+    'max_distance_meters': (50_000, 100_000, 200_000),
+    'min_weight': (0.0, 0.1),
+    'k_max': (3, 6),
+}
+
+PARAMETER_COLUMNS = list(PARAMETER_GRID)
+
+RESULT_COLUMNS = ['region'] + PARAMETER_COLUMNS + ['n_stations', 'n_predictions', 'rmse', 'mae', 'bias']
+
+
+def parameter_grid(grid: Mapping[str, Sequence] = PARAMETER_GRID) -> pd.DataFrame:
+    """
+    Expand a parameter grid into one row per combination.
+
+    Args:
+        grid: Values of each parameter in PARAMETER_COLUMNS
+
+    Returns:
+        DataFrame with PARAMETER_COLUMNS
+
+    Raises:
+        ValueError: If a parameter is missing or a method is unknown
+    """
+    missing = [name for name in PARAMETER_COLUMNS if name not in grid]
+    if missing:
+        raise ValueError(f"Parameter grid is missing: {missing}")
+    unknown = [method for method in grid['method'] if method not in WEIGHT_METHODS]
+    if unknown:
+        raise ValueError(f"Unknown weight methods in grid: {unknown}; expected one of {WEIGHT_METHODS}")
+    combinations = itertools.product(*(grid[name] for name in PARAMETER_COLUMNS))
+    return pd.DataFrame(list(combinations), columns=PARAMETER_COLUMNS)
+
+
+@dataclass
+class StationNeighbors:
+    """
+    Nearest other stations of every station of a region, per subregion group.
+
+    Row r is station station_row[r] searched within one subregion group;
+    neighbors[r, j] is a position into station_ids (-1 for padding) at
+    distances[r, j] meters (inf for padding), in ascending distance order.
+    The station itself is never its own neighbor.
+    """
+    region: str
+    station_ids: np.ndarray   # (m,) station IDs of the region
+    station_row: np.ndarray   # (r,) row -> station position
+    neighbors: np.ndarray     # (r, k) neighbor positions
+    distances: np.ndarray     # (r, k) distances in meters
+
+    @property
+    def row_matrix(self) -> sparse.csr_matrix:
+        """Indicator (m, r) summing row results into their stations."""
+        rows = len(self.station_row)
+        return sparse.csr_matrix((np.ones(rows), (self.station_row, np.arange(rows))),
+                                 shape=(len(self.station_ids), rows))
+
+
+def loso_neighbors(index: StationIndex, region: str, k: int) -> StationNeighbors:
+    """
+    Query the k nearest other stations of each station of a region.
+
+    Subregions are searched separately unless the region has a single (or
+    no) subregion, as in NearestGaugeFinder.find_nearest.
+
+    Args:
+        index: Station index holding the region's trees
+        region: Region identifier
+        k: Neighbors per station and group
+
+    Returns:
+        StationNeighbors of the region
+    """
+    positions = index.groups[group_key(region)]
+    sub_regions = index.sub_regions[positions]
+    subregions = pd.unique(sub_regions)
+    single = len(subregions) == 1 or all(sub_region == '' for sub_region in subregions)
+    keys = [group_key(region)] if single else [group_key(region, sub_region) for sub_region in subregions]
+    vectors = np.asarray(index.vectors[positions])
+
+    rows, neighbors, distances = [], [], []
+    for key in keys:
+        group = index.groups[key]
+        query_k = min(k + 1, len(group))
+        chords, found = index.trees[key].query(vectors, k=query_k)
+        chords, found = chords.reshape(len(vectors), query_k), found.reshape(len(vectors), query_k)
+        found = np.searchsorted(positions, group[found])
+
+        # Drop the station itself, keeping the next k stations in distance order
+        is_self = found == np.arange(len(positions))[:, None]
+        order = np.argsort(is_self, axis=1, kind='stable')
+        found = np.take_along_axis(found, order, axis=1)
+        chords = np.take_along_axis(chords, order, axis=1)
+        keep = ~np.take_along_axis(is_self, order, axis=1)
+
+        block_neighbors = np.full((len(positions), k), -1, dtype=np.int64)
+        block_distances = np.full((len(positions), k), np.inf)
+        width = min(k, query_k)
+        block_neighbors[:, :width] = np.where(keep, found, -1)[:, :width]
+        block_distances[:, :width] = np.where(keep, chord_to_meters(chords), np.inf)[:, :width]
+
+        rows.append(np.arange(len(positions)))
+        neighbors.append(block_neighbors)
+        distances.append(block_distances)
+
+    return StationNeighbors(
+        region=region,
+        station_ids=np.asarray(index.station_ids[positions]),
+        station_row=np.concatenate(rows),
+        neighbors=np.vstack(neighbors),
+        distances=np.vstack(distances)
+    )
+
+
+def annual_flood_matrix(flood_data: pd.DataFrame, station_ids: np.ndarray) -> np.ndarray:
+    """
+    Annual flood days aligned to a station axis.
+
+    Args:
+        flood_data: Long table with station_id, year and flood_days
+        station_ids: Station axis
+
+    Returns:
+        float64 array (len(station_ids), n_years); NaN where a station-year is missing
+    """
+    wide = flood_data.pivot_table(index='station_id', columns='year', values='flood_days', aggfunc='mean')
+    wide = wide.set_axis(wide.index.astype(str)).reindex(np.asarray(station_ids, dtype=str))
+    return wide.to_numpy(dtype=np.float64)
+
+
+def predict_loso(neighbors: StationNeighbors,
+                 values: np.ndarray,
+                 calculator: WeightCalculator,
+                 k_max: int) -> np.ndarray:
+    """
+    Predict every station's values from its neighbors with one parameter set.
+
+    Args:
+        neighbors: LOSO neighbors computed for at least k_max neighbors
+        values: Station values (m, n_years), NaN for missing
+        calculator: Weight calculator holding the weighting parameters
+        k_max: Neighbors per station and group
+
+    Returns:
+        Predictions (m, n_years); NaN where no weighted neighbor has data
+    """
+    stations = neighbors.neighbors[:, :k_max]
+    distances = neighbors.distances[:, :k_max]
+    valid = stations >= 0
+
+    # Radius search with the single nearest station as fallback
+    searched = valid & (distances <= calculator.max_distance)
+    fallback = ~searched.any(axis=1) & valid[:, 0]
+    searched[fallback, 0] = True
+
+    weights, keep = calculator.calculate_weight_matrix(distances, searched)
+    neighbor_values = values[np.maximum(stations, 0)]                    # (r, k, n_years)
+    has_data = ~np.isnan(neighbor_values) & keep[:, :, None]
+    numerator = np.einsum('rk,rky->ry', weights, np.where(has_data, neighbor_values, 0.0))
+    denominator = np.einsum('rk,rky->ry', weights, has_data.astype(np.float64))
+
+    to_stations = neighbors.row_matrix
+    numerator, denominator = to_stations @ numerator, to_stations @ denominator
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def evaluate_region(neighbors: StationNeighbors,
+                    values: np.ndarray,
+                    grid: pd.DataFrame,
+                    calculators: List[WeightCalculator]) -> pd.DataFrame:
+    """
+    Score every parameter combination for one region.
+
+    Args:
+        neighbors: LOSO neighbors of the region
+        values: Station values (m, n_years)
+        grid: Parameter combinations (from parameter_grid)
+        calculators: One WeightCalculator per grid row
+
+    Returns:
+        DataFrame with RESULT_COLUMNS, one row per combination
+    """
+    observed = ~np.isnan(values)
+    rows = []
+    for k_max, calculator in zip(grid['k_max'], calculators):
+        predictions = predict_loso(neighbors, values, calculator, int(k_max))
+        scored = observed & ~np.isnan(predictions)
+        errors = (predictions - values)[scored]
+        n = len(errors)
+        rows.append((
+            int(scored.any(axis=1).sum()),
+            n,
+            float(np.sqrt(np.mean(errors ** 2))) if n else np.nan,
+            float(np.mean(np.abs(errors))) if n else np.nan,
+            float(np.mean(errors)) if n else np.nan
+        ))
+
+    metrics = pd.DataFrame(rows, columns=RESULT_COLUMNS[len(PARAMETER_COLUMNS) + 1:])
+    result = pd.concat([grid.reset_index(drop=True), metrics], axis=1)
+    result.insert(0, 'region', neighbors.region)
+    return result[RESULT_COLUMNS]
+
+
+def _region_worker(region: str,
+                   flood_data: pd.DataFrame,
+                   index_dir: Path,
+                   grid: pd.DataFrame,
+                   calculators: List[WeightCalculator],
+                   k: int) -> pd.DataFrame:
+    """Evaluate one region in a worker process from the persisted station index and its own flood data."""
+    index = load_station_index(index_dir)
+    neighbors = loso_neighbors(index, region, k)
+    return evaluate_region(neighbors, annual_flood_matrix(flood_data, neighbors.station_ids), grid, calculators)
+
+
+def run_cross_validation(flood_data: pd.DataFrame,
+                         grid: Mapping[str, Sequence] = PARAMETER_GRID,
+                         regions: Optional[Sequence[str]] = None,
+                         index_dir: Path = STATION_INDEX_DIR,
+                         max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Leave-one-station-out errors of every parameter combination in every region.
+
+    Args:
+        flood_data: Long table with station_id, year and flood_days
+        grid: Values of each parameter in PARAMETER_COLUMNS
+        regions: Regions to evaluate (default: every region of the station index)
+        index_dir: Persisted station index root
+        max_workers: Worker processes (None = CPU count, 1 = run in this process)
+
+    Returns:
+        DataFrame with RESULT_COLUMNS, ordered by region then grid order
+    """
+    combinations = parameter_grid(grid)
+    calculators = [
+        WeightCalculator(max_distance_meters=row.max_distance_meters, power=row.power,
+                         min_weight=row.min_weight, method=row.method)
+        for row in combinations.itertuples()
+    ]
+    index = load_station_index(index_dir)
+    if regions is None:
+        regions = sorted(set(index.regions.tolist()))
+
+    # Split flood data by station region so each worker only receives its own slice
+    flood_data = flood_data[['station_id', 'year', 'flood_days']].astype({'station_id': str})
+    station_regions = pd.Series(index.regions, index=index.station_ids)
+    flood_regions = flood_data['station_id'].map(station_regions)
+    region_data = [flood_data[(flood_regions == region).to_numpy()] for region in regions]
+    worker = partial(_region_worker, index_dir=index_dir, grid=combinations,
+                     calculators=calculators, k=int(combinations['k_max'].max()))
+
+    logger.info(f"Cross-validating {len(combinations)} parameter combinations in {len(regions)} regions")
+    if max_workers == 1:
+        results = [worker(region, data) for region, data in zip(regions, region_data)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(worker, regions, region_data))
+
+    if not results:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(results, ignore_index=True)
+
+
+def best_parameters(results: pd.DataFrame, metric: str = 'rmse') -> pd.DataFrame:
+    """
+    Best-scoring parameter combination of each region.
+
+    Args:
+        results: Output of run_cross_validation
+        metric: Error column to minimize ('rmse', 'mae')
+
+    Returns:
+        One row of results per region with predictions
+    """
+    scored = results[results[metric].notna()]
+    return scored.loc[scored.groupby('region')[metric].idxmin()].reset_index(drop=True)
+
+
+def main():
+    """Run leave-one-station-out cross-validation from the command line."""
+    parser = argparse.ArgumentParser(description="Cross-validate imputation weighting parameters")
+    parser.add_argument("--flood-data", type=Path, default=HISTORICAL_DIR / DATASET_NAME,
+                        help="Historical flood days parquet file or dataset")
+    parser.add_argument("--regions", nargs="+", help="Regions to evaluate (default: all)")
+    parser.add_argument("--max-workers", type=int, help="Worker processes")
+    parser.add_argument("--output", type=Path, default=Path("output/imputation/loso_cross_validation.csv"),
+                        help="Output CSV file")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    flood_data = pd.read_parquet(args.flood_data, columns=['station_id', 'year', 'flood_days'])
+    results = run_cross_validation(flood_data, regions=args.regions, max_workers=args.max_workers)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(args.output, index=False)
+    logger.info(f"Saved {len(results)} cross-validation results to {args.output}")
+    for row in best_parameters(results).itertuples():
+        logger.info(f"{row.region}: best {row.method} power={row.power} max_distance={row.max_distance_meters} "
+                    f"min_weight={row.min_weight} k_max={row.k_max} RMSE={row.rmse:.2f} MAE={row.mae:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Content fingerprints and incremental outputs for regional imputation.
+
+Every region's imputation structure is a pure function of its reference
+point slice, its station configuration and the weighting parameters. A
+SHA-256 fingerprint of those inputs is recorded per region in a manifest
+next to the regional parquet files:
+
+- On the next run, a region whose fingerprint matches its manifest entry
+  (and whose file still exists) reuses the stored structure instead of
+  being recomputed
+- The combined imputation_structure_all_regions.parquet remembers which
+  fingerprint each region had when it was written; only regions whose
+  fingerprint changed are replaced in it, and the sparse weight matrices
+  beside it are rebuilt from the result
+
+Editing one Hawaii station therefore recomputes Hawaii alone and rewrites
+only Hawaii's rows of the combined file.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+
+from src.config import TIDE_STATIONS_DIR
+from .weight_matrix import MATRIX_FILES, save_weight_matrices
+
+logger = logging.getLogger(__name__)
+
+# Bump when process_region changes what it produces for the same inputs
+STRUCTURE_VERSION = 1
+
+MANIFEST_FILENAME = "imputation_manifest.json"
+
+COMBINED_FILENAME = "imputation_structure_all_regions.parquet"
+
+
+def _hash_frame(digest, frame: pd.DataFrame):
+    """Feed a row-order-sensitive hash of a frame and its index to digest."""
+    digest.update(str(list(frame.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+
+
+def region_fingerprint(region: str,
+                       region_info: Dict[str, Any],
+                       reference_points: gpd.GeoDataFrame,
+                       gauge_stations: gpd.GeoDataFrame,
+                       parameters: Dict[str, Any],
+                       tide_stations_dir: Path = TIDE_STATIONS_DIR) -> str:
+    """
+    Fingerprint the inputs of one region's imputation structure.
+
+    Args:
+        region: Region identifier
+        region_info: Region configuration dictionary
+        reference_points: The region's reference point slice
+        gauge_stations: The region's gauge stations
+        parameters: Weighting and search parameters (JSON-serializable)
+        tide_stations_dir: Directory of <region>_tide_stations.yaml files
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    settings = {'version': STRUCTURE_VERSION, 'region': region, 'region_info': region_info,
+                'parameters': parameters}
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+
+    station_file = Path(tide_stations_dir) / f"{region}_tide_stations.yaml"
+    if station_file.exists():
+        digest.update(station_file.read_bytes())
+
+    points = pd.DataFrame({
+        'county_fips': reference_points['county_fips'].astype(str).to_numpy(),
+        'state_code': reference_points['state_code'].astype(str).to_numpy(),
+        'lon': reference_points.geometry.x.to_numpy(),
+        'lat': reference_points.geometry.y.to_numpy()
+    }, index=reference_points.index)
+    _hash_frame(digest, points)
+
+    stations = pd.DataFrame({
+        'station_id': gauge_stations['station_id'].astype(str).to_numpy(),
+        'lon': gauge_stations.geometry.x.to_numpy(),
+        'lat': gauge_stations.geometry.y.to_numpy()
+    })
+    _hash_frame(digest, stations)
+    return digest.hexdigest()
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """Write JSON atomically."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class ImputationManifest:
+    """Per-region fingerprints and files of an imputation output directory."""
+
+    def __init__(self, output_dir: Path, data: Optional[Dict[str, Any]] = None):
+        self.output_dir = Path(output_dir)
+        data = data or {}
+        self.regions: Dict[str, Dict[str, Any]] = data.get('regions', {})
+        self.combined: Dict[str, Any] = data.get('combined', {})
+
+    @property
+    def path(self) -> Path:
+        """Location of the manifest file."""
+        return self.output_dir / MANIFEST_FILENAME
+
+    @classmethod
+    def load(cls, output_dir: Path) -> 'ImputationManifest':
+        """Read the manifest of output_dir (empty if missing or unreadable)."""
+        path = Path(output_dir) / MANIFEST_FILENAME
+        try:
+            with open(path) as f:
+                return cls(output_dir, json.load(f))
+        except FileNotFoundError:
+            return cls(output_dir)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable imputation manifest {path}: {e}")
+            return cls(output_dir)
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        _write_json(self.path, {'regions': self.regions, 'combined': self.combined})
+
+    def region_file(self, region: str) -> Optional[Path]:
+        """Stored structure file of a region, if recorded and present."""
+        name = self.regions.get(region, {}).get('file')
+        if name and (self.output_dir / name).exists():
+            return self.output_dir / name
+        return None
+
+    def is_current(self, region: str, fingerprint: str) -> bool:
+        """Whether a region's stored structure exists and matches a fingerprint."""
+        entry = self.regions.get(region)
+        return (entry is not None and entry.get('fingerprint') == fingerprint
+                and self.region_file(region) is not None)
+
+    def record(self, region: str, fingerprint: str, path: Path, records: int):
+        """Record a region's fingerprint and saved structure file."""
+        self.regions[region] = {
+            'fingerprint': fingerprint,
+            'file': Path(path).name,
+            'records': int(records)
+        }
+
+
+def update_combined_structure(manifest: ImputationManifest,
+                              combined_path: Path) -> Optional[Path]:
+    """
+    Bring the combined structure file up to date with the manifest.
+
+    Rows of regions whose fingerprint is unchanged since the combined file was
+    written are kept; changed regions are replaced from their regional files.
+    Rows are ordered by region name, matching combine_imputation_files.
+
+    Args:
+        manifest: Manifest of the regional output directory (updated and saved)
+        combined_path: Combined parquet file
+
+    Returns:
+        Path to the combined file, or None if there is nothing to combine
+    """
+    combined_path = Path(combined_path)
+    current = {region: entry['fingerprint'] for region, entry in manifest.regions.items()
+               if manifest.region_file(region) is not None}
+
+    written = manifest.combined.get('regions', {}) \
+        if manifest.combined.get('path') == str(combined_path) and combined_path.exists() else {}
+    changed = sorted(region for region in current if written.get(region) != current[region])
+    removed = sorted(set(written) - set(current))
+
+    if not changed and not removed and written:
+        logger.info(f"Combined imputation structure is up to date: {combined_path}")
+        if not all((combined_path.parent / name).exists() for name in MATRIX_FILES.values()):
+            save_weight_matrices(pd.read_parquet(combined_path), combined_path.parent)
+        return combined_path
+    if not current:
+        logger.warning("No regional imputation structures to combine")
+        return None
+
+    frames = []
+    if written:
+        kept = pd.read_parquet(combined_path)
+        frames.append(kept[~kept['region'].isin(changed + removed)])
+    for region in changed:
+        frames.append(pd.read_parquet(manifest.region_file(region)))
+
+    combined = pd.concat(frames, ignore_index=True)
+    order = np.argsort(combined['region'].to_numpy().astype(str), kind='stable')
+    combined = combined.iloc[order].reset_index(drop=True)
+
+    combined_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = combined_path.with_name(combined_path.name + ".tmp")
+    combined.to_parquet(tmp, index=False)
+    os.replace(tmp, combined_path)
+    save_weight_matrices(combined, combined_path.parent)
+
+    manifest.combined = {'path': str(combined_path), 'regions': current}
+    manifest.save()
+    logger.info(f"Updated combined imputation structure ({len(changed)} regions replaced, "
+                f"{len(removed)} removed): {combined_path}")
+    return combined_path
@@ -41,19 +41,43 @@ from src.config import (
     REFERENCE_POINTS_FILE,
     OUTPUT_DIR,
     TIDE_STATIONS_DIR,
-    REGION_CONFIG
+    REGION_CONFIG,
+    STATION_INDEX_DIR
 )
 
 from .data_loader import DataLoader
 from .spatial_ops import NearestGaugeFinder
+from .station_index import load_station_index
+from .shared_points import SharedPointSlice, SharedReferencePoints, slice_regions
+from .incremental import COMBINED_FILENAME, ImputationManifest, region_fingerprint, update_combined_structure
 from .weight_calculator import WeightCalculator
 
 logger = logging.getLogger(__name__)
 
+# Weighting used for every region (part of each region's fingerprint)
+WEIGHT_PARAMETERS = {
+    'max_distance_meters': 100000,  # 100km max distance
+    'power': 2,  # inverse distance power
+    'min_weight': 0.1
+}
+
+# Neighbor search: the k_max nearest stations per point and subregion. A radius
+# search (radius_meters) is available; change these only with the
+# leave-one-station-out results of cross_validation to back it
+SEARCH_PARAMETERS = {
+    'k_max': 3,
+    'radius_meters': None
+}
+
+# Nearest neighbor backend (part of each region's fingerprint); the pipeline opts
+# in to great-circle distances instead of NearestGaugeFinder's Albers default
+SPATIAL_BACKEND = 'sphere'
+
 def process_region(region: str,
                   region_info: dict,
                   reference_points: gpd.GeoDataFrame,
-                  gauge_stations: gpd.GeoDataFrame) -> Optional[pd.DataFrame]:
+                  gauge_stations: gpd.GeoDataFrame,
+                  station_index_dir: Optional[Path] = None) -> Optional[pd.DataFrame]:
     """
     Process a single region.
     
@@ -62,6 +86,8 @@ def process_region(region: str,
         region_info: Region configuration dictionary
         reference_points: Reference points GeoDataFrame
         gauge_stations: Gauge stations GeoDataFrame
+        station_index_dir: Persisted station index root to load prebuilt trees from
+            (None builds trees from gauge_stations)
         
     Returns:
         DataFrame containing imputation structure for the region or None if error
@@ -71,44 +97,27 @@ def process_region(region: str,
         logger.info(f"States included: {', '.join(region_info['state_codes'])}")
         
         # Initialize components for this region
-        gauge_finder = NearestGaugeFinder(region_config=REGION_CONFIG)
-        weight_calculator = WeightCalculator(
-            max_distance_meters=100000,  # 100km max distance
-            power=2,  # inverse distance power
-            min_weight=0.1
-        )
+        station_index = load_station_index(station_index_dir) if station_index_dir else None
+        gauge_finder = NearestGaugeFinder(region_config=REGION_CONFIG, backend=SPATIAL_BACKEND,
+                                          station_index=station_index, **SEARCH_PARAMETERS)
+        weight_calculator = WeightCalculator(**WEIGHT_PARAMETERS)
         
         # Find nearest gauges for reference points in this region
-        mappings = gauge_finder.find_nearest(
+        neighbors = gauge_finder.find_nearest(
             reference_points=reference_points,
             gauge_stations=gauge_stations,
             region=region
         )
         
-        if not mappings:
+        if neighbors is None or len(neighbors) == 0:
             logger.warning(f"No mappings found for region {region}")
             return None
             
-        # Calculate weights for gauge stations
-        weighted_mappings = weight_calculator.calculate_weights(mappings)
+        # Calculate weights for all point-gauge pairs at once
+        weights, keep = weight_calculator.calculate_weight_matrix(neighbors.distances, neighbors.valid)
         
         # Convert to DataFrame
-        records = []
-        for mapping in weighted_mappings:
-            for gauge in mapping['mappings']:
-                records.append({
-                    'reference_point_id': mapping['reference_point_id'],
-                    'county_fips': mapping['county_fips'],
-                    'region': region,
-                    'region_name': region_info['name'],
-                    'station_id': gauge['station_id'],
-                    'station_name': gauge['station_name'],
-                    'sub_region': gauge['sub_region'],
-                    'distance_meters': gauge['distance_meters'],
-                    'weight': gauge['weight']
-                })
-                
-        df = pd.DataFrame.from_records(records)
+        df = neighbors.to_frame(weights=weights, keep=keep, region_name=region_info['name'])
         
         # Log statistics with improved clarity
         if not df.empty:
@@ -137,7 +146,7 @@ def process_region(region: str,
                     logger.info(f"  Counties with mappings: {sub_counties} (all counties in region)")
                     logger.info(f"  Average distance to stations: {avg_distance:,.2f} meters")
                     logger.info(f"  Average station weight: {avg_weight:.4f}")
-                    logger.info("  Note: Weights decrease with distance, stations beyond 100km have minimal influence")
+                    logger.info("  Note: Weights decrease with distance; stations beyond 100km are only used as a sole nearest fallback")
             
         return df
         
@@ -145,6 +154,32 @@ def process_region(region: str,
         logger.error(f"Error processing region {region}: {str(e)}")
         return None
 
+def process_region_shared(region: str,
+                          region_info: Dict,
+                          points: SharedPointSlice,
+                          gauge_stations: gpd.GeoDataFrame,
+                          station_index_dir: Optional[Path] = None) -> Optional[pd.DataFrame]:
+    """
+    Process a region whose reference points arrive as a shared-memory slice.
+
+    Args:
+        region: Region identifier
+        region_info: Region configuration dictionary
+        points: The region's reference points in shared memory
+        gauge_stations: Gauge stations GeoDataFrame (the region's stations suffice)
+        station_index_dir: Persisted station index root
+
+    Returns:
+        DataFrame containing imputation structure for the region or None if error
+    """
+    return process_region(region, region_info, points.to_frame(), gauge_stations, station_index_dir)
+
+def region_gauge_stations(gauge_stations: gpd.GeoDataFrame, region: str) -> gpd.GeoDataFrame:
+    """The region's stations when the loader tagged them with a region, else all stations."""
+    if 'region' not in gauge_stations.columns:
+        return gauge_stations
+    return gauge_stations[gauge_stations['region'] == region]
+
 class ImputationManager:
     """
     Manages the imputation process across all regions.
@@ -161,7 +196,9 @@ class ImputationManager:
                  output_dir: Path = IMPUTATION_DIR / "data",
                  region_config: Path = REGION_CONFIG,
                  n_processes: int = None,
-                 region: str = None):
+                 region: str = None,
+                 combined_path: Path = None,
+                 force: bool = False):
         """
         Initialize imputation manager.
         
@@ -172,6 +209,9 @@ class ImputationManager:
             region_config: Path to region configuration file
             n_processes: Number of processes to use for parallel processing
             region: Specific region to process (if None, process all regions)
+            combined_path: Combined structure file kept up to date after each run
+                (defaults to imputation_structure_all_regions.parquet beside output_dir)
+            force: Recompute every region even if its fingerprint is unchanged
         """
         self.reference_points_file = reference_points_file
         self.gauge_stations_file = gauge_stations_file
@@ -179,6 +219,8 @@ class ImputationManager:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.n_processes = n_processes or max(1, mp.cpu_count() - 2)
         self.region = region
+        self.combined_path = combined_path or self.output_dir.parent / COMBINED_FILENAME
+        self.force = force
         
         # Load region configuration
         with open(region_config) as f:
@@ -250,12 +292,51 @@ class ImputationManager:
         
         return output_path
 
+    def _fingerprints(self,
+                      regions: Dict[str, Dict],
+                      reference_points: gpd.GeoDataFrame,
+                      positions: Dict[str, np.ndarray],
+                      gauge_stations: gpd.GeoDataFrame) -> Dict[str, str]:
+        """Fingerprint each region's point slice, stations and parameters."""
+        parameters = {'weights': WEIGHT_PARAMETERS, 'search': SEARCH_PARAMETERS,
+                      'backend': SPATIAL_BACKEND}
+        return {
+            region: region_fingerprint(
+                region,
+                info,
+                reference_points.iloc[positions[region]],
+                region_gauge_stations(gauge_stations, region),
+                parameters
+            )
+            for region, info in regions.items()
+        }
+
+    def _store_result(self,
+                      manifest: ImputationManifest,
+                      region: str,
+                      fingerprint: str,
+                      df: Optional[pd.DataFrame]) -> Optional[Path]:
+        """
+        Save a region's structure and record it in the manifest.
+
+        Regions without output (no mappings or an error) are not recorded,
+        so they are attempted again on the next run.
+        """
+        output_path = self.save_imputation_structure(df, region)
+        if output_path:
+            manifest.record(region, fingerprint, output_path, len(df))
+            manifest.save()
+        return output_path
+
     def run(self) -> Dict[str, Path]:
         """
         Run imputation structure preparation for all regions or a single region.
         
         If a region was specified during initialization, only that region is processed.
-        Otherwise, all regions are processed in parallel.
+        Otherwise, all regions are processed in parallel. Regions whose
+        fingerprint (point slice, station configuration and weighting
+        parameters) matches the manifest reuse their stored structure, and
+        the combined structure file is updated for changed regions only.
         
         Returns:
             Dictionary mapping region names to output file paths
@@ -274,61 +355,85 @@ class ImputationManager:
             if gauge_stations is None or gauge_stations.empty:
                 logger.error("Failed to load gauge stations")
                 return output_files
-            
+
             # Process only a specific region if requested
             if self.region:
                 if self.region not in self.region_config:
                     logger.error(f"Region '{self.region}' not found in configuration")
                     return output_files
-                    
+                regions = {self.region: self.region_config[self.region]}
                 logger.info(f"Processing single region: {self.region}")
+            else:
+                regions = self.region_config
+
+            # Slice and fingerprint every region once; unchanged regions are reused
+            positions = slice_regions(reference_points, regions)
+            fingerprints = self._fingerprints(regions, reference_points, positions, gauge_stations)
+            manifest = ImputationManifest.load(self.output_dir)
+            empty = [region for region in regions if len(positions[region]) == 0]
+            if empty:
+                logger.warning(f"No reference points for regions: {', '.join(empty)}")
+            stale = [region for region in regions if region not in empty and
+                     (self.force or not manifest.is_current(region, fingerprints[region]))]
+            for region in regions:
+                if region not in stale and region not in empty:
+                    output_files[region] = manifest.region_file(region)
+            logger.info(f"{len(output_files)} regions unchanged, {len(stale)} to compute")
+
+            if stale:
+                # Build the persisted station index once so workers only memory-map it
+                load_station_index(STATION_INDEX_DIR)
+
+            if self.region and stale:
                 try:
                     df = process_region(
                         self.region, 
-                        self.region_config[self.region],
-                        reference_points,
-                        gauge_stations
+                        regions[self.region],
+                        reference_points.iloc[positions[self.region]],
+                        region_gauge_stations(gauge_stations, self.region),
+                        STATION_INDEX_DIR
                     )
                     
-                    if df is not None:
-                        output_path = self.save_imputation_structure(df, self.region)
-                        if output_path:
-                            output_files[self.region] = output_path
+                    output_path = self._store_result(manifest, self.region, fingerprints[self.region], df)
+                    if output_path:
+                        output_files[self.region] = output_path
                 except Exception as e:
                     logger.error(f"Error processing region {self.region}: {str(e)}")
                     logger.error(traceback.format_exc())
+            elif stale:
+                # Process changed regions in parallel. Points are sliced once here;
+                # workers receive only their region's attributes and read
+                # coordinates from shared memory.
+                logger.info("Processing regions in parallel")
+                stale_config = {region: regions[region] for region in stale}
+                with SharedReferencePoints(reference_points, stale_config, positions) as shared, \
+                        ProcessPoolExecutor(max_workers=self.n_processes) as executor:
+                    # Submit changed regions
+                    future_to_region = {
+                        executor.submit(
+                            process_region_shared,
+                            region,
+                            regions[region],
+                            shared.slices[region],
+                            region_gauge_stations(gauge_stations, region),
+                            STATION_INDEX_DIR
+                        ): region 
+                        for region in stale
+                    }
                     
-                return output_files
-            
-            # Process all regions in parallel if no specific region requested
-            logger.info("Processing all regions in parallel")
-            with ProcessPoolExecutor(max_workers=self.n_processes) as executor:
-                # Submit all regions
-                future_to_region = {
-                    executor.submit(
-                        process_region,
-                        region,
-                        self.region_config[region],
-                        reference_points,
-                        gauge_stations
-                    ): region 
-                    for region in self.region_config
-                }
-                
-                # Process results as they complete
-                for future in tqdm(as_completed(future_to_region), 
-                                 total=len(self.region_config),
-                                 desc="Processing regions"):
-                    region = future_to_region[future]
-                    try:
-                        df = future.result()
-                        if df is not None:
-                            output_path = self.save_imputation_structure(df, region)
+                    # Process results as they complete
+                    for future in tqdm(as_completed(future_to_region), 
+                                     total=len(future_to_region),
+                                     desc="Processing regions"):
+                        region = future_to_region[future]
+                        try:
+                            output_path = self._store_result(manifest, region, fingerprints[region], future.result())
                             if output_path:
                                 output_files[region] = output_path
-                    except Exception as e:
-                        logger.error(f"Error processing region {region}: {str(e)}")
-            
+                        except Exception as e:
+                            logger.error(f"Error processing region {region}: {str(e)}")
+
+            update_combined_structure(manifest, self.combined_path)
             return output_files
             
         except Exception as e:
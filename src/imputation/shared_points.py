@@ -0,0 +1,178 @@
+"""
+Region slicing and shared-memory transport of reference points.
+
+Regional imputation workers only need their own region's reference points.
+Instead of pickling the national GeoDataFrame into every worker (which then
+filters it again), the parent:
+
+1. Slices reference points by region once, with the same state code and
+   bounds rules NearestGaugeFinder applies
+2. Writes all sliced coordinates into one multiprocessing.shared_memory
+   block of float64 (lon, lat) rows, region after region
+3. Hands each worker a small SharedPointSlice holding the block name, its
+   row range and only its own point IDs, county FIPS and state codes
+
+Workers rebuild their GeoDataFrame from the shared coordinates, so memory and
+IPC no longer scale with regions x full dataset.
+"""
+
+import logging
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+import geopandas as gpd
+import numpy as np
+
+from .spatial_ops import region_bounds_mask
+
+logger = logging.getLogger(__name__)
+
+WGS84 = "EPSG:4326"
+
+
+def slice_regions(reference_points: gpd.GeoDataFrame,
+                  region_config: Dict[str, dict]) -> Dict[str, np.ndarray]:
+    """
+    Row positions of each region's reference points.
+
+    Args:
+        reference_points: Reference points with a state_code column
+        region_config: Region definitions (state_codes and bounds) by region
+
+    Returns:
+        Dictionary of region -> int64 row positions into reference_points
+    """
+    if reference_points.crs is not None and not reference_points.crs.equals(WGS84):
+        reference_points = reference_points.to_crs(WGS84)
+    lon = reference_points.geometry.x.to_numpy()
+    lat = reference_points.geometry.y.to_numpy()
+    state_codes = reference_points['state_code'].to_numpy()
+
+    slices = {}
+    for region, info in region_config.items():
+        mask = np.isin(state_codes, info['state_codes']) & region_bounds_mask(lon, lat, info['bounds'])
+        slices[region] = np.flatnonzero(mask)
+    return slices
+
+
+@dataclass
+class SharedPointSlice:
+    """One region's reference points: coordinates in shared memory, attributes inline."""
+    shm_name: str             # Shared memory block of (rows, 2) float64 lon/lat
+    rows: int                 # Total rows in the block
+    start: int                # First row of this region
+    stop: int                 # One past the last row of this region
+    point_ids: np.ndarray     # Reference point IDs (index of the original frame)
+    county_fips: np.ndarray
+    state_codes: np.ndarray
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    def to_frame(self) -> gpd.GeoDataFrame:
+        """
+        Rebuild the region's reference points from shared memory.
+
+        Returns:
+            GeoDataFrame in EPSG:4326 indexed by the original point IDs
+        """
+        coords = np.empty((len(self), 2))
+        if len(self):
+            block = shared_memory.SharedMemory(name=self.shm_name)
+            try:
+                shared = np.ndarray((self.rows, 2), dtype=np.float64, buffer=block.buf)
+                coords[:] = shared[self.start:self.stop]
+                del shared
+            finally:
+                block.close()
+
+        return gpd.GeoDataFrame(
+            {'county_fips': self.county_fips, 'state_code': self.state_codes},
+            geometry=gpd.points_from_xy(coords[:, 0], coords[:, 1]),
+            index=self.point_ids,
+            crs=WGS84
+        )
+
+
+class SharedReferencePoints:
+    """
+    Context manager owning the shared coordinate block for all regions.
+
+    Usage:
+        with SharedReferencePoints(reference_points, region_config) as shared:
+            executor.submit(worker, shared.slices[region])
+    """
+
+    def __init__(self,
+                 reference_points: gpd.GeoDataFrame,
+                 region_config: Dict[str, dict],
+                 positions: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Slice reference points by region and copy their coordinates to shared memory.
+
+        Args:
+            reference_points: Reference points with county_fips and state_code columns
+            region_config: Region definitions (state_codes and bounds) by region
+            positions: Precomputed slice_regions() result for region_config
+        """
+        if positions is None:
+            positions = slice_regions(reference_points, region_config)
+        positions = {region: positions[region] for region in region_config}
+        rows = sum(len(p) for p in positions.values())
+
+        # Read every column (and reproject) before allocating, so bad input
+        # fails without creating a shared memory block
+        points = reference_points
+        if points.crs is not None and not points.crs.equals(WGS84):
+            points = points.to_crs(WGS84)
+        lon = points.geometry.x.to_numpy()
+        lat = points.geometry.y.to_numpy()
+        point_ids = points.index.to_numpy()
+        county_fips = points['county_fips'].to_numpy()
+        state_codes = points['state_code'].to_numpy()
+
+        self.block: Optional[shared_memory.SharedMemory] = shared_memory.SharedMemory(
+            create=True, size=max(rows * 2 * np.dtype(np.float64).itemsize, 1)
+        )
+        self.slices: Dict[str, SharedPointSlice] = {}
+        try:
+            shared = np.ndarray((rows, 2), dtype=np.float64, buffer=self.block.buf)
+            try:
+                start = 0
+                for region, rows_in_region in positions.items():
+                    stop = start + len(rows_in_region)
+                    shared[start:stop, 0] = lon[rows_in_region]
+                    shared[start:stop, 1] = lat[rows_in_region]
+                    self.slices[region] = SharedPointSlice(
+                        shm_name=self.block.name,
+                        rows=rows,
+                        start=start,
+                        stop=stop,
+                        point_ids=point_ids[rows_in_region],
+                        county_fips=county_fips[rows_in_region],
+                        state_codes=state_codes[rows_in_region]
+                    )
+                    start = stop
+            finally:
+                # The view must be released before the block can be closed
+                del shared
+        except BaseException:
+            self.close()
+            raise
+
+        logger.info(f"Shared {rows} reference point coordinates across {len(self.slices)} regions "
+                    f"({self.block.size / 1e6:.1f} MB)")
+
+    def close(self):
+        """Release and unlink the shared memory block."""
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def __enter__(self) -> 'SharedReferencePoints':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -5,8 +5,11 @@ This module provides spatial operations for finding the nearest tide gauge stati
 It is needed because:
 
 1. Accurate Distance Calculations:
-   - Converts coordinates from WGS84 (lat/long) to Albers Equal Area projection
-   - Albers projection preserves distances, critical for finding truly nearest stations
+   - By default projects to a region-specific Albers Equal Area CRS
+   - The 'sphere' backend converts WGS84 (lat/long) coordinates to 3D unit vectors
+     instead; chord distances between unit vectors rank neighbors exactly like
+     great-circle distances, need no per-region reprojection and are unaffected
+     by the antimeridian
 
 2. Efficient Nearest Neighbor Search:
    - Uses KD-Trees for fast spatial queries
@@ -26,6 +29,8 @@ The module is a key component for:
 
 import geopandas as gpd
 import numpy as np
+import pandas as pd
+from dataclasses import dataclass
 from scipy.spatial import cKDTree
 from typing import Tuple, List, Dict, Optional
 import logging
@@ -33,16 +38,221 @@ from tqdm import tqdm
 import pyproj
 from pathlib import Path
 from src.config import CONFIG_DIR, config_manager
-from shapely.geometry import box
 
 logger = logging.getLogger(__name__)
 
+# Mean Earth radius (IUGG) used to convert chord lengths to great-circle meters
+EARTH_RADIUS_METERS = 6_371_008.8
+
+# Nearest neighbor backends: unit-sphere vectors or region-specific Albers projections
+SPATIAL_BACKENDS = ('sphere', 'albers')
+
+def lonlat_to_unit_vectors(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """
+    Convert longitude/latitude in degrees to ECEF unit vectors on a spherical Earth.
+
+    Args:
+        lon: Longitudes in degrees
+        lat: Latitudes in degrees
+
+    Returns:
+        float64 array of shape (n, 3)
+    """
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+def chord_to_meters(chord: np.ndarray) -> np.ndarray:
+    """
+    Convert unit-sphere chord lengths to great-circle distances in meters.
+
+    Infinite chords (KD-tree padding for missing neighbors) stay infinite.
+    """
+    chord = np.asarray(chord, dtype=np.float64)
+    finite = np.isfinite(chord)
+    meters = np.full(chord.shape, np.inf)
+    meters[finite] = 2 * EARTH_RADIUS_METERS * np.arcsin(np.clip(chord[finite] / 2, 0, 1))
+    return meters
+
+def meters_to_chord(meters: np.ndarray) -> np.ndarray:
+    """
+    Convert great-circle distances in meters to unit-sphere chord lengths.
+
+    Distances beyond half the circumference map to the diameter (2).
+    """
+    angle = np.minimum(np.asarray(meters, dtype=np.float64) / EARTH_RADIUS_METERS, np.pi)
+    return 2 * np.sin(angle / 2)
+
+
+@dataclass
+class GaugeNeighbors:
+    """
+    Columnar point-to-gauge neighbor result for one region.
+
+    Row r pairs reference point point_index[r] with a variable number of
+    stations, stored CSR-style: its neighbors are
+    neighbor_stations[offsets[r]:offsets[r + 1]] (positions into the station
+    arrays) at neighbor_distances[...] meters, in ascending distance order.
+    station_index and distances give the same neighbors as padded (r, k)
+    arrays (-1 / inf padding) for whole-matrix weighting.
+    """
+    region: str
+    point_ids: np.ndarray           # (n,) reference point index labels
+    county_fips: np.ndarray         # (n,) county FIPS of each reference point
+    station_ids: np.ndarray         # (m,) station IDs
+    station_names: np.ndarray       # (m,) station names
+    sub_regions: np.ndarray         # (m,) station sub-regions
+    point_index: np.ndarray         # (r,) row -> reference point position
+    offsets: np.ndarray             # (r + 1,) row -> start of its neighbors
+    neighbor_stations: np.ndarray   # (nnz,) station positions
+    neighbor_distances: np.ndarray  # (nnz,) distances in meters
+
+    def __len__(self) -> int:
+        return len(self.point_index)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """Number of neighbors of each row."""
+        return np.diff(self.offsets)
+
+    def _padded(self, values: np.ndarray, fill) -> np.ndarray:
+        """Scatter per-neighbor values into a (r, max count) array."""
+        counts = self.counts
+        width = int(counts.max()) if len(counts) else 0
+        padded = np.full((len(counts), width), fill, dtype=values.dtype)
+        padded[np.arange(width) < counts[:, None]] = values
+        return padded
+
+    @property
+    def station_index(self) -> np.ndarray:
+        """Padded (r, k) station positions, -1 for padding."""
+        return self._padded(self.neighbor_stations, -1)
+
+    @property
+    def distances(self) -> np.ndarray:
+        """Padded (r, k) distances in meters, inf for padding."""
+        return self._padded(self.neighbor_distances, np.inf)
+
+    @property
+    def valid(self) -> np.ndarray:
+        """Mask (r, k) of real (non-padding) neighbors."""
+        counts = self.counts
+        width = int(counts.max()) if len(counts) else 0
+        return np.arange(width) < counts[:, None]
+
+    def station_mask(self, station_flags: np.ndarray) -> np.ndarray:
+        """Broadcast a per-station boolean array to the (r, k) neighbor grid."""
+        return self.valid & station_flags[np.maximum(self.station_index, 0)]
+
+    def to_frame(self,
+                 weights: Optional[np.ndarray] = None,
+                 keep: Optional[np.ndarray] = None,
+                 region_name: Optional[str] = None) -> pd.DataFrame:
+        """
+        Flatten to one row per point-station pair.
+
+        Args:
+            weights: Optional (r, k) station weights (default 1.0)
+            keep: Optional (r, k) mask of pairs to keep (default: all valid)
+            region_name: Optional display name added as a region_name column
+
+        Returns:
+            DataFrame with reference_point_id, county_fips, region,
+            [region_name,] station_id, station_name, sub_region,
+            distance_meters and weight, ordered by row then distance
+        """
+        keep = self.valid if keep is None else keep & self.valid
+        rows, cols = np.nonzero(keep)
+        points = self.point_index[rows]
+        flat = self.offsets[rows] + cols
+        stations = self.neighbor_stations[flat]
+
+        columns = {
+            'reference_point_id': self.point_ids[points],
+            'county_fips': self.county_fips[points],
+            'region': self.region
+        }
+        if region_name is not None:
+            columns['region_name'] = region_name
+        columns.update({
+            'station_id': self.station_ids[stations],
+            'station_name': self.station_names[stations],
+            'sub_region': self.sub_regions[stations],
+            'distance_meters': self.neighbor_distances[flat].astype(float),
+            'weight': 1.0 if weights is None else weights[rows, cols].astype(float)
+        })
+        return pd.DataFrame(columns)
+
+    def to_mappings(self) -> List[dict]:
+        """Convert to the per-point list of mapping dictionaries."""
+        records = self.to_frame()[['station_id', 'station_name', 'sub_region',
+                                   'distance_meters', 'weight']].to_dict('records')
+        mappings = []
+        for row, point in enumerate(self.point_index):
+            mappings.append({
+                'reference_point_id': self.point_ids[point],
+                'county_fips': self.county_fips[point],
+                'region': self.region,
+                'mappings': records[self.offsets[row]:self.offsets[row + 1]]
+            })
+        return mappings
+
+
+def region_bounds_mask(lon: np.ndarray, lat: np.ndarray, bounds: Dict[str, float]) -> np.ndarray:
+    """
+    Mask of points strictly inside a region's bounding box.
+
+    Bounds with min_lon greater than max_lon cross the antimeridian and
+    include longitudes above min_lon or below max_lon.
+
+    Args:
+        lon: Longitudes in degrees
+        lat: Latitudes in degrees
+        bounds: Dictionary with min_lon, min_lat, max_lon, max_lat
+
+    Returns:
+        Boolean mask with the shape of lon
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    above_min, below_max = lon > bounds['min_lon'], lon < bounds['max_lon']
+    in_lon = (above_min | below_max) if bounds['min_lon'] > bounds['max_lon'] else (above_min & below_max)
+    return in_lon & (lat > bounds['min_lat']) & (lat < bounds['max_lat'])
 
 class NearestGaugeFinder:
     """Finds nearest gauge stations for reference points."""
 
     def __init__(self,
-                 region_config: Path = CONFIG_DIR / "region_mappings.yaml"):
+                 region_config: Path = CONFIG_DIR / "region_mappings.yaml",
+                 backend: str = 'albers',
+                 station_index=None,
+                 k_max: Optional[int] = 3,
+                 radius_meters: Optional[float] = None):
+        """
+        Initialize the finder.
+
+        Args:
+            region_config: Region definitions file
+            backend: Nearest neighbor backend ('albers' or 'sphere')
+            station_index: Optional persisted StationIndex
+            k_max: Most stations per point and subregion (None: every station
+                within radius_meters)
+            radius_meters: Search radius; points with no station inside it get
+                their single nearest station (None: always the k_max nearest)
+        """
+        if backend not in SPATIAL_BACKENDS:
+            raise ValueError(f"Unknown spatial backend: {backend}; expected one of {SPATIAL_BACKENDS}")
+        if k_max is None and radius_meters is None:
+            raise ValueError("k_max and radius_meters cannot both be None")
+        if k_max is not None and k_max < 1:
+            raise ValueError(f"k_max must be at least 1, got {k_max}")
+        self.backend = backend
+        self.k_max = k_max
+        self.radius_meters = radius_meters
+        # Optional persisted StationIndex whose prebuilt trees replace per-call builds
+        self.station_index = station_index
+
         # Load region definitions using cached config manager
         self.region_config = config_manager.get_yaml(region_config)
             
@@ -125,23 +335,9 @@ class NearestGaugeFinder:
             reference_points['state_code'].isin(state_codes)
         ].copy()
         
-        # Get region bounds
-        bounds = region_def['bounds']
-        bounds_polygon = box(
-            bounds['min_lon'],
-            bounds['min_lat'],
-            bounds['max_lon'],
-            bounds['max_lat']
-        )
-        bounds_gdf = gpd.GeoDataFrame({'geometry': [bounds_polygon]}, crs="EPSG:4326")
-        
         # Further filter points by region bounds
-        filtered_points = gpd.sjoin(
-            filtered_points,
-            bounds_gdf,
-            how='inner',
-            predicate='within'
-        )
+        bounds = region_def['bounds']
+        filtered_points = filtered_points[self._within_bounds(filtered_points, bounds)]
         
         # Get station IDs for the region
         region_station_ids = set(self.region_stations[region].keys())
@@ -161,12 +357,7 @@ class NearestGaugeFinder:
             lambda x: self.region_stations[region].get(x, {}).get('name', '')
         )
         
-        filtered_stations = gpd.sjoin(
-            filtered_stations,
-            bounds_gdf,
-            how='inner',
-            predicate='within'
-        )
+        filtered_stations = filtered_stations[self._within_bounds(filtered_stations, bounds)]
         
         if filtered_points.empty or filtered_stations.empty:
             logger.warning(f"No data found for region {region} after filtering")
@@ -179,6 +370,12 @@ class NearestGaugeFinder:
             
         return filtered_points, filtered_stations
 
+    def _within_bounds(self, frame: gpd.GeoDataFrame, bounds: Dict[str, float]) -> np.ndarray:
+        """Mask of geometries strictly inside region bounds (see region_bounds_mask)."""
+        if frame.crs is not None and not frame.crs.equals("EPSG:4326"):
+            frame = frame.to_crs("EPSG:4326")
+        return region_bounds_mask(frame.geometry.x.to_numpy(), frame.geometry.y.to_numpy(), bounds)
+
     def _get_region_projection(self, region: str) -> str:
         """Get the appropriate projection for a region."""
         return self.region_projections.get(region, self.region_projections['default'])
@@ -227,6 +424,40 @@ class NearestGaugeFinder:
         ])
         return ref_coords, gauge_coords
     
+    def _sphere_coordinates(self,
+                            reference_points: gpd.GeoDataFrame,
+                            gauge_stations: gpd.GeoDataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Unit vectors of reference points and gauge stations for KDTree.
+
+        Chord distances between unit vectors are monotonic in great-circle
+        distance, so KD-tree neighbors in 3D are the true nearest stations on
+        the sphere, for any region and across the antimeridian.
+
+        Args:
+            reference_points: GeoDataFrame of reference points
+            gauge_stations: GeoDataFrame of gauge stations
+
+        Returns:
+            Tuple of unit vector arrays (reference_vectors, gauge_vectors), each (n, 3)
+        """
+        vectors = []
+        for frame in (reference_points, gauge_stations):
+            if frame.crs is not None and not frame.crs.equals("EPSG:4326"):
+                frame = frame.to_crs("EPSG:4326")
+            vectors.append(lonlat_to_unit_vectors(frame.geometry.x.to_numpy(), frame.geometry.y.to_numpy()))
+        return vectors[0], vectors[1]
+
+    def _neighbor_coordinates(self,
+                              reference_points: gpd.GeoDataFrame,
+                              gauge_stations: gpd.GeoDataFrame,
+                              region: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Coordinates for the configured backend (unit vectors or projected meters)."""
+        if self.backend == 'sphere':
+            return self._sphere_coordinates(reference_points, gauge_stations)
+        reference_points, gauge_stations = self._project_points(reference_points, gauge_stations, region)
+        return self._extract_coordinates(reference_points, gauge_stations)
+
     def _get_region_bounds(self, state_fips: str) -> Dict[str, float]:
         """
         Get the bounding box for the region containing the given state.
@@ -269,128 +500,176 @@ class NearestGaugeFinder:
         
         return gauge_stations[mask]
 
+    def _search_tree(self, tree: cKDTree, ref_coords: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Radius-bounded, adaptive-k search of one station tree.
+
+        Without a radius every point gets its min(k_max, stations) nearest
+        stations. With a radius, a point gets the stations within it (at most
+        k_max, via distance_upper_bound, or all of them via query_ball_point
+        when k_max is None) and falls back to its single nearest station when
+        none are in range.
+
+        Args:
+            tree: KD-tree of station coordinates
+            ref_coords: Reference point coordinates in the tree's space
+
+        Returns:
+            Tuple of (counts, positions, distances): neighbors per point and the
+            flat positions into the tree's data and distances in meters, ordered
+            by point then ascending distance
+        """
+        n = len(ref_coords)
+        k = tree.n if self.k_max is None else min(self.k_max, tree.n)
+
+        if self.radius_meters is None:
+            distances, positions = tree.query(ref_coords, k=k)
+            counts = np.full(n, k, dtype=np.int64)
+            rows = np.repeat(np.arange(n), k)
+            positions, distances = positions.reshape(-1), distances.reshape(-1)
+        else:
+            bound = meters_to_chord(self.radius_meters) if self.backend == 'sphere' else self.radius_meters
+            if self.k_max is None:
+                found = tree.query_ball_point(ref_coords, r=bound, return_sorted=False)
+                counts = np.array([len(f) for f in found], dtype=np.int64)
+                positions = np.concatenate([np.asarray(f, dtype=np.int64) for f in found]) if n else \
+                    np.empty(0, dtype=np.int64)
+                rows = np.repeat(np.arange(n), counts)
+                distances = np.linalg.norm(ref_coords[rows] - tree.data[positions], axis=1)
+            else:
+                distances, positions = tree.query(ref_coords, k=k, distance_upper_bound=bound)
+                distances, positions = distances.reshape(n, k), positions.reshape(n, k)
+                within = np.isfinite(distances)
+                counts = within.sum(axis=1)
+                rows = np.nonzero(within)[0]
+                positions, distances = positions[within], distances[within]
+
+            # Single nearest station for points with nothing in range
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                logger.debug(f"{len(empty)} points have no station within "
+                             f"{self.radius_meters / 1000:.0f}km; using their nearest station")
+                nearest_distances, nearest = tree.query(ref_coords[empty], k=1)
+                counts[empty] = 1
+                rows = np.concatenate([rows, empty])
+                positions = np.concatenate([positions, nearest])
+                distances = np.concatenate([distances, nearest_distances])
+
+            order = np.lexsort((distances, rows))
+            positions, distances = positions[order], distances[order]
+
+        if self.backend == 'sphere':
+            distances = chord_to_meters(distances)
+        return counts, positions.astype(np.int64), distances
+
+    def _query_group(self,
+                     ref_coords: np.ndarray,
+                     station_coords: np.ndarray,
+                     station_ids: np.ndarray,
+                     group_key: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Query one station group, using the persisted index tree when it matches.
+
+        The index tree is used only with the sphere backend and when the
+        index group holds exactly these stations at the same coordinates;
+        otherwise a tree is built from station_coords.
+
+        Args:
+            ref_coords: Reference point coordinates
+            station_coords: Coordinates of the group's stations
+            station_ids: IDs of the group's stations
+            group_key: Index group key ('region' or 'region/sub_region')
+
+        Returns:
+            Tuple of (counts, positions into station_coords, distances in meters),
+            as returned by _search_tree
+        """
+        index = self.station_index
+        if self.backend == 'sphere' and index is not None and group_key in index.groups:
+            index_positions = index.groups[group_key]
+            ids = pd.Index(station_ids)
+            # Position of each index-group station within this group
+            lookup = ids.get_indexer(index.station_ids[index_positions]) if ids.is_unique else None
+            if (lookup is not None and len(lookup) == len(ids) and (lookup >= 0).all()
+                    and np.allclose(index.vectors[index_positions], station_coords[lookup])):
+                counts, found, distances = self._search_tree(index.trees[group_key], ref_coords)
+                return counts, lookup[found], distances
+        return self._search_tree(cKDTree(station_coords), ref_coords)
+
     def find_nearest(self,
                     reference_points: gpd.GeoDataFrame,
                     gauge_stations: gpd.GeoDataFrame,
-                    region: str) -> List[dict]:
+                    region: str) -> Optional[GaugeNeighbors]:
         """
         Find nearest gauge stations for each reference point within the same region and subregion.
 
+        With several subregions, every reference point is matched against
+        each subregion's stations separately, giving one row per point and
+        subregion.
+
         Args:
             reference_points: GeoDataFrame of reference points
             gauge_stations: GeoDataFrame of gauge stations
             region: Region identifier
 
         Returns:
-            List of dictionaries containing point-to-gauge mappings
+            Columnar GaugeNeighbors, or None if the region has no points or stations
         """
         # Filter by region first
         ref_points, stations = self._filter_by_region(reference_points, gauge_stations, region)
 
         if ref_points.empty or stations.empty:
-            return []
+            return None
 
-        # Project coordinates
-        ref_points, stations = self._project_points(ref_points, stations, region)
+        # Unit vectors (or projected coordinates for the albers backend)
+        ref_coords, station_coords = self._neighbor_coordinates(ref_points, stations, region)
+        sub_regions = stations['sub_region'].to_numpy()
 
         # Get unique subregions (including empty string for stations without subregion)
         subregions = stations['sub_region'].unique()
 
         # Optimization: if only one subregion (or all empty), build single KD-tree
         use_single_tree = len(subregions) == 1 or all(sr == '' for sr in subregions)
-
-        all_mappings = []
-
-        if use_single_tree:
-            # Build single KD-tree for all stations (more efficient)
-            ref_coords, station_coords = self._extract_coordinates(ref_points, stations)
-            tree = cKDTree(station_coords)
-
-            k = min(3, len(stations))
-            distances, indices = tree.query(ref_coords, k=k)
-
-            # Create mapping dictionaries
-            for i, (dist, idx) in enumerate(zip(distances, indices)):
-                point_mappings = {
-                    'reference_point_id': ref_points.iloc[i].name,
-                    'county_fips': ref_points.iloc[i]['county_fips'],
-                    'region': region,
-                    'mappings': []
-                }
-
-                # Handle case where k=1 (only one station available)
-                if not isinstance(dist, np.ndarray):
-                    dist = [dist]
-                    idx = [idx]
-
-                for d, j in zip(dist, idx):
-                    station = stations.iloc[j]
-                    point_mappings['mappings'].append({
-                        'station_id': station['station_id'],
-                        'station_name': station['station_name'],
-                        'sub_region': station['sub_region'],
-                        'distance_meters': float(d),
-                        'weight': 1.0  # Initial weight, will be adjusted by weight calculator
-                    })
-
-                all_mappings.append(point_mappings)
-        else:
-            # Multiple subregions: build separate KD-tree per subregion
-            for subregion in subregions:
-                # Filter stations for this subregion
-                subregion_mask = stations['sub_region'] == subregion
-                subregion_stations = stations[subregion_mask]
-
-                if len(subregion_stations) == 0:
-                    continue
-
-                # Extract coordinates for KD-tree
-                ref_coords, station_coords = self._extract_coordinates(ref_points, subregion_stations)
-
-                # Build KD-tree for this subregion
-                tree = cKDTree(station_coords)
-
-                # Find k nearest neighbors for each reference point
-                k = min(3, len(subregion_stations))
-                distances, indices = tree.query(ref_coords, k=k)
-
-                # Convert to meters and create mapping dictionaries
-                for i, (dist, idx) in enumerate(zip(distances, indices)):
-                    point_mappings = {
-                        'reference_point_id': ref_points.iloc[i].name,
-                        'county_fips': ref_points.iloc[i]['county_fips'],
-                        'region': region,
-                        'mappings': []
-                    }
-
-                    # Handle case where k=1 (only one station available)
-                    if not isinstance(dist, np.ndarray):
-                        dist = [dist]
-                        idx = [idx]
-
-                    for d, j in zip(dist, idx):
-                        station = subregion_stations.iloc[j]
-                        point_mappings['mappings'].append({
-                            'station_id': station['station_id'],
-                            'station_name': station['station_name'],
-                            'sub_region': station['sub_region'],
-                            'distance_meters': float(d),
-                            'weight': 1.0  # Initial weight, will be adjusted by weight calculator
-                        })
-
-                    all_mappings.append(point_mappings)
+        groups = [np.arange(len(stations))] if use_single_tree else [
+            np.flatnonzero(sub_regions == subregion) for subregion in subregions
+        ]
+        group_keys = [region] if use_single_tree else [f"{region}/{subregion}" for subregion in subregions]
+        station_ids = stations['station_id'].astype(str).to_numpy()
+
+        # Query each group; positions are mapped back to the region's station
+        # arrays and the ragged results of all groups are stacked row-wise
+        counts, stations_found, distances = [], [], []
+        for group, group_key in zip(groups, group_keys):
+            group_counts, positions, group_distances = self._query_group(
+                ref_coords, station_coords[group], station_ids[group], group_key
+            )
+            counts.append(group_counts)
+            stations_found.append(group[positions])
+            distances.append(group_distances)
+        counts = np.concatenate(counts)
+
+        neighbors = GaugeNeighbors(
+            region=region,
+            point_ids=ref_points.index.to_numpy(),
+            county_fips=ref_points['county_fips'].to_numpy(),
+            station_ids=stations['station_id'].to_numpy(),
+            station_names=stations['station_name'].to_numpy(),
+            sub_regions=sub_regions,
+            point_index=np.tile(np.arange(len(ref_coords)), len(groups)),
+            offsets=np.r_[0, np.cumsum(counts)].astype(np.int64),
+            neighbor_stations=np.concatenate(stations_found),
+            neighbor_distances=np.concatenate(distances)
+        )
 
         # Log summary statistics
-        if all_mappings:
-            logger.info(f"\nGenerated mappings for region {region}:")
-            for subregion in subregions:
-                subregion_name = subregion if subregion else 'main'
-                subregion_mappings = [m for m in all_mappings
-                                    if any(sm['sub_region'] == subregion for sm in m['mappings'])]
-                if subregion_mappings:
-                    logger.info(f"  Subregion {subregion_name}: {len(subregion_mappings)} reference point mappings")
-
-        return all_mappings
+        logger.info(f"\nGenerated mappings for region {region}:")
+        for subregion in subregions:
+            subregion_name = subregion if subregion else 'main'
+            count = int(neighbors.station_mask(sub_regions == subregion).any(axis=1).sum())
+            if count:
+                logger.info(f"  Subregion {subregion_name}: {count} reference point mappings")
+
+        return neighbors
 
 def process_spatial_data(
     region: str,
@@ -0,0 +1,260 @@
+"""
+Persisted spatial index of tide gauge stations.
+
+Building station KD-trees means reading every regional station YAML,
+assembling GeoDataFrames and converting coordinates on every imputation run
+and in every worker. The station registry only changes when its YAML files
+do, so the index is built once and written to disk:
+
+- Station metadata (IDs, names, regions, subregions) and coordinates
+  (longitude, latitude and unit-sphere vectors) as .npy arrays, loaded
+  memory-mapped
+- Pickled KD-trees over the unit vectors for all stations, each region and
+  each region/subregion group, restored without rebuilding
+
+Each index lives in a directory named by a SHA-256 hash of the station
+YAMLs, the region configuration and the index settings (format version and
+Earth radius), so any change to the registry is picked up automatically and
+stale indexes are never read.
+"""
+
+import hashlib
+import json
+import logging
+import pickle
+import shutil
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from src.config import REGION_CONFIG, STATION_INDEX_DIR, TIDE_STATIONS_DIR, config_manager
+from .spatial_ops import EARTH_RADIUS_METERS, chord_to_meters, lonlat_to_unit_vectors
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes
+INDEX_VERSION = 1
+
+# Key of the tree over every station
+ALL_STATIONS = 'all'
+
+ARRAY_NAMES = ('station_ids', 'station_names', 'regions', 'sub_regions', 'lon', 'lat', 'vectors')
+
+
+def group_key(region: str, sub_region: Optional[str] = None) -> str:
+    """Tree key for a region or a region/subregion group."""
+    return region if sub_region is None else f"{region}/{sub_region}"
+
+
+def station_config_hash(tide_stations_dir: Path = TIDE_STATIONS_DIR,
+                        region_config: Path = REGION_CONFIG) -> str:
+    """
+    Hash the station registry and index settings.
+
+    Args:
+        tide_stations_dir: Directory of <region>_tide_stations.yaml files
+        region_config: Region mappings YAML
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    settings = {'version': INDEX_VERSION, 'earth_radius_meters': EARTH_RADIUS_METERS}
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    digest.update(Path(region_config).read_bytes())
+    for station_file in sorted(Path(tide_stations_dir).glob("*_tide_stations.yaml")):
+        digest.update(station_file.name.encode())
+        digest.update(station_file.read_bytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class StationIndex:
+    """Station metadata, coordinates and KD-trees for nearest station queries."""
+    config_hash: str
+    station_ids: np.ndarray         # str (n,)
+    station_names: np.ndarray       # str (n,)
+    regions: np.ndarray             # str (n,)
+    sub_regions: np.ndarray         # str (n,), '' without subregion
+    lon: np.ndarray                 # float64 (n,)
+    lat: np.ndarray                 # float64 (n,)
+    vectors: np.ndarray             # float64 (n, 3) unit vectors
+    trees: Dict[str, cKDTree]       # group key -> tree over vectors[groups[key]]
+    groups: Dict[str, np.ndarray]   # group key -> int64 station positions
+
+    def __len__(self) -> int:
+        return len(self.station_ids)
+
+    @classmethod
+    def build(cls,
+              tide_stations_dir: Path = TIDE_STATIONS_DIR,
+              region_config: Path = REGION_CONFIG) -> 'StationIndex':
+        """
+        Build the index from the station YAMLs.
+
+        Args:
+            tide_stations_dir: Directory of <region>_tide_stations.yaml files
+            region_config: Region mappings YAML
+
+        Returns:
+            StationIndex over every configured station
+        """
+        rows = []
+        for region in config_manager.get_yaml(Path(region_config))['regions']:
+            station_file = Path(tide_stations_dir) / f"{region}_tide_stations.yaml"
+            if not station_file.exists():
+                logger.warning(f"No tide station configuration found for region: {region}")
+                continue
+            for station_id, info in config_manager.get_yaml(station_file).get('stations', {}).items():
+                rows.append((str(station_id), info['name'], region, info.get('region', '') or '',
+                             info['location']['lon'], info['location']['lat']))
+
+        columns = list(zip(*rows)) if rows else [()] * 6
+        station_ids, station_names, regions, sub_regions = (np.array(c, dtype=str) for c in columns[:4])
+        lon, lat = (np.array(c, dtype=np.float64) for c in columns[4:])
+        vectors = lonlat_to_unit_vectors(lon, lat)
+
+        groups = {ALL_STATIONS: np.arange(len(station_ids))}
+        for region in np.unique(regions):
+            in_region = regions == region
+            groups[group_key(region)] = np.flatnonzero(in_region)
+            for sub_region in np.unique(sub_regions[in_region]):
+                groups[group_key(region, sub_region)] = np.flatnonzero(in_region & (sub_regions == sub_region))
+        trees = {key: cKDTree(vectors[positions]) for key, positions in groups.items() if len(positions)}
+
+        logger.info(f"Built station index with {len(station_ids)} stations in {len(groups) - 1} groups")
+        return cls(
+            config_hash=station_config_hash(tide_stations_dir, region_config),
+            station_ids=station_ids,
+            station_names=station_names,
+            regions=regions,
+            sub_regions=sub_regions,
+            lon=lon,
+            lat=lat,
+            vectors=vectors,
+            trees=trees,
+            groups=groups
+        )
+
+    def save(self, index_dir: Path = STATION_INDEX_DIR) -> Path:
+        """
+        Write the index to index_dir/<config_hash>.
+
+        Files are staged in a temporary directory and renamed into place, so
+        readers never see a partial index. If another process saved the same
+        configuration first, its copy is kept.
+
+        Args:
+            index_dir: Root directory of persisted indexes
+
+        Returns:
+            Directory holding the index
+        """
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        target = index_dir / self.config_hash
+
+        staging = Path(tempfile.mkdtemp(dir=index_dir, prefix=f".{self.config_hash[:12]}-"))
+        try:
+            for name in ARRAY_NAMES:
+                np.save(staging / f"{name}.npy", np.asarray(getattr(self, name)))
+            with open(staging / "trees.pkl", 'wb') as f:
+                pickle.dump({'trees': self.trees, 'groups': self.groups}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        try:
+            staging.rename(target)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not (target / "trees.pkl").exists():
+                raise
+
+        logger.info(f"Saved station index to {target}")
+        return target
+
+    @classmethod
+    def load(cls, path: Path) -> 'StationIndex':
+        """
+        Load an index written by save(); arrays are memory-mapped read-only.
+
+        Args:
+            path: Index directory (index_dir/<config_hash>)
+
+        Returns:
+            StationIndex
+        """
+        path = Path(path)
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode='r') for name in ARRAY_NAMES}
+        with open(path / "trees.pkl", 'rb') as f:
+            state = pickle.load(f)
+        return cls(config_hash=path.name, trees=state['trees'], groups=state['groups'], **arrays)
+
+    def query(self,
+              lon: np.ndarray,
+              lat: np.ndarray,
+              k: int = 3,
+              region: Optional[str] = None,
+              sub_region: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the k nearest stations to each point by great-circle distance.
+
+        Args:
+            lon: Point longitudes in degrees
+            lat: Point latitudes in degrees
+            k: Number of neighbors
+            region: Restrict to one region (None = all stations)
+            sub_region: Restrict to one subregion of region
+
+        Returns:
+            Tuple of (distances in meters, station positions into this index),
+            each of shape (n, k); padded with inf / -1 where the group has
+            fewer than k stations
+
+        Raises:
+            KeyError: If the region or subregion is not in the index
+        """
+        key = ALL_STATIONS if region is None else group_key(region, sub_region)
+        positions = self.groups[key]
+        points = lonlat_to_unit_vectors(np.atleast_1d(lon), np.atleast_1d(lat))
+
+        distances = np.full((len(points), k), np.inf)
+        stations = np.full((len(points), k), -1, dtype=np.int64)
+        group_k = min(k, len(positions))
+        if group_k:
+            chords, found = self.trees[key].query(points, k=group_k)
+            distances[:, :group_k] = chord_to_meters(chords.reshape(len(points), group_k))
+            stations[:, :group_k] = positions[found.reshape(len(points), group_k)]
+        return distances, stations
+
+
+def load_station_index(index_dir: Path = STATION_INDEX_DIR,
+                       tide_stations_dir: Path = TIDE_STATIONS_DIR,
+                       region_config: Path = REGION_CONFIG,
+                       rebuild: bool = False) -> StationIndex:
+    """
+    Load the persisted index for the current station registry, building it if needed.
+
+    Args:
+        index_dir: Root directory of persisted indexes
+        tide_stations_dir: Directory of <region>_tide_stations.yaml files
+        region_config: Region mappings YAML
+        rebuild: Rebuild even if a matching index exists
+
+    Returns:
+        StationIndex matching the current configuration hash
+    """
+    path = Path(index_dir) / station_config_hash(tide_stations_dir, region_config)
+    if not rebuild and (path / "trees.pkl").exists():
+        logger.debug(f"Loading station index from {path}")
+        return StationIndex.load(path)
+
+    if rebuild and path.exists():
+        shutil.rmtree(path)
+    index = StationIndex.build(tide_stations_dir, region_config)
+    return StationIndex.load(index.save(index_dir))
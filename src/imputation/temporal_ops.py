@@ -3,161 +3,400 @@ Temporal operations for water level imputation at coastal reference points.
 Handles the integration of gauge readings over time and their imputation to reference points.
 
 This module is responsible for:
-1. Loading and processing gauge water level time series
+1. Loading gauge water level time series from the water level store into a
+   memory-mapped gauge matrix (stations x time, float32, NaN for gaps) on a
+   regular time grid
 2. Handling missing data and different temporal resolutions
-3. Applying spatial weights to compute water levels at reference points
+3. Applying the sparse spatial weights to compute water levels at reference
+   points (or counties), one block of time steps at a time:
+
+       level = (W @ nan_to_zero(block)) / (W @ has_data(block))
+
+   so missing gauge readings are excluded and the remaining weights
+   renormalized, and results are streamed to parquet block by block
+
+Neither the gauge matrix nor the imputed output is ever held in memory as a
+whole, so decades of hourly data for hundreds of gauges fit in a bounded
+working set.
 """
 
-import pandas as pd
-import numpy as np
-from pathlib import Path
-from typing import Dict, List, Optional, Union
+import hashlib
+import json
 import logging
-from datetime import datetime, timedelta
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pandas.tseries.frequencies import to_offset
+from scipy import sparse
+
+from src.noaa.historical.water_level_store import WaterLevelStore
+from .weight_matrix import MATRIX_FILES, WeightMatrix
 
 logger = logging.getLogger(__name__)
 
+# Bump when the gauge matrix layout or binning changes
+GAUGE_MATRIX_VERSION = 1
+
+GAUGE_MATRIX_FILENAME = "gauge_matrix.npy"
+
+# Upper bound on output values (rows x time steps) computed per block
+DEFAULT_BLOCK_VALUES = 2 ** 24
+
+
+def _metadata_path(path: Path) -> Path:
+    """Sidecar JSON file describing a gauge matrix .npy file."""
+    return path.with_suffix(".json")
+
+
+def _store_signature(store: WaterLevelStore, station_ids: Sequence[str], years: range) -> str:
+    """Hash the size and modification time of every stored station-year in range."""
+    digest = hashlib.sha256()
+    for station_id in station_ids:
+        for year in years:
+            path = store.path(station_id, year)
+            if path.exists():
+                stat = path.stat()
+                digest.update(f"{station_id}/{year}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class GaugeMatrix:
+    """Memory-mapped gauge water levels on a regular time grid."""
+    values: np.ndarray          # (len(station_ids), n_times) float32 memmap, NaN for gaps
+    station_ids: np.ndarray     # Station IDs (str) of the rows
+    start: pd.Timestamp         # UTC time of the first column
+    freq: str                   # Fixed grid frequency (e.g. '1h')
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def times(self) -> pd.DatetimeIndex:
+        """UTC timestamps of the columns."""
+        return pd.date_range(self.start, periods=self.values.shape[1], freq=self.freq)
+
+    @staticmethod
+    def time_grid(start: datetime, end: datetime, freq: str) -> pd.DatetimeIndex:
+        """
+        Regular UTC time grid from start to end (inclusive).
+
+        Raises:
+            ValueError: If freq is not a fixed frequency
+        """
+        to_offset(freq).nanos  # Raises for calendar frequencies such as 'MS'
+        start = pd.Timestamp(start)
+        end = pd.Timestamp(end)
+        start = start.tz_localize('UTC') if start.tzinfo is None else start.tz_convert('UTC')
+        end = end.tz_localize('UTC') if end.tzinfo is None else end.tz_convert('UTC')
+        return pd.date_range(start, end, freq=freq)
+
+    @classmethod
+    def build(cls,
+              store: WaterLevelStore,
+              station_ids: Sequence[str],
+              times: pd.DatetimeIndex,
+              path: Path) -> 'GaugeMatrix':
+        """
+        Bin stored observations onto a time grid and write them to path.
+
+        Each station-year is read from the store (never fetched), its valid
+        heights averaged into the grid interval starting at each grid time,
+        and written into the station's row; intervals without observations
+        stay NaN. Only one station-year is held in memory at a time.
+
+        Args:
+            store: Water level store to read from
+            station_ids: Stations of the matrix rows
+            times: Regular UTC time grid (from time_grid)
+            path: Output .npy file
+
+        Returns:
+            The memory-mapped GaugeMatrix
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        station_ids = np.asarray(station_ids, dtype=str)
+        step = times.freq.nanos
+        start = times[0].value if len(times) else 0
+        n_times = len(times)
+        years = range(times[0].year, times[-1].year + 1) if n_times else range(0)
+
+        tmp = path.with_name(f".{path.name}.tmp")
+        values = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(len(station_ids), n_times))
+        for row, station_id in enumerate(station_ids):
+            values[row] = np.nan
+            observed = 0
+            for year in years:
+                frame = store.get_year(station_id, year, fetch_missing=False)
+                if frame.empty:
+                    continue
+                heights = frame['height'].to_numpy(dtype=np.float64)
+                bins = (pd.DatetimeIndex(frame['timestamp']).as_unit('ns').asi8 - start) // step
+                keep = np.isfinite(heights) & (bins >= 0) & (bins < n_times)
+                if not keep.any():
+                    continue
+                bins, heights = bins[keep], heights[keep]
+                first, last = bins.min(), bins.max() + 1
+                sums = np.bincount(bins - first, weights=heights, minlength=last - first)
+                counts = np.bincount(bins - first, minlength=last - first)
+                with np.errstate(invalid='ignore'):
+                    values[row, first:last] = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+                observed += int(keep.sum())
+            logger.debug(f"Binned {observed} observations for station {station_id}")
+        values.flush()
+        del values
+        os.replace(tmp, path)
+
+        metadata = {
+            'version': GAUGE_MATRIX_VERSION,
+            'product': store.product,
+            'datum': store.datum,
+            'station_ids': station_ids.tolist(),
+            'start': times[0].isoformat() if n_times else None,
+            'freq': times.freqstr,
+            'n_times': n_times,
+            'signature': _store_signature(store, station_ids, years)
+        }
+        with open(_metadata_path(path), 'w') as f:
+            json.dump(metadata, f, indent=2)
+
+        logger.info(f"Built gauge matrix {len(station_ids)} stations x {n_times} time steps at {path}")
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: Path) -> 'GaugeMatrix':
+        """Memory-map a gauge matrix written by build()."""
+        path = Path(path)
+        with open(_metadata_path(path)) as f:
+            metadata = json.load(f)
+        values = np.load(path, mmap_mode='r')
+        start = pd.Timestamp(metadata['start']) if metadata['start'] else pd.Timestamp(0, tz='UTC')
+        return cls(values, np.asarray(metadata['station_ids'], dtype=str), start, metadata['freq'])
+
+    @classmethod
+    def load_or_build(cls,
+                      store: WaterLevelStore,
+                      station_ids: Sequence[str],
+                      times: pd.DatetimeIndex,
+                      path: Path) -> 'GaugeMatrix':
+        """
+        Open the gauge matrix at path if it matches the request, else rebuild it.
+
+        A stored matrix is reused when its product, datum, stations, time grid and
+        the sizes and modification times of the stored station-years all match.
+        """
+        path = Path(path)
+        station_ids = np.asarray(station_ids, dtype=str)
+        years = range(times[0].year, times[-1].year + 1) if len(times) else range(0)
+        expected = {
+            'version': GAUGE_MATRIX_VERSION,
+            'product': store.product,
+            'datum': store.datum,
+            'station_ids': station_ids.tolist(),
+            'start': times[0].isoformat() if len(times) else None,
+            'freq': times.freqstr,
+            'n_times': len(times),
+            'signature': _store_signature(store, station_ids, years)
+        }
+        try:
+            with open(_metadata_path(path)) as f:
+                current = json.load(f) == expected and path.exists()
+        except (OSError, json.JSONDecodeError):
+            current = False
+
+        if current:
+            logger.info(f"Reusing gauge matrix {path}")
+            return cls.open(path)
+        return cls.build(store, station_ids, times, path)
+
+    def blocks(self, block_size: int) -> Iterator[Tuple[slice, np.ndarray]]:
+        """Yield (column slice, float32 block) pairs of at most block_size time steps."""
+        for first in range(0, self.values.shape[1], block_size):
+            columns = slice(first, min(first + block_size, self.values.shape[1]))
+            yield columns, np.asarray(self.values[:, columns])
+
+
+def station_alignment(weights: WeightMatrix, station_ids: np.ndarray) -> sparse.csr_matrix:
+    """
+    Reorder a weight matrix's station axis onto a gauge matrix's rows.
+
+    Stations of the weight matrix missing from station_ids are dropped, so
+    their weights count as missing data and are renormalized away.
+
+    Args:
+        weights: Sparse weights over weights.station_ids
+        station_ids: Station IDs of the gauge matrix rows
+
+    Returns:
+        CSR matrix (weights rows x len(station_ids))
+    """
+    station_ids = np.asarray(station_ids, dtype=str)
+    positions = np.searchsorted(weights.station_ids, station_ids)
+    positions = np.minimum(positions, max(len(weights.station_ids) - 1, 0))
+    found = np.zeros(len(station_ids), dtype=bool)
+    if len(weights.station_ids):
+        found = weights.station_ids[positions] == station_ids
+    selection = sparse.csr_matrix(
+        (np.ones(found.sum()), (positions[found], np.flatnonzero(found))),
+        shape=(len(weights.station_ids), len(station_ids))
+    )
+    return (weights.matrix @ selection).tocsr()
+
+
+def impute_block(weights: sparse.csr_matrix, block: np.ndarray) -> np.ndarray:
+    """
+    NaN-aware weighted average of a block of gauge readings.
+
+    Args:
+        weights: CSR weights (rows x stations)
+        block: Gauge readings (stations x time steps), NaN for gaps
+
+    Returns:
+        float32 array (rows x time steps); NaN where no weighted gauge has data
+    """
+    has_data = ~np.isnan(block)
+    numerator = weights @ np.where(has_data, block, 0.0).astype(np.float64)
+    denominator = weights @ has_data.astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan).astype(np.float32)
+
+
 class WaterLevelProcessor:
     """Processes and imputes water level data from gauge stations to reference points."""
-    
+
     def __init__(self,
                  imputation_structure_file: Path,
-                 output_dir: Path):
+                 output_dir: Path,
+                 kind: str = 'points',
+                 block_values: int = DEFAULT_BLOCK_VALUES):
         """
         Initialize water level processor.
-        
+
         Args:
             imputation_structure_file: Path to imputation structure from spatial phase
             output_dir: Directory for output files
+            kind: 'points' to impute reference points or 'counties' to impute
+                county weighted averages
+            block_values: Upper bound on rows x time steps imputed per block
         """
-        self.imputation_structure_file = imputation_structure_file
-        self.output_dir = output_dir
-        
-        # Load imputation structure
-        self.imputation_df = pd.read_parquet(imputation_structure_file)
-        
+        self.imputation_structure_file = Path(imputation_structure_file)
+        self.output_dir = Path(output_dir)
+        self.block_values = block_values
+
+        # Sparse weights saved next to the structure, if they are not older than it
+        matrix_file = self.imputation_structure_file.parent / MATRIX_FILES.get(kind, '')
+        if (kind in MATRIX_FILES and matrix_file.exists()
+                and matrix_file.stat().st_mtime >= self.imputation_structure_file.stat().st_mtime):
+            self.weights = WeightMatrix.load(matrix_file)
+        else:
+            self.weights = WeightMatrix.from_structure(pd.read_parquet(imputation_structure_file), kind)
+
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
-    
+
     def load_gauge_data(self,
-                       gauge_data_dir: Path,
-                       start_date: Optional[datetime] = None,
-                       end_date: Optional[datetime] = None,
-                       resample_freq: str = '1H') -> pd.DataFrame:
+                        gauge_data_dir: Optional[Path] = None,
+                        start_date: Optional[datetime] = None,
+                        end_date: Optional[datetime] = None,
+                        resample_freq: str = '1h',
+                        product: str = 'hourly_height',
+                        datum: str = 'STND') -> GaugeMatrix:
         """
         Load and preprocess gauge water level data.
-        
-        Args:
-            gauge_data_dir: Directory containing gauge data files
-            start_date: Optional start date for filtering
-            end_date: Optional end date for filtering
-            resample_freq: Frequency to resample data to (e.g. '1H' for hourly)
-            
-        Returns:
-            DataFrame with gauge water levels indexed by time
-        """
-        # Implementation will depend on gauge data format
-        raise NotImplementedError
-    
-    def _validate_gauge_coverage(self,
-                               point_data: pd.Series,
-                               available_gauges: set) -> bool:
-        """
-        Validate that both required gauges are available for a point.
-        
-        Args:
-            point_data: Series containing point data
-            available_gauges: Set of available gauge IDs
-            
-        Returns:
-            True if both gauges are available, False otherwise
-        """
-        return (point_data['gauge_id_1'] in available_gauges and 
-                point_data['gauge_id_2'] in available_gauges)
-    
-    def _impute_point_water_level(self,
-                                point_data: pd.Series,
-                                gauge_levels: pd.DataFrame,
-                                time_index: pd.DatetimeIndex) -> pd.Series:
-        """
-        Impute water levels for a single point using weighted gauge data.
-        
+
         Args:
-            point_data: Series containing point data and weights
-            gauge_levels: DataFrame of gauge water levels
-            time_index: Time index for output series
-            
+            gauge_data_dir: Root of the water level store (default: data/cache/water_levels)
+            start_date: Optional start date (default: January 1 of the first stored year)
+            end_date: Optional end date, inclusive (default: end of the last stored year)
+            resample_freq: Fixed frequency of the time grid (e.g. '1h' for hourly)
+            product: Water level store product to read
+            datum: Vertical datum of the stored observations
+
         Returns:
-            Series of imputed water levels
+            Memory-mapped GaugeMatrix over the weighted stations, stored in output_dir
         """
-        # Get gauge IDs and weights
-        gauge1 = point_data['gauge_id_1']
-        gauge2 = point_data['gauge_id_2']
-        weight1 = point_data['weight_1']
-        weight2 = point_data['weight_2']
-        
-        # Calculate weighted average
-        water_levels = (
-            gauge_levels[gauge1] * weight1 +
-            gauge_levels[gauge2] * weight2
-        )
-        
-        return water_levels
-    
+        store = WaterLevelStore(store_dir=gauge_data_dir, product=product, datum=datum)
+        station_ids = self.weights.station_ids
+
+        if start_date is None or end_date is None:
+            years = sorted(int(p.stem) for station_id in station_ids
+                           for p in (store.store_dir / station_id).glob("*.parquet") if p.stem.isdigit())
+            if not years:
+                raise ValueError(f"No stored {product} data for the weighted stations in {store.store_dir}")
+            start_date = start_date if start_date is not None else datetime(years[0], 1, 1)
+            end_date = end_date if end_date is not None else datetime(years[-1], 12, 31, 23, 59, 59)
+
+        times = GaugeMatrix.time_grid(start_date, end_date, resample_freq)
+        return GaugeMatrix.load_or_build(store, station_ids, times, self.output_dir / GAUGE_MATRIX_FILENAME)
+
     def process_water_levels(self,
-                           gauge_data_dir: Path,
-                           output_file: Path,
-                           start_date: Optional[datetime] = None,
-                           end_date: Optional[datetime] = None,
-                           resample_freq: str = '1H') -> Path:
+                             gauge_data_dir: Optional[Path],
+                             output_file: Path,
+                             start_date: Optional[datetime] = None,
+                             end_date: Optional[datetime] = None,
+                             resample_freq: str = '1h',
+                             product: str = 'hourly_height',
+                             datum: str = 'STND') -> Path:
         """
         Process and impute water levels for all reference points.
-        
+
+        Time steps are imputed in blocks of at most block_values / rows steps
+        and each block is appended to the output as a parquet row group of
+        (row key, timestamp, water_level), omitting rows without data.
+
         Args:
-            gauge_data_dir: Directory containing gauge data files
+            gauge_data_dir: Root of the water level store
             output_file: Path to save results
-            start_date: Optional start date for filtering
-            end_date: Optional end date for filtering
-            resample_freq: Frequency to resample data to
-            
+            start_date: Optional start date
+            end_date: Optional end date (inclusive)
+            resample_freq: Fixed frequency of the time grid
+            product: Water level store product to read
+            datum: Vertical datum of the stored observations
+
         Returns:
             Path to output file
         """
         logger.info("Loading gauge data...")
-        gauge_levels = self.load_gauge_data(
-            gauge_data_dir,
-            start_date,
-            end_date,
-            resample_freq
-        )
-        
-        available_gauges = set(gauge_levels.columns)
-        time_index = gauge_levels.index
-        
-        logger.info("Imputing water levels for reference points...")
-        results = []
-        
-        for idx, point in self.imputation_df.iterrows():
-            if self._validate_gauge_coverage(point, available_gauges):
-                water_levels = self._impute_point_water_level(
-                    point,
-                    gauge_levels,
-                    time_index
-                )
-                
-                results.append({
-                    'county_fips': point['county_fips'],
-                    'county_name': point['county_name'],
-                    'state_fips': point['state_fips'],
-                    'geometry': point['geometry'],
-                    'water_levels': water_levels
-                })
-        
-        # Convert results to DataFrame
-        result_df = pd.DataFrame(results)
-        
-        # Save results
-        result_df.to_parquet(output_file)
-        logger.info(f"Saved results to {output_file}")
-        
-        return output_file 
\ No newline at end of file
+        gauges = self.load_gauge_data(gauge_data_dir, start_date, end_date, resample_freq, product, datum)
+        weights = station_alignment(self.weights, gauges.station_ids)
+        row_ids = self.weights.row_ids
+        times = gauges.times
+        block_size = max(1, self.block_values // max(len(row_ids), 1))
+
+        schema = pa.schema([
+            (self.weights.row_label, pa.array(row_ids[:0]).type),
+            ('timestamp', pa.timestamp('ns', tz='UTC')),
+            ('water_level', pa.float32())
+        ])
+        output_file = Path(output_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = output_file.with_name(f".{output_file.name}.tmp")
+
+        logger.info(f"Imputing {len(times)} time steps for {len(row_ids)} {self.weights.row_label} values "
+                    f"in blocks of {block_size}...")
+        written = 0
+        with pq.ParquetWriter(tmp, schema) as writer:
+            for columns, block in gauges.blocks(block_size):
+                levels = impute_block(weights, block)
+                rows, steps = np.nonzero(~np.isnan(levels))
+                if not len(rows):
+                    continue
+                writer.write_table(pa.table({
+                    self.weights.row_label: pa.array(row_ids[rows]),
+                    'timestamp': pa.array(times[columns][steps]),
+                    'water_level': pa.array(levels[rows, steps])
+                }, schema=schema))
+                written += len(rows)
+        os.replace(tmp, output_file)
+
+        logger.info(f"Saved {written} imputed water levels to {output_file}")
+        return output_file
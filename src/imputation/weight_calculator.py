@@ -28,21 +28,30 @@ The module is critical for:
 """
 
 import numpy as np
-from typing import List, Dict, Literal
+from typing import List, Dict, Literal, Optional, Tuple
 import logging
-from tqdm import tqdm
 
 logger = logging.getLogger(__name__)
 
 WeightMethod = Literal['idw', 'gaussian', 'linear', 'hybrid']
 
+WEIGHT_METHODS = ('idw', 'gaussian', 'linear', 'hybrid')
+
+
+def _normalize_rows(weights: np.ndarray) -> np.ndarray:
+    """Scale each row to sum to 1, leaving all-zero rows at zero."""
+    totals = weights.sum(axis=1, keepdims=True)
+    return np.divide(weights, totals, out=np.zeros_like(weights), where=totals > 0)
+
 class WeightCalculator:
     """Calculate weights for tide gauge stations."""
     
     def __init__(self, 
                  max_distance_meters: float = 100000,  # 100km max distance
                  power: float = 2,  # inverse distance power
-                 min_weight: float = 0.1):
+                 min_weight: float = 0.1,
+                 method: WeightMethod = 'idw',
+                 bandwidth_meters: Optional[float] = None):
         """
         Initialize weight calculator.
         
@@ -50,14 +59,48 @@ class WeightCalculator:
             max_distance_meters: Maximum distance to consider for weights
             power: Power parameter for inverse distance weighting
             min_weight: Minimum weight to assign
+            method: Distance decay ('idw', 'gaussian', 'linear' or 'hybrid')
+            bandwidth_meters: Gaussian kernel bandwidth (default: half of max distance)
         """
+        if method not in WEIGHT_METHODS:
+            raise ValueError(f"Unknown weight method: {method}; expected one of {WEIGHT_METHODS}")
+
         self.max_distance = max_distance_meters
         self.power = power
         self.min_weight = min_weight
+        self.method = method
+        self.bandwidth = bandwidth_meters or max_distance_meters / 2
         
         logger.info(f"Initialized WeightCalculator")
         logger.info(f"Max distance: {self.max_distance/1000:.1f}km")
+        logger.info(f"Method: {self.method}")
         logger.info(f"IDW power: {self.power}")
+
+    def _raw_weights(self, distances: np.ndarray, method: WeightMethod) -> np.ndarray:
+        """
+        Unnormalized distance decay for floored distances.
+
+        - idw: 1 / d^power
+        - gaussian: exp(-d^2 / (2 * bandwidth^2))
+        - linear: 1 - d / max_distance, reaching zero at max distance
+        - hybrid: inverse distance tapered by the gaussian kernel
+
+        Args:
+            distances: Distances in meters (at least 1)
+            method: Weighting method
+
+        Returns:
+            Non-negative weights with the shape of distances
+        """
+        if method == 'idw':
+            return distances ** -self.power
+        if method == 'gaussian':
+            return np.exp(-0.5 * (distances / self.bandwidth) ** 2)
+        if method == 'linear':
+            return np.clip(1.0 - distances / self.max_distance, 0.0, None)
+        if method == 'hybrid':
+            return distances ** -self.power * np.exp(-0.5 * (distances / self.bandwidth) ** 2)
+        raise ValueError(f"Unknown weight method: {method}; expected one of {WEIGHT_METHODS}")
         
     def _calculate_single_mapping_weights(self, mapping: Dict) -> Dict:
         """
@@ -69,60 +112,74 @@ class WeightCalculator:
         Returns:
             Updated mapping dictionary with calculated weights
         """
-        distances = np.array([m['distance_meters'] for m in mapping['mappings']])
-
-        # Filter by max distance
-        valid_mask = distances <= self.max_distance
-        if not any(valid_mask):
-            # If no stations within max distance, use all stations but warn
-            valid_mask = np.ones_like(distances, dtype=bool)
-            min_dist_km = distances.min() / 1000
-            logger.warning(
-                f"No stations within {self.max_distance/1000:.0f}km for county {mapping.get('county_fips', 'unknown')}. "
-                f"Using nearest station at {min_dist_km:.1f}km."
-            )
+        distances = np.array([[m['distance_meters'] for m in mapping['mappings']]], dtype=np.float64)
+        weights, keep = self.calculate_weight_matrix(distances)
 
-        valid_distances = distances[valid_mask]
-
-        # Handle edge case of zero distance (station at reference point)
-        valid_distances = np.maximum(valid_distances, 1.0)  # Minimum 1 meter
+        # Update mapping with weights
+        valid_mappings = [m for i, m in enumerate(mapping['mappings']) if keep[0, i]]
+        for m, w in zip(valid_mappings, weights[0, keep[0]]):
+            m['weight'] = float(w)
 
-        # Calculate inverse distance weights
-        weights = 1 / (valid_distances ** self.power)
+        mapping['mappings'] = valid_mappings
+        return mapping
+    
+    def calculate_weight_matrix(self,
+                                distances: np.ndarray,
+                                valid: Optional[np.ndarray] = None,
+                                method: Optional[WeightMethod] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculate weights for a whole neighbor matrix at once.
 
-        # Normalize weights to sum to 1
-        weights = weights / np.sum(weights)
+        Stations beyond max distance are dropped unless a point has none
+        within it, distances are floored at 1 meter, and weights are clamped
+        to min_weight and renormalized, all as whole-array operations. Where
+        a kernel vanishes for every kept station of a point (linear weights
+        or gaussian underflow beyond range), that point falls back to
+        inverse distance weights.
 
-        # Check if min_weight will significantly alter the distribution
-        weights_below_min = (weights < self.min_weight).sum()
-        if weights_below_min > 0 and len(weights) > 1:
-            # Calculate how much redistribution will occur
-            original_max = weights.max()
+        Args:
+            distances: Distances in meters, shape (n, k)
+            valid: Mask of real neighbors (default: finite distances)
+            method: Weighting method (default: the calculator's method)
 
-        # Apply minimum weight threshold
-        weights = np.maximum(weights, self.min_weight)
-        weights = weights / np.sum(weights)  # Renormalize
+        Returns:
+            Tuple of (weights, keep): float64 weights of shape (n, k) summing
+            to 1 over each row's kept neighbors (0 elsewhere), and the mask of
+            kept neighbors
+        """
+        method = method or self.method
+        distances = np.asarray(distances, dtype=np.float64)
+        valid = np.isfinite(distances) if valid is None else valid & np.isfinite(distances)
+
+        # Filter by max distance, falling back to all neighbors where none are in range
+        keep = valid & (distances <= self.max_distance)
+        fallback = ~keep.any(axis=1) & valid.any(axis=1)
+        if fallback.any():
+            logger.warning(
+                f"No stations within {self.max_distance/1000:.0f}km for {int(fallback.sum())} points. "
+                f"Using their nearest stations."
+            )
+            keep[fallback] = valid[fallback]
 
-        # Warn if weights are highly skewed (one station dominates)
-        if len(weights) > 1:
-            max_weight = weights.max()
-            if max_weight > 0.9:
-                logger.debug(
-                    f"Highly skewed weights for county {mapping.get('county_fips', 'unknown')}: "
-                    f"dominant station has {max_weight:.1%} weight"
-                )
+        # Minimum 1 meter handles stations at the reference point
+        safe = np.where(keep, np.maximum(distances, 1.0), 1.0)
+        weights = np.where(keep, self._raw_weights(safe, method), 0.0)
+        if method != 'idw':
+            vanished = ~(weights > 0).any(axis=1) & keep.any(axis=1)
+            if vanished.any():
+                weights[vanished] = np.where(keep[vanished], self._raw_weights(safe[vanished], 'idw'), 0.0)
+        weights = _normalize_rows(weights)
 
-        # Update mapping with weights
-        valid_mappings = [m for i, m in enumerate(mapping['mappings']) if valid_mask[i]]
-        for m, w in zip(valid_mappings, weights):
-            m['weight'] = float(w)
+        # Apply minimum weight threshold and renormalize
+        weights = _normalize_rows(np.where(keep, np.maximum(weights, self.min_weight), 0.0))
+        return weights, keep
 
-        mapping['mappings'] = valid_mappings
-        return mapping
-    
     def calculate_weights(self, mappings: List[Dict]) -> List[Dict]:
         """
         Calculate weights for all reference point mappings.
+
+        Mappings are padded into one distance matrix and weighted in a single
+        calculate_weight_matrix call.
         
         Args:
             mappings: List of mapping dictionaries
@@ -134,16 +191,24 @@ class WeightCalculator:
             return []
             
         logger.info(f"Processing {len(mappings)} mappings")
-        
-        # Process all mappings sequentially with progress bar
+
+        lengths = np.array([len(mapping['mappings']) for mapping in mappings])
+        k = int(lengths.max()) if len(lengths) else 0
+        valid = np.arange(k) < lengths[:, None]
+        distances = np.full((len(mappings), k), np.inf)
+        distances[valid] = [m['distance_meters'] for mapping in mappings for m in mapping['mappings']]
+
+        weights, keep = self.calculate_weight_matrix(distances, valid)
+
         weighted_mappings = []
-        for mapping in tqdm(mappings, desc="Calculating weights"):
-            try:
-                weighted_mapping = self._calculate_single_mapping_weights(mapping)
-                weighted_mappings.append(weighted_mapping)
-            except Exception as e:
-                logger.error(f"Error processing mapping: {str(e)}")
+        for row, mapping in enumerate(mappings):
+            if not keep[row].any():
                 continue
+            valid_mappings = [m for i, m in enumerate(mapping['mappings']) if keep[row, i]]
+            for m, w in zip(valid_mappings, weights[row, keep[row]]):
+                m['weight'] = float(w)
+            mapping['mappings'] = valid_mappings
+            weighted_mappings.append(mapping)
         
         logger.info(f"Completed weight calculation for {len(weighted_mappings)} mappings")
-        return weighted_mappings 
\ No newline at end of file
+        return weighted_mappings
@@ -0,0 +1,193 @@
+"""
+Sparse weight matrices derived from the imputation structure.
+
+The imputation structure is a long table of (reference_point_id,
+county_fips, station_id, weight) rows. Consumers that aggregate station
+series to counties otherwise merge it with every series they process. This
+module turns the table into scipy.sparse CSR matrices with aligned index
+arrays:
+
+- points: reference points x stations; a point mapped in several
+  subregions has the weights of all its rows summed
+- counties: counties x stations; the sum of the weights of every mapping
+  row of the county, i.e. the pre-aggregated form of the per-county
+  weighted average used by the assignment stage
+
+Aggregating any station-level values (historical flood days, a projected
+scenario, a matrix of years) is then a single sparse product, with the
+denominator taken from the weights of stations that actually have data:
+
+    county_value = (W @ nan_to_zero(x)) / (W @ has_data(x))
+
+Matrices are saved as .npz files holding the CSR arrays together with the
+row and station ID arrays, so they can be loaded without the parquet table.
+"""
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+# Row key of each matrix kind and its file name
+MATRIX_ROWS = {
+    'points': 'reference_point_id',
+    'counties': 'county_fips',
+}
+
+MATRIX_FILES = {
+    'points': "imputation_weights_points.npz",
+    'counties': "imputation_weights_counties.npz",
+}
+
+
+@dataclass
+class WeightMatrix:
+    """CSR weights of rows (points or counties) over stations, with aligned IDs."""
+    matrix: sparse.csr_matrix   # (len(row_ids), len(station_ids)) float64
+    row_ids: np.ndarray         # Sorted row keys (reference point IDs or county FIPS)
+    station_ids: np.ndarray     # Sorted station IDs (str)
+    row_label: str              # Name of the row key column
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    @classmethod
+    def from_structure(cls, structure: pd.DataFrame, kind: str = 'counties') -> 'WeightMatrix':
+        """
+        Build a weight matrix from an imputation structure table.
+
+        Args:
+            structure: Imputation structure with station_id, weight and the row key column
+            kind: 'points' (reference points x stations) or 'counties' (counties x stations)
+
+        Returns:
+            WeightMatrix with duplicate (row, station) weights summed
+
+        Raises:
+            ValueError: If kind is unknown
+        """
+        if kind not in MATRIX_ROWS:
+            raise ValueError(f"Unknown weight matrix kind: {kind}; expected one of {tuple(MATRIX_ROWS)}")
+        row_label = MATRIX_ROWS[kind]
+
+        row_keys = structure[row_label].to_numpy()
+        if kind == 'counties' or row_keys.dtype == object:
+            row_keys = row_keys.astype(str)
+        row_ids, rows = np.unique(row_keys, return_inverse=True)
+        station_ids, cols = np.unique(structure['station_id'].to_numpy().astype(str), return_inverse=True)
+
+        matrix = sparse.csr_matrix(
+            (structure['weight'].to_numpy(dtype=np.float64), (rows, cols)),
+            shape=(len(row_ids), len(station_ids))
+        )
+        matrix.sum_duplicates()
+        return cls(matrix, row_ids, station_ids, row_label)
+
+    def save(self, path: Path) -> Path:
+        """Write the CSR arrays and index arrays to an .npz file."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            data=self.matrix.data,
+            indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            row_ids=self.row_ids,
+            station_ids=self.station_ids,
+            row_label=np.array(self.row_label)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> 'WeightMatrix':
+        """Read a matrix written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            matrix = sparse.csr_matrix((data['data'], data['indices'], data['indptr']),
+                                       shape=tuple(data['shape']))
+            return cls(matrix, data['row_ids'], data['station_ids'], str(data['row_label']))
+
+    def align(self, station_values: pd.DataFrame) -> np.ndarray:
+        """
+        Reorder station-indexed values onto the matrix's station axis.
+
+        Args:
+            station_values: Frame indexed by station ID (one column per series)
+
+        Returns:
+            float64 array (n_stations, n_columns); NaN for stations without values
+        """
+        aligned = station_values.set_axis(station_values.index.astype(str)).reindex(self.station_ids)
+        return aligned.to_numpy(dtype=np.float64)
+
+    def aggregate(self, station_values: pd.DataFrame) -> pd.DataFrame:
+        """
+        Weighted average of station values for every row.
+
+        Missing station values (NaN or absent stations) are excluded and the
+        remaining weights renormalized; rows with no weighted data get NaN.
+
+        Args:
+            station_values: Frame indexed by station ID, one column per series
+                (e.g. years or scenarios)
+
+        Returns:
+            Frame indexed by row ID with the columns of station_values
+        """
+        values = self.align(station_values)
+        has_data = ~np.isnan(values)
+        numerator = self.matrix @ np.where(has_data, values, 0.0)
+        denominator = self.matrix @ has_data.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result = np.where(denominator > 0, numerator / denominator, np.nan)
+        return pd.DataFrame(result, index=pd.Index(self.row_ids, name=self.row_label),
+                            columns=station_values.columns)
+
+    def aggregate_long(self, frame: pd.DataFrame, value: str, by: str) -> pd.DataFrame:
+        """
+        Aggregate a long station table, e.g. (station_id, year, flood_days).
+
+        Args:
+            frame: Long table with station_id, the by column and the value column
+            value: Column to aggregate
+            by: Column spanning the series (e.g. 'year' or 'scenario')
+
+        Returns:
+            Long table of (row key, by, value) for rows with data
+        """
+        wide = frame.pivot_table(index='station_id', columns=by, values=value, aggfunc='mean', dropna=False)
+        aggregated = self.aggregate(wide)
+        # Reshape row-major by hand; DataFrame.stack changed its NaN handling across pandas versions
+        result = pd.DataFrame({
+            self.row_label: np.repeat(aggregated.index.to_numpy(), aggregated.shape[1]),
+            by: np.tile(aggregated.columns.to_numpy(), len(aggregated)),
+            value: aggregated.to_numpy().ravel()
+        })
+        return result[result[value].notna()].reset_index(drop=True)
+
+
+def save_weight_matrices(structure: pd.DataFrame, output_dir: Path) -> Dict[str, Path]:
+    """
+    Write the points and counties weight matrices of a structure table.
+
+    Args:
+        structure: Imputation structure table
+        output_dir: Directory for the .npz files
+
+    Returns:
+        Dictionary of kind -> saved path
+    """
+    paths = {}
+    for kind, filename in MATRIX_FILES.items():
+        matrix = WeightMatrix.from_structure(structure, kind)
+        paths[kind] = matrix.save(Path(output_dir) / filename)
+        logger.info(f"Saved {kind} weight matrix {matrix.shape[0]} x {matrix.shape[1]} "
+                    f"({matrix.matrix.nnz:,} weights) to {paths[kind]}")
+    return paths
@@ -13,6 +13,7 @@ from . import projected
 from .core import NOAAClient, NOAACache
 from .historical import HistoricalHTFFetcher, HistoricalHTFProcessor
 from .projected import ProjectedHTFFetcher, ProjectedHTFProcessor
+from .station_sweep import StationSweep
 
 __all__ = [
     # Submodules
@@ -30,5 +31,8 @@ __all__ = [
     
     # Projected data classes
     'ProjectedHTFFetcher',
-    'ProjectedHTFProcessor'
+    'ProjectedHTFProcessor',
+    
+    # Combined refresh
+    'StationSweep'
 ] 
\ No newline at end of file
@@ -7,11 +7,12 @@ and managing data caching.
 
 from .noaa_client import NOAAClient, NOAAApiError
 from .cache_manager import NOAACache
-from .rate_limiter import RateLimiter
+from .rate_limiter import RateLimiter, TokenBucketRateLimiter
 
 __all__ = [
     'NOAAClient',
     'NOAAApiError',
     'NOAACache',
-    'RateLimiter'
+    'RateLimiter',
+    'TokenBucketRateLimiter'
 ]
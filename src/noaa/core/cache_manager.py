@@ -7,8 +7,10 @@ from typing import Dict, List, Optional
 from pathlib import Path
 import logging
 import json
+import os
 import yaml
 from datetime import datetime, timedelta
+from threading import Lock
 import shutil
 
 logger = logging.getLogger(__name__)
@@ -44,6 +46,9 @@ class NOAACache:
         # Load cache settings
         self._load_cache_settings()
         
+        # Serializes multi-file cache commits
+        self._commit_lock = Lock()
+        
         # Load or initialize cache stats
         self.stats_file = self.cache_dir / "cache_stats.json"
         self._stats_write_interval = 100  # Write stats every N operations
@@ -369,7 +374,123 @@ class NOAACache:
         except Exception as e:
             logger.error(f"Error saving projected data to cache file {cache_file}: {e}")
             self._update_stats('errors')
-    
+
+    def save_projected_records(self, station_id: str, records: List[Dict]):
+        """Replace a station's projected cache with a full set of records.
+
+        Writes all decades in a single file write instead of one
+        read-modify-write cycle per decade.
+
+        Args:
+            station_id: NOAA station identifier
+            records: Projected flood count records for all decades
+        """
+        if not self._validate_cache_data(records):
+            logger.error(f"Invalid data format for station {station_id}")
+            self._update_stats('errors')
+            return
+
+        cache_file = self._get_cache_path(station_id, 'projected')
+
+        try:
+            with open(cache_file, 'w') as f:
+                json.dump(records, f, indent=2)
+
+            logger.debug(f"Cached {len(records)} decades for station {station_id}")
+
+        except Exception as e:
+            logger.error(f"Error saving projected data to cache file {cache_file}: {e}")
+            self._update_stats('errors')
+
+    def save_station_records(
+        self,
+        station_id: str,
+        historical: Optional[List[Dict]] = None,
+        projected: Optional[List[Dict]] = None
+    ):
+        """Commit a station's historical and projected records together.
+
+        Both cache files are written to temporary files first and only
+        moved into place once every write has succeeded, so a failed write
+        leaves the previous cache for that station untouched. Either set of
+        records may be None to leave that data type unchanged.
+
+        Args:
+            station_id: NOAA station identifier
+            historical: Annual flood count records for all years
+            projected: Projected flood count records for all decades
+
+        Raises:
+            ValueError: If the projected records are not valid cache data
+        """
+        if projected and not self._validate_cache_data(projected):
+            self._update_stats('errors')
+            raise ValueError(f"Invalid projected data format for station {station_id}")
+
+        pending = []
+        try:
+            for data_type, records in (('historical', historical), ('projected', projected)):
+                if records is None:
+                    continue
+                cache_file = self._get_cache_path(station_id, data_type)
+                tmp_file = cache_file.with_name(f".{cache_file.name}.tmp")
+                pending.append((tmp_file, cache_file))
+                with open(tmp_file, 'w') as f:
+                    json.dump(records, f, indent=2)
+
+            with self._commit_lock:
+                for tmp_file, cache_file in pending:
+                    os.replace(tmp_file, cache_file)
+
+            logger.debug(f"Committed {len(pending)} cache files for station {station_id}")
+
+        except Exception:
+            for tmp_file, _ in pending:
+                tmp_file.unlink(missing_ok=True)
+            self._update_stats('errors')
+            raise
+
+    # Station Metadata Methods
+    def get_station_metadata(self, station_id: str) -> Optional[Dict]:
+        """Get cached datums and flood levels for a station.
+
+        Args:
+            station_id: NOAA station identifier
+
+        Returns:
+            Station metadata if cached
+        """
+        cache_file = self._get_cache_path(station_id, 'metadata')
+
+        if not cache_file.exists():
+            return None
+
+        try:
+            with open(cache_file) as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading metadata cache file {cache_file}: {e}")
+            return None
+
+    def save_station_metadata(self, station_id: str, metadata: Dict):
+        """Save datums and flood levels for a station to cache.
+
+        Args:
+            station_id: NOAA station identifier
+            metadata: Station metadata to cache
+        """
+        cache_file = self._get_cache_path(station_id, 'metadata')
+
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            tmp_file = cache_file.with_name(f".{cache_file.name}.tmp")
+            with open(tmp_file, 'w') as f:
+                json.dump(metadata, f, indent=2)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.error(f"Error saving metadata to cache file {cache_file}: {e}")
+            self._update_stats('errors')
+
     def _load_cache_settings(self):
         """Load cache settings from config file."""
         cache_settings = self.settings.get('cache', {})
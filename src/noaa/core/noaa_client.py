@@ -2,17 +2,23 @@
 NOAA API Client for accessing high tide flooding data.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 import requests
 import logging
 from pathlib import Path
 import json
 from datetime import datetime, timedelta
 
-from .rate_limiter import RateLimiter
+from .rate_limiter import RateLimiter, TokenBucketRateLimiter
 
 logger = logging.getLogger(__name__)
 
+# CO-OPS data retrieval API (raw water levels), separate from the derived-product API
+DATAGETTER_URL = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
+
+# CO-OPS metadata API (station datums and flood levels)
+METADATA_URL = "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations"
+
 class NOAAApiError(Exception):
     """Exception raised when NOAA API request fails."""
     def __init__(self, message: str, response: Optional[requests.Response] = None):
@@ -29,15 +35,22 @@ class NOAAApiError(Exception):
 class NOAAClient:
     """Client for interacting with NOAA Tides & Currents API."""
 
-    def __init__(self, api_base_url: str = "https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi", requests_per_second: float = 2.0):
+    def __init__(
+        self,
+        api_base_url: str = "https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi",
+        requests_per_second: float = 2.0,
+        rate_limiter: Optional[Union[RateLimiter, TokenBucketRateLimiter]] = None
+    ):
         """Initialize the NOAA API client.
 
         Args:
             api_base_url: Base URL for the NOAA API
             requests_per_second: Maximum number of requests per second. Defaults to 2.0.
+            rate_limiter: Optional limiter to share with other clients or threads.
+                If None, a RateLimiter for requests_per_second is created.
         """
         self.api_base_url = api_base_url.rstrip('/')
-        self.rate_limiter = RateLimiter(requests_per_second)
+        self.rate_limiter = rate_limiter or RateLimiter(requests_per_second)
         # Use session for connection pooling and improved performance
         self._session = requests.Session()
 
@@ -183,3 +196,117 @@ class NOAAClient:
         except (ValueError, KeyError) as e:
             logger.error(f"Failed to parse NOAA API response for station {station}: {str(e)}")
             raise NOAAApiError(f"Invalid response format: {str(e)}", response=response if 'response' in locals() else None)
+
+    def fetch_water_levels(
+        self,
+        station: str,
+        begin_date: str,
+        end_date: str,
+        product: str = 'high_low',
+        datum: str = 'STND',
+        units: str = 'english',
+        time_zone: str = 'gmt'
+    ) -> List[Dict]:
+        """Fetch raw water level observations from the CO-OPS data API.
+        
+        Args:
+            station: 7-digit NOAA station identifier
+            begin_date: First day to fetch (YYYYMMDD)
+            end_date: Last day to fetch (YYYYMMDD)
+            product: Water level product (e.g. 'high_low', 'hourly_height')
+            datum: Vertical datum. Defaults to station datum.
+            units: 'english' (feet) or 'metric' (meters)
+            time_zone: Time zone of returned timestamps
+            
+        Returns:
+            List of observation records, each containing:
+            - t: Timestamp ("YYYY-MM-DD HH:MM")
+            - v: Water level value
+            - ty: Tide type ('H', 'HH', 'L', 'LL'; high_low only)
+            An empty list means the API reported that no data exists.
+            
+        Raises:
+            NOAAApiError: If the API request fails or returns an error other than "no data"
+        """
+        if not station:
+            raise NOAAApiError("Station ID is required")
+            
+        params = {
+            'begin_date': begin_date,
+            'end_date': end_date,
+            'station': station,
+            'product': product,
+            'datum': datum,
+            'units': units,
+            'time_zone': time_zone,
+            'format': 'json'
+        }
+        logger.debug(f"Making API request to URL: {DATAGETTER_URL}")
+        logger.debug(f"Request parameters: {params}")
+        
+        try:
+            self.rate_limiter.wait()
+            response = self._session.get(DATAGETTER_URL, params=params, timeout=30)
+            logger.debug(f"API response status code: {response.status_code}")
+            
+            response.raise_for_status()
+            data = response.json()
+            
+            if 'data' in data:
+                return data['data']
+            
+            message = data.get('error', {}).get('message', 'Unknown error')
+            if 'no data' in message.lower():
+                logger.debug(f"No {product} data for station {station} {begin_date}-{end_date}")
+                return []
+            raise NOAAApiError(f"Water level request failed: {message}", response=response)
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"NOAA API request failed for station {station}: {str(e)}")
+            raise NOAAApiError(f"Failed to fetch water level data: {str(e)}", response=e.response if hasattr(e, 'response') else None)
+        except (ValueError, KeyError, AttributeError) as e:
+            logger.error(f"Failed to parse NOAA API response for station {station}: {str(e)}")
+            raise NOAAApiError(f"Invalid response format: {str(e)}", response=response if 'response' in locals() else None)
+
+    def fetch_station_metadata(self, station: str) -> Dict:
+        """Fetch a station's tidal datums and flood thresholds from the metadata API.
+
+        Args:
+            station: 7-digit NOAA station identifier
+
+        Returns:
+            Dictionary containing:
+            - datums: Datum name -> value in feet above station datum (e.g. 'MHHW')
+            - flood_levels: Threshold name -> value in feet above station datum
+              (e.g. 'nws_minor', 'nws_moderate', 'nws_major'; None if undefined)
+
+        Raises:
+            NOAAApiError: If either request fails
+        """
+        if not station:
+            raise NOAAApiError("Station ID is required")
+
+        metadata = {}
+        for key, resource in (('datums', 'datums'), ('flood_levels', 'floodlevels')):
+            url = f"{METADATA_URL}/{station}/{resource}.json"
+            logger.debug(f"Making API request to URL: {url}")
+            try:
+                self.rate_limiter.wait()
+                response = self._session.get(url, params={'units': 'english'}, timeout=30)
+                response.raise_for_status()
+                data = response.json()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"NOAA metadata request failed for station {station}: {str(e)}")
+                raise NOAAApiError(f"Failed to fetch {resource}: {str(e)}", response=e.response if hasattr(e, 'response') else None)
+            except ValueError as e:
+                raise NOAAApiError(f"Invalid response format: {str(e)}", response=response)
+
+            if key == 'datums':
+                metadata[key] = {d['name']: d['value'] for d in data.get('datums') or [] if d.get('value') is not None}
+            else:
+                metadata[key] = {
+                    name: value for name, value in data.items()
+                    if name.startswith(('nws_', 'nos_')) and not isinstance(value, (dict, list))
+                }
+
+        return metadata
@@ -41,4 +41,52 @@ class RateLimiter:
                     logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
                     time.sleep(sleep_time)
             
-            self._last_request_time = time.time() 
\ No newline at end of file
+            self._last_request_time = time.time() 
+
+class TokenBucketRateLimiter:
+    """Token bucket rate limiter shared by concurrent request threads.
+    
+    Tokens refill continuously at the configured rate up to a burst capacity.
+    Each request consumes one token; threads that find the bucket empty sleep
+    outside the lock until their token is due, so waiting threads do not
+    serialize each other beyond the configured rate.
+    """
+    
+    def __init__(self, requests_per_second: float = 2.0, burst: Optional[int] = None):
+        """Initialize the rate limiter.
+        
+        Args:
+            requests_per_second (float): Sustained request rate
+            burst (int): Maximum number of requests allowed back to back.
+                Defaults to one second's worth of requests (at least 1).
+        """
+        if requests_per_second <= 0:
+            raise ValueError("requests_per_second must be positive")
+        self._requests_per_second = requests_per_second
+        self._capacity = float(burst if burst is not None else max(1, int(requests_per_second)))
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+    
+    @property
+    def requests_per_second(self) -> float:
+        """Get the configured requests per second limit."""
+        return self._requests_per_second
+    
+    def wait(self) -> None:
+        """Block until a request token is available and consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity,
+                                   self._tokens + (now - self._updated) * self._requests_per_second)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                sleep_time = (1 - self._tokens) / self._requests_per_second
+            
+            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
+            time.sleep(sleep_time)
@@ -0,0 +1,148 @@
+"""
+Region-partitioned parquet datasets shared by the historical and projected pipelines.
+
+Processed flood records are written as one hive-partitioned dataset per
+pipeline (`<dataset>/region=<name>/part-0.parquet`), with stations tagged by
+the region the imputation structure assigns them to.
+"""
+
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from src.config import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def load_station_region_map(imputation_file: Optional[Path] = None) -> Dict[str, str]:
+    """Load the station to region mapping from the imputation structure.
+
+    Args:
+        imputation_file: Optional path to the combined imputation structure
+
+    Returns:
+        Dictionary mapping station ID to region name
+    """
+    imputation_file = imputation_file or (
+        OUTPUT_DIR / "imputation" / "imputation_structure_all_regions.parquet"
+    )
+    if not imputation_file.exists():
+        logger.warning(f"Imputation structure not found: {imputation_file}")
+        return {}
+
+    df = pd.read_parquet(imputation_file, columns=['station_id', 'region'])
+    df = df.drop_duplicates('station_id')
+    return dict(zip(df['station_id'].astype(str), df['region'].astype(str)))
+
+
+def write_region_dataset(df: pd.DataFrame, dataset_dir: Path,
+                         regions: Optional[Sequence[str]] = None) -> Path:
+    """Write records as a hive-partitioned (region=) parquet dataset.
+
+    Partitions for regions present in ``df`` are replaced, and partitions of
+    processed ``regions`` without any records are removed; partitions for
+    other regions are left untouched.
+
+    Args:
+        df: Records including a 'region' column
+        dataset_dir: Root directory of the dataset
+        regions: Regions processed in this run (default: those in ``df``)
+
+    Returns:
+        Path to the dataset directory
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table,
+        dataset_dir,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([('region', pa.string())]), flavor="hive"),
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching"
+    )
+
+    # delete_matching only touches written partitions; drop those of regions that lost all records
+    written = set(df['region'].astype(str))
+    for region in sorted(set(regions or []) - written):
+        partition = Path(dataset_dir) / f"region={region}"
+        if partition.is_dir():
+            logger.info(f"Removing stale partition {partition}")
+            shutil.rmtree(partition)
+    return dataset_dir
+
+
+def read_region_dataset(dataset_dir: Path, regions: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a hive-partitioned (region=) dataset, optionally limited to some regions.
+
+    Args:
+        dataset_dir: Root directory of the dataset
+        regions: Regions to read (default: all partitions)
+
+    Returns:
+        DataFrame with the region column as plain strings
+
+    Raises:
+        FileNotFoundError: If the dataset directory does not exist
+    """
+    dataset_dir = Path(dataset_dir)
+    if not dataset_dir.is_dir():
+        raise FileNotFoundError(f"Region dataset not found: {dataset_dir}")
+
+    dataset = ds.dataset(dataset_dir, format="parquet", partitioning="hive")
+    filter_ = ds.field('region').isin(list(regions)) if regions is not None else None
+    df = dataset.to_table(filter=filter_).to_pandas()
+    df['region'] = df['region'].astype(str)
+    return df
+
+
+def read_region_records(directory: Path, dataset_name: str,
+                        regions: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Read a region dataset together with standalone regional files.
+
+    Regions processed outside the dataset (e.g. Alaska) are written as
+    ``<dataset_name>_<region>.parquet`` next to it; those files are read for
+    any region the dataset does not contain.
+
+    Args:
+        directory: Directory holding the dataset and standalone files
+        dataset_name: Name of the dataset directory and standalone file prefix
+        regions: Regions to read (default: all)
+
+    Returns:
+        Combined DataFrame with the region column as plain strings
+
+    Raises:
+        FileNotFoundError: If neither the dataset nor any standalone file exists
+    """
+    directory = Path(directory)
+    dfs = []
+    dataset_regions = set()
+
+    dataset_dir = directory / dataset_name
+    if dataset_dir.is_dir():
+        df = read_region_dataset(dataset_dir, regions)
+        dataset_regions = set(df['region'].unique())
+        dfs.append(df)
+
+    prefix = f"{dataset_name}_"
+    for file in sorted(directory.glob(f"{prefix}*.parquet")):
+        region = file.stem[len(prefix):]
+        if region in dataset_regions or (regions is not None and region not in regions):
+            continue
+        df = pd.read_parquet(file)
+        if 'region' not in df.columns:
+            df['region'] = region
+        dfs.append(df)
+
+    if not dfs:
+        raise FileNotFoundError(f"No {dataset_name} data found in {directory}")
+
+    df = pd.concat(dfs, ignore_index=True)
+    df['region'] = df['region'].astype(str)
+    return df
@@ -5,9 +5,11 @@ This module handles the retrieval and processing of historical high tide floodin
 - Fetching historical minor flood counts from NOAA API
 - Processing historical data by region
 - Command line interface for data retrieval
+- Computing flood days from raw water levels for custom thresholds
 """
 
 from .historical_htf_fetcher import HistoricalHTFFetcher
 from .historical_htf_processor import HistoricalHTFProcessor
+from .htf_engine import HTFEngine, ThresholdSpec
 
-__all__ = ['HistoricalHTFFetcher', 'HistoricalHTFProcessor']
+__all__ = ['HistoricalHTFFetcher', 'HistoricalHTFProcessor', 'HTFEngine', 'ThresholdSpec']
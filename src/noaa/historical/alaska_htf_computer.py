@@ -18,23 +18,43 @@ The 99th percentile approach is defensible for research because:
 
 Reference: Sweet et al. (2018) "2017 State of U.S. High Tide Flooding" uses
 similar percentile-based approaches for defining minor flood thresholds.
+
+Long runs can checkpoint each finished station to <checkpoint_dir>/<station>.parquet;
+with resume, stations whose checkpoint covers the same years and severity
+tier thresholds are loaded instead of recomputed.
 """
 
+import json
 import logging
-import time
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
-import requests
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 
+from ..core.noaa_client import NOAAClient
+from ..core.rate_limiter import TokenBucketRateLimiter
+from .water_level_store import WaterLevelStore, count_flood_days, HIGH_TIDE_CODES
+from .htf_kernels import (
+    TideArrays, SEVERITY_COLUMNS, MISSING_DAYS_COLUMN, count_high_tides, count_tier_days, severity_column
+)
+
 logger = logging.getLogger(__name__)
 
 # Percentile to use for derived thresholds (99th = ~3-4 exceedance days/year)
 DEFAULT_THRESHOLD_PERCENTILE = 99
 
+# Parquet metadata key of the tier thresholds a checkpoint was computed with
+CHECKPOINT_THRESHOLDS_KEY = b'tier_thresholds'
+
+# Stations processed concurrently; requests are paced by a shared token bucket
+DEFAULT_MAX_WORKERS = 4
+
 # Reference period for computing percentiles (1990-2000 baseline)
 # Using a fixed historical baseline makes flood counts interpretable as
 # anomalies relative to late 20th century conditions
@@ -104,13 +124,17 @@ ALASKA_STATIONS = {
 class AlaskaHTFComputer:
     """Computes HTF flood days for Alaska stations from water level data."""
 
-    BASE_URL = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
-
     def __init__(self,
                  threshold_percentile: float = DEFAULT_THRESHOLD_PERCENTILE,
                  reference_start: int = REFERENCE_PERIOD_START,
                  reference_end: int = REFERENCE_PERIOD_END,
-                 rate_limit: float = 0.5):
+                 rate_limit: float = 0.5,
+                 store: Optional[WaterLevelStore] = None,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 requests_per_second: Optional[float] = None,
+                 use_sketches: bool = False,
+                 checkpoint_dir: Optional[Path] = None,
+                 severity_offsets: Optional[Dict[str, float]] = None):
         """
         Initialize the Alaska HTF computer.
 
@@ -118,12 +142,38 @@ class AlaskaHTFComputer:
             threshold_percentile: Percentile for derived thresholds (default 99)
             reference_start: Start year for reference period
             reference_end: End year for reference period
-            rate_limit: Seconds between API requests
+            rate_limit: Seconds per API request, used if requests_per_second is None
+            store: Raw water level store (created if None)
+            max_workers: Number of stations processed concurrently
+            requests_per_second: API request budget shared by all workers
+            use_sketches: Estimate percentile thresholds by merging the store's
+                yearly height sketches instead of loading raw observations
+            checkpoint_dir: Directory for per-station result checkpoints (None = no checkpoints)
+            severity_offsets: Feet above each station's minor threshold for higher
+                severity tiers, e.g. {'moderate': 1.0, 'major': 2.0}; other
+                names add custom '<name>Count' tiers
+
+        Raises:
+            ValueError: If a severity offset is not positive
         """
         self.threshold_percentile = threshold_percentile
         self.reference_start = reference_start
         self.reference_end = reference_end
         self.rate_limit = rate_limit
+        self.max_workers = max_workers
+        self.use_sketches = use_sketches
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
+        self.severity_offsets = {'minor': 0.0, **(severity_offsets or {})}
+        if any(offset <= 0 for tier, offset in self.severity_offsets.items() if tier != 'minor'):
+            raise ValueError(f"Severity offsets must be positive: {severity_offsets}")
+        # Standard NOAA tiers are always reported (NA if undefined), custom tiers after them
+        self.severity_tiers = list(SEVERITY_COLUMNS) + [
+            tier for tier in self.severity_offsets if tier not in SEVERITY_COLUMNS
+        ]
+        self.requests_per_second = requests_per_second or 1.0 / rate_limit
+        self.store = store or WaterLevelStore(
+            client=NOAAClient(rate_limiter=TokenBucketRateLimiter(self.requests_per_second))
+        )
         self.stations: Dict[str, AlaskaStation] = {}
         self._init_stations()
 
@@ -143,45 +193,6 @@ class AlaskaHTFComputer:
                 threshold_source='nws' if info['nws_minor'] else 'pending'
             )
 
-    def _fetch_high_low_data(self, station_id: str, year: int) -> Optional[List[Dict]]:
-        """
-        Fetch high/low water level data for a station and year.
-
-        Args:
-            station_id: NOAA station ID
-            year: Year to fetch
-
-        Returns:
-            List of high/low records or None if no data
-        """
-        params = {
-            'begin_date': f'{year}0101',
-            'end_date': f'{year}1231',
-            'station': station_id,
-            'product': 'high_low',
-            'datum': 'STND',  # Station datum (same reference as thresholds)
-            'units': 'english',  # feet
-            'time_zone': 'gmt',
-            'format': 'json'
-        }
-
-        try:
-            response = requests.get(self.BASE_URL, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            if 'data' in data:
-                return data['data']
-            elif 'error' in data:
-                logger.debug(f"API error for {station_id}/{year}: {data.get('error', {}).get('message', 'Unknown')}")
-                return None
-            else:
-                return None
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {station_id}/{year}: {e}")
-            return None
-
     def compute_percentile_threshold(self, station_id: str) -> Optional[float]:
         """
         Compute percentile-based flood threshold from reference period data.
@@ -194,40 +205,50 @@ class AlaskaHTFComputer:
         """
         logger.info(f"Computing {self.threshold_percentile}th percentile threshold for {station_id}")
 
-        all_high_values = []
-
-        for year in range(self.reference_start, self.reference_end + 1):
-            data = self._fetch_high_low_data(station_id, year)
-            if data:
-                for record in data:
-                    tide_type = record.get('ty', '').strip()
-                    if tide_type in ['H', 'HH']:
-                        try:
-                            value = float(record['v'])
-                            all_high_values.append(value)
-                        except (ValueError, KeyError):
-                            continue
-            time.sleep(self.rate_limit)
+        if self.use_sketches:
+            return self._sketch_percentile_threshold(station_id)
+
+        all_high_values = self.store.high_tide_heights(station_id, self.reference_start, self.reference_end)
 
         if len(all_high_values) < 100:  # Need sufficient data
             logger.warning(f"Insufficient data for {station_id}: only {len(all_high_values)} high tides")
             return None
 
-        threshold = np.percentile(all_high_values, self.threshold_percentile)
+        threshold = float(np.percentile(all_high_values, self.threshold_percentile))
         logger.info(f"  {station_id}: {self.threshold_percentile}th percentile = {threshold:.2f} ft "
                    f"(from {len(all_high_values)} observations)")
 
         return threshold
 
+    def _sketch_percentile_threshold(self, station_id: str) -> Optional[float]:
+        """Estimate the percentile threshold from merged yearly height sketches."""
+        sketch = self.store.reference_sketch(station_id, self.reference_start, self.reference_end)
+
+        if sketch.count < 100:  # Need sufficient data
+            logger.warning(f"Insufficient data for {station_id}: only {sketch.count} high tides")
+            return None
+
+        threshold = float(sketch.quantiles([self.threshold_percentile])[0])
+        logger.info(f"  {station_id}: {self.threshold_percentile}th percentile = {threshold:.2f} "
+                   f"+/- {sketch.error_bound:.3f} ft (sketch of {sketch.count} observations)")
+
+        return threshold
+
     def compute_all_thresholds(self) -> Dict[str, float]:
         """
         Compute percentile thresholds for all stations without NWS thresholds.
 
+        Reference periods of different stations are loaded concurrently.
+
         Returns:
             Dictionary of station_id -> threshold
         """
         thresholds = {}
 
+        pending = [sid for sid, station in self.stations.items() if station.nws_minor is None]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            percentiles = dict(zip(pending, executor.map(self.compute_percentile_threshold, pending)))
+
         for station_id, station in self.stations.items():
             if station.nws_minor is not None:
                 # Use NWS threshold
@@ -237,7 +258,7 @@ class AlaskaHTFComputer:
                 logger.info(f"{station.name}: Using NWS threshold = {station.nws_minor:.2f} ft")
             else:
                 # Compute percentile threshold
-                pct_threshold = self.compute_percentile_threshold(station_id)
+                pct_threshold = percentiles[station_id]
                 if pct_threshold:
                     thresholds[station_id] = pct_threshold
                     station.percentile_threshold = pct_threshold
@@ -267,46 +288,83 @@ class AlaskaHTFComputer:
             logger.warning(f"No threshold for {station_id}, skipping")
             return (0, 0)
 
-        data = self._fetch_high_low_data(station_id, year)
-        if not data:
-            return (0, 0)
+        # Count days with at least one high tide exceeding threshold
+        return count_flood_days(self.store.get_year(station_id, year), station.threshold_used)
+
+    def checkpoint_path(self, station_id: str) -> Path:
+        """Get the checkpoint file path for a station."""
+        return self.checkpoint_dir / f"{station_id}.parquet"
+
+    def tier_thresholds(self, station_id: str) -> List[Tuple[str, Optional[float]]]:
+        """Get a station's severity tier thresholds in feet (None for undefined tiers)."""
+        minor = self.stations[station_id].threshold_used
+        return [
+            (tier, None if tier not in self.severity_offsets else float(minor + self.severity_offsets[tier]))
+            for tier in self.severity_tiers
+        ]
+
+    def _write_checkpoint(self, station_id: str, records: List[Dict]):
+        """Write a finished station's records and tier thresholds atomically."""
+        path = self.checkpoint_path(station_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        table = pa.Table.from_pandas(pd.DataFrame(records), preserve_index=False)
+        metadata = {**(table.schema.metadata or {}),
+                    CHECKPOINT_THRESHOLDS_KEY: json.dumps(self.tier_thresholds(station_id)).encode()}
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        os.replace(tmp_path, path)
+
+    def _load_checkpoint(self, station_id: str, years: List[int]) -> Optional[List[Dict]]:
+        """
+        Load a station's checkpointed records if they match the current run.
 
-        threshold = station.threshold_used
+        Args:
+            station_id: NOAA station ID
+            years: Years the run covers
 
-        # Count days with at least one high tide exceeding threshold
-        flood_dates = set()
-        high_tide_count = 0
-
-        for record in data:
-            tide_type = record.get('ty', '').strip()
-            if tide_type in ['H', 'HH']:  # High tide or Higher High tide
-                high_tide_count += 1
-                try:
-                    value = float(record['v'])
-                    if value >= threshold:
-                        # Extract date from timestamp
-                        date = record['t'].split()[0]
-                        flood_dates.add(date)
-                except (ValueError, KeyError):
-                    continue
-
-        return (len(flood_dates), high_tide_count)
+        Returns:
+            Checkpointed records, or None if missing or computed for other
+            years or other tier thresholds
+        """
+        path = self.checkpoint_path(station_id)
+        if not path.exists():
+            return None
+
+        table = pq.read_table(path)
+        stored = (table.schema.metadata or {}).get(CHECKPOINT_THRESHOLDS_KEY)
+        thresholds = [list(pair) for pair in self.tier_thresholds(station_id)]
+        df = table.to_pandas()
+        if (df['year'].tolist() != years or stored is None
+                or json.loads(stored) != thresholds):
+            logger.info(f"Ignoring stale checkpoint for {station_id}")
+            return None
+
+        return df.to_dict('records')
 
     def compute_all_stations(self, start_year: int, end_year: int,
                             station_ids: Optional[List[str]] = None,
-                            compute_thresholds: bool = True) -> pd.DataFrame:
+                            compute_thresholds: bool = True,
+                            resume: bool = False) -> pd.DataFrame:
         """
         Compute flood days for all stations across a year range.
 
+        With a checkpoint directory, each station's records are written as soon
+        as all of its years are stored; stations with failed requests are not
+        checkpointed, so a resumed run retries them.
+
         Args:
             start_year: First year to process
             end_year: Last year to process (inclusive)
             station_ids: Optional list of specific station IDs to process
             compute_thresholds: If True, compute percentile thresholds first
+            resume: If True, load stations with a matching checkpoint instead
+                of recomputing them (requires checkpoint_dir)
 
         Returns:
             DataFrame with columns: station_id, station_name, year, flood_days,
-                                    threshold_ft, threshold_source, region
+                                    threshold_ft, threshold_source, region, and
+                                    NOAA-style severity counts (minCount, modCount,
+                                    majCount, custom tiers, nanCount)
         """
         if station_ids is None:
             station_ids = list(self.stations.keys())
@@ -319,28 +377,43 @@ class AlaskaHTFComputer:
         # Step 2: Compute flood days
         logger.info(f"Step 2: Computing flood days for {len(station_ids)} stations, {start_year}-{end_year}")
 
-        results = []
-        total_requests = len(station_ids) * (end_year - start_year + 1)
-        completed = 0
-
-        for station_id in station_ids:
+        def process_station(station_id: str) -> List[Dict]:
             station = self.stations[station_id]
 
             if station.threshold_used is None:
                 logger.warning(f"Skipping {station.name}: no threshold available")
-                continue
+                return []
 
-            logger.info(f"Processing {station.name} ({station_id})")
+            if resume and self.checkpoint_dir:
+                records = self._load_checkpoint(station_id, list(range(start_year, end_year + 1)))
+                if records is not None:
+                    logger.info(f"Resuming {station.name} ({station_id}) from checkpoint")
+                    return records
 
-            for year in range(start_year, end_year + 1):
-                flood_days, high_tides = self.compute_flood_days(station_id, year)
+            logger.info(f"Processing {station.name} ({station_id})")
 
-                results.append({
+            # Bucket every day of every year into severity tiers in one pass;
+            # tiers sit at or above minor, so flood days are their total
+            years = np.arange(start_year, end_year + 1, dtype=np.int32)
+            arrays = TideArrays.from_frame(self.store.get_years(station_id, start_year, end_year), HIGH_TIDE_CODES)
+            thresholds = [np.nan if threshold is None else threshold
+                          for _, threshold in self.tier_thresholds(station_id)]
+            tier_days, missing_days = count_tier_days(arrays, thresholds, years)
+            flood_days = tier_days.sum(axis=0)
+            high_tides = count_high_tides(arrays, years)
+
+            records = []
+            for i, year in enumerate(years.tolist()):
+                severity = {
+                    severity_column(tier): None if np.isnan(threshold) else int(tier_days[j, i])
+                    for j, (tier, threshold) in enumerate(zip(self.severity_tiers, thresholds))
+                }
+                records.append({
                     'station_id': station_id,
                     'station_name': station.name,
                     'year': year,
-                    'flood_days': flood_days,
-                    'high_tides_observed': high_tides,
+                    'flood_days': int(flood_days[i]),
+                    'high_tides_observed': int(high_tides[i]),
                     'threshold_ft': station.threshold_used,
                     'threshold_source': station.threshold_source,
                     'percentile_threshold_ft': station.percentile_threshold,
@@ -348,16 +421,31 @@ class AlaskaHTFComputer:
                     'mhhw_ft': station.mhhw,
                     'region': station.region,
                     'lat': station.lat,
-                    'lon': station.lon
+                    'lon': station.lon,
+                    **severity,
+                    MISSING_DAYS_COLUMN: int(missing_days[i])
                 })
 
-                completed += 1
-                if completed % 20 == 0:
-                    logger.info(f"Progress: {completed}/{total_requests} requests")
+            if self.checkpoint_dir:
+                if all(self.store.has(station_id, year) for year in years.tolist()):
+                    self._write_checkpoint(station_id, records)
+                else:
+                    logger.warning(f"{station.name}: some years are not stored, not checkpointed")
+
+            return records
 
-                time.sleep(self.rate_limit)
+        # Stations run concurrently; map() yields results in station order,
+        # so the output is identical to a serial run
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for completed, records in enumerate(executor.map(process_station, station_ids), start=1):
+                results.extend(records)
+                logger.info(f"Progress: {completed}/{len(station_ids)} stations")
 
         df = pd.DataFrame(results)
+        if not df.empty:
+            tier_columns = [severity_column(tier) for tier in self.severity_tiers]
+            df[tier_columns] = df[tier_columns].astype('Int64')
         logger.info(f"Computed {len(df)} station-year records")
 
         return df
@@ -384,14 +472,39 @@ class AlaskaHTFComputer:
         logger.info(f"Saved Alaska HTF data to {output_path}")
         return output_path
 
+    def threshold_intervals(self, n_resamples: int, seed: Optional[int] = None) -> pd.DataFrame:
+        """
+        Bootstrap confidence intervals of the percentile thresholds.
+
+        Args:
+            n_resamples: Number of bootstrap resamples of reference years
+            seed: Random seed for reproducible resamples
+
+        Returns:
+            Bootstrap thresholds (see threshold_bootstrap) for stations with a
+            percentile threshold
+        """
+        # Imported here: threshold_bootstrap depends on this module
+        from .threshold_bootstrap import bootstrap_thresholds
+
+        station_ids = [sid for sid, station in self.stations.items() if station.percentile_threshold is not None]
+        intervals, _ = bootstrap_thresholds(
+            station_ids, [], percentile=self.threshold_percentile, reference_start=self.reference_start,
+            reference_end=self.reference_end, n_resamples=n_resamples, seed=seed, store=self.store
+        )
+        return intervals
+
     def save_threshold_report(self, output_dir: Path,
-                             filename: str = "alaska_htf_thresholds.csv") -> Path:
+                             filename: str = "alaska_htf_thresholds.csv",
+                             intervals: Optional[pd.DataFrame] = None) -> Path:
         """
         Save threshold report for documentation.
 
         Args:
             output_dir: Output directory
             filename: Output filename
+            intervals: Optional bootstrap thresholds (see threshold_bootstrap) whose
+                confidence bounds are added as percentile_ci_lower_ft/upper_ft
 
         Returns:
             Path to output file
@@ -399,6 +512,9 @@ class AlaskaHTFComputer:
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
+        # Percentile thresholds are exact unless estimated from height sketches
+        error_bound = self.store.sketch_resolution / 2 if self.use_sketches else 0.0
+
         records = []
         for station_id, station in self.stations.items():
             records.append({
@@ -410,11 +526,16 @@ class AlaskaHTFComputer:
                 f'percentile_{int(self.threshold_percentile)}_ft': station.percentile_threshold,
                 'threshold_used_ft': station.threshold_used,
                 'threshold_source': station.threshold_source,
+                'percentile_error_bound_ft': error_bound if station.percentile_threshold is not None else None,
                 'lat': station.lat,
                 'lon': station.lon
             })
 
         df = pd.DataFrame(records)
+        if intervals is not None:
+            bounds = intervals.set_index('station_id')[['ci_lower_ft', 'ci_upper_ft']]
+            df['percentile_ci_lower_ft'] = df['station_id'].map(bounds['ci_lower_ft'])
+            df['percentile_ci_upper_ft'] = df['station_id'].map(bounds['ci_upper_ft'])
         output_path = output_dir / filename
         df.to_csv(output_path, index=False)
 
@@ -428,7 +549,13 @@ def compute_alaska_htf(
     output_dir: Optional[Path] = None,
     threshold_percentile: float = DEFAULT_THRESHOLD_PERCENTILE,
     reference_start: int = REFERENCE_PERIOD_START,
-    reference_end: int = REFERENCE_PERIOD_END
+    reference_end: int = REFERENCE_PERIOD_END,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    requests_per_second: float = 2.0,
+    use_sketches: bool = False,
+    resume: bool = False,
+    severity_offsets: Optional[Dict[str, float]] = None,
+    bootstrap_resamples: int = 0
 ) -> pd.DataFrame:
     """
     Main function to compute Alaska HTF data.
@@ -440,6 +567,13 @@ def compute_alaska_htf(
         threshold_percentile: Percentile for derived thresholds
         reference_start: Start year for reference period (for percentile calculation)
         reference_end: End year for reference period
+        max_workers: Number of stations processed concurrently
+        requests_per_second: API request budget shared by all workers
+        use_sketches: Estimate percentile thresholds from yearly height sketches
+        resume: Reuse per-station checkpoints in output_dir/checkpoints
+        severity_offsets: Feet above the minor threshold for higher severity tiers
+        bootstrap_resamples: If positive, add bootstrap confidence intervals of
+            the percentile thresholds to the threshold report
 
     Returns:
         DataFrame with computed flood days
@@ -447,14 +581,20 @@ def compute_alaska_htf(
     computer = AlaskaHTFComputer(
         threshold_percentile=threshold_percentile,
         reference_start=reference_start,
-        reference_end=reference_end
+        reference_end=reference_end,
+        max_workers=max_workers,
+        requests_per_second=requests_per_second,
+        use_sketches=use_sketches,
+        checkpoint_dir=Path(output_dir) / "checkpoints" if output_dir else None,
+        severity_offsets=severity_offsets
     )
 
-    df = computer.compute_all_stations(start_year, end_year)
+    df = computer.compute_all_stations(start_year, end_year, resume=resume)
 
     if output_dir:
         computer.save_results(df, output_dir)
-        computer.save_threshold_report(output_dir)
+        intervals = computer.threshold_intervals(bootstrap_resamples) if bootstrap_resamples > 0 else None
+        computer.save_threshold_report(output_dir, intervals=intervals)
 
     return df
 
@@ -473,6 +613,18 @@ if __name__ == "__main__":
                        help="Reference period start year for percentile computation")
     parser.add_argument("--ref-end", type=int, default=REFERENCE_PERIOD_END,
                        help="Reference period end year for percentile computation")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                       help="Number of stations processed concurrently")
+    parser.add_argument("--requests-per-second", type=float, default=2.0,
+                       help="API request budget shared by all workers")
+    parser.add_argument("--use-sketches", action="store_true",
+                       help="Estimate percentile thresholds from yearly height sketches")
+    parser.add_argument("--severity-offset", nargs="+", default=[], metavar="TIER=FEET",
+                       help="Severity tiers as feet above the minor threshold (e.g. moderate=1.0 major=2.0)")
+    parser.add_argument("--resume", action="store_true",
+                       help="Skip stations already checkpointed in <output-dir>/checkpoints")
+    parser.add_argument("--bootstrap-resamples", type=int, default=0,
+                       help="Add bootstrap threshold confidence intervals to the report (0 = off)")
 
     args = parser.parse_args()
 
@@ -487,7 +639,14 @@ if __name__ == "__main__":
         output_dir=args.output_dir,
         threshold_percentile=args.percentile,
         reference_start=args.ref_start,
-        reference_end=args.ref_end
+        reference_end=args.ref_end,
+        max_workers=args.max_workers,
+        requests_per_second=args.requests_per_second,
+        use_sketches=args.use_sketches,
+        resume=args.resume,
+        severity_offsets={tier: float(feet) for tier, feet in
+                          (item.split('=') for item in args.severity_offset)},
+        bootstrap_resamples=args.bootstrap_resamples
     )
 
     print(f"\nAlaska HTF Summary:")
@@ -12,12 +12,13 @@ Testing periods:
 """
 
 import logging
-import time
 from pathlib import Path
 from typing import Dict, List, Optional
 import pandas as pd
 import numpy as np
-import requests
+
+from .water_level_store import WaterLevelStore, count_flood_days
+from .sensitivity_sweep import run_sweep
 
 logger = logging.getLogger(__name__)
 
@@ -36,86 +37,35 @@ STATIONS_NO_THRESHOLD = {
     '9497645': {'name': 'Nome', 'mhhw': 36.54}
 }
 
-BASE_URL = "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter"
-
-
-def fetch_high_low_data(station_id: str, year: int, rate_limit: float = 0.5) -> Optional[List[Dict]]:
-    """Fetch high/low water level data for a station and year."""
-    params = {
-        'begin_date': f'{year}0101',
-        'end_date': f'{year}1231',
-        'station': station_id,
-        'product': 'high_low',
-        'datum': 'STND',
-        'units': 'english',
-        'time_zone': 'gmt',
-        'format': 'json'
-    }
-
-    try:
-        response = requests.get(BASE_URL, params=params, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        time.sleep(rate_limit)
-
-        if 'data' in data:
-            return data['data']
-        return None
-
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Request failed for {station_id}/{year}: {e}")
-        return None
-
 
 def compute_percentile_for_period(station_id: str, start_year: int, end_year: int,
-                                  percentile: float = 99) -> Optional[float]:
+                                  percentile: float = 99,
+                                  store: Optional[WaterLevelStore] = None) -> Optional[float]:
     """Compute percentile threshold for a specific reference period."""
-    all_high_values = []
-
-    for year in range(start_year, end_year + 1):
-        data = fetch_high_low_data(station_id, year)
-        if data:
-            for record in data:
-                tide_type = record.get('ty', '').strip()
-                if tide_type in ['H', 'HH']:
-                    try:
-                        value = float(record['v'])
-                        all_high_values.append(value)
-                    except (ValueError, KeyError):
-                        continue
+    store = store or WaterLevelStore()
+    all_high_values = store.high_tide_heights(station_id, start_year, end_year)
 
     if len(all_high_values) < 100:
         return None
 
-    return np.percentile(all_high_values, percentile)
+    return float(np.percentile(all_high_values, percentile))
 
 
-def compute_flood_days_with_threshold(station_id: str, year: int, threshold: float) -> int:
+def compute_flood_days_with_threshold(station_id: str, year: int, threshold: float,
+                                      store: Optional[WaterLevelStore] = None) -> int:
     """Compute flood days for a year using a given threshold."""
-    data = fetch_high_low_data(station_id, year)
-    if not data:
-        return 0
-
-    flood_dates = set()
-    for record in data:
-        tide_type = record.get('ty', '').strip()
-        if tide_type in ['H', 'HH']:
-            try:
-                value = float(record['v'])
-                if value >= threshold:
-                    date = record['t'].split()[0]
-                    flood_dates.add(date)
-            except (ValueError, KeyError):
-                continue
-
-    return len(flood_dates)
+    store = store or WaterLevelStore()
+    flood_days, _ = count_flood_days(store.get_year(station_id, year), threshold)
+    return flood_days
 
 
 def run_sensitivity_analysis(
     test_stations: Optional[List[str]] = None,
     test_year: int = 2023,
     reference_periods: Optional[List[tuple]] = None,
-    output_dir: Optional[Path] = None
+    output_dir: Optional[Path] = None,
+    store: Optional[WaterLevelStore] = None,
+    max_workers: Optional[int] = None
 ) -> pd.DataFrame:
     """
     Run sensitivity analysis on reference period choice.
@@ -125,10 +75,14 @@ def run_sensitivity_analysis(
         test_year: Year to compute flood days for
         reference_periods: List of (start, end) tuples for reference periods
         output_dir: Optional output directory for results
+        store: Raw water level store shared by all periods (created if None)
+        max_workers: Worker processes for the sweep (None = CPU count)
 
     Returns:
         DataFrame with sensitivity analysis results
     """
+    store = store or WaterLevelStore()
+
     if test_stations is None:
         # Select representative stations with different characteristics
         test_stations = ['9455920', '9455090', '9462620']  # Anchorage, Valdez, Unalaska
@@ -140,39 +94,29 @@ def run_sensitivity_analysis(
             (2000, 2019, "2000-2019"),
         ]
 
-    results = []
-
-    for station_id in test_stations:
-        station_name = STATIONS_NO_THRESHOLD[station_id]['name']
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Testing station: {station_name} ({station_id})")
-
-        for start_year, end_year, period_label in reference_periods:
-            logger.info(f"  Computing threshold for period {period_label}...")
-            threshold = compute_percentile_for_period(station_id, start_year, end_year)
-
-            if threshold is None:
-                logger.warning(f"    Could not compute threshold for {period_label}")
-                continue
-
-            logger.info(f"    99th percentile threshold: {threshold:.2f} ft")
-
-            # Compute flood days for test year
-            flood_days = compute_flood_days_with_threshold(station_id, test_year, threshold)
-            logger.info(f"    Flood days in {test_year}: {flood_days}")
-
-            results.append({
-                'station_id': station_id,
-                'station_name': station_name,
-                'reference_period': period_label,
-                'ref_start': start_year,
-                'ref_end': end_year,
-                'threshold_99pct_ft': threshold,
-                'test_year': test_year,
-                'flood_days': flood_days
-            })
-
-    df = pd.DataFrame(results)
+    # Evaluate all stations and periods in one sweep over the stored tide series
+    cube = run_sweep(test_stations, [99], reference_periods, [test_year], store=store, max_workers=max_workers)
+
+    for row in cube.itertuples(index=False):
+        if pd.isna(row.threshold_ft):
+            logger.warning(f"{row.station_name}: could not compute threshold for {row.reference_period}")
+        else:
+            logger.info(f"{row.station_name} {row.reference_period}: 99th percentile threshold "
+                        f"{row.threshold_ft:.2f} ft, {row.flood_days} flood days in {test_year}")
+
+    cube = cube[cube['threshold_ft'].notna()]
+    results = pd.DataFrame({
+        'station_id': cube['station_id'],
+        'station_name': cube['station_name'],
+        'reference_period': cube['reference_period'],
+        'ref_start': cube['ref_start'],
+        'ref_end': cube['ref_end'],
+        'threshold_99pct_ft': cube['threshold_ft'],
+        'test_year': cube['test_year'],
+        'flood_days': cube['flood_days']
+    })
+
+    df = results.reset_index(drop=True)
 
     if output_dir:
         output_dir = Path(output_dir)
@@ -0,0 +1,174 @@
+"""
+Mergeable quantile sketches of high tide heights.
+
+Percentile thresholds over long reference periods would otherwise require
+loading every raw high tide of every year. Instead, each station-year keeps
+a fixed-bin histogram of its valid high tide heights:
+
+- Bin k covers heights in [k * resolution, (k + 1) * resolution) feet; bins
+  are anchored at zero, so sketches built with the same resolution share
+  one grid and merge by adding counts
+- Only occupied bins are stored (sorted bin indices and counts), so the
+  grid is unbounded and no height is ever clipped
+- The exact minimum and maximum are kept alongside the bins
+
+A quantile is estimated by locating the bins holding the order statistics
+np.percentile would interpolate between and taking their midpoints (clamped
+to the observed range). Each order statistic is then off by at most half a
+bin, and so is their linear interpolation: every estimate is within
+error_bound = resolution / 2 of the exact np.percentile value.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+# Default bin width in feet (estimates within +/- 0.005 ft)
+DEFAULT_RESOLUTION = 0.01
+
+
+@dataclass
+class HeightSketch:
+    """Fixed-bin histogram of heights with exact extremes."""
+    resolution: float   # Bin width in feet
+    bins: np.ndarray    # int64 sorted occupied bin indices
+    counts: np.ndarray  # int64 observations per occupied bin
+    minimum: float      # Smallest observed height (NaN if empty)
+    maximum: float      # Largest observed height (NaN if empty)
+
+    @classmethod
+    def empty(cls, resolution: float = DEFAULT_RESOLUTION) -> 'HeightSketch':
+        """Create a sketch with no observations."""
+        return cls(resolution, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.nan, np.nan)
+
+    @classmethod
+    def from_heights(cls, heights: np.ndarray, resolution: float = DEFAULT_RESOLUTION) -> 'HeightSketch':
+        """
+        Build a sketch from raw heights.
+
+        Args:
+            heights: Heights in feet; NaN values are ignored
+            resolution: Bin width in feet
+
+        Returns:
+            HeightSketch of the valid heights
+        """
+        heights = np.asarray(heights, dtype=np.float64)
+        heights = heights[~np.isnan(heights)]
+        if len(heights) == 0:
+            return cls.empty(resolution)
+
+        bins, counts = np.unique(np.floor(heights / resolution).astype(np.int64), return_counts=True)
+        return cls(resolution, bins, counts.astype(np.int64), float(heights.min()), float(heights.max()))
+
+    @property
+    def count(self) -> int:
+        """Number of observations in the sketch."""
+        return int(self.counts.sum())
+
+    @property
+    def error_bound(self) -> float:
+        """Maximum absolute error of any quantile estimate, in feet."""
+        return self.resolution / 2
+
+    def merge(self, other: 'HeightSketch') -> 'HeightSketch':
+        """
+        Combine two sketches into a sketch of the union of their observations.
+
+        Args:
+            other: Sketch with the same resolution
+
+        Returns:
+            New merged HeightSketch
+
+        Raises:
+            ValueError: If the resolutions differ
+        """
+        return merge_sketches([self, other], self.resolution)
+
+    def quantiles(self, percentiles: Sequence[float]) -> np.ndarray:
+        """
+        Estimate percentiles, matching np.percentile's linear interpolation.
+
+        Args:
+            percentiles: Percentiles in [0, 100]
+
+        Returns:
+            float64 array with one estimate per percentile (NaN if empty)
+        """
+        percentiles = np.asarray(percentiles, dtype=np.float64)
+        n = self.count
+        if n == 0:
+            return np.full(percentiles.shape, np.nan)
+
+        # Zero-based ranks of the order statistics np.percentile interpolates between
+        position = percentiles / 100 * (n - 1)
+        lo = np.floor(position).astype(np.int64)
+        hi = np.minimum(lo + 1, n - 1)
+        frac = position - lo
+
+        cumulative = np.cumsum(self.counts)
+        midpoints = np.clip((self.bins + 0.5) * self.resolution, self.minimum, self.maximum)
+        lo_value = midpoints[np.searchsorted(cumulative, lo, side='right')]
+        hi_value = midpoints[np.searchsorted(cumulative, hi, side='right')]
+        return lo_value + frac * (hi_value - lo_value)
+
+    def save(self, path: Path):
+        """Write the sketch and its error bound to an .npz file."""
+        np.savez(
+            path,
+            resolution=self.resolution,
+            bins=self.bins,
+            counts=self.counts,
+            minimum=self.minimum,
+            maximum=self.maximum,
+            error_bound=self.error_bound
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> 'HeightSketch':
+        """Read a sketch written by save()."""
+        with np.load(path) as data:
+            return cls(
+                resolution=float(data['resolution']),
+                bins=data['bins'].astype(np.int64),
+                counts=data['counts'].astype(np.int64),
+                minimum=float(data['minimum']),
+                maximum=float(data['maximum'])
+            )
+
+
+def merge_sketches(sketches: Iterable[HeightSketch], resolution: float = DEFAULT_RESOLUTION) -> HeightSketch:
+    """
+    Merge any number of sketches, e.g. the yearly sketches of a reference period.
+
+    Args:
+        sketches: Sketches sharing one resolution
+        resolution: Expected resolution (also used if there are no sketches)
+
+    Returns:
+        HeightSketch of all observations
+
+    Raises:
+        ValueError: If a sketch has a different resolution
+    """
+    sketches = list(sketches)
+    for sketch in sketches:
+        if not np.isclose(sketch.resolution, resolution):
+            raise ValueError(f"Cannot merge sketches with resolution {sketch.resolution} and {resolution}")
+
+    sketches = [s for s in sketches if s.count]
+    if not sketches:
+        return HeightSketch.empty(resolution)
+
+    bins, inverse = np.unique(np.concatenate([s.bins for s in sketches]), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate([s.counts for s in sketches]), minlength=len(bins))
+    return HeightSketch(
+        resolution=resolution,
+        bins=bins,
+        counts=counts.astype(np.int64),
+        minimum=min(s.minimum for s in sketches),
+        maximum=max(s.maximum for s in sketches)
+    )
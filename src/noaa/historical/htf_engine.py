@@ -0,0 +1,410 @@
+"""
+Threshold-exceedance HTF engine for any registered station.
+
+NOAA's annual flood counts lag, and they exist only for the NWS
+minor/moderate/major thresholds. This engine computes annual flood days for
+any station in the tide station registry directly from raw water levels, for
+any set of threshold specifications:
+
+- nws: an NWS flood category (minor, moderate or major) from the station's
+  metadata
+- percentile: a percentile of observed high tides (or hourly heights) over a
+  reference period
+- mhhw_offset: a fixed height above the station's Mean Higher High Water
+
+compute_severity classifies every day into severity tiers (by default the
+NWS minor/moderate/major levels) with one searchsorted bucketing of the
+daily maxima, producing NOAA annual-product columns (minCount, modCount,
+majCount, nanCount) for stations and years the HTF API does not cover.
+
+Water levels are read through the WaterLevelStore (fetched once per
+station-year), datums and flood levels through the NOAACache metadata cache.
+Every threshold of a station is counted in one pass over its daily maxima,
+and stations are processed concurrently under a shared request budget.
+All heights are in feet above station datum (STND).
+"""
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..core import NOAACache
+from ..core.noaa_client import NOAAClient, NOAAApiError
+from ..core.rate_limiter import TokenBucketRateLimiter
+from .alaska_htf_computer import DEFAULT_MAX_WORKERS, REFERENCE_PERIOD_START, REFERENCE_PERIOD_END
+from .htf_kernels import (
+    TideArrays, MISSING_DAYS_COLUMN, count_exceedance_days, count_high_tides, count_tier_days, severity_column
+)
+from .sensitivity_sweep import MIN_OBSERVATIONS, sorted_percentiles
+from .water_level_store import WaterLevelStore, HIGH_TIDE_CODES
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD_METHODS = ('nws', 'percentile', 'mhhw_offset')
+
+NWS_TIERS = ('minor', 'moderate', 'major')
+
+# Tide type codes whose heights count toward daily maxima, per product;
+# hourly heights have no tide type, so every observation counts
+PRODUCT_TIDE_CODES = {
+    'high_low': HIGH_TIDE_CODES,
+    'hourly_height': (-1,)
+}
+
+OUTPUT_COLUMNS = [
+    'station_id', 'station_name', 'region', 'year', 'threshold', 'threshold_ft',
+    'flood_days', 'observations'
+]
+
+# Identifying columns of the severity output, followed by one count column per tier
+SEVERITY_ID_COLUMNS = ['station_id', 'station_name', 'region', 'year']
+
+
+@dataclass(frozen=True)
+class ThresholdSpec:
+    """Specification of a flood threshold, resolved per station."""
+    method: str                                   # One of THRESHOLD_METHODS
+    value: Optional[float] = None                 # Percentile, or feet above MHHW
+    tier: str = 'minor'                           # NWS flood category (method 'nws')
+    reference_start: int = REFERENCE_PERIOD_START  # Percentile reference period
+    reference_end: int = REFERENCE_PERIOD_END
+
+    def __post_init__(self):
+        if self.method not in THRESHOLD_METHODS:
+            raise ValueError(f"Unknown threshold method: {self.method}")
+        if self.method == 'nws' and self.tier not in NWS_TIERS:
+            raise ValueError(f"Unknown NWS flood category: {self.tier}")
+        if self.method != 'nws' and self.value is None:
+            raise ValueError(f"Threshold method {self.method} requires a value")
+        if self.method == 'percentile' and not 0 <= self.value <= 100:
+            raise ValueError(f"Percentile must be between 0 and 100, got {self.value}")
+
+    @property
+    def label(self) -> str:
+        """Short name used in outputs (e.g. 'nws_minor', 'percentile_99')."""
+        if self.method == 'nws':
+            return f"nws_{self.tier}"
+        return f"{self.method}_{self.value:g}"
+
+    @classmethod
+    def parse(cls, text: str) -> 'ThresholdSpec':
+        """
+        Parse a command line threshold specification.
+
+        Accepted forms: 'nws:minor', 'percentile:99', 'percentile:99@1990-2000'
+        and 'mhhw_offset:1.8'.
+
+        Args:
+            text: Specification string
+
+        Returns:
+            ThresholdSpec
+
+        Raises:
+            ValueError: If the specification is malformed
+        """
+        method, _, argument = text.partition(':')
+        if method == 'nws':
+            return cls('nws', tier=argument or 'minor')
+
+        argument, _, period = argument.partition('@')
+        if not argument:
+            raise ValueError(f"Threshold method {method} requires a value: {text}")
+        if period:
+            start, end = (int(part) for part in period.split('-'))
+            return cls(method, float(argument), reference_start=start, reference_end=end)
+        return cls(method, float(argument))
+
+
+# NWS flood categories, reported like NOAA's annual flood counts
+DEFAULT_SEVERITY_TIERS = {tier: ThresholdSpec('nws', tier=tier) for tier in NWS_TIERS}
+
+
+class HTFEngine:
+    """Computes annual flood days from raw water levels for any station and threshold."""
+
+    def __init__(self,
+                 cache: Optional[NOAACache] = None,
+                 store: Optional[WaterLevelStore] = None,
+                 product: str = 'high_low',
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 requests_per_second: float = 2.0):
+        """
+        Initialize the engine.
+
+        Args:
+            cache: Cache providing the station registry and metadata (created if None)
+            store: Raw water level store (created for product if None)
+            product: Water level product, 'high_low' or 'hourly_height'
+            max_workers: Number of stations processed concurrently
+            requests_per_second: API request budget shared by all workers
+
+        Raises:
+            ValueError: If the store's product is not supported
+        """
+        self.cache = cache or NOAACache()
+        self.store = store or WaterLevelStore(
+            client=NOAAClient(rate_limiter=TokenBucketRateLimiter(requests_per_second)),
+            product=product
+        )
+        if self.store.product not in PRODUCT_TIDE_CODES:
+            raise ValueError(f"Unsupported water level product: {self.store.product}")
+        self.tide_codes = PRODUCT_TIDE_CODES[self.store.product]
+        self.max_workers = max_workers
+        self.stations = {station['id']: station for station in self.cache.get_stations()}
+
+    def station_metadata(self, station_id: str) -> Dict:
+        """
+        Get a station's datums and flood levels, from cache when fresh.
+
+        Args:
+            station_id: NOAA station ID
+
+        Returns:
+            Dictionary with 'datums' and 'flood_levels' (empty if unavailable)
+        """
+        cached = self.cache.get_station_metadata(station_id)
+        if cached is not None and not self.cache.needs_update(station_id, 'metadata'):
+            return cached
+
+        try:
+            metadata = self.store.client.fetch_station_metadata(station_id)
+        except NOAAApiError as e:
+            logger.warning(f"Metadata request failed for {station_id}: {e}")
+            return cached or {'datums': {}, 'flood_levels': {}}
+
+        self.cache.save_station_metadata(station_id, metadata)
+        return metadata
+
+    def resolve_thresholds(self, station_id: str, specs: Sequence[ThresholdSpec]) -> np.ndarray:
+        """
+        Resolve threshold specifications to heights for one station.
+
+        Args:
+            station_id: NOAA station ID
+            specs: Threshold specifications
+
+        Returns:
+            float64 array of thresholds in feet above station datum, NaN where
+            the station lacks the flood level, datum or reference data
+        """
+        thresholds = np.full(len(specs), np.nan)
+
+        metadata = None
+        if any(spec.method != 'percentile' for spec in specs):
+            metadata = self.station_metadata(station_id)
+
+        # Percentiles sharing a reference period are read from one sorted sample
+        periods: Dict[tuple, List[int]] = {}
+        for i, spec in enumerate(specs):
+            if spec.method == 'nws':
+                level = metadata['flood_levels'].get(f"nws_{spec.tier}")
+                thresholds[i] = np.nan if level is None else level
+            elif spec.method == 'mhhw_offset':
+                mhhw = metadata['datums'].get('MHHW')
+                thresholds[i] = np.nan if mhhw is None else mhhw + spec.value
+            else:
+                periods.setdefault((spec.reference_start, spec.reference_end), []).append(i)
+
+        for (start, end), indices in periods.items():
+            arrays = TideArrays.from_frame(self.store.get_years(station_id, start, end), self.tide_codes)
+            sample = np.sort(arrays.height[arrays.high & ~np.isnan(arrays.height)])
+            if len(sample) < MIN_OBSERVATIONS:
+                logger.warning(f"Insufficient data for {station_id} {start}-{end}: "
+                               f"only {len(sample)} observations")
+                continue
+            thresholds[indices] = sorted_percentiles(sample, [specs[i].value for i in indices])
+
+        return thresholds
+
+    def compute_station(self, station_id: str, specs: Sequence[ThresholdSpec],
+                        start_year: int, end_year: int) -> pd.DataFrame:
+        """
+        Compute annual flood days for one station and every threshold.
+
+        Args:
+            station_id: NOAA station ID
+            specs: Threshold specifications
+            start_year: First year
+            end_year: Last year (inclusive)
+
+        Returns:
+            DataFrame with OUTPUT_COLUMNS, one row per threshold and year;
+            flood_days is NA where the threshold could not be resolved
+        """
+        thresholds = self.resolve_thresholds(station_id, specs)
+        years = np.arange(start_year, end_year + 1, dtype=np.int32)
+
+        arrays = TideArrays.from_frame(self.store.get_years(station_id, start_year, end_year), self.tide_codes)
+        valid = ~np.isnan(thresholds)
+        counts = np.zeros((len(specs), len(years)), dtype=np.int64)
+        counts[valid] = count_exceedance_days(arrays, thresholds[valid], years)
+        observations = count_high_tides(arrays, years)
+
+        station = self.stations.get(station_id, {})
+        df = pd.DataFrame({
+            'station_id': station_id,
+            'station_name': station.get('name', station_id),
+            'region': station.get('region', ''),
+            'year': np.tile(years, len(specs)),
+            'threshold': np.repeat([spec.label for spec in specs], len(years)),
+            'threshold_ft': np.repeat(thresholds, len(years)),
+            'flood_days': pd.array(counts.reshape(-1), dtype='Int64'),
+            'observations': np.tile(observations, len(specs))
+        })
+        df.loc[df['threshold_ft'].isna(), 'flood_days'] = pd.NA
+        return df[OUTPUT_COLUMNS]
+
+    def compute(self, specs: Sequence[ThresholdSpec], start_year: int, end_year: int,
+                station_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Compute annual flood days for many stations.
+
+        Args:
+            specs: Threshold specifications
+            start_year: First year
+            end_year: Last year (inclusive)
+            station_ids: Stations to process (default: every registered station)
+
+        Returns:
+            DataFrame with OUTPUT_COLUMNS in station, threshold and year order
+        """
+        station_ids = list(self.stations) if station_ids is None else list(station_ids)
+        logger.info(f"Computing {len(specs)} thresholds for {len(station_ids)} stations, "
+                    f"{start_year}-{end_year} ({self.store.product})")
+        return self._map_stations(
+            lambda station_id: self.compute_station(station_id, specs, start_year, end_year),
+            station_ids, OUTPUT_COLUMNS
+        )
+
+    def compute_station_severity(self, station_id: str, tiers: Dict[str, ThresholdSpec],
+                                 start_year: int, end_year: int) -> pd.DataFrame:
+        """
+        Count days per severity tier for one station in a single pass.
+
+        Args:
+            station_id: NOAA station ID
+            tiers: Tier name -> threshold specification
+            start_year: First year
+            end_year: Last year (inclusive)
+
+        Returns:
+            DataFrame with SEVERITY_ID_COLUMNS, one Int64 count column per tier
+            (NA where the tier's threshold could not be resolved) and nanCount
+        """
+        thresholds = self.resolve_thresholds(station_id, list(tiers.values()))
+        years = np.arange(start_year, end_year + 1, dtype=np.int32)
+
+        arrays = TideArrays.from_frame(self.store.get_years(station_id, start_year, end_year), self.tide_codes)
+        tier_days, missing_days = count_tier_days(arrays, thresholds, years)
+
+        station = self.stations.get(station_id, {})
+        df = pd.DataFrame({
+            'station_id': station_id,
+            'station_name': station.get('name', station_id),
+            'region': station.get('region', ''),
+            'year': years
+        })
+        for tier, threshold, counts in zip(tiers, thresholds, tier_days):
+            df[severity_column(tier)] = pd.array(counts, dtype='Int64')
+            if np.isnan(threshold):
+                df[severity_column(tier)] = pd.NA
+        df[MISSING_DAYS_COLUMN] = missing_days
+        return df
+
+    def compute_severity(self, start_year: int, end_year: int,
+                         tiers: Optional[Dict[str, ThresholdSpec]] = None,
+                         station_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """
+        Compute NOAA-style annual severity counts for many stations.
+
+        Each day counts toward the highest tier its daily maximum reaches, as
+        in NOAA's annual flood count product.
+
+        Args:
+            start_year: First year
+            end_year: Last year (inclusive)
+            tiers: Tier name -> threshold specification (default: NWS minor,
+                moderate and major); 'minor', 'moderate' and 'major' map to
+                minCount, modCount and majCount, other names to '<name>Count'
+            station_ids: Stations to process (default: every registered station)
+
+        Returns:
+            DataFrame with SEVERITY_ID_COLUMNS, tier count columns and nanCount
+        """
+        tiers = tiers or DEFAULT_SEVERITY_TIERS
+        station_ids = list(self.stations) if station_ids is None else list(station_ids)
+        logger.info(f"Computing {len(tiers)} severity tiers for {len(station_ids)} stations, "
+                    f"{start_year}-{end_year} ({self.store.product})")
+        columns = SEVERITY_ID_COLUMNS + [severity_column(tier) for tier in tiers] + [MISSING_DAYS_COLUMN]
+        return self._map_stations(
+            lambda station_id: self.compute_station_severity(station_id, tiers, start_year, end_year),
+            station_ids, columns
+        )
+
+    def _map_stations(self, process_station, station_ids: List[str], columns: List[str]) -> pd.DataFrame:
+        """Run a per-station computation concurrently and concatenate in station order."""
+        # map() yields results in station order, so output matches a serial run
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            frames = list(executor.map(process_station, station_ids))
+
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    """Compute flood days for registered stations from the command line."""
+    parser = argparse.ArgumentParser(description="Compute HTF flood days from raw water levels")
+    parser.add_argument("--stations", nargs="+", help="Station IDs (default: all registered stations)")
+    parser.add_argument("--region", help="Only process stations in this registry region")
+    parser.add_argument("--threshold", nargs="+", type=ThresholdSpec.parse, default=[ThresholdSpec('nws')],
+                        help="Threshold specs: nws:TIER, percentile:P[@START-END], mhhw_offset:FEET")
+    parser.add_argument("--severity", action="store_true",
+                        help="Report NOAA-style severity counts (minCount, modCount, majCount, nanCount)")
+    parser.add_argument("--tier", nargs="+", default=[], metavar="NAME=SPEC",
+                        help="Severity tiers for --severity (default: NWS minor, moderate and major)")
+    parser.add_argument("--start-year", type=int, default=1990, help="First year")
+    parser.add_argument("--end-year", type=int, default=2024, help="Last year")
+    parser.add_argument("--product", choices=sorted(PRODUCT_TIDE_CODES), default='high_low',
+                        help="Water level product")
+    parser.add_argument("--max-workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Number of stations processed concurrently")
+    parser.add_argument("--requests-per-second", type=float, default=2.0,
+                        help="API request budget shared by all workers")
+    parser.add_argument("--output", type=Path, default=Path("output/historical/htf_engine_flood_days.parquet"),
+                        help="Output parquet file")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    engine = HTFEngine(product=args.product, max_workers=args.max_workers,
+                       requests_per_second=args.requests_per_second)
+    station_ids = args.stations
+    if args.region:
+        station_ids = [s['id'] for s in engine.cache.get_stations(args.region)
+                       if not station_ids or s['id'] in station_ids]
+
+    if args.severity:
+        tiers = {name: ThresholdSpec.parse(spec) for name, spec in (item.split('=', 1) for item in args.tier)}
+        df = engine.compute_severity(args.start_year, args.end_year, tiers=tiers or None, station_ids=station_ids)
+    else:
+        df = engine.compute(args.threshold, args.start_year, args.end_year, station_ids=station_ids)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(args.output, index=False)
+    logger.info(f"Saved {len(df)} station-year-threshold records to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
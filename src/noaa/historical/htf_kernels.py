@@ -0,0 +1,201 @@
+"""
+Vectorized flood-day kernels over columnar tide arrays.
+
+Flood days are days with at least one high tide at or above a threshold. The
+kernels here work on pre-parsed arrays instead of JSON records:
+
+- TideArrays: day index (int32 days since 1970-01-01), height (float32),
+  high-tide mask and calendar year for every observation
+- daily_high_maxima: highest high tide of each observed day
+- count_exceedance_days: flood days for many thresholds x many years in one
+  bincount
+- count_tier_days: days classified into severity tiers (minor, moderate,
+  major, ...) by one searchsorted bucketing of the daily maxima, plus
+  missing days, as in NOAA's annual minCount/modCount/majCount/nanCount
+
+A day floods at threshold t exactly when its highest high tide is >= t, so
+reducing to daily maxima first makes threshold sweeps independent of the
+number of tides per day.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Nanoseconds per day, for converting timestamps to day indices
+NS_PER_DAY = 86_400 * 10**9
+
+# NOAA annual flood count columns of the standard severity tiers
+SEVERITY_COLUMNS: Dict[str, str] = {'minor': 'minCount', 'moderate': 'modCount', 'major': 'majCount'}
+
+# NOAA annual column counting days without observations
+MISSING_DAYS_COLUMN = 'nanCount'
+
+
+def severity_column(tier: str) -> str:
+    """Output column for a severity tier ('minor' -> 'minCount', 'king' -> 'kingCount')."""
+    return SEVERITY_COLUMNS.get(tier, f"{tier}Count")
+
+
+def day_to_year(day: np.ndarray) -> np.ndarray:
+    """Convert day indices (days since 1970-01-01) to calendar years."""
+    return day.astype('datetime64[D]').astype('datetime64[Y]').astype(np.int32) + 1970
+
+
+def _year_positions(years: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Locate values in a sorted year axis; returns (positions, found mask)."""
+    if len(years) == 0:
+        return np.zeros(len(values), dtype=np.intp), np.zeros(len(values), dtype=bool)
+    idx = np.searchsorted(years, values)
+    found = years[np.minimum(idx, len(years) - 1)] == values
+    return idx, found
+
+
+@dataclass
+class TideArrays:
+    """Columnar tide observations."""
+    day: np.ndarray     # int32 days since 1970-01-01 (UTC)
+    height: np.ndarray  # float32 water level
+    high: np.ndarray    # bool, True for high and higher high tides
+    year: np.ndarray    # int32 calendar year
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, high_codes: Sequence[int] = (0, 1)) -> 'TideArrays':
+        """
+        Build arrays from a water level store frame.
+
+        Args:
+            frame: DataFrame with timestamp (UTC), height and tide_type columns
+            high_codes: Tide type codes counted as high tides
+
+        Returns:
+            TideArrays for all observations in the frame
+        """
+        ns = pd.DatetimeIndex(frame['timestamp']).as_unit('ns').asi8
+        day = (ns // NS_PER_DAY).astype(np.int32)
+        return cls(
+            day=day,
+            height=frame['height'].to_numpy(dtype=np.float32),
+            high=np.isin(frame['tide_type'].to_numpy(), high_codes),
+            year=day_to_year(day)
+        )
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+
+def daily_high_maxima(arrays: TideArrays) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the highest valid high tide of each day.
+
+    Args:
+        arrays: Tide observations
+
+    Returns:
+        Tuple of (sorted unique day indices, float32 daily maxima)
+    """
+    keep = arrays.high & ~np.isnan(arrays.height)
+    day = arrays.day[keep]
+    height = arrays.height[keep]
+    if len(day) == 0:
+        return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+    order = np.argsort(day, kind='stable')
+    day = day[order]
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    return day[starts], np.maximum.reduceat(height[order], starts)
+
+
+def count_exceedance_days(arrays: TideArrays,
+                          thresholds: Sequence[float],
+                          years: Optional[Sequence[int]] = None) -> np.ndarray:
+    """
+    Count flood days for every threshold and year in one pass.
+
+    Args:
+        arrays: Tide observations
+        thresholds: Flood thresholds (compared in float32, inclusive)
+        years: Years to report (default: all observed years, sorted)
+
+    Returns:
+        int64 array of shape (len(thresholds), len(years))
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float32).reshape(-1)
+    years = np.unique(arrays.year) if years is None else np.asarray(years, dtype=np.int32)
+
+    days, maxima = daily_high_maxima(arrays)
+    day_years = day_to_year(days)
+
+    # Position of each day's year in the output; days in other years are dropped
+    year_idx, found = _year_positions(years, day_years)
+    year_idx, maxima = year_idx[found], maxima[found]
+
+    exceed = maxima[None, :] >= thresholds[:, None]
+    cells = (np.arange(len(thresholds))[:, None] * len(years) + year_idx[None, :])[exceed]
+    counts = np.bincount(cells, minlength=len(thresholds) * len(years))
+    return counts.reshape(len(thresholds), len(years))
+
+
+def days_in_years(years: np.ndarray) -> np.ndarray:
+    """Number of calendar days in each year."""
+    start = (np.asarray(years, dtype=np.int64) - 1970).astype('datetime64[Y]')
+    return ((start + 1).astype('datetime64[D]') - start.astype('datetime64[D]')).astype(np.int64)
+
+
+def count_tier_days(arrays: TideArrays,
+                    thresholds: Sequence[float],
+                    years: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Classify every observed day into severity tiers in one pass.
+
+    Daily maxima are bucketed once against the sorted thresholds with
+    np.searchsorted, so each day counts only toward the highest tier it
+    reaches (tiers are mutually exclusive, like NOAA's annual counts).
+
+    Args:
+        arrays: Tide observations
+        thresholds: Tier thresholds in any order (compared in float32,
+            inclusive); NaN tiers are undefined and never counted
+        years: Sorted years to report
+
+    Returns:
+        Tuple of (int64 tier counts of shape (len(thresholds), len(years)),
+        int64 days per year without any valid observation)
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float32).reshape(-1)
+    years = np.asarray(years, dtype=np.int32)
+
+    days, maxima = daily_high_maxima(arrays)
+    year_idx, found = _year_positions(years, day_to_year(days))
+    year_idx, maxima = year_idx[found], maxima[found]
+
+    # Bucket 0 holds days below every defined tier; bucket k the k-th lowest tier
+    defined = np.flatnonzero(~np.isnan(thresholds))
+    order = defined[np.argsort(thresholds[defined], kind='stable')]
+    bucket = np.searchsorted(thresholds[order], maxima, side='right')
+
+    n_buckets = len(order) + 1
+    cells = np.bincount(year_idx * n_buckets + bucket, minlength=len(years) * n_buckets)
+    cells = cells.reshape(len(years), n_buckets)
+
+    counts = np.zeros((len(thresholds), len(years)), dtype=np.int64)
+    counts[order] = cells[:, 1:].T
+    return counts, days_in_years(years) - cells.sum(axis=1)
+
+
+def count_high_tides(arrays: TideArrays, years: Sequence[int]) -> np.ndarray:
+    """
+    Count high tide observations per year (including missing heights).
+
+    Args:
+        arrays: Tide observations
+        years: Sorted years to report
+
+    Returns:
+        int64 array of shape (len(years),)
+    """
+    years = np.asarray(years, dtype=np.int32)
+    year_idx, found = _year_positions(years, arrays.year[arrays.high])
+    return np.bincount(year_idx[found], minlength=len(years))
@@ -1,61 +1,53 @@
 """
-Process raw JSON flood data files into regional parquet files.
+Process raw JSON flood data files into a region-partitioned parquet dataset.
 Focuses on minor flood events (minCount) from NOAA data.
+
+All regions are handled in a single pass: the station to region map is loaded
+once, every station JSON file is parsed in parallel, and the combined table is
+written as one hive-partitioned (`region=<name>`) parquet dataset.
 """
 
 import json
 import pandas as pd
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import yaml
-from typing import Dict, List, Optional, Set
-from tqdm import tqdm
+from typing import Dict, List, Optional
 
 from src.config import CONFIG_DIR, OUTPUT_DIR
+from ..core.region_dataset import load_station_region_map, write_region_dataset
 
 logger = logging.getLogger(__name__)
 
+# Name of the partitioned dataset directory inside the historical output directory
+DATASET_NAME = "historical_htf"
+
+OUTPUT_COLUMNS = ['station_id', 'year', 'flood_days', 'missing_days', 'region']
+
 def load_region_config() -> Dict:
     """Load region configuration from YAML."""
     with open(CONFIG_DIR / "region_mappings.yaml") as f:
         config = yaml.safe_load(f)
     return config['regions']
 
-def get_region_stations(region: str) -> Set[str]:
-    """Get set of station IDs for a region.
-    
-    Args:
-        region: Name of the region
-        
-    Returns:
-        Set of station IDs
-    """
-    # Load imputation structure to get station to region mapping
-    imputation_file = OUTPUT_DIR / "imputation" / "imputation_structure_all_regions.parquet"
-    if not imputation_file.exists():
-        logger.warning(f"Imputation structure not found: {imputation_file}")
-        return set()
-    
-    df = pd.read_parquet(imputation_file)
-    return set(df[df['region'] == region]['station_id'].unique())
-
 def process_station_json(file_path: Path) -> pd.DataFrame:
     """Process a single station's JSON file.
-    
+
     Args:
         file_path: Path to JSON file
-        
+
     Returns:
         DataFrame with processed flood data
     """
     # Load JSON data
     with open(file_path) as f:
         data = json.load(f)
-    
+
     # Convert to DataFrame
     records = []
     station_id = file_path.stem  # filename is station ID
-    
+
     for year_data in data:
         record = {
             'station_id': station_id,
@@ -64,113 +56,115 @@ def process_station_json(file_path: Path) -> pd.DataFrame:
             'missing_days': year_data.get('nanCount', 0) or 0
         }
         records.append(record)
-    
+
     return pd.DataFrame(records)
 
-def process_region(
-    region: str,
-    region_def: Dict,
+def _parse_station_file(file_path: Path) -> Optional[pd.DataFrame]:
+    """Parse a station file, logging and skipping files that fail."""
+    try:
+        return process_station_json(file_path)
+    except Exception as e:
+        logger.error(f"Error processing {file_path.name}: {str(e)}")
+        return None
+
+def parse_station_files(
+    json_files: List[Path],
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """Parse station JSON files in parallel and combine them.
+
+    Args:
+        json_files: Station JSON files to parse
+        max_workers: Number of worker processes (None uses the CPU count)
+
+    Returns:
+        Combined DataFrame of all parsed station records
+    """
+    if not json_files:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS[:-1])
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        dfs = [
+            df for df in executor.map(_parse_station_file, json_files, chunksize=8)
+            if df is not None and not df.empty
+        ]
+
+    if not dfs:
+        return pd.DataFrame(columns=OUTPUT_COLUMNS[:-1])
+    return pd.concat(dfs, ignore_index=True)
+
+def log_region_summary(region: str, df: pd.DataFrame):
+    """Log summary statistics for one region's processed data."""
+    logger.info(f"\nProcessed data summary for {region}:")
+    logger.info(f"Total records: {len(df)}")
+    logger.info(f"Date range: {df['year'].min()} to {df['year'].max()}")
+    logger.info(f"Stations: {df['station_id'].nunique()}")
+    logger.info(f"Mean flood days per year: {df['flood_days'].mean():.2f}")
+
+    # Additional statistics about data completeness
+    complete_data = df[df['missing_days'] < 365]
+    logger.info(f"Records with complete data: {len(complete_data)} ({len(complete_data)/len(df)*100:.1f}%)")
+    if not complete_data.empty:
+        logger.info(f"Mean flood days (complete data only): {complete_data['flood_days'].mean():.2f}")
+
+def process_all_regions(
+    regions_config: Dict,
     raw_data_dir: Path,
-    output_dir: Path
+    output_dir: Path,
+    station_regions: Optional[Dict[str, str]] = None,
+    max_workers: Optional[int] = None
 ) -> Optional[Path]:
-    """Process flood data for a specific region.
-    
+    """Process flood data for all regions in a single pass.
+
     Args:
-        region: Name of the region
-        region_def: Region definition from config
+        regions_config: Region definitions from config
         raw_data_dir: Directory containing raw JSON files
         output_dir: Directory to save processed data
-        
+        station_regions: Optional station to region map (loaded if None)
+        max_workers: Number of worker processes used for parsing
+
     Returns:
-        Path to output file if successful, None otherwise
+        Path to the partitioned dataset if any data was written, None otherwise
     """
-    logger.info(f"\nProcessing region: {region}")
-    
-    # Get stations for this region
-    try:
-        region_stations = get_region_stations(region)
-        logger.info(f"Found {len(region_stations)} stations for {region}")
-        
-        if not region_stations:
-            # Create empty DataFrame with correct structure
-            empty_df = pd.DataFrame(columns=[
-                'station_id', 'year', 'flood_days', 'missing_days', 'region'
-            ])
-            output_path = output_dir / f"historical_htf_{region}.parquet"
-            empty_df.to_parquet(output_path)
-            logger.warning(f"No stations found for {region}, created empty file")
-            return output_path
-            
-    except Exception as e:
-        logger.error(f"Error getting stations for {region}: {str(e)}")
+    if station_regions is None:
+        station_regions = load_station_region_map()
+
+    # Restrict to configured regions
+    station_regions = {
+        station: region for station, region in station_regions.items()
+        if region in regions_config
+    }
+    logger.info(f"Found {len(station_regions)} stations across {len(set(station_regions.values()))} regions")
+
+    if not station_regions:
+        logger.warning("No station to region mapping available, nothing to process")
         return None
-    
-    # Get list of JSON files for this region's stations
-    json_files = [
+
+    json_files = sorted(
         f for f in raw_data_dir.glob("*.json")
-        if f.stem in region_stations
-    ]
-    
-    if not json_files:
-        # Create empty DataFrame with correct structure
-        empty_df = pd.DataFrame(columns=[
-            'station_id', 'year', 'flood_days', 'missing_days', 'region'
-        ])
-        output_path = output_dir / f"historical_htf_{region}.parquet"
-        empty_df.to_parquet(output_path)
-        logger.warning(f"No JSON files found for {region} stations, created empty file")
-        return output_path
-    
-    # Process each station
-    dfs = []
-    for file_path in tqdm(json_files, desc=f"Processing {region} stations"):
-        try:
-            df = process_station_json(file_path)
-            if not df.empty:
-                df['region'] = region
-                dfs.append(df)
-        except Exception as e:
-            logger.error(f"Error processing {file_path.name}: {str(e)}")
+        if f.stem in station_regions
+    )
+    logger.info(f"Parsing {len(json_files)} station files from {raw_data_dir}")
+
+    combined_df = parse_station_files(json_files, max_workers=max_workers)
+    if combined_df.empty:
+        logger.warning("No valid data processed for any region")
+        return None
+
+    combined_df['region'] = combined_df['station_id'].map(station_regions)
+    combined_df = combined_df[OUTPUT_COLUMNS]
+
+    for region in regions_config:
+        region_df = combined_df[combined_df['region'] == region]
+        if region_df.empty:
+            logger.warning(f"No data found for {region} stations")
             continue
-    
-    if not dfs:
-        # Create empty DataFrame with correct structure
-        empty_df = pd.DataFrame(columns=[
-            'station_id', 'year', 'flood_days', 'missing_days', 'region'
-        ])
-        output_path = output_dir / f"historical_htf_{region}.parquet"
-        empty_df.to_parquet(output_path)
-        logger.warning(f"No valid data processed for {region}, created empty file")
-        return output_path
-    
-    # Combine all stations
-    combined_df = pd.concat(dfs, ignore_index=True)
-    
-    # Log some statistics
-    logger.info(f"\nProcessed data summary for {region}:")
-    logger.info(f"Total records: {len(combined_df)}")
-    logger.info(f"Date range: {combined_df['year'].min()} to {combined_df['year'].max()}")
-    logger.info(f"Stations: {len(combined_df['station_id'].unique())}")
-    logger.info(f"\nMean flood days per year: {combined_df['flood_days'].mean():.2f}")
-    
-    # Additional statistics about data completeness
-    complete_data = combined_df[combined_df['missing_days'] < 365]
-    logger.info("\nData completeness:")
-    logger.info(f"Records with complete data: {len(complete_data)} ({len(complete_data)/len(combined_df)*100:.1f}%)")
-    logger.info(f"Mean flood days (complete data only): {complete_data['flood_days'].mean():.2f}")
-    
-    # Save to parquet
-    output_path = output_dir / f"historical_htf_{region}.parquet"
-    combined_df.to_parquet(output_path)
-    logger.info(f"\nSaved {len(combined_df)} records to {output_path}")
-    
-    # Display first few rows and summary statistics
-    logger.info("\nFirst few rows of processed data:")
-    logger.info(combined_df.head().to_string())
-    logger.info("\nSummary statistics:")
-    logger.info(combined_df.describe().to_string())
-    
-    return output_path
+        log_region_summary(region, region_df)
+
+    dataset_dir = write_region_dataset(combined_df, output_dir / DATASET_NAME, regions=list(regions_config))
+    logger.info(f"\nSaved {len(combined_df)} records to {dataset_dir}")
+
+    return dataset_dir
 
 def main():
     """Process raw flood data files."""
@@ -179,41 +173,30 @@ def main():
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    
+
     try:
         # Load region configuration
         regions_config = load_region_config()
-        
+
         # Set up directories
         raw_data_dir = OUTPUT_DIR / "noaa" / "historical"
         output_dir = OUTPUT_DIR / "historical"
         output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Process each region
-        for region, region_def in regions_config.items():
-            try:
-                output_path = process_region(
-                    region=region,
-                    region_def=region_def,
-                    raw_data_dir=raw_data_dir,
-                    output_dir=output_dir
-                )
-                
-                if output_path:
-                    if output_path.stat().st_size > 0:
-                        logger.info(f"Successfully processed {region}")
-                    else:
-                        logger.warning(f"No data available for {region}, empty file created")
-                else:
-                    logger.warning(f"Failed to process {region}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing region {region}: {str(e)}")
-                continue
-            
+
+        output_path = process_all_regions(
+            regions_config=regions_config,
+            raw_data_dir=raw_data_dir,
+            output_dir=output_dir
+        )
+
+        if output_path:
+            logger.info(f"Successfully processed historical flood data to {output_path}")
+        else:
+            logger.warning("No historical flood data was processed")
+
     except Exception as e:
         logger.error(f"Error processing flood data: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
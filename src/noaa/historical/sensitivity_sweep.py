@@ -0,0 +1,252 @@
+"""
+One-pass parameter sweep for Alaska threshold sensitivity.
+
+Evaluates every combination of threshold percentile, reference period and
+test year for a set of stations and returns the full results cube. Each
+station's high tides are loaded from the water level store once:
+
+- Reference-period percentiles come from per-year sorted height arrays;
+  a period's sorted sample is a merge of its years' runs, and all requested
+  percentiles are read from it in one vectorized interpolation
+- Flood days for all thresholds and test years come from a single
+  count_exceedance_days call on the station's tide arrays
+
+Stations are processed in parallel worker processes. The parent prefetches
+missing station-years into the store first, so workers only read parquet;
+station-years the store keeps in memory only (e.g. the current year) are
+handed to the workers with their task. Test years without observations get
+NA flood days.
+"""
+
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .alaska_htf_computer import ALASKA_STATIONS
+from .htf_kernels import TideArrays, count_exceedance_days
+from .water_level_store import WaterLevelStore, HIGH_TIDE_CODES, SCHEMA, high_tides
+
+logger = logging.getLogger(__name__)
+
+# Minimum number of high tides in a reference period for a percentile threshold
+MIN_OBSERVATIONS = 100
+
+# (start year, end year, label)
+ReferencePeriod = Tuple[int, int, str]
+
+RESULT_COLUMNS = [
+    'station_id', 'station_name', 'percentile', 'reference_period', 'ref_start', 'ref_end',
+    'n_observations', 'threshold_ft', 'test_year', 'flood_days'
+]
+
+
+def sorted_percentiles(sorted_values: np.ndarray, percentiles: Sequence[float]) -> np.ndarray:
+    """Linear-interpolated percentiles of an already sorted sample.
+
+    Equivalent to np.percentile(values, percentiles) without re-sorting.
+
+    Args:
+        sorted_values: Ascending sample
+        percentiles: Percentiles in [0, 100]
+
+    Returns:
+        float64 array with one value per percentile
+    """
+    position = np.asarray(percentiles, dtype=np.float64) / 100 * (len(sorted_values) - 1)
+    lo = np.floor(position).astype(np.intp)
+    hi = np.minimum(lo + 1, len(sorted_values) - 1)
+    frac = position - lo
+    values = sorted_values.astype(np.float64)
+    return values[lo] + frac * (values[hi] - values[lo])
+
+
+def yearly_sorted_heights(frame: pd.DataFrame) -> Dict[int, np.ndarray]:
+    """Group valid high tide heights by year, each sorted ascending.
+
+    Args:
+        frame: Observations in the water level store layout
+
+    Returns:
+        Dictionary of year -> sorted float32 heights
+    """
+    highs = high_tides(frame)
+    highs = highs[highs['height'].notna()]
+    years = highs['timestamp'].dt.year.to_numpy()
+    heights = highs['height'].to_numpy(dtype=np.float32)
+
+    order = np.lexsort((heights, years))
+    years, heights = years[order], heights[order]
+    unique_years, starts = np.unique(years, return_index=True)
+    return dict(zip(unique_years.tolist(), np.split(heights, starts[1:])))
+
+
+def sweep_years(periods: Sequence[ReferencePeriod], test_years: Sequence[int]) -> List[int]:
+    """All years needed for a set of reference periods and test years."""
+    years = set(test_years)
+    for start, end, _ in periods:
+        years.update(range(start, end + 1))
+    return sorted(years)
+
+
+def sweep_station(station_id: str,
+                  percentiles: Sequence[float],
+                  periods: Sequence[ReferencePeriod],
+                  test_years: Sequence[int],
+                  store_dir: Optional[Path] = None,
+                  product: str = 'high_low',
+                  datum: str = 'STND',
+                  unstored: Optional[Dict[int, pd.DataFrame]] = None) -> pd.DataFrame:
+    """Evaluate the full parameter grid for one station.
+
+    Reads only stored station-years (no API requests), so it can run in a
+    worker process after the parent has prefetched.
+
+    Args:
+        station_id: NOAA station ID
+        percentiles: Threshold percentiles
+        periods: Reference periods as (start, end, label)
+        test_years: Years to count flood days for
+        store_dir: Water level store root directory
+        product: Water level product
+        datum: Vertical datum of the stored observations
+        unstored: Observations by year that the parent fetched but did not store
+
+    Returns:
+        DataFrame with RESULT_COLUMNS, one row per percentile x period x test year
+    """
+    store = WaterLevelStore(store_dir=store_dir, product=product, datum=datum)
+    unstored = unstored or {}
+    frames = [unstored[year] if year in unstored else store.get_year(station_id, year, fetch_missing=False)
+              for year in sweep_years(periods, test_years)]
+    frames = [f for f in frames if not f.empty]
+    frame = pd.concat(frames, ignore_index=True) if frames else SCHEMA.empty_table().to_pandas()
+
+    # Percentile thresholds for every period, from merged per-year sorted runs
+    by_year = yearly_sorted_heights(frame)
+    rows = []
+    for start, end, label in periods:
+        runs = [by_year[year] for year in range(start, end + 1) if year in by_year]
+        sample = np.sort(np.concatenate(runs), kind='stable') if runs else np.empty(0, dtype=np.float32)
+        if len(sample) >= MIN_OBSERVATIONS:
+            thresholds = sorted_percentiles(sample, percentiles)
+        else:
+            thresholds = np.full(len(percentiles), np.nan)
+        for percentile, threshold in zip(percentiles, thresholds):
+            rows.append((percentile, label, start, end, len(sample), threshold))
+
+    grid = pd.DataFrame(rows, columns=['percentile', 'reference_period', 'ref_start', 'ref_end',
+                                       'n_observations', 'threshold_ft'])
+
+    # Flood days for every threshold and test year in one kernel call
+    test_years = np.asarray(test_years, dtype=np.int32)
+    year_axis = np.unique(test_years)
+    arrays = TideArrays.from_frame(frame, HIGH_TIDE_CODES)
+    valid = grid['threshold_ft'].notna().to_numpy()
+    counts = np.zeros((len(grid), len(year_axis)), dtype=np.int64)
+    counts[valid] = count_exceedance_days(arrays, grid.loc[valid, 'threshold_ft'], year_axis)
+    counts = counts[:, np.searchsorted(year_axis, test_years)]
+
+    cube = grid.loc[grid.index.repeat(len(test_years))].reset_index(drop=True)
+    cube['test_year'] = np.tile(test_years, len(grid))
+    cube['flood_days'] = pd.array(counts.reshape(-1), dtype='Int64')
+    cube.loc[cube['threshold_ft'].isna() | ~cube['test_year'].isin(list(by_year)), 'flood_days'] = pd.NA
+
+    cube.insert(0, 'station_id', station_id)
+    cube.insert(1, 'station_name', ALASKA_STATIONS.get(station_id, {}).get('name', station_id))
+    return cube[RESULT_COLUMNS]
+
+
+def _sweep_task(worker: partial, station_id: str, unstored: Dict[int, pd.DataFrame]) -> pd.DataFrame:
+    """Run one station's sweep with the unstored years handed over by the parent."""
+    return worker(station_id, unstored=unstored)
+
+
+def run_sweep(station_ids: Sequence[str],
+              percentiles: Sequence[float],
+              periods: Sequence[ReferencePeriod],
+              test_years: Sequence[int],
+              store: Optional[WaterLevelStore] = None,
+              max_workers: Optional[int] = None,
+              prefetch_workers: int = 4) -> pd.DataFrame:
+    """Evaluate a percentile x reference period x test year grid for many stations.
+
+    Args:
+        station_ids: NOAA station IDs
+        percentiles: Threshold percentiles
+        periods: Reference periods as (start, end, label)
+        test_years: Years to count flood days for
+        store: Water level store (created if None)
+        max_workers: Worker processes (None = CPU count, 1 = run in this process)
+        prefetch_workers: Threads used to fetch missing station-years
+
+    Returns:
+        Results cube with RESULT_COLUMNS, ordered by station, period,
+        percentile and test year as given; thresholds and flood days are NA where
+        a period has fewer than MIN_OBSERVATIONS high tides, and flood days are
+        NA for test years without high tide observations
+    """
+    store = store or WaterLevelStore()
+    store.prefetch(station_ids, sweep_years(periods, test_years), max_workers=prefetch_workers)
+
+    worker = partial(sweep_station, percentiles=list(percentiles), periods=list(periods),
+                     test_years=list(test_years), store_dir=store.root_dir, product=store.product,
+                     datum=store.datum)
+
+    logger.info(f"Sweeping {len(station_ids)} stations x {len(percentiles)} percentiles x "
+                f"{len(periods)} periods x {len(test_years)} test years")
+    unstored = [store.unstored_years(station_id) for station_id in station_ids]
+    if max_workers == 1:
+        cubes = [worker(station_id, unstored=frames) for station_id, frames in zip(station_ids, unstored)]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            cubes = list(executor.map(partial(_sweep_task, worker), station_ids, unstored))
+
+    if not cubes:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(cubes, ignore_index=True)
+
+
+def parse_period(value: str) -> ReferencePeriod:
+    """Parse a 'START-END' reference period argument."""
+    start, end = (int(part) for part in value.split('-'))
+    return (start, end, f"{start}-{end}")
+
+
+def main():
+    """Run a threshold sensitivity sweep from the command line."""
+    parser = argparse.ArgumentParser(description="Sweep Alaska HTF threshold parameters")
+    parser.add_argument("--stations", nargs="+", help="Station IDs (default: all without NWS thresholds)")
+    parser.add_argument("--percentiles", nargs="+", type=float, default=[98.0, 99.0, 99.5],
+                        help="Threshold percentiles")
+    parser.add_argument("--periods", nargs="+", type=parse_period,
+                        default=[parse_period("1990-2000"), parse_period("2000-2010"), parse_period("2000-2019")],
+                        help="Reference periods as START-END")
+    parser.add_argument("--test-years", nargs="+", type=int, default=[2015, 2020, 2023],
+                        help="Years to count flood days for")
+    parser.add_argument("--max-workers", type=int, help="Worker processes")
+    parser.add_argument("--output", type=Path, default=Path("output/analysis/alaska_htf_sensitivity_sweep.parquet"),
+                        help="Output parquet file")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    station_ids = args.stations or [sid for sid, info in ALASKA_STATIONS.items() if info['nws_minor'] is None]
+    cube = run_sweep(station_ids, args.percentiles, args.periods, args.test_years, max_workers=args.max_workers)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    cube.to_parquet(args.output, index=False)
+    logger.info(f"Saved {len(cube)} sweep results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Block bootstrap confidence intervals for percentile flood thresholds.
+
+Percentile thresholds are point estimates from one reference period. This
+module quantifies their sampling uncertainty with a block bootstrap that
+resamples whole reference years (keeping each year's seasonal and storm
+structure intact), and propagates it to annual flood day counts.
+
+The bootstrap is vectorized across resamples:
+- One batched draw of year indices, shared by every station so that
+  resamples keep the cross-station dependence of regional storm years,
+  becomes a (resamples x years) multiplicity matrix
+- Each station's yearly height sketches form a (years x bins) count
+  matrix; one matrix product gives every resample's histogram, and the
+  resampled percentiles are read from its cumulative counts (within the
+  sketch error bound of np.percentile on the resampled observations)
+- Flood days for every resampled threshold come from a searchsorted on the
+  sorted daily maxima of each test year
+
+Intervals are percentile intervals of the bootstrap distribution, taken with
+np.percentile along the resample axis. Resamples with fewer than
+MIN_OBSERVATIONS high tides have no percentile and are dropped; their number
+is reported as n_dropped, and intervals are NaN if every resample is dropped.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .alaska_htf_computer import ALASKA_STATIONS, REFERENCE_PERIOD_START, REFERENCE_PERIOD_END
+from .height_sketch import HeightSketch
+from .htf_kernels import TideArrays, daily_high_maxima, day_to_year
+from .sensitivity_sweep import MIN_OBSERVATIONS
+from .water_level_store import WaterLevelStore, HIGH_TIDE_CODES, SCHEMA
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESAMPLES = 10_000
+
+DEFAULT_CONFIDENCE = 0.95
+
+# Resamples per matrix product, bounding memory to chunk x bins floats
+RESAMPLE_CHUNK = 2_000
+
+THRESHOLD_COLUMNS = [
+    'station_id', 'station_name', 'percentile', 'ref_start', 'ref_end', 'threshold_ft',
+    'ci_lower_ft', 'ci_upper_ft', 'bootstrap_se_ft', 'n_resamples', 'n_dropped', 'error_bound_ft'
+]
+
+FLOOD_DAY_COLUMNS = [
+    'station_id', 'station_name', 'year', 'threshold_ft', 'flood_days',
+    'flood_days_ci_lower', 'flood_days_ci_upper'
+]
+
+
+def resample_year_weights(n_years: int, n_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Draw block bootstrap resamples of years as multiplicities.
+
+    Args:
+        n_years: Number of years in the reference period
+        n_resamples: Number of bootstrap resamples
+        rng: Random generator
+
+    Returns:
+        int64 array of shape (n_resamples, n_years); row b counts how often
+        each year was drawn in resample b (rows sum to n_years)
+    """
+    draws = rng.integers(0, n_years, size=(n_resamples, n_years))
+    cells = (np.arange(n_resamples)[:, None] * n_years + draws).reshape(-1)
+    return np.bincount(cells, minlength=n_resamples * n_years).reshape(n_resamples, n_years)
+
+
+def sketch_matrix(sketches: Sequence[HeightSketch]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Align yearly sketches on their union of bins.
+
+    Args:
+        sketches: Yearly sketches sharing one resolution
+
+    Returns:
+        Tuple of (bin midpoints clamped to the observed range, float64
+        count matrix of shape (len(sketches), n_bins))
+    """
+    bins = np.unique(np.concatenate([s.bins for s in sketches]))
+    counts = np.zeros((len(sketches), len(bins)))
+    for i, sketch in enumerate(sketches):
+        counts[i, np.searchsorted(bins, sketch.bins)] = sketch.counts
+
+    observed = [s for s in sketches if s.count]
+    resolution = sketches[0].resolution
+    midpoints = (bins + 0.5) * resolution
+    if observed:
+        midpoints = np.clip(midpoints, min(s.minimum for s in observed), max(s.maximum for s in observed))
+    return midpoints, counts
+
+
+def resampled_percentiles(midpoints: np.ndarray, counts: np.ndarray,
+                          weights: np.ndarray, percentile: float) -> np.ndarray:
+    """
+    Percentile of every resample, matching np.percentile's linear interpolation.
+
+    Args:
+        midpoints: Bin midpoints (n_bins,)
+        counts: Yearly bin counts (n_years, n_bins)
+        weights: Year multiplicities (n_resamples, n_years)
+        percentile: Percentile in [0, 100]
+
+    Returns:
+        float64 array (n_resamples,); NaN where a resample has fewer than
+        MIN_OBSERVATIONS observations
+    """
+    result = np.full(len(weights), np.nan)
+    for start in range(0, len(weights), RESAMPLE_CHUNK):
+        cumulative = np.cumsum(weights[start:start + RESAMPLE_CHUNK] @ counts, axis=1)
+        n = cumulative[:, -1]
+
+        position = percentile / 100 * np.maximum(n - 1, 0)
+        lo = np.floor(position)
+        hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+        frac = position - lo
+
+        # Bin holding the order statistic of rank r: first bin with cumulative count > r
+        lo_value = midpoints[np.minimum((cumulative <= lo[:, None]).sum(axis=1), len(midpoints) - 1)]
+        hi_value = midpoints[np.minimum((cumulative <= hi[:, None]).sum(axis=1), len(midpoints) - 1)]
+        values = lo_value + frac * (hi_value - lo_value)
+        values[n < MIN_OBSERVATIONS] = np.nan
+        result[start:start + RESAMPLE_CHUNK] = values
+    return result
+
+
+def flood_days_for_thresholds(arrays: TideArrays, thresholds: np.ndarray,
+                              years: Sequence[int]) -> np.ndarray:
+    """
+    Flood days per year for many thresholds via sorted daily maxima.
+
+    Args:
+        arrays: Tide observations
+        thresholds: Thresholds (n,), compared in float32, inclusive
+        years: Years to report
+
+    Returns:
+        float64 array of shape (n, len(years)); NaN for years without any
+        valid high tide
+    """
+    days, maxima = daily_high_maxima(arrays)
+    day_years = day_to_year(days)
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+
+    counts = np.full((len(thresholds), len(years)), np.nan)
+    for j, year in enumerate(years):
+        year_maxima = np.sort(maxima[day_years == year])
+        if len(year_maxima):
+            counts[:, j] = len(year_maxima) - np.searchsorted(year_maxima, thresholds, side='left')
+    return counts
+
+
+def bootstrap_thresholds(station_ids: Sequence[str],
+                         test_years: Sequence[int],
+                         percentile: float = 99,
+                         reference_start: int = REFERENCE_PERIOD_START,
+                         reference_end: int = REFERENCE_PERIOD_END,
+                         n_resamples: int = DEFAULT_RESAMPLES,
+                         confidence: float = DEFAULT_CONFIDENCE,
+                         seed: Optional[int] = None,
+                         store: Optional[WaterLevelStore] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Bootstrap percentile thresholds and flood days for many stations.
+
+    Args:
+        station_ids: NOAA station IDs
+        test_years: Years to report flood day intervals for
+        percentile: Threshold percentile
+        reference_start: First reference year
+        reference_end: Last reference year (inclusive)
+        n_resamples: Number of bootstrap resamples
+        confidence: Confidence level of the intervals
+        seed: Random seed for reproducible resamples
+        store: Water level store (created if None)
+
+    Returns:
+        Tuple of (thresholds with THRESHOLD_COLUMNS, one row per station;
+        flood days with FLOOD_DAY_COLUMNS, one row per station-year).
+        Stations with insufficient reference data get NaN thresholds and
+        no flood day rows; stations whose every resample is dropped get NaN
+        intervals, and test years without tide data get NaN flood days.
+    """
+    store = store or WaterLevelStore()
+    rng = np.random.default_rng(seed)
+    ref_years = list(range(reference_start, reference_end + 1))
+    test_years = sorted(test_years)
+
+    # One draw of reference years shared by every station
+    weights = resample_year_weights(len(ref_years), n_resamples, rng).astype(np.float64)
+    tail = (1 - confidence) / 2 * 100
+    bounds = [tail, 100 - tail]
+
+    threshold_rows: List[dict] = []
+    flood_frames: List[pd.DataFrame] = []
+    for station_id in station_ids:
+        name = ALASKA_STATIONS.get(station_id, {}).get('name', station_id)
+        sketches = [store.get_sketch(station_id, year) for year in ref_years]
+        total = sum(s.count for s in sketches)
+
+        row = {
+            'station_id': station_id, 'station_name': name, 'percentile': percentile,
+            'ref_start': reference_start, 'ref_end': reference_end, 'threshold_ft': np.nan,
+            'ci_lower_ft': np.nan, 'ci_upper_ft': np.nan, 'bootstrap_se_ft': np.nan,
+            'n_resamples': n_resamples, 'n_dropped': n_resamples,
+            'error_bound_ft': store.sketch_resolution / 2
+        }
+        threshold_rows.append(row)
+        if total < MIN_OBSERVATIONS:
+            logger.warning(f"Insufficient data for {station_id}: only {total} high tides")
+            continue
+
+        midpoints, counts = sketch_matrix(sketches)
+        point = resampled_percentiles(midpoints, counts, np.ones((1, len(ref_years))), percentile)[0]
+        resampled = resampled_percentiles(midpoints, counts, weights, percentile)
+        valid = resampled[~np.isnan(resampled)]
+        row.update(threshold_ft=point, n_dropped=n_resamples - len(valid))
+        if row['n_dropped']:
+            logger.warning(f"  {station_id}: dropped {row['n_dropped']} of {n_resamples} resamples "
+                           f"with fewer than {MIN_OBSERVATIONS} high tides")
+        if len(valid):
+            lower, upper = np.percentile(valid, bounds)
+            row.update(ci_lower_ft=lower, ci_upper_ft=upper,
+                       bootstrap_se_ft=valid.std(ddof=1) if len(valid) > 1 else np.nan)
+        logger.info(f"  {station_id}: {percentile}th percentile = {point:.2f} ft "
+                    f"({confidence:.0%} CI {row['ci_lower_ft']:.2f}-{row['ci_upper_ft']:.2f})")
+
+        # Only the requested test years, not every year between them
+        frames = [frame for frame in (store.get_year(station_id, year) for year in test_years) if not frame.empty]
+        observed = pd.concat(frames, ignore_index=True) if frames else SCHEMA.empty_table().to_pandas()
+        arrays = TideArrays.from_frame(observed, HIGH_TIDE_CODES)
+        days = flood_days_for_thresholds(arrays, np.r_[point, valid], test_years)
+        day_bounds = (np.percentile(days[1:], bounds, axis=0) if len(valid)
+                      else np.full((2, len(test_years)), np.nan))
+        flood_frames.append(pd.DataFrame({
+            'station_id': station_id,
+            'station_name': name,
+            'year': test_years,
+            'threshold_ft': point,
+            'flood_days': days[0],
+            'flood_days_ci_lower': day_bounds[0],
+            'flood_days_ci_upper': day_bounds[1]
+        }))
+
+    thresholds = pd.DataFrame(threshold_rows, columns=THRESHOLD_COLUMNS)
+    flood_days = (pd.concat(flood_frames, ignore_index=True) if flood_frames
+                  else pd.DataFrame(columns=FLOOD_DAY_COLUMNS))
+    return thresholds, flood_days
+
+
+def main():
+    """Bootstrap Alaska percentile thresholds from the command line."""
+    parser = argparse.ArgumentParser(description="Bootstrap confidence intervals for Alaska HTF thresholds")
+    parser.add_argument("--stations", nargs="+", help="Station IDs (default: all without NWS thresholds)")
+    parser.add_argument("--percentile", type=float, default=99, help="Threshold percentile")
+    parser.add_argument("--ref-start", type=int, default=REFERENCE_PERIOD_START, help="Reference period start year")
+    parser.add_argument("--ref-end", type=int, default=REFERENCE_PERIOD_END, help="Reference period end year")
+    parser.add_argument("--start-year", type=int, default=1990, help="First year for flood day intervals")
+    parser.add_argument("--end-year", type=int, default=2024, help="Last year for flood day intervals")
+    parser.add_argument("--resamples", type=int, default=DEFAULT_RESAMPLES, help="Bootstrap resamples")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE, help="Confidence level")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    parser.add_argument("--output-dir", type=Path, default=Path("output/historical"), help="Output directory")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    station_ids = args.stations or [sid for sid, info in ALASKA_STATIONS.items() if info['nws_minor'] is None]
+    thresholds, flood_days = bootstrap_thresholds(
+        station_ids, range(args.start_year, args.end_year + 1), percentile=args.percentile,
+        reference_start=args.ref_start, reference_end=args.ref_end, n_resamples=args.resamples,
+        confidence=args.confidence, seed=args.seed
+    )
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    thresholds.to_csv(args.output_dir / "alaska_htf_threshold_intervals.csv", index=False)
+    flood_days.to_csv(args.output_dir / "alaska_htf_flood_day_intervals.csv", index=False)
+    logger.info(f"Saved bootstrap intervals for {len(thresholds)} stations to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Persistent store for raw NOAA water level observations.
+
+Alaska flood days are computed from raw high/low water levels rather than
+the HTF API. The same station-years are needed for reference-period
+thresholds, target-year flood counts and sensitivity analyses, so every
+station-year is fetched from the CO-OPS data API once and kept as a small
+parquet file:
+
+    data/cache/water_levels/<product>/<datum>/<station_id>/<year>.parquet
+
+Each file holds typed columns:
+- timestamp: UTC observation time (timestamp[ns, UTC])
+- height: water level in feet above station datum (float32)
+- tide_type: tide type code (int8, see TIDE_TYPES; -1 if not applicable)
+
+Only completed years are stored: the current UTC year is still being
+published, so it is fetched once per store instance and kept in memory.
+Years for which the API explicitly reports that no data exists are stored as
+empty files so they are not requested again, unless they are within
+UNPUBLISHED_GRACE_YEARS of the current year (verified data may not be
+published yet). Failed requests are not stored.
+
+Next to each station-year, <year>.sketch.npz holds a HeightSketch of its
+valid high tide heights (with the sketch's error bound), so reference-period
+percentiles can be estimated by merging yearly sketches instead of loading
+raw observations.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.config import CACHE_DIR
+from ..core.noaa_client import NOAAClient, NOAAApiError
+from .height_sketch import DEFAULT_RESOLUTION, HeightSketch, merge_sketches
+from .htf_kernels import TideArrays, count_exceedance_days
+
+logger = logging.getLogger(__name__)
+
+# Tide type labels indexed by their stored code
+TIDE_TYPES = ('H', 'HH', 'L', 'LL')
+
+# Codes of high and higher high tides
+HIGH_TIDE_CODES = (0, 1)
+
+# Empty responses for years this close to the current year are not stored
+UNPUBLISHED_GRACE_YEARS = 1
+
+SCHEMA = pa.schema([
+    ('timestamp', pa.timestamp('ns', tz='UTC')),
+    ('height', pa.float32()),
+    ('tide_type', pa.int8())
+])
+
+
+def current_utc_year() -> int:
+    """Get the current year in UTC."""
+    return datetime.now(timezone.utc).year
+
+
+def records_to_frame(records: list) -> pd.DataFrame:
+    """Convert CO-OPS water level records to the typed store layout.
+
+    Args:
+        records: Records with 't' (timestamp), 'v' (value) and optional 'ty' (tide type)
+
+    Returns:
+        DataFrame with timestamp, height and tide_type columns; unparseable
+        heights are stored as NaN
+    """
+    raw = pd.DataFrame.from_records(records, columns=['t', 'v', 'ty'])
+    tide_codes = {label: code for code, label in enumerate(TIDE_TYPES)}
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(raw['t'], format='%Y-%m-%d %H:%M', utc=True).dt.as_unit('ns'),
+        'height': pd.to_numeric(raw['v'], errors='coerce').astype(np.float32),
+        'tide_type': raw['ty'].fillna('').str.strip().map(tide_codes).fillna(-1).astype(np.int8)
+    })
+
+
+def high_tides(frame: pd.DataFrame) -> pd.DataFrame:
+    """Select high and higher high tide observations."""
+    return frame[frame['tide_type'].isin(HIGH_TIDE_CODES)]
+
+
+def count_flood_days(frame: pd.DataFrame, threshold: float) -> Tuple[int, int]:
+    """Count days with at least one high tide at or above a threshold.
+
+    Args:
+        frame: Observations in the store layout
+        threshold: Flood threshold in feet (station datum)
+
+    Returns:
+        Tuple of (flood_days, total_high_tides)
+    """
+    arrays = TideArrays.from_frame(frame, HIGH_TIDE_CODES)
+    flood_days = count_exceedance_days(arrays, [threshold], years=np.unique(arrays.year)).sum()
+    return int(flood_days), int(arrays.high.sum())
+
+
+class WaterLevelStore:
+    """Fetch-once, parquet-backed store of raw water level observations."""
+
+    def __init__(self,
+                 store_dir: Optional[Path] = None,
+                 client: Optional[NOAAClient] = None,
+                 product: str = 'high_low',
+                 datum: str = 'STND',
+                 sketch_resolution: float = DEFAULT_RESOLUTION):
+        """
+        Initialize the store.
+
+        Args:
+            store_dir: Root store directory (default: data/cache/water_levels)
+            client: NOAA API client used for missing station-years
+            product: CO-OPS water level product
+            datum: Vertical datum requested from the API
+            sketch_resolution: Bin width in feet of the yearly height sketches
+        """
+        self.product = product
+        self.datum = datum
+        self.sketch_resolution = sketch_resolution
+        self.root_dir = Path(store_dir or CACHE_DIR / "water_levels")
+        self.store_dir = self.root_dir / product / datum
+        self.client = client or NOAAClient()
+        # Station-years fetched but not stored (incomplete or possibly unpublished)
+        self._unstored: Dict[Tuple[str, int], pd.DataFrame] = {}
+
+    def path(self, station_id: str, year: int) -> Path:
+        """Get the parquet file path for a station-year."""
+        return self.store_dir / station_id / f"{year}.parquet"
+
+    def sketch_path(self, station_id: str, year: int) -> Path:
+        """Get the height sketch file path for a station-year."""
+        return self.store_dir / station_id / f"{year}.sketch.npz"
+
+    def has(self, station_id: str, year: int) -> bool:
+        """Check whether a station-year has been stored."""
+        return self.path(station_id, year).exists()
+
+    def unstored_years(self, station_id: str) -> Dict[int, pd.DataFrame]:
+        """Get a station's fetched but unstored observations by year."""
+        return {year: frame for (sid, year), frame in self._unstored.items() if sid == station_id}
+
+    def is_storable(self, year: int, frame: pd.DataFrame) -> bool:
+        """Check whether a fetched station-year is final and can be stored.
+
+        Args:
+            year: Fetched year
+            frame: Fetched observations
+
+        Returns:
+            False for the current (or a future) UTC year, and for empty
+            responses within UNPUBLISHED_GRACE_YEARS of the current year
+        """
+        current_year = current_utc_year()
+        if year >= current_year:
+            return False
+        return not frame.empty or year < current_year - UNPUBLISHED_GRACE_YEARS
+
+    def _write(self, station_id: str, year: int, frame: pd.DataFrame):
+        """Write a station-year atomically."""
+        path = self.path(station_id, year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        table = pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False)
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        self._write_sketch(station_id, year, frame)
+
+    def _build_sketch(self, frame: pd.DataFrame) -> HeightSketch:
+        """Build the height sketch of a station-year's observations."""
+        return HeightSketch.from_heights(high_tides(frame)['height'].to_numpy(), self.sketch_resolution)
+
+    def _write_sketch(self, station_id: str, year: int, frame: pd.DataFrame) -> HeightSketch:
+        """Build and atomically write the height sketch of a station-year."""
+        sketch = self._build_sketch(frame)
+        path = self.sketch_path(station_id, year)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        with open(tmp_path, 'wb') as f:
+            sketch.save(f)
+        os.replace(tmp_path, path)
+        return sketch
+
+    def fetch(self, station_id: str, year: int) -> Optional[pd.DataFrame]:
+        """Fetch a station-year from the API and store it if it is final.
+
+        Args:
+            station_id: NOAA station ID
+            year: Year to fetch
+
+        Returns:
+            Observations in the store layout, or None if the request failed
+        """
+        try:
+            records = self.client.fetch_water_levels(
+                station_id,
+                begin_date=f'{year}0101',
+                end_date=f'{year}1231',
+                product=self.product,
+                datum=self.datum
+            )
+        except NOAAApiError as e:
+            logger.error(f"Request failed for {station_id}/{year}: {e}")
+            return None
+
+        frame = records_to_frame(records)
+        if not self.is_storable(year, frame):
+            self._unstored[(station_id, year)] = frame
+            logger.debug(f"Keeping {len(frame)} {self.product} observations for {station_id}/{year} unstored")
+            return frame
+
+        self._write(station_id, year, frame)
+        logger.debug(f"Stored {len(frame)} {self.product} observations for {station_id}/{year}")
+        return frame
+
+    def get_year(self, station_id: str, year: int, fetch_missing: bool = True) -> pd.DataFrame:
+        """Get observations for a station-year, fetching them if not stored.
+
+        Args:
+            station_id: NOAA station ID
+            year: Year to read
+            fetch_missing: If False, never call the API for station-years not stored
+
+        Returns:
+            Observations in the store layout (empty if unavailable)
+        """
+        path = self.path(station_id, year)
+        if path.exists():
+            return pq.read_table(path).to_pandas()
+        if (station_id, year) in self._unstored:
+            return self._unstored[(station_id, year)]
+
+        frame = self.fetch(station_id, year) if fetch_missing else None
+        return frame if frame is not None else SCHEMA.empty_table().to_pandas()
+
+    def get_years(self, station_id: str, start_year: int, end_year: int,
+                  fetch_missing: bool = True) -> pd.DataFrame:
+        """Get observations for an inclusive range of years.
+
+        Args:
+            station_id: NOAA station ID
+            start_year: First year
+            end_year: Last year (inclusive)
+            fetch_missing: If False, never call the API for station-years not stored
+
+        Returns:
+            Concatenated observations in the store layout
+        """
+        frames = [self.get_year(station_id, year, fetch_missing) for year in range(start_year, end_year + 1)]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return SCHEMA.empty_table().to_pandas()
+        return pd.concat(frames, ignore_index=True)
+
+    def high_tide_heights(self, station_id: str, start_year: int, end_year: int) -> np.ndarray:
+        """Get valid high tide heights for an inclusive range of years.
+
+        Args:
+            station_id: NOAA station ID
+            start_year: First year
+            end_year: Last year (inclusive)
+
+        Returns:
+            float32 array of high and higher high tide heights
+        """
+        heights = high_tides(self.get_years(station_id, start_year, end_year))['height'].to_numpy()
+        return heights[~np.isnan(heights)]
+
+    def get_sketch(self, station_id: str, year: int, fetch_missing: bool = True) -> HeightSketch:
+        """Get the high tide height sketch of a station-year.
+
+        Sketches missing for stored years (or built with another resolution)
+        are rebuilt from the stored observations once.
+
+        Args:
+            station_id: NOAA station ID
+            year: Year to read
+            fetch_missing: If False, never call the API for station-years not stored
+
+        Returns:
+            HeightSketch (empty if the station-year is unavailable)
+        """
+        path = self.sketch_path(station_id, year)
+        if path.exists():
+            sketch = HeightSketch.load(path)
+            if np.isclose(sketch.resolution, self.sketch_resolution):
+                return sketch
+
+        if not self.has(station_id, year):
+            frame = self._unstored.get((station_id, year))
+            if frame is None and fetch_missing:
+                frame = self.fetch(station_id, year)
+            if frame is None:
+                return HeightSketch.empty(self.sketch_resolution)
+            return HeightSketch.load(path) if self.has(station_id, year) else self._build_sketch(frame)
+
+        return self._write_sketch(station_id, year, pq.read_table(self.path(station_id, year)).to_pandas())
+
+    def reference_sketch(self, station_id: str, start_year: int, end_year: int) -> HeightSketch:
+        """Merge the yearly height sketches of an inclusive range of years.
+
+        Args:
+            station_id: NOAA station ID
+            start_year: First year
+            end_year: Last year (inclusive)
+
+        Returns:
+            HeightSketch of all valid high tide heights in the range
+        """
+        return merge_sketches(
+            (self.get_sketch(station_id, year) for year in range(start_year, end_year + 1)),
+            self.sketch_resolution
+        )
+
+    def prefetch(self, station_ids: Iterable[str], years: Iterable[int], max_workers: int = 4) -> int:
+        """Fetch every missing station-year, concurrently under the client's limiter.
+
+        Args:
+            station_ids: NOAA station IDs
+            years: Years to ensure are stored
+            max_workers: Number of concurrent request threads
+
+        Returns:
+            Number of station-years fetched
+        """
+        years = list(years)
+        missing = [(sid, year) for sid in station_ids for year in years
+                   if not self.has(sid, year) and (sid, year) not in self._unstored]
+        if not missing:
+            return 0
+
+        logger.info(f"Prefetching {len(missing)} {self.product} station-years")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda key: self.fetch(*key), missing))
+        return len(missing)
@@ -4,10 +4,14 @@ Projected HTF data handling.
 This module handles the retrieval and processing of projected high tide flooding data:
 - Fetching HTF projections from NOAA API
 - Processing projection data by region
+- Memory-mapped station x decade x scenario projection tensors
+- Annual interpolation of decadal projections
 - Command line interface for data retrieval
 """
 
 from .projected_htf_fetcher import ProjectedHTFFetcher
 from .projected_htf_processor import ProjectedHTFProcessor
+from .projection_tensor import ProjectionTensor
+from .interpolation import interpolate_annual
 
-__all__ = ['ProjectedHTFFetcher', 'ProjectedHTFProcessor']
+__all__ = ['ProjectedHTFFetcher', 'ProjectedHTFProcessor', 'ProjectionTensor', 'interpolate_annual']
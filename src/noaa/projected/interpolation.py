@@ -0,0 +1,130 @@
+"""
+Annual interpolation of decadal HTF projections.
+
+NOAA publishes projected flood days per decade, while downstream population
+modeling needs annual values. This module interpolates a ProjectionTensor to
+calendar years for every station and scenario at once:
+
+- 'linear': piecewise linear between decade values
+- 'pchip': monotone piecewise cubic Hermite interpolation, which follows the
+  curvature of accelerating projections without overshooting between decades
+
+Station/scenario series with missing decades fall back to linear
+interpolation, which leaves years adjacent to the gap as NaN.
+"""
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+from scipy.interpolate import PchipInterpolator
+
+from .projection_tensor import ProjectionTensor
+
+logger = logging.getLogger(__name__)
+
+InterpolationMethod = Literal['linear', 'pchip']
+
+DEFAULT_START_YEAR = 2020
+DEFAULT_END_YEAR = 2100
+
+
+def _interpolate_linear(x: np.ndarray, values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Linearly interpolate along axis 1 for all stations and scenarios."""
+    lo = np.clip(np.searchsorted(x, years, side='right') - 1, 0, len(x) - 2)
+    hi = lo + 1
+    t = ((years - x[lo]) / (x[hi] - x[lo]))[None, :, None]
+
+    v_lo = values[:, lo, :]
+    v_hi = values[:, hi, :]
+    result = v_lo + t * (v_hi - v_lo)
+
+    # Years that fall exactly on a decade keep that decade's value even if
+    # the neighbouring decade is missing (the last decade lands on t == 1)
+    return np.where(t == 0, v_lo, np.where(t == 1, v_hi, result))
+
+
+def interpolate_annual(tensor: ProjectionTensor,
+                       start_year: int = DEFAULT_START_YEAR,
+                       end_year: int = DEFAULT_END_YEAR,
+                       method: InterpolationMethod = 'linear') -> ProjectionTensor:
+    """
+    Interpolate decadal projections to annual values.
+
+    Args:
+        tensor: Decadal ProjectionTensor
+        start_year: First year (inclusive)
+        end_year: Last year (inclusive)
+        method: 'linear' or 'pchip' (monotone cubic)
+
+    Returns:
+        ProjectionTensor with one entry per calendar year
+
+    Raises:
+        ValueError: If the method is unknown or years fall outside the decades
+    """
+    if method not in ('linear', 'pchip'):
+        raise ValueError(f"Unknown interpolation method: {method}")
+
+    x = tensor.years.astype(np.float64)
+    if len(x) < 2:
+        raise ValueError("At least two decades are required for interpolation")
+    if start_year < x[0] or end_year > x[-1]:
+        raise ValueError(
+            f"Years {start_year}-{end_year} outside projected decades {int(x[0])}-{int(x[-1])}"
+        )
+
+    years = np.arange(start_year, end_year + 1)
+    values = np.asarray(tensor.values, dtype=np.float64)
+
+    result = _interpolate_linear(x, values, years.astype(np.float64))
+
+    if method == 'pchip':
+        # Series with gaps cannot be fit with a cubic; they keep the linear result
+        complete = ~np.isnan(values).any(axis=1, keepdims=True)
+        cubic = PchipInterpolator(x, np.nan_to_num(values), axis=1)(years)
+        result = np.where(complete, cubic, result)
+
+    logger.info(f"Interpolated {tensor.shape[0]} stations x {tensor.shape[2]} scenarios "
+                f"to {len(years)} years ({method})")
+
+    return ProjectionTensor(result.astype(np.float32), tensor.station_ids, years, tensor.scenarios)
+
+
+def main():
+    """Interpolate a saved decadal projection tensor to annual values."""
+    parser = argparse.ArgumentParser(description="Interpolate decadal HTF projections to annual values")
+    parser.add_argument("--tensor-dir", type=Path,
+                        default=Path("output/processed_projected/projection_tensor"),
+                        help="Directory containing the decadal projection tensor")
+    parser.add_argument("--output-dir", type=Path,
+                        default=Path("output/processed_projected/annual_projection_tensor"),
+                        help="Output directory for the annual tensor")
+    parser.add_argument("--start-year", type=int, default=DEFAULT_START_YEAR, help="First year")
+    parser.add_argument("--end-year", type=int, default=DEFAULT_END_YEAR, help="Last year")
+    parser.add_argument("--method", choices=['linear', 'pchip'], default='linear',
+                        help="Interpolation method")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also write a long (station_id, year, scenario, flood_days) parquet table")
+
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    decadal = ProjectionTensor.load(args.tensor_dir)
+    annual = interpolate_annual(decadal, args.start_year, args.end_year, args.method)
+    annual.save(args.output_dir)
+
+    if args.parquet:
+        output_file = args.output_dir / "annual_projections.parquet"
+        annual.to_frame(time_col='year', long=True).to_parquet(output_file, index=False)
+        logger.info(f"Saved annual projections table to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
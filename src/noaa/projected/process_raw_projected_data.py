@@ -1,132 +1,123 @@
 """
-Process raw projected HTF data files into regional parquet files.
+Process raw projected HTF data files into a region-partitioned parquet dataset.
 Handles decadal projections with multiple sea level rise scenarios.
+
+All regions are handled in a single pass: the station to region map is loaded
+once, every raw regional file is read as one Arrow dataset, and the result is
+written as one hive-partitioned (`region=<name>`) parquet dataset. The same
+records are also saved as a memory-mappable ProjectionTensor.
 """
 
 import pandas as pd
+import pyarrow.dataset as ds
 import logging
 from pathlib import Path
 import yaml
-from typing import Dict, List, Optional, Set
-from tqdm import tqdm
+from typing import Dict, List, Optional
 
 from src.config import CONFIG_DIR, OUTPUT_DIR
+from ..core.region_dataset import load_station_region_map, write_region_dataset
+from .projection_tensor import ProjectionTensor, SCENARIO_COLUMNS
 
 logger = logging.getLogger(__name__)
 
+# Name of the partitioned dataset directory inside the processed output directory
+DATASET_NAME = "processed_projected_htf"
+
+# Name of the memory-mappable station x decade x scenario tensor directory
+TENSOR_NAME = "projection_tensor"
+
 def load_region_config() -> Dict:
     """Load region configuration from YAML."""
     with open(CONFIG_DIR / "region_mappings.yaml") as f:
         config = yaml.safe_load(f)
     return config['regions']
 
-def get_region_stations(region: str) -> Set[str]:
-    """Get set of station IDs for a region.
-    
+def read_raw_projections(raw_files: List[Path]) -> pd.DataFrame:
+    """Read all raw regional projection files as a single table.
+
     Args:
-        region: Name of the region
-        
+        raw_files: Raw `projected_htf_<region>.parquet` files
+
     Returns:
-        Set of station IDs
+        Combined DataFrame of all raw projection records
     """
-    # Load imputation structure to get station to region mapping
-    imputation_file = OUTPUT_DIR / "imputation" / "imputation_structure_all_regions.parquet"
-    if not imputation_file.exists():
-        logger.warning(f"Imputation structure not found: {imputation_file}")
-        return set()
-    
-    df = pd.read_parquet(imputation_file)
-    return set(df[df['region'] == region]['station_id'].unique())
-
-def process_region_projections(
-    region: str,
-    region_def: Dict,
+    if not raw_files:
+        return pd.DataFrame()
+
+    dataset = ds.dataset([str(f) for f in raw_files], format="parquet")
+    return dataset.to_table().to_pandas()
+
+def process_all_projections(
+    regions_config: Dict,
     raw_data_dir: Path,
-    output_dir: Path
+    output_dir: Path,
+    station_regions: Optional[Dict[str, str]] = None
 ) -> Optional[Path]:
-    """Process projected flood data for a specific region.
-    
+    """Process projected flood data for all regions in a single pass.
+
     Args:
-        region: Name of the region
-        region_def: Region definition from config
+        regions_config: Region definitions from config
         raw_data_dir: Directory containing raw parquet files
         output_dir: Directory to save processed data
-        
+        station_regions: Optional station to region map (loaded if None)
+
     Returns:
-        Path to output file if successful, None otherwise
+        Path to the partitioned dataset if any data was written, None otherwise
     """
-    logger.info(f"\nProcessing projected data for region: {region}")
-    
-    # Get stations for this region
-    try:
-        region_stations = get_region_stations(region)
-        logger.info(f"Found {len(region_stations)} stations for {region}")
-        
-        if not region_stations:
-            # Create empty DataFrame with correct structure
-            empty_df = pd.DataFrame(columns=[
-                'station_id', 'station_name', 'decade', 'region',
-                'low_scenario', 'intermediate_low_scenario', 
-                'intermediate_scenario', 'intermediate_high_scenario',
-                'high_scenario', 'scenario_range', 'median_scenario'
-            ])
-            output_path = output_dir / f"processed_projected_htf_{region}.parquet"
-            empty_df.to_parquet(output_path)
-            logger.warning(f"No stations found for {region}, created empty file")
-            return output_path
-            
-    except Exception as e:
-        logger.error(f"Error getting stations for {region}: {str(e)}")
-        return None
-    
-    # Read the raw projected data file for this region
-    input_file = raw_data_dir / f"projected_htf_{region}.parquet"
-    if not input_file.exists():
-        logger.warning(f"No projected data file found for {region}")
+    if station_regions is None:
+        station_regions = load_station_region_map()
+
+    station_regions = {
+        station: region for station, region in station_regions.items()
+        if region in regions_config
+    }
+    logger.info(f"Found {len(station_regions)} stations across {len(set(station_regions.values()))} regions")
+
+    if not station_regions:
+        logger.warning("No station to region mapping available, nothing to process")
         return None
-        
+
+    raw_files = [
+        raw_data_dir / f"projected_htf_{region}.parquet"
+        for region in regions_config
+        if (raw_data_dir / f"projected_htf_{region}.parquet").exists()
+    ]
+    logger.info(f"Reading {len(raw_files)} raw projection files from {raw_data_dir}")
+
     try:
-        df = pd.read_parquet(input_file)
+        df = read_raw_projections(raw_files)
     except Exception as e:
-        logger.error(f"Error reading projected data for {region}: {str(e)}")
+        logger.error(f"Error reading projected data: {str(e)}")
+        return None
+
+    if df.empty:
+        logger.warning("No projected data files found")
         return None
-        
-    # Filter to only include stations in our region mapping
-    df = df[df['station'].isin(region_stations)].copy()
-    
+
+    # Filter to stations in our region mapping and tag each record with its region
+    df['station'] = df['station'].astype(str)
+    df['region'] = df['station'].map(station_regions)
+    df = df[df['region'].notna()].copy()
+
     if df.empty:
-        logger.warning(f"No valid stations found in projected data for {region}")
+        logger.warning("No valid stations found in projected data")
         return None
-        
-    # Add region column
-    df['region'] = region
-    
-    # Log some statistics
-    logger.info(f"\nProcessed projected data summary for {region}:")
-    logger.info(f"Total records: {len(df)}")
-    logger.info(f"Decade range: {df['decade'].min()} to {df['decade'].max()}")
-    logger.info(f"Stations: {len(df['station'].unique())}")
-    
-    # Calculate scenario statistics
-    logger.info("\nScenario Statistics:")
-    for scenario in ['low_scenario', 'intermediate_low_scenario', 
-                    'intermediate_scenario', 'intermediate_high_scenario',
-                    'high_scenario']:
-        mean_days = df[scenario].mean()
-        logger.info(f"{scenario}: mean {mean_days:.1f} days/year")
-    
-    # Save processed data
-    output_path = output_dir / f"processed_projected_htf_{region}.parquet"
-    df.to_parquet(output_path)
-    logger.info(f"\nSaved {len(df)} records to {output_path}")
-    
-    # Display first few rows and summary statistics
-    logger.info("\nFirst few rows of processed data:")
-    logger.info(df.head().to_string())
-    logger.info("\nSummary statistics:")
-    logger.info(df.describe().to_string())
-    
-    return output_path
+
+    for region, region_df in df.groupby('region', sort=True):
+        logger.info(f"\nProcessed projected data summary for {region}:")
+        logger.info(f"Total records: {len(region_df)}")
+        logger.info(f"Decade range: {region_df['decade'].min()} to {region_df['decade'].max()}")
+        logger.info(f"Stations: {region_df['station'].nunique()}")
+        for scenario in SCENARIO_COLUMNS:
+            logger.info(f"{scenario}: mean {region_df[scenario].mean():.1f} days/year")
+
+    dataset_dir = write_region_dataset(df, output_dir / DATASET_NAME, regions=list(regions_config))
+    logger.info(f"\nSaved {len(df)} records to {dataset_dir}")
+
+    ProjectionTensor.from_frame(df).save(output_dir / TENSOR_NAME)
+
+    return dataset_dir
 
 def main():
     """Process projected flood data files."""
@@ -135,41 +126,30 @@ def main():
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
-    
+
     try:
         # Load region configuration
         regions_config = load_region_config()
-        
+
         # Set up directories
         raw_data_dir = OUTPUT_DIR / "projected"
         output_dir = OUTPUT_DIR / "processed_projected"
         output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Process each region
-        for region, region_def in regions_config.items():
-            try:
-                output_path = process_region_projections(
-                    region=region,
-                    region_def=region_def,
-                    raw_data_dir=raw_data_dir,
-                    output_dir=output_dir
-                )
-                
-                if output_path:
-                    if output_path.stat().st_size > 0:
-                        logger.info(f"Successfully processed projections for {region}")
-                    else:
-                        logger.warning(f"No projected data available for {region}, empty file created")
-                else:
-                    logger.warning(f"Failed to process projections for {region}")
-                    
-            except Exception as e:
-                logger.error(f"Error processing region {region}: {str(e)}")
-                continue
-            
+
+        output_path = process_all_projections(
+            regions_config=regions_config,
+            raw_data_dir=raw_data_dir,
+            output_dir=output_dir
+        )
+
+        if output_path:
+            logger.info(f"Successfully processed projections to {output_path}")
+        else:
+            logger.warning("No projected data was processed")
+
     except Exception as e:
         logger.error(f"Error processing projected data: {str(e)}")
         raise
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -20,9 +20,52 @@ import yaml
 
 from ..core.noaa_client import NOAAClient, NOAAApiError
 from ..core.cache_manager import NOAACache
+from .projection_tensor import SCENARIO_FIELDS, SCENARIO_COLUMNS
 
 logger = logging.getLogger(__name__)
 
+# Columns of the wide projected dataset written by generate_dataset
+PROJECTION_FRAME_COLUMNS = [
+    'station', 'station_name', 'decade', 'source',
+    *SCENARIO_COLUMNS,
+    'scenario_range', 'median_scenario'
+]
+
+def build_projection_frame(raw_data: Dict[str, List[Dict]]) -> pd.DataFrame:
+    """Flatten raw decadal projection records into the wide projected dataset.
+    
+    Missing (null) scenario values are stored as 0 days per year; values
+    that are not numeric become NaN.
+    
+    Args:
+        raw_data: Dict mapping station IDs to decadal projection records
+        
+    Returns:
+        DataFrame with one row per station and decade (PROJECTION_FRAME_COLUMNS)
+    """
+    records = [record for station_data in raw_data.values() for record in station_data]
+    if not records:
+        return pd.DataFrame(columns=PROJECTION_FRAME_COLUMNS)
+    
+    raw = pd.DataFrame.from_records(records)
+    df = pd.DataFrame({
+        'station': raw['stnId'],
+        'station_name': raw['stnName'],
+        'decade': raw['decade'],
+        'source': raw['source'].fillna('NOAA') if 'source' in raw else 'NOAA'
+    })
+    
+    # Scenario projections (days per year)
+    for field, column in zip(SCENARIO_FIELDS, SCENARIO_COLUMNS):
+        values = raw[field].fillna(0) if field in raw else pd.Series(0, index=raw.index)
+        df[column] = pd.to_numeric(values, errors='coerce')
+    
+    # Derived fields
+    df['scenario_range'] = df['high_scenario'] - df['low_scenario']
+    df['median_scenario'] = df['intermediate_scenario']
+    
+    return df
+
 class ProjectedHTFFetcher:
     """Service for managing projected high tide flooding data."""
     
@@ -38,6 +81,9 @@ class ProjectedHTFFetcher:
         self.cache = cache
         self.region = region.lower()
         
+        # Per-station projections indexed by decade, loaded on first use
+        self._projections: Dict[str, Dict[int, Dict]] = {}
+        
         # Load NOAA settings for validation
         self.settings = self.cache.settings['data']['projected']
         
@@ -80,15 +126,17 @@ class ProjectedHTFFetcher:
         """
         return station_id in self.station_config['stations']
     
-    def get_station_data(self, station_id: str, decade: Optional[int] = None) -> List[Dict]:
-        """Get projected HTF data for a station.
+    def get_station_projections(self, station_id: str) -> Dict[int, Dict]:
+        """Get the full projection set for a station, indexed by decade.
+        
+        The cache file is read (or the API queried) at most once per station
+        for the lifetime of the fetcher; later calls are served from memory.
         
         Args:
             station_id: NOAA station identifier
-            decade: Optional specific decade to retrieve
             
         Returns:
-            List of projected HTF records
+            Dict mapping decade to projected HTF record
             
         Raises:
             ValueError: If station ID is invalid
@@ -97,34 +145,52 @@ class ProjectedHTFFetcher:
         if not self._validate_station_id(station_id):
             raise ValueError(f"Invalid station ID: {station_id}")
         
+        if station_id in self._projections:
+            return self._projections[station_id]
+        
         # Check cache first
-        cached_data = self.cache.get_projected_data(station_id, decade)
-        if cached_data is not None:
-            if isinstance(cached_data, list):
-                return cached_data
-            return [cached_data]
-        
-        # Check if cache needs update
-        if not self.cache.needs_update(station_id, 'projected'):
-            return []
-        
-        try:
-            # Fetch from API
-            data = self.client.fetch_decadal_projections(station_id)
+        records = self.cache.get_projected_data(station_id)
+        if records is not None and not isinstance(records, list):
+            records = [records]
+        
+        if records is None:
+            # Check if cache needs update
+            if not self.cache.needs_update(station_id, 'projected'):
+                return {}
             
-            # Cache all decades
-            for record in data:
-                self.cache.save_projected_data(station_id, record['decade'], record)
+            try:
+                # Fetch all decades from API in one request
+                records = self.client.fetch_decadal_projections(station_id)
+                self.cache.save_projected_records(station_id, records)
+            except Exception as e:
+                logger.error(f"Error fetching projected data for station {station_id}: {e}")
+                raise
+        
+        projections = {record['decade']: record for record in records}
+        self._projections[station_id] = projections
+        return projections
+    
+    def get_station_data(self, station_id: str, decade: Optional[int] = None) -> List[Dict]:
+        """Get projected HTF data for a station.
+        
+        Args:
+            station_id: NOAA station identifier
+            decade: Optional specific decade to retrieve
             
-            # Return requested decade if specified
-            if decade is not None:
-                return [record for record in data if record['decade'] == decade]
+        Returns:
+            List of projected HTF records
             
-            return data
+        Raises:
+            ValueError: If station ID is invalid
+            NOAAApiError: If API request fails
+        """
+        projections = self.get_station_projections(station_id)
+        
+        if decade is not None:
+            record = projections.get(decade)
+            return [record] if record is not None else []
         
-        except Exception as e:
-            logger.error(f"Error fetching projected data for station {station_id}: {e}")
-            raise
+        return [projections[d] for d in sorted(projections)]
     
     def get_regional_dataset(
         self,
@@ -133,6 +199,9 @@ class ProjectedHTFFetcher:
     ) -> Dict[str, List[Dict]]:
         """Get the complete projected HTF dataset for the region.
         
+        Each station's projections are loaded once and the requested decade
+        range is sliced from memory.
+        
         Args:
             start_decade: Start decade (inclusive). If None, uses settings default.
             end_decade: End decade (inclusive). If None, uses settings default.
@@ -142,6 +211,7 @@ class ProjectedHTFFetcher:
         """
         start_decade = start_decade or self.settings['start_decade']
         end_decade = end_decade or self.settings['end_decade']
+        decades = range(start_decade, end_decade + 10, 10)
         
         # Get stations
         stations = self.get_regional_stations()
@@ -150,11 +220,8 @@ class ProjectedHTFFetcher:
         dataset = {}
         for station_id in stations:
             try:
-                station_data = []
-                for decade in range(start_decade, end_decade + 10, 10):
-                    data = self.get_station_data(station_id, decade)
-                    if data:
-                        station_data.extend(data)
+                projections = self.get_station_projections(station_id)
+                station_data = [projections[d] for d in decades if d in projections]
                         
                 if station_data:
                     dataset[station_id] = station_data
@@ -239,35 +306,8 @@ class ProjectedHTFFetcher:
         if stations:
             raw_data = {k: v for k, v in raw_data.items() if k in stations}
         
-        # Transform into a flat structure for efficient storage
-        records = []
-        for station, station_data in raw_data.items():
-            for decadal_record in station_data:
-                # Get projection values with default of 0 for None
-                low = decadal_record.get('low', 0) or 0
-                int_low = decadal_record.get('intLow', 0) or 0
-                intermediate = decadal_record.get('intermediate', 0) or 0
-                int_high = decadal_record.get('intHigh', 0) or 0
-                high = decadal_record.get('high', 0) or 0
-                
-                records.append({
-                    'station': decadal_record['stnId'],
-                    'station_name': decadal_record['stnName'],
-                    'decade': decadal_record['decade'],
-                    'source': decadal_record.get('source', 'NOAA'),
-                    # Scenario projections (days per year)
-                    'low_scenario': low,
-                    'intermediate_low_scenario': int_low,
-                    'intermediate_scenario': intermediate,
-                    'intermediate_high_scenario': int_high,
-                    'high_scenario': high,
-                    # Add derived fields
-                    'scenario_range': high - low,
-                    'median_scenario': intermediate
-                })
-        
-        # Convert to DataFrame for efficient storage and querying
-        df = pd.DataFrame.from_records(records)
+        # Transform into a flat structure for efficient storage and querying
+        df = build_projection_frame(raw_data)
         
         # Ensure output directory exists
         output_path.mkdir(parents=True, exist_ok=True)
@@ -5,168 +5,127 @@ Processes projected high tide flooding data by region, handling:
 - Regional data validation
 - Scenario-based processing
 - Data aggregation
+
+Each region's projections are loaded once through its ProjectedHTFFetcher,
+flattened into the same wide frame the projected CLI writes, validated with
+vectorized range checks and melted to long
+(station_id, decade, scenario, flood_days) format.
 """
 
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Optional
 import pandas as pd
 import yaml
 
 from ..core import NOAACache
-from .projected_htf_fetcher import ProjectedHTFFetcher
+from .projected_htf_fetcher import ProjectedHTFFetcher, build_projection_frame
+from .projection_tensor import SCENARIO_COLUMNS
 
 logger = logging.getLogger(__name__)
 
+# Maximum possible flood days per year
+MAX_FLOOD_DAYS = 366
+
+# Columns of the long processed output
+OUTPUT_COLUMNS = ['station_id', 'decade', 'scenario', 'flood_days', 'region']
+
 class ProjectedHTFProcessor:
     """Processes projected HTF data by region."""
-    
+
     def __init__(self, config_dir: Optional[Path] = None):
         """Initialize the processor.
-        
+
         Args:
             config_dir: Optional custom config directory
         """
         self.config_dir = config_dir or (Path(__file__).parent.parent.parent.parent / "config")
         self.cache = NOAACache(config_dir=self.config_dir)
-        self.fetcher = ProjectedHTFFetcher(self.cache)
-        
+
+        # Regional fetchers, created on first use
+        self._fetchers: Dict[str, ProjectedHTFFetcher] = {}
+
         # Load region mappings
         region_file = self.config_dir / "region_mappings.yaml"
         logger.debug(f"Loading region mappings from: {region_file}")
         with open(region_file) as f:
             self.region_config = yaml.safe_load(f)
-            
-        # Load NOAA settings for scenario information
-        with open(self.config_dir / "noaa_api_settings.yaml") as f:
-            self.noaa_settings = yaml.safe_load(f)
-            
+
+    def get_fetcher(self, region: str) -> ProjectedHTFFetcher:
+        """Get the fetcher for a region, sharing this processor's cache.
+
+        Args:
+            region: Name of the region
+
+        Returns:
+            ProjectedHTFFetcher for the region
+        """
+        if region not in self._fetchers:
+            self._fetchers[region] = ProjectedHTFFetcher(self.cache, region)
+        return self._fetchers[region]
+
     def process_region(self, region: str, start_decade: int, end_decade: int) -> pd.DataFrame:
         """Process projected HTF data for a specific region.
-        
+
         Args:
             region: Name of the region to process
             start_decade: Start decade (inclusive)
             end_decade: End decade (inclusive)
-            
+
         Returns:
-            DataFrame containing processed projected HTF data for the region
-            
+            DataFrame with one row per station, decade and scenario
+            (OUTPUT_COLUMNS); scenario values are the projected dataset's
+            scenario column names
+
         Raises:
-            ValueError: If region is not found or data is invalid
+            ValueError: If region is not found
         """
         # Validate region
         if region not in self.region_config['regions']:
             raise ValueError(f"Invalid region: {region}")
-            
-        # Get states in region
-        states = self.region_config['regions'][region]['state_codes']
-        
-        # Get stations in region
-        stations = self._get_region_stations(region)
-        
-        # Process each station
-        data = []
-        for station in stations:
-            station_data = self._process_station(
-                station['id'],
-                start_decade,
-                end_decade
-            )
-            if station_data:
-                data.extend(station_data)
-                
-        # Convert to DataFrame
-        df = pd.DataFrame(data)
-        
+
+        # Load every station's projections for the region once
+        dataset = self.get_fetcher(region).get_regional_dataset(
+            start_decade=start_decade,
+            end_decade=end_decade
+        )
+        df = self._validate_frame(build_projection_frame(dataset))
+
         if df.empty:
             logger.warning(f"No data found for region {region}")
-            return df
-            
+            return pd.DataFrame(columns=OUTPUT_COLUMNS)
+
+        # Melt scenarios to long format, keeping scenario order within each station/decade
+        df = df.melt(
+            id_vars=['station', 'decade'],
+            value_vars=list(SCENARIO_COLUMNS),
+            var_name='scenario',
+            value_name='flood_days'
+        ).rename(columns={'station': 'station_id'})
+        df = df.sort_values(['station_id', 'decade'], kind='stable', ignore_index=True)
+
         # Add region column
         df['region'] = region
-        
-        return df
-        
-    def _get_region_stations(self, region: str) -> List[Dict]:
-        """Get list of stations in a region.
-        
-        Args:
-            region: Name of the region
-            
-        Returns:
-            List of station records
-        """
-        # Load regional tide station config
-        config_file = self.config_dir / f"{region.lower()}_tide_stations.yaml"
-        with open(config_file) as f:
-            config = yaml.safe_load(f)
-            
-        return [
-            {
-                'id': station_id,
-                'name': station_data['name'],
-                'location': station_data['location']
-            }
-            for station_id, station_data in config['stations'].items()
-        ]
-        
-    def _process_station(
-        self,
-        station_id: str,
-        start_decade: int,
-        end_decade: int
-    ) -> List[Dict]:
-        """Process projected data for a single station.
-        
-        Args:
-            station_id: Station identifier
-            start_decade: Start decade (inclusive)
-            end_decade: End decade (inclusive)
-            
-        Returns:
-            List of processed records
-        """
-        data = []
-        for decade in range(start_decade, end_decade + 10, 10):
-            record = self.cache.get_annual_data(station_id, decade, 'projected')
-            if record and self._validate_record(record):
-                # Create a record for each scenario
-                for scenario in self.noaa_settings['data']['projected']['response_fields'][4:]:  # Skip metadata fields
-                    processed = {
-                        'station_id': station_id,
-                        'decade': decade,
-                        'scenario': scenario,
-                        'flood_days': record[scenario]
-                    }
-                    data.append(processed)
-                    
-        return data
-        
-    def _validate_record(self, record: Dict) -> bool:
-        """Validate a projected HTF record.
-        
+
+        return df[OUTPUT_COLUMNS]
+
+    def _validate_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Drop station/decade rows with missing or out-of-range projections.
+
         Args:
-            record: Record to validate
-            
+            df: Wide projection frame
+
         Returns:
-            True if valid, False otherwise
+            Rows whose scenario values are all numeric and within 0-366 days
         """
-        # Check for required scenario fields
-        scenario_fields = self.noaa_settings['data']['projected']['response_fields'][4:]  # Skip metadata fields
-        if not all(field in record for field in scenario_fields):
-            return False
-            
-        # Validate numeric fields
-        try:
-            for field in scenario_fields:
-                value = float(record[field])
-                
-                # Basic range checks
-                if value < 0 or value > 366:  # Max possible days per year
-                    return False
-                    
-            return True
-            
-        except (ValueError, TypeError):
-            return False
+        if df.empty:
+            return df
+
+        values = df[list(SCENARIO_COLUMNS)].apply(pd.to_numeric, errors='coerce')
+        valid = (values.notna() & (values >= 0) & (values <= MAX_FLOOD_DAYS)).all(axis=1)
+
+        invalid_count = int((~valid).sum())
+        if invalid_count:
+            logger.warning(f"Dropping {invalid_count} invalid projection records")
+
+        return df[valid]
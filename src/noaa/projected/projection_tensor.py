@@ -0,0 +1,269 @@
+"""
+Compact station x decade x scenario tensor of projected HTF data.
+
+Projected flood days are stored as a float32 array of shape
+(stations, decades, scenarios) together with a station index and a decade
+axis. The tensor is saved as a `.npy` file plus a small JSON index and is
+opened with memory mapping, so consumers (county assignment, interpolation,
+reporting) can slice scenarios and station subsets without parsing JSON or
+parquet again. Missing projections are stored as NaN.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Scenario names as returned by the NOAA decadal projection API
+SCENARIO_FIELDS = ('low', 'intLow', 'intermediate', 'intHigh', 'high')
+
+# Scenario column names used in the projected parquet outputs
+SCENARIO_COLUMNS = (
+    'low_scenario',
+    'intermediate_low_scenario',
+    'intermediate_scenario',
+    'intermediate_high_scenario',
+    'high_scenario'
+)
+
+VALUES_FILE = "projections.npy"
+INDEX_FILE = "projections_index.json"
+
+
+class ProjectionTensor:
+    """Projected flood days indexed by station, time and scenario."""
+
+    def __init__(self,
+                 values: np.ndarray,
+                 station_ids: Sequence[str],
+                 years: Sequence[int],
+                 scenarios: Sequence[str] = SCENARIO_COLUMNS):
+        """
+        Initialize the tensor.
+
+        Args:
+            values: Array of shape (stations, years, scenarios)
+            station_ids: Station identifiers for axis 0
+            years: Decade (or calendar year) values for axis 1
+            scenarios: Scenario column names for axis 2
+        """
+        self.values = values
+        self.station_ids = np.asarray(station_ids, dtype=str)
+        self.years = np.asarray(years, dtype=np.int32)
+        self.scenarios = tuple(scenarios)
+
+        expected = (len(self.station_ids), len(self.years), len(self.scenarios))
+        if self.values.shape != expected:
+            raise ValueError(f"Tensor shape {self.values.shape} does not match index {expected}")
+
+        self._station_lookup = {sid: i for i, sid in enumerate(self.station_ids)}
+
+    @property
+    def shape(self):
+        """Shape of the underlying array."""
+        return self.values.shape
+
+    def __repr__(self) -> str:
+        return (f"ProjectionTensor(stations={len(self.station_ids)}, "
+                f"years={self.years.min() if len(self.years) else None}-"
+                f"{self.years.max() if len(self.years) else None}, "
+                f"scenarios={len(self.scenarios)})")
+
+    @classmethod
+    def from_frame(cls,
+                   df: pd.DataFrame,
+                   station_col: str = 'station',
+                   time_col: str = 'decade') -> 'ProjectionTensor':
+        """
+        Build a tensor from a wide projection DataFrame.
+
+        Args:
+            df: DataFrame with one row per station and decade and one column
+                per scenario (as written by ProjectedHTFFetcher.generate_dataset)
+            station_col: Station identifier column
+            time_col: Decade column
+
+        Returns:
+            ProjectionTensor with NaN for station/decade pairs not in df
+
+        Raises:
+            ValueError: If a station/decade pair appears in more than one row
+        """
+        station_codes, station_ids = pd.factorize(df[station_col].astype(str), sort=True)
+        time_codes, years = pd.factorize(df[time_col].astype(np.int32), sort=True)
+
+        keys = station_codes.astype(np.int64) * len(years) + time_codes
+        duplicated = pd.Series(keys).duplicated().to_numpy()
+        if duplicated.any():
+            pairs = sorted({(station_ids[s], int(years[t]))
+                            for s, t in zip(station_codes[duplicated], time_codes[duplicated])})
+            raise ValueError(f"Duplicate {station_col}/{time_col} rows for {len(pairs)} pairs, e.g. {pairs[:5]}")
+
+        values = np.full((len(station_ids), len(years), len(SCENARIO_COLUMNS)), np.nan, dtype=np.float32)
+        values[station_codes, time_codes, :] = df[list(SCENARIO_COLUMNS)].to_numpy(dtype=np.float32, na_value=np.nan)
+
+        return cls(values, station_ids, years)
+
+    @classmethod
+    def from_dataset(cls, dataset: Dict[str, List[Dict]]) -> 'ProjectionTensor':
+        """
+        Build a tensor from raw API records grouped by station.
+
+        Args:
+            dataset: Dict mapping station IDs to decadal projection records
+                     (as returned by ProjectedHTFFetcher.get_regional_dataset)
+
+        Returns:
+            ProjectionTensor
+        """
+        records = [record for station_data in dataset.values() for record in station_data]
+        df = pd.DataFrame.from_records(records, columns=['stnId', 'decade', *SCENARIO_FIELDS])
+        df = df.rename(columns=dict(zip(SCENARIO_FIELDS, SCENARIO_COLUMNS)))
+        for column in SCENARIO_COLUMNS:
+            df[column] = pd.to_numeric(df[column], errors='coerce')
+        return cls.from_frame(df, station_col='stnId', time_col='decade')
+
+    def _scenario_index(self, scenario: str) -> int:
+        """Resolve an API scenario field or column name to an axis index."""
+        if scenario in SCENARIO_FIELDS:
+            scenario = SCENARIO_COLUMNS[SCENARIO_FIELDS.index(scenario)]
+        try:
+            return self.scenarios.index(scenario)
+        except ValueError:
+            raise ValueError(f"Unknown scenario: {scenario}")
+
+    def scenario(self, scenario: str) -> np.ndarray:
+        """
+        Get a (stations, years) view of one scenario.
+
+        Args:
+            scenario: API field (e.g. 'intHigh') or column name
+                      (e.g. 'intermediate_high_scenario')
+
+        Returns:
+            Array view into the tensor (no copy)
+        """
+        return self.values[:, :, self._scenario_index(scenario)]
+
+    def station_index(self, station_ids: Sequence[str]) -> np.ndarray:
+        """
+        Get axis-0 positions for station IDs.
+
+        Args:
+            station_ids: Station identifiers
+
+        Returns:
+            Integer array of positions
+
+        Raises:
+            KeyError: If a station is not in the tensor
+        """
+        missing = [sid for sid in station_ids if sid not in self._station_lookup]
+        if missing:
+            raise KeyError(f"Stations not in projection tensor: {missing[:5]}")
+        return np.array([self._station_lookup[sid] for sid in station_ids], dtype=np.intp)
+
+    def select_stations(self, station_ids: Sequence[str]) -> 'ProjectionTensor':
+        """
+        Get a tensor restricted to a subset of stations, in the given order.
+
+        Args:
+            station_ids: Station identifiers
+
+        Returns:
+            New ProjectionTensor holding a copy of the selected rows
+        """
+        idx = self.station_index(station_ids)
+        return ProjectionTensor(self.values[idx], self.station_ids[idx], self.years, self.scenarios)
+
+    def select_years(self, start: int, end: int) -> 'ProjectionTensor':
+        """
+        Get a tensor restricted to an inclusive range of years.
+
+        Args:
+            start: First year (inclusive)
+            end: Last year (inclusive)
+
+        Returns:
+            New ProjectionTensor sharing memory with this one
+        """
+        lo, hi = np.searchsorted(self.years, [start, end + 1])
+        return ProjectionTensor(self.values[:, lo:hi], self.station_ids, self.years[lo:hi], self.scenarios)
+
+    def to_frame(self, time_col: str = 'decade', long: bool = False) -> pd.DataFrame:
+        """
+        Convert to a DataFrame.
+
+        Args:
+            time_col: Name for the time column
+            long: If True, return (station_id, time, scenario, flood_days)
+                  rows; otherwise one column per scenario
+
+        Returns:
+            DataFrame of projections
+        """
+        n_stations, n_years, n_scenarios = self.values.shape
+        station_col = np.repeat(self.station_ids, n_years)
+        year_col = np.tile(self.years, n_stations)
+
+        if long:
+            return pd.DataFrame({
+                'station_id': np.repeat(station_col, n_scenarios),
+                time_col: np.repeat(year_col, n_scenarios),
+                'scenario': np.tile(np.asarray(self.scenarios), n_stations * n_years),
+                'flood_days': np.asarray(self.values).reshape(-1)
+            })
+
+        df = pd.DataFrame({'station_id': station_col, time_col: year_col})
+        flat = np.asarray(self.values).reshape(n_stations * n_years, n_scenarios)
+        for i, scenario in enumerate(self.scenarios):
+            df[scenario] = flat[:, i]
+        return df
+
+    def save(self, directory: Path) -> Path:
+        """
+        Save the tensor as `.npy` values plus a JSON index.
+
+        Args:
+            directory: Output directory
+
+        Returns:
+            Path to the output directory
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        np.save(directory / VALUES_FILE, np.ascontiguousarray(self.values, dtype=np.float32))
+        with open(directory / INDEX_FILE, 'w') as f:
+            json.dump({
+                'station_ids': self.station_ids.tolist(),
+                'years': self.years.tolist(),
+                'scenarios': list(self.scenarios)
+            }, f, indent=2)
+
+        logger.info(f"Saved projection tensor {self.values.shape} to {directory}")
+        return directory
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> 'ProjectionTensor':
+        """
+        Load a saved tensor.
+
+        Args:
+            directory: Directory written by save()
+            mmap: If True, memory-map the values read-only instead of reading them
+
+        Returns:
+            ProjectionTensor
+        """
+        directory = Path(directory)
+        with open(directory / INDEX_FILE) as f:
+            index = json.load(f)
+
+        values = np.load(directory / VALUES_FILE, mmap_mode='r' if mmap else None)
+        return cls(values, index['station_ids'], index['years'], index['scenarios'])
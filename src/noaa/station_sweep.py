@@ -0,0 +1,386 @@
+"""
+Combined historical and projected station sweep.
+
+Refreshes both NOAA HTF datasets in a single pass over the station list:
+- Both endpoint requests for a station are issued concurrently through one
+  shared NOAAClient, so they share its rate limiter and connection pool
+- Both results for a station are committed to the cache together
+- The swept data is summarized as a historical-vs-projected station coverage
+  comparison, by station and by region, and written as a markdown report
+"""
+
+import argparse
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import yaml
+
+from .core import NOAAClient, NOAACache
+from .projected.projection_tensor import SCENARIO_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Year used for the historical side of the coverage comparison
+DEFAULT_REFERENCE_YEAR = 2020
+
+# Coverage match categories as (lower bound in percent, label, description), highest first
+COVERAGE_CATEGORIES = [
+    (80, 'Strong', '>80%'),
+    (60, 'Moderate', '60-80%'),
+    (40, 'Partial', '40-60%'),
+    (0, 'Poor', '<40%')
+]
+
+SCENARIO_LABELS = {
+    'low': 'Low',
+    'intLow': 'Intermediate-Low',
+    'intermediate': 'Intermediate',
+    'intHigh': 'Intermediate-High',
+    'high': 'High'
+}
+
+
+def load_station_regions(config_dir: Path) -> Dict[str, str]:
+    """Map every configured tide station to its region.
+
+    Args:
+        config_dir: Config directory containing region_mappings.yaml and tide_stations/
+
+    Returns:
+        Dictionary mapping station ID to region name
+    """
+    with open(config_dir / "region_mappings.yaml") as f:
+        regions = yaml.safe_load(f)['regions']
+
+    station_regions = {}
+    for region in regions:
+        station_file = config_dir / "tide_stations" / f"{region}_tide_stations.yaml"
+        if not station_file.exists():
+            continue
+        with open(station_file) as f:
+            stations = yaml.safe_load(f).get('stations') or {}
+        for station_id in stations:
+            station_regions[str(station_id)] = region
+
+    return station_regions
+
+
+class StationSweep:
+    """Fetches historical and projected HTF data for each station in one pass."""
+
+    def __init__(self,
+                 cache: NOAACache,
+                 client: Optional[NOAAClient] = None,
+                 max_workers: int = 4):
+        """Initialize the sweep.
+
+        Args:
+            cache: NOAACache instance for data caching
+            client: Shared NOAA API client (created from the cache settings if None)
+            max_workers: Number of concurrent request threads
+        """
+        self.cache = cache
+        api_settings = cache.settings.get('api', {})
+        self.client = client or NOAAClient(
+            api_base_url=api_settings.get('base_url', "https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi"),
+            requests_per_second=api_settings.get('requests_per_second', 2.0)
+        )
+        self.max_workers = max_workers
+        self.station_regions = load_station_regions(Path(cache.config_dir))
+
+    def _cached_records(self, station_id: str, data_type: str, force: bool) -> Optional[List[Dict]]:
+        """Get cached records for a station if they are fresh enough to reuse."""
+        if force or self.cache.needs_update(station_id, data_type):
+            return None
+        if data_type == 'historical':
+            return self.cache.get_historical_data(station_id)
+        return self.cache.get_projected_data(station_id)
+
+    def sweep(
+        self,
+        stations: Optional[List[str]] = None,
+        force: bool = False
+    ) -> Tuple[Dict[str, List[Dict]], Dict[str, List[Dict]], Dict[str, str]]:
+        """Refresh both datasets for a list of stations.
+
+        Args:
+            stations: Station IDs to sweep. If None, sweeps all configured stations.
+            force: If True, refetch even when the cache is fresh
+
+        Returns:
+            Tuple of (historical dataset, projected dataset, errors), where the
+            datasets map station IDs to records and errors maps station IDs to
+            error messages
+        """
+        stations = stations or sorted(self.station_regions)
+        logger.info(f"Sweeping {len(stations)} stations with {self.max_workers} workers")
+
+        historical: Dict[str, List[Dict]] = {}
+        projected: Dict[str, List[Dict]] = {}
+        errors: Dict[str, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            # Queue both requests for every station up front; the shared rate
+            # limiter paces them while earlier stations are being committed
+            pending = {}
+            for station_id in stations:
+                cached, futures = {}, {}
+                for data_type, fetch in (('historical', self.client.fetch_annual_flood_counts),
+                                         ('projected', self.client.fetch_decadal_projections)):
+                    records = self._cached_records(station_id, data_type, force)
+                    if records is not None:
+                        cached[data_type] = records
+                    else:
+                        futures[data_type] = executor.submit(fetch, station=station_id)
+                pending[station_id] = (cached, futures)
+
+            for station_id, (cached, futures) in pending.items():
+                fetched = {}
+                messages = []
+                for data_type, future in futures.items():
+                    try:
+                        fetched[data_type] = future.result()
+                    except Exception as e:
+                        messages.append(f"{data_type}: {e}")
+
+                try:
+                    if fetched:
+                        self.cache.save_station_records(
+                            station_id,
+                            historical=fetched.get('historical'),
+                            projected=fetched.get('projected')
+                        )
+                except Exception as e:
+                    messages.append(f"cache: {e}")
+
+                results = {**cached, **fetched}
+                if results.get('historical'):
+                    historical[station_id] = results['historical']
+                if results.get('projected'):
+                    projected[station_id] = results['projected']
+                if messages:
+                    errors[station_id] = "; ".join(messages)
+                    logger.error(f"Error sweeping station {station_id}: {errors[station_id]}")
+
+        self.cache.flush_stats()
+        logger.info(f"Sweep complete: {len(historical)} stations with historical data, "
+                    f"{len(projected)} with projections, {len(errors)} with errors")
+        return historical, projected, errors
+
+    def build_station_coverage(
+        self,
+        historical: Dict[str, List[Dict]],
+        projected: Dict[str, List[Dict]],
+        stations: Optional[List[str]] = None,
+        reference_year: int = DEFAULT_REFERENCE_YEAR
+    ) -> pd.DataFrame:
+        """Compare historical and projected coverage for each station.
+
+        Args:
+            historical: Historical dataset from sweep()
+            projected: Projected dataset from sweep()
+            stations: Station IDs to include. If None, uses all configured stations.
+            reference_year: Year a station must have historical data for
+
+        Returns:
+            DataFrame with one row per station: station_id, region,
+            historical_years, has_historical, projected_decades, has_projected
+        """
+        stations = stations or sorted(self.station_regions)
+        df = pd.DataFrame({
+            'station_id': stations,
+            'region': [self.station_regions.get(s) for s in stations]
+        })
+        df['historical_years'] = [len(historical.get(s, [])) for s in stations]
+        df['has_historical'] = [
+            any(record.get('year') == reference_year for record in historical.get(s, []))
+            for s in stations
+        ]
+        df['projected_decades'] = [len(projected.get(s, [])) for s in stations]
+        df['has_projected'] = df['projected_decades'] > 0
+        return df
+
+
+def summarize_region_coverage(station_coverage: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate station coverage to regions.
+
+    Coverage is the number of projected stations as a percentage of the
+    stations with historical data in the reference year.
+
+    Args:
+        station_coverage: Output of StationSweep.build_station_coverage
+
+    Returns:
+        DataFrame with one row per region: historical_stations,
+        projected_stations, both_stations, coverage_pct, category
+    """
+    df = station_coverage.assign(
+        both=station_coverage['has_historical'] & station_coverage['has_projected']
+    )
+    summary = df.groupby('region', sort=False).agg(
+        historical_stations=('has_historical', 'sum'),
+        projected_stations=('has_projected', 'sum'),
+        both_stations=('both', 'sum')
+    ).reset_index()
+
+    historical_count = summary['historical_stations'].where(summary['historical_stations'] > 0)
+    summary['coverage_pct'] = (summary['projected_stations'] / historical_count * 100).round()
+
+    def categorize(pct: float) -> str:
+        if pd.isna(pct):
+            return 'N/A'
+        return next(label for bound, label, _ in COVERAGE_CATEGORIES if pct > bound or bound == 0)
+
+    summary['category'] = summary['coverage_pct'].map(categorize)
+    return summary
+
+
+def _region_title(region: str) -> str:
+    """Format a region key for display (e.g. 'mid_atlantic' -> 'Mid Atlantic')."""
+    return region.replace('_', ' ').title()
+
+
+def _plural(count: int, word: str = 'station') -> str:
+    return f"{count} {word}{'' if count == 1 else 's'}"
+
+
+def write_coverage_report(
+    region_coverage: pd.DataFrame,
+    projected: Dict[str, List[Dict]],
+    station_regions: Dict[str, str],
+    output_file: Path,
+    reference_year: int = DEFAULT_REFERENCE_YEAR
+) -> Path:
+    """Write the historical-vs-projected station coverage report.
+
+    Args:
+        region_coverage: Output of summarize_region_coverage
+        projected: Projected dataset from StationSweep.sweep()
+        station_regions: Station to region map
+        output_file: Markdown file to write
+        reference_year: Year used for historical coverage
+
+    Returns:
+        Path to the report
+    """
+    lines = [
+        "# High Tide Flooding Station Coverage Report",
+        "",
+        "## Overview",
+        f"This report compares the coverage of NOAA tide stations between historical ({reference_year}) "
+        "and projected datasets. It highlights which stations have data in both periods and "
+        "identifies any mismatches.",
+        "",
+        "## Data Comparison",
+        "",
+        "### Historical vs Projected Coverage",
+        f"| Region | Historical Stations ({reference_year}) | Projected Stations | Both | Coverage Match |",
+        "|--------|---------------------------|-------------------|------|----------------|",
+    ]
+    for row in region_coverage.itertuples(index=False):
+        match = 'N/A' if row.category == 'N/A' else f"{row.category} - {row.coverage_pct:.0f}%"
+        lines.append(
+            f"| {_region_title(row.region)} | {_plural(row.historical_stations)} | "
+            f"{_plural(row.projected_stations)} | {row.both_stations} | {match} |"
+        )
+
+    lines += ["", "### Coverage Analysis"]
+    for i, (_, label, description) in enumerate(COVERAGE_CATEGORIES, start=1):
+        members = region_coverage[region_coverage['category'] == label]
+        lines.append(f"{i}. **{label} Coverage Match ({description})**:")
+        if members.empty:
+            lines.append("   - None")
+        for row in members.sort_values('coverage_pct', ascending=False).itertuples(index=False):
+            lines.append(f"   - {_region_title(row.region)} ({row.coverage_pct:.0f}%)")
+        lines.append("")
+
+    lines.append("### Station Loss")
+    losses = region_coverage.assign(
+        lost=region_coverage['historical_stations'] - region_coverage['projected_stations']
+    )
+    losses = losses[losses['lost'] > 0].sort_values('lost', ascending=False)
+    if losses.empty:
+        lines.append("- None")
+    for row in losses.itertuples(index=False):
+        lines.append(f"- {_region_title(row.region)}: Lost {_plural(row.lost)} "
+                     f"({row.lost / row.historical_stations * 100:.0f}% reduction)")
+
+    lines += ["", "## Regional Summaries"]
+    records = [
+        {**record, 'region': station_regions.get(station_id)}
+        for station_id, station_data in projected.items()
+        for record in station_data
+    ]
+    projected_df = pd.DataFrame.from_records(records, columns=['region', 'decade', *SCENARIO_FIELDS])
+    for field in SCENARIO_FIELDS:
+        projected_df[field] = pd.to_numeric(projected_df[field], errors='coerce')
+
+    for region in region_coverage['region']:
+        region_df = projected_df[projected_df['region'] == region]
+        lines += ["", f"### {_region_title(region)} Region"]
+        if region_df.empty:
+            lines.append("- **Projected Data Coverage**: No data available")
+            continue
+
+        n_stations = sum(1 for s in projected if station_regions.get(s) == region)
+        lines += [
+            "- **Projected Data Coverage**:",
+            f"  - Total Records: {len(region_df)} from {_plural(n_stations)}",
+            f"  - Decades: {int(region_df['decade'].min())}-{int(region_df['decade'].max())}",
+            "  - Mean Flood Days by Scenario (days/year):"
+        ]
+        for field in SCENARIO_FIELDS:
+            lines.append(f"    - {SCENARIO_LABELS[field]}: {region_df[field].mean():.1f}")
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    output_file.write_text("\n".join(lines) + "\n")
+    logger.info(f"Wrote station coverage report to {output_file}")
+    return output_file
+
+
+def main():
+    """Run a combined station sweep and write the coverage outputs."""
+    parser = argparse.ArgumentParser(description="Refresh historical and projected HTF data in one station sweep")
+    parser.add_argument("--config-dir", type=Path, help="Custom config directory path")
+    parser.add_argument("--output-dir", type=Path, default=Path("output/analysis"),
+                        help="Output directory for coverage outputs")
+    parser.add_argument("--stations", nargs="+", help="Station IDs to sweep (default: all configured)")
+    parser.add_argument("--max-workers", type=int, default=4, help="Concurrent request threads")
+    parser.add_argument("--reference-year", type=int, default=DEFAULT_REFERENCE_YEAR,
+                        help="Year used for historical coverage")
+    parser.add_argument("--force", action="store_true", help="Refetch even when the cache is fresh")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    cache = NOAACache(config_dir=args.config_dir)
+    station_sweep = StationSweep(cache, max_workers=args.max_workers)
+    historical, projected, errors = station_sweep.sweep(stations=args.stations, force=args.force)
+
+    station_coverage = station_sweep.build_station_coverage(
+        historical, projected, stations=args.stations, reference_year=args.reference_year
+    )
+    station_coverage['error'] = station_coverage['station_id'].map(errors)
+    region_coverage = summarize_region_coverage(station_coverage)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    station_coverage.to_csv(args.output_dir / "station_coverage.csv", index=False)
+    write_coverage_report(
+        region_coverage,
+        projected,
+        station_sweep.station_regions,
+        args.output_dir / "station_coverage_report.md",
+        reference_year=args.reference_year
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Tests for leave-one-station-out cross-validation of imputation parameters."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.imputation import cross_validation
+from src.imputation.cross_validation import (
+    PARAMETER_COLUMNS, RESULT_COLUMNS, annual_flood_matrix, best_parameters, loso_neighbors,
+    parameter_grid, predict_loso, run_cross_validation
+)
+from src.imputation.spatial_ops import EARTH_RADIUS_METERS
+from src.imputation.station_index import StationIndex, load_station_index
+from src.imputation.weight_calculator import WeightCalculator
+
+SMALL_GRID = {
+    'method': ('idw', 'gaussian'),
+    'power': (2,),
+    'max_distance_meters': (100_000, 300_000),
+    'min_weight': (0.1,),
+    'k_max': (2, 4),
+}
+
+@pytest.fixture(scope="module")
+def index():
+    """Station index of the repository registry."""
+    return StationIndex.build()
+
+@pytest.fixture(scope="module")
+def flood_data(index):
+    """Annual flood days that vary smoothly with latitude, with some missing station-years."""
+    rng = np.random.default_rng(0)
+    years = np.arange(2000, 2010)
+    frame = pd.DataFrame({
+        'station_id': np.repeat(index.station_ids, len(years)),
+        'year': np.tile(years, len(index.station_ids)),
+        'flood_days': np.repeat(np.asarray(index.lat) / 2, len(years)) + np.tile(years - 2000, len(index.station_ids))
+    })
+    return frame.drop(index=rng.choice(len(frame), len(frame) // 10, replace=False))
+
+def haversine_meters(lon1, lat1, lon2, lat2):
+    """Great-circle distance on the index sphere."""
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+
+class TestCrossValidation:
+    """Test suite for LOSO neighbors, predictions and the parameter grid runner."""
+
+    def test_neighbors_exclude_self(self, index):
+        """Each station's neighbors are the nearest other stations of each subregion."""
+        neighbors = loso_neighbors(index, 'alaska', 3)
+        positions = index.groups['alaska']
+        sub_regions = index.sub_regions[positions]
+        distances = haversine_meters(index.lon[positions][:, None], index.lat[positions][:, None],
+                                     index.lon[positions][None], index.lat[positions][None])
+
+        assert len(neighbors.station_row) == len(positions) * len(np.unique(sub_regions))
+        for row, station in enumerate(neighbors.station_row):
+            valid = neighbors.neighbors[row] >= 0
+            chosen = neighbors.neighbors[row][valid]
+            assert station not in chosen
+            group = sub_regions == sub_regions[chosen[0]]
+            group[station] = False
+            expected = np.sort(distances[station][group])[:3]
+            np.testing.assert_allclose(neighbors.distances[row][valid], expected, rtol=1e-9)
+
+    def test_predictions_match_manual_loso(self, index, flood_data):
+        """Predictions equal weighted averages over the other stations, summed over subregions."""
+        neighbors = loso_neighbors(index, 'west_coast', 4)
+        values = annual_flood_matrix(flood_data, neighbors.station_ids)
+        calculator = WeightCalculator(max_distance_meters=150_000, power=2, min_weight=0.1)
+        predictions = predict_loso(neighbors, values, calculator, 3)
+
+        positions = index.groups['west_coast']
+        sub_regions = index.sub_regions[positions]
+        distances = haversine_meters(index.lon[positions][:, None], index.lat[positions][:, None],
+                                     index.lon[positions][None], index.lat[positions][None])
+        for station in range(len(positions)):
+            numerator = np.zeros(values.shape[1])
+            denominator = np.zeros(values.shape[1])
+            for sub_region in np.unique(sub_regions):
+                candidates = np.flatnonzero((sub_regions == sub_region) & (np.arange(len(positions)) != station))
+                others = candidates[np.argsort(distances[station][candidates])][:3]
+                in_range = others[distances[station][others] <= 150_000]
+                chosen = in_range if len(in_range) else others[:1]
+                weights, _ = calculator.calculate_weight_matrix(distances[station][chosen][None])
+                has_data = ~np.isnan(values[chosen])
+                numerator += weights[0] @ np.where(has_data, values[chosen], 0.0)
+                denominator += weights[0] @ has_data
+            with np.errstate(invalid='ignore'):
+                expected = np.where(denominator > 0, numerator / denominator, np.nan)
+            np.testing.assert_allclose(predictions[station], expected, rtol=1e-9)
+
+    def test_grid_results(self, tmp_path, flood_data):
+        """Every region is scored for every combination and serial and parallel runs agree."""
+        serial = run_cross_validation(flood_data, SMALL_GRID, index_dir=tmp_path, max_workers=1)
+        regions = sorted(set(load_station_index(tmp_path).regions.tolist()))
+
+        assert list(serial.columns) == RESULT_COLUMNS
+        assert len(serial) == len(regions) * len(parameter_grid(SMALL_GRID))
+        assert (serial['rmse'] >= serial['mae']).all()
+        assert (serial['n_predictions'] > 0).all()
+
+        parallel = run_cross_validation(flood_data, SMALL_GRID, regions=['alaska', 'hawaii'],
+                                        index_dir=tmp_path, max_workers=2)
+        expected = serial[serial['region'].isin(['alaska', 'hawaii'])].reset_index(drop=True)
+        pd.testing.assert_frame_equal(parallel, expected)
+
+        best = best_parameters(serial)
+        assert list(best['region']) == regions
+        for row in best.itertuples():
+            assert row.rmse == serial.loc[serial['region'] == row.region, 'rmse'].min()
+
+    def test_workers_receive_region_slices(self, tmp_path, index, flood_data, monkeypatch):
+        """Each region's worker is handed only the flood data of that region's stations."""
+        received = {}
+        def record(region, data, **kwargs):
+            received[region] = data
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        monkeypatch.setattr(cross_validation, '_region_worker', record)
+
+        run_cross_validation(flood_data, SMALL_GRID, regions=['alaska', 'hawaii'], index_dir=tmp_path, max_workers=1)
+
+        station_regions = dict(zip(index.station_ids, index.regions))
+        for region in ('alaska', 'hawaii'):
+            expected = flood_data[flood_data['station_id'].map(station_regions) == region]
+            assert len(received[region]) == len(expected) > 0
+            assert set(received[region]['station_id']) == set(expected['station_id'])
+
+    def test_parameter_grid_validation(self):
+        """Grids must name every parameter and only known weight methods."""
+        assert list(parameter_grid(SMALL_GRID).columns) == PARAMETER_COLUMNS
+        with pytest.raises(ValueError):
+            parameter_grid({name: values for name, values in SMALL_GRID.items() if name != 'k_max'})
+        with pytest.raises(ValueError):
+            parameter_grid({**SMALL_GRID, 'method': ('kriging',)})
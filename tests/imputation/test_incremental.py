@@ -0,0 +1,117 @@
+"""Tests for fingerprinted, incremental imputation runs."""
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.assignment.historical.combine_imputation import combine_imputation_files, get_latest_regional_files
+from src.imputation import main
+from src.imputation.data_loader import GaugeStationLoader
+from src.imputation.incremental import ImputationManifest
+
+class StubLoader:
+    """Data loader returning in-memory frames."""
+
+    def __init__(self, reference_points, gauge_stations):
+        self.reference_points = reference_points
+        self.gauge_stations = gauge_stations
+
+    def load_reference_points(self):
+        return self.reference_points
+
+    def load_gauge_stations(self):
+        return self.gauge_stations
+
+@pytest.fixture
+def national_points():
+    """Reference points in Alaska, Hawaii and the Gulf coast."""
+    rng = np.random.default_rng(0)
+    frames = []
+    for state_code, county_fips, lat_range, lon_range in [
+        ('AK', '02020', (55, 65), (-165, -135)),
+        ('HI', '15001', (19.5, 21.5), (-159, -155)),
+        ('TX', '48167', (27, 30), (-97, -93)),
+    ]:
+        frames.append(gpd.GeoDataFrame(
+            {'county_fips': [county_fips] * 100, 'state_code': [state_code] * 100},
+            geometry=gpd.points_from_xy(rng.uniform(*lon_range, 100), rng.uniform(*lat_range, 100)),
+            crs="EPSG:4326"
+        ))
+    points = pd.concat(frames)
+    points.index = pd.RangeIndex(len(points))
+    return points
+
+@pytest.fixture
+def run_manager(tmp_path, monkeypatch):
+    """Run an ImputationManager over in-memory inputs, returning the regions it saved."""
+    monkeypatch.setattr(main, "STATION_INDEX_DIR", tmp_path / "station_index")
+
+    def run(points, stations, **kwargs):
+        manager = main.ImputationManager(output_dir=tmp_path / "imputation" / "data", n_processes=2, **kwargs)
+        manager.data_loader = StubLoader(points, stations)
+        saved = []
+        save = manager.save_imputation_structure
+
+        def spy(df, region):
+            saved.append(region)
+            return save(df, region)
+
+        manager.save_imputation_structure = spy
+        return manager.run(), sorted(saved)
+
+    return run
+
+class TestIncrementalImputation:
+    """Test suite for per-region fingerprints and the incremental combined file."""
+
+    def test_only_changed_regions_recompute(self, tmp_path, national_points, run_manager):
+        """Unchanged regions are reused and editing a Hawaii station recomputes Hawaii only."""
+        stations = GaugeStationLoader().load()
+        combined_path = tmp_path / "imputation" / "imputation_structure_all_regions.parquet"
+
+        first, saved = run_manager(national_points, stations)
+        assert saved == ['alaska', 'gulf_coast', 'hawaii']
+        combined = pd.read_parquet(combined_path)
+
+        second, saved = run_manager(national_points, stations)
+        assert saved == []
+        assert second == first
+        pd.testing.assert_frame_equal(pd.read_parquet(combined_path), combined)
+
+        edited = stations.copy()
+        hawaii = edited.index[edited['region'] == 'hawaii'][0]
+        moved = edited.loc[hawaii, 'geometry']
+        edited.loc[hawaii, 'geometry'] = gpd.points_from_xy([moved.x + 0.05], [moved.y])[0]
+        third, saved = run_manager(national_points, edited)
+        assert saved == ['hawaii']
+        assert third['alaska'] == first['alaska']
+
+        # The incremental combined file matches a full rebuild from the latest regional files
+        full = combine_imputation_files(tmp_path / "imputation" / "data", tmp_path / "full.parquet")
+        pd.testing.assert_frame_equal(pd.read_parquet(combined_path), pd.read_parquet(full))
+        assert get_latest_regional_files(tmp_path / "imputation" / "data")['hawaii'] == third['hawaii']
+
+    def test_force_and_parameters(self, national_points, run_manager, monkeypatch):
+        """force recomputes everything and changed weights invalidate every fingerprint."""
+        stations = GaugeStationLoader().load()
+        run_manager(national_points, stations)
+
+        _, saved = run_manager(national_points, stations, force=True)
+        assert saved == ['alaska', 'gulf_coast', 'hawaii']
+
+        monkeypatch.setitem(main.WEIGHT_PARAMETERS, 'power', 3)
+        _, saved = run_manager(national_points, stations)
+        assert saved == ['alaska', 'gulf_coast', 'hawaii']
+
+    def test_manifest_missing_file_recomputes(self, tmp_path, national_points, run_manager):
+        """A region whose recorded file was deleted is recomputed."""
+        stations = GaugeStationLoader().load()
+        first, _ = run_manager(national_points, stations)
+        first['gulf_coast'].unlink()
+
+        manifest = ImputationManifest.load(tmp_path / "imputation" / "data")
+        assert manifest.region_file('gulf_coast') is None
+
+        _, saved = run_manager(national_points, stations)
+        assert saved == ['gulf_coast']
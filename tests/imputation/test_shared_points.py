@@ -0,0 +1,104 @@
+"""Tests for region slicing and shared-memory reference points."""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import REGION_CONFIG, config_manager
+from src.imputation.data_loader import GaugeStationLoader
+from src.imputation.main import process_region, process_region_shared, region_gauge_stations
+from src.imputation.shared_points import SharedReferencePoints, slice_regions
+from src.imputation.spatial_ops import NearestGaugeFinder
+
+@pytest.fixture(scope="module")
+def regions():
+    """Region definitions from the repository configuration."""
+    return config_manager.get_yaml(REGION_CONFIG)['regions']
+
+@pytest.fixture(scope="module")
+def national_points():
+    """Reference points spread over Alaska, Hawaii and the Gulf coast."""
+    rng = np.random.default_rng(0)
+    parts = [
+        ('AK', '02020', (55, 65), (-165, -135)),
+        ('HI', '15001', (19.5, 21.5), (-159, -155)),
+        ('TX', '48167', (27, 30), (-97, -93)),
+    ]
+    frames = []
+    for state_code, county_fips, lat_range, lon_range in parts:
+        n = 150
+        frames.append(gpd.GeoDataFrame(
+            {'county_fips': [county_fips] * n, 'state_code': [state_code] * n},
+            geometry=gpd.points_from_xy(rng.uniform(*lon_range, n), rng.uniform(*lat_range, n)),
+            crs="EPSG:4326"
+        ))
+    points = pd.concat(frames)
+    points.index = pd.RangeIndex(100, 100 + len(points))
+    return points
+
+class TestSharedPoints:
+    """Test suite for parent-side slicing and shared-memory transport."""
+
+    def test_slices_match_finder_filter(self, regions, national_points):
+        """Parent slicing selects exactly the points the finder keeps."""
+        finder = NearestGaugeFinder()
+        stations = GaugeStationLoader().load()
+        slices = slice_regions(national_points, regions)
+
+        for region in ('alaska', 'hawaii', 'gulf_coast', 'west_coast'):
+            expected, _ = finder._filter_by_region(national_points, stations, region)
+            assert list(national_points.index[slices[region]]) == list(expected.index)
+
+    def test_slice_roundtrip(self, regions, national_points):
+        """A worker-side frame reproduces the region's points and attributes."""
+        with SharedReferencePoints(national_points, regions) as shared:
+            frame = shared.slices['hawaii'].to_frame()
+            empty = shared.slices['virgin_islands'].to_frame()
+
+        expected = national_points[national_points['state_code'] == 'HI']
+        assert list(frame.index) == list(expected.index)
+        assert list(frame['county_fips']) == list(expected['county_fips'])
+        np.testing.assert_array_equal(frame.geometry.x, expected.geometry.x)
+        np.testing.assert_array_equal(frame.geometry.y, expected.geometry.y)
+        assert empty.empty
+
+    def test_workers_match_full_frame(self, regions, national_points):
+        """Regions processed from shared slices in worker processes match the full-frame path."""
+        stations = GaugeStationLoader().load()
+        with SharedReferencePoints(national_points, regions) as shared, ProcessPoolExecutor(max_workers=2) as executor:
+            futures = {
+                region: executor.submit(process_region_shared, region, regions[region], shared.slices[region],
+                                        region_gauge_stations(stations, region))
+                for region in ('alaska', 'hawaii')
+            }
+            results = {region: future.result() for region, future in futures.items()}
+
+        for region, result in results.items():
+            expected = process_region(region, regions[region], national_points, stations)
+            pd.testing.assert_frame_equal(result, expected)
+
+    def test_no_leak_on_error(self, regions, national_points, monkeypatch):
+        """Invalid input releases the shared memory block before the error propagates."""
+        created = []
+        original = shared_memory.SharedMemory
+        def tracking(*args, **kwargs):
+            block = original(*args, **kwargs)
+            created.append(block.name)
+            return block
+        monkeypatch.setattr(shared_memory, 'SharedMemory', tracking)
+
+        with pytest.raises(KeyError):
+            SharedReferencePoints(national_points.drop(columns='state_code'), regions)
+        assert not created
+
+        positions = slice_regions(national_points, regions)
+        positions['hawaii'] = np.array([len(national_points)])
+        with pytest.raises(IndexError):
+            SharedReferencePoints(national_points, regions, positions=positions)
+        assert len(created) == 1
+        with pytest.raises(FileNotFoundError):
+            original(name=created[0])
@@ -0,0 +1,221 @@
+"""Tests for nearest gauge search."""
+
+import copy
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.imputation.data_loader import GaugeStationLoader
+from src.imputation.main import process_region
+from src.imputation.spatial_ops import (
+    EARTH_RADIUS_METERS, NearestGaugeFinder, chord_to_meters, lonlat_to_unit_vectors, meters_to_chord
+)
+from src.imputation.weight_calculator import WeightCalculator
+
+@pytest.fixture(scope="module")
+def gauge_stations():
+    """Gauge stations from the repository's station configuration."""
+    return GaugeStationLoader().load()
+
+def haversine_meters(lon1, lat1, lon2, lat2):
+    """Great-circle distance on the sphere used by the finder."""
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+
+def random_points(n, state_code, lat_range, lon_range, seed=0):
+    """Random reference points with non-default index labels."""
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(*lat_range, n)
+    lon = rng.uniform(*lon_range, n)
+    return gpd.GeoDataFrame(
+        {'county_fips': rng.choice(['02020', '02110', '02150'], n), 'state_code': state_code},
+        geometry=gpd.points_from_xy(lon, lat),
+        index=pd.RangeIndex(5000, 5000 + n),
+        crs="EPSG:4326"
+    )
+
+class TestNearestGaugeFinder:
+    """Test suite for the columnar nearest gauge search."""
+
+    @pytest.mark.parametrize("region,state_code,lat_range,lon_range", [
+        ('alaska', 'AK', (55, 65), (-165, -135)),
+        ('hawaii', 'HI', (19.5, 21.5), (-159, -155)),
+    ])
+    def test_matches_brute_force(self, gauge_stations, region, state_code, lat_range, lon_range):
+        """Albers neighbors match an exhaustive projected search within each subregion."""
+        finder = NearestGaugeFinder(backend='albers')
+        points = random_points(300, state_code, lat_range, lon_range)
+        neighbors = finder.find_nearest(points, gauge_stations, region)
+
+        ref, stations = finder._filter_by_region(points, gauge_stations, region)
+        ref, stations = finder._project_points(ref, stations, region)
+        ref_xy, station_xy = finder._extract_coordinates(ref, stations)
+        all_distances = np.linalg.norm(ref_xy[:, None] - station_xy[None], axis=2)
+
+        subregions = stations['sub_region'].to_numpy()
+        groups = np.unique(subregions)
+        assert len(neighbors) == len(ref) * len(groups)
+        assert neighbors.point_ids[neighbors.point_index[0]] == ref.index[0]
+
+        for row in range(len(neighbors)):
+            point = neighbors.point_index[row]
+            chosen = neighbors.station_index[row][neighbors.valid[row]]
+            group = subregions[chosen[0]]
+            assert (subregions[chosen] == group).all()
+            expected = np.sort(all_distances[point][subregions == group])[:len(chosen)]
+            np.testing.assert_allclose(neighbors.distances[row][neighbors.valid[row]], expected)
+
+    @pytest.mark.parametrize("region,state_code,lat_range,lon_range", [
+        ('alaska', 'AK', (55, 65), (-165, -135)),
+        ('hawaii', 'HI', (19.5, 21.5), (-159, -155)),
+    ])
+    def test_sphere_matches_haversine(self, gauge_stations, region, state_code, lat_range, lon_range):
+        """Unit-sphere neighbors and distances match an exhaustive great-circle search."""
+        finder = NearestGaugeFinder(backend='sphere')
+        points = random_points(300, state_code, lat_range, lon_range, seed=1)
+        neighbors = finder.find_nearest(points, gauge_stations, region)
+
+        ref, stations = finder._filter_by_region(points, gauge_stations, region)
+        all_distances = haversine_meters(
+            ref.geometry.x.to_numpy()[:, None], ref.geometry.y.to_numpy()[:, None],
+            stations.geometry.x.to_numpy()[None], stations.geometry.y.to_numpy()[None]
+        )
+        subregions = stations['sub_region'].to_numpy()
+
+        for row in range(len(neighbors)):
+            point = neighbors.point_index[row]
+            chosen = neighbors.station_index[row][neighbors.valid[row]]
+            group = subregions == subregions[chosen[0]]
+            expected = np.sort(all_distances[point][group])[:len(chosen)]
+            np.testing.assert_allclose(neighbors.distances[row][neighbors.valid[row]], expected, rtol=1e-9)
+            np.testing.assert_allclose(all_distances[point][chosen], expected, rtol=1e-9)
+
+    def test_sphere_close_to_albers(self, gauge_stations):
+        """Great-circle distances agree with the regional Albers projection to within 1%."""
+        points = random_points(200, 'HI', (19.5, 21.5), (-159, -155), seed=2)
+        sphere = NearestGaugeFinder(backend='sphere').find_nearest(points, gauge_stations, 'hawaii')
+        albers = NearestGaugeFinder(backend='albers').find_nearest(points, gauge_stations, 'hawaii')
+
+        np.testing.assert_allclose(sphere.distances[:, 0], albers.distances[:, 0], rtol=0.01, atol=50)
+
+    def test_antimeridian_distances(self):
+        """Points on either side of 180 degrees are neighbors, not half a world apart."""
+        vectors = lonlat_to_unit_vectors(np.array([179.9, -179.9, 0.0]), np.array([0.0, 0.0, 0.0]))
+        chords = np.linalg.norm(vectors[0] - vectors[1:], axis=1)
+        meters = chord_to_meters(chords)
+        np.testing.assert_allclose(meters[0], np.radians(0.2) * EARTH_RADIUS_METERS)
+        np.testing.assert_allclose(meters[1], np.radians(179.9) * EARTH_RADIUS_METERS)
+        np.testing.assert_allclose(meters_to_chord(meters), chords)
+        assert chord_to_meters(np.array([np.inf]))[0] == np.inf
+
+    def test_antimeridian_bounds(self, gauge_stations):
+        """Bounds with min_lon > max_lon keep points and stations on both sides of 180 degrees."""
+        finder = NearestGaugeFinder(backend='sphere')
+        points = gpd.GeoDataFrame(
+            {'county_fips': ['60050', '66010'], 'state_code': ['AS', 'GU']},
+            geometry=gpd.points_from_xy([-170.7, 144.75], [-14.28, 13.44]),
+            crs="EPSG:4326"
+        )
+        bounds = {'min_lon': 144.5, 'max_lon': -169.0, 'min_lat': -14.5, 'max_lat': 22.0}
+        finder.region_config = copy.deepcopy(finder.region_config)
+        finder.region_config['regions']['pacific_islands']['bounds'] = bounds
+        neighbors = finder.find_nearest(points, gauge_stations, 'pacific_islands')
+
+        frame = neighbors.to_frame()
+        assert set(frame['reference_point_id']) == {0, 1}
+        samoa = frame[(frame['reference_point_id'] == 0) & (frame['station_id'] == '1770000')]
+        assert len(samoa) == 1
+        assert samoa['distance_meters'].iloc[0] < 10_000
+
+    @pytest.mark.parametrize("k_max", [4, None])
+    def test_radius_search_matches_brute_force(self, gauge_stations, k_max):
+        """Every station within the radius (up to k_max), else the single nearest, in CSR rows."""
+        radius = 150_000
+        finder = NearestGaugeFinder(backend='sphere', k_max=k_max, radius_meters=radius)
+        points = random_points(300, 'AK', (55, 65), (-165, -135), seed=3)
+        neighbors = finder.find_nearest(points, gauge_stations, 'alaska')
+
+        ref, stations = finder._filter_by_region(points, gauge_stations, 'alaska')
+        all_distances = haversine_meters(
+            ref.geometry.x.to_numpy()[:, None], ref.geometry.y.to_numpy()[:, None],
+            stations.geometry.x.to_numpy()[None], stations.geometry.y.to_numpy()[None]
+        )
+        subregions = stations['sub_region'].to_numpy()
+        groups = stations['sub_region'].unique()
+        assert len(neighbors) == len(ref) * len(groups)
+        assert neighbors.offsets[-1] == len(neighbors.neighbor_stations) == len(neighbors.neighbor_distances)
+
+        fallbacks = 0
+        for row in range(len(neighbors)):
+            point = neighbors.point_index[row]
+            group = groups[row // len(ref)]
+            chosen = neighbors.neighbor_stations[neighbors.offsets[row]:neighbors.offsets[row + 1]]
+            distances = neighbors.neighbor_distances[neighbors.offsets[row]:neighbors.offsets[row + 1]]
+            group_distances = np.sort(all_distances[point][subregions == group])
+            in_range = group_distances[group_distances <= radius]
+            if len(in_range):
+                expected = in_range[:k_max]
+            else:
+                expected = group_distances[:1]
+                fallbacks += 1
+            assert (subregions[chosen] == group).all()
+            np.testing.assert_allclose(distances, expected, rtol=1e-9)
+            np.testing.assert_allclose(all_distances[point][chosen], expected, rtol=1e-9)
+        assert fallbacks > 0
+        assert len(np.unique(neighbors.counts)) > 1
+
+    def test_ragged_padded_views(self, gauge_stations):
+        """Padded station and distance arrays mirror the CSR rows."""
+        finder = NearestGaugeFinder(backend='sphere', k_max=5, radius_meters=100_000)
+        neighbors = finder.find_nearest(random_points(100, 'HI', (19.5, 21.5), (-159, -155)),
+                                        gauge_stations, 'hawaii')
+
+        assert neighbors.station_index.shape == neighbors.distances.shape == neighbors.valid.shape
+        assert neighbors.valid.shape[1] == neighbors.counts.max() <= 5
+        np.testing.assert_array_equal(neighbors.station_index[neighbors.valid], neighbors.neighbor_stations)
+        assert (neighbors.station_index[~neighbors.valid] == -1).all()
+        assert np.isinf(neighbors.distances[~neighbors.valid]).all()
+        assert len(neighbors.to_frame()) == neighbors.offsets[-1]
+
+    def test_search_parameters(self):
+        """A search needs a neighbor cap, a radius or both."""
+        with pytest.raises(ValueError):
+            NearestGaugeFinder(k_max=None, radius_meters=None)
+        with pytest.raises(ValueError):
+            NearestGaugeFinder(k_max=0)
+
+    def test_unknown_backend(self):
+        """Unknown backends are rejected."""
+        with pytest.raises(ValueError):
+            NearestGaugeFinder(backend='mercator')
+        assert NearestGaugeFinder().backend == 'albers'
+
+    def test_vectorized_weights_match_per_mapping(self, gauge_stations):
+        """Matrix weighting reproduces the per-mapping weights and drops far stations."""
+        finder = NearestGaugeFinder(backend='sphere')
+        neighbors = finder.find_nearest(random_points(200, 'AK', (55, 65), (-165, -135), seed=1),
+                                        gauge_stations, 'alaska')
+        calculator = WeightCalculator(max_distance_meters=300000, power=2, min_weight=0.1)
+
+        weights, keep = calculator.calculate_weight_matrix(neighbors.distances, neighbors.valid)
+        frame = neighbors.to_frame(weights=weights, keep=keep)
+        legacy = [m for mapping in calculator.calculate_weights(neighbors.to_mappings())
+                  for m in mapping['mappings']]
+
+        assert len(frame) == len(legacy)
+        np.testing.assert_allclose(frame['weight'], [m['weight'] for m in legacy])
+        assert list(frame['station_id']) == [m['station_id'] for m in legacy]
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+
+    def test_process_region_columns(self, gauge_stations):
+        """The regional imputation structure keeps its long-table layout."""
+        points = random_points(100, 'HI', (19.5, 21.5), (-159, -155))
+        df = process_region('hawaii', {'name': 'Hawaii', 'state_codes': ['HI']}, points, gauge_stations)
+
+        assert list(df.columns) == ['reference_point_id', 'county_fips', 'region', 'region_name',
+                                    'station_id', 'station_name', 'sub_region', 'distance_meters', 'weight']
+        np.testing.assert_allclose(df.groupby('reference_point_id')['weight'].sum(), 1.0)
+        assert df['reference_point_id'].min() >= 5000
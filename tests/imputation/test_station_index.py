@@ -0,0 +1,104 @@
+"""Tests for the persisted station spatial index."""
+
+import shutil
+
+import geopandas as gpd
+import numpy as np
+import pytest
+
+from src.config import REGION_CONFIG, TIDE_STATIONS_DIR
+from src.imputation.data_loader import GaugeStationLoader
+from src.imputation.spatial_ops import EARTH_RADIUS_METERS, NearestGaugeFinder
+from src.imputation.station_index import StationIndex, load_station_index, station_config_hash
+
+@pytest.fixture
+def station_config(tmp_path):
+    """Copy of the station registry that tests may modify."""
+    stations_dir = tmp_path / "tide_stations"
+    shutil.copytree(TIDE_STATIONS_DIR, stations_dir)
+    region_config = tmp_path / "region_mappings.yaml"
+    shutil.copy(REGION_CONFIG, region_config)
+    return stations_dir, region_config
+
+def haversine_meters(lon1, lat1, lon2, lat2):
+    """Great-circle distance on the index sphere."""
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * np.arcsin(np.sqrt(a))
+
+class TestStationIndex:
+    """Test suite for StationIndex persistence and queries."""
+
+    def test_roundtrip_memory_mapped(self, tmp_path, station_config):
+        """Saved indexes load memory-mapped with identical arrays and trees."""
+        index = StationIndex.build(*station_config)
+        loaded = StationIndex.load(index.save(tmp_path / "index"))
+
+        assert loaded.config_hash == index.config_hash
+        assert isinstance(loaded.vectors, np.memmap)
+        np.testing.assert_array_equal(loaded.station_ids, index.station_ids)
+        np.testing.assert_array_equal(loaded.vectors, index.vectors)
+        assert set(loaded.trees) == set(index.trees)
+        assert len(loaded) == len(GaugeStationLoader().load())
+
+    def test_hash_tracks_station_yaml(self, station_config):
+        """Editing a station YAML changes the hash and triggers a rebuild."""
+        stations_dir, region_config = station_config
+        before = station_config_hash(stations_dir, region_config)
+        assert station_config_hash(stations_dir, region_config) == before
+
+        station_file = stations_dir / "hawaii_tide_stations.yaml"
+        station_file.write_text(station_file.read_text() + "\n# edited\n")
+        assert station_config_hash(stations_dir, region_config) != before
+
+    def test_load_reuses_persisted_index(self, tmp_path, station_config, monkeypatch):
+        """A matching persisted index is loaded without rebuilding."""
+        first = load_station_index(tmp_path / "index", *station_config)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("index was rebuilt")
+
+        monkeypatch.setattr(StationIndex, "build", fail)
+        second = load_station_index(tmp_path / "index", *station_config)
+        assert second.config_hash == first.config_hash
+        assert list((tmp_path / "index").iterdir()) == [tmp_path / "index" / first.config_hash]
+
+    def test_query_matches_brute_force(self, tmp_path, station_config):
+        """Region and subregion queries return the nearest stations by great-circle distance."""
+        index = load_station_index(tmp_path / "index", *station_config)
+        rng = np.random.default_rng(0)
+        lon, lat = rng.uniform(-165, -135, 200), rng.uniform(55, 65, 200)
+
+        for region, sub_region in [(None, None), ('alaska', None)] + [
+            ('alaska', s) for s in np.unique(index.sub_regions[index.regions == 'alaska'])
+        ]:
+            distances, stations = index.query(lon, lat, k=3, region=region, sub_region=sub_region)
+            key_mask = np.ones(len(index), dtype=bool) if region is None else index.regions == region
+            if sub_region is not None:
+                key_mask &= index.sub_regions == sub_region
+            candidates = np.flatnonzero(key_mask)
+            exact = haversine_meters(lon[:, None], lat[:, None], index.lon[candidates], index.lat[candidates])
+
+            k = min(3, len(candidates))
+            np.testing.assert_allclose(distances[:, :k], np.sort(exact, axis=1)[:, :k], rtol=1e-9)
+            assert np.isin(stations[:, :k], candidates).all()
+            assert (stations[:, k:] == -1).all() and np.isinf(distances[:, k:]).all()
+
+    def test_finder_uses_index_trees(self, tmp_path, station_config):
+        """NearestGaugeFinder gives the same neighbors with the persisted trees."""
+        index = load_station_index(tmp_path / "index", *station_config)
+        gauge_stations = GaugeStationLoader().load()
+        rng = np.random.default_rng(1)
+        geometry = gpd.points_from_xy(rng.uniform(-165, -135, 200), rng.uniform(55, 65, 200))
+        points = gpd.GeoDataFrame({'county_fips': ['02020'] * 200, 'state_code': ['AK'] * 200},
+                                geometry=geometry, crs="EPSG:4326")
+
+        finder = NearestGaugeFinder(backend='sphere', station_index=index)
+        calls = []
+        finder._query_neighbors = lambda *args: calls.append(args)
+        with_index = finder.find_nearest(points, gauge_stations, 'alaska')
+        without_index = NearestGaugeFinder(backend='sphere').find_nearest(points, gauge_stations, 'alaska')
+
+        assert not calls
+        np.testing.assert_array_equal(with_index.station_index, without_index.station_index)
+        np.testing.assert_allclose(with_index.distances, without_index.distances)
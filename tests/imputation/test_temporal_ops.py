@@ -0,0 +1,143 @@
+"""Tests for the memory-mapped gauge matrix and blockwise water level imputation."""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from scipy import sparse
+
+from src.imputation.temporal_ops import GaugeMatrix, WaterLevelProcessor, impute_block
+from src.noaa.historical.water_level_store import SCHEMA, WaterLevelStore
+
+PRODUCT = 'hourly_height'
+DATUM = 'STND'
+
+def write_station_year(store_dir, station_id, year, timestamps, heights):
+    """Write a station-year parquet file in the water level store layout."""
+    path = store_dir / PRODUCT / DATUM / station_id / f"{year}.parquet"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    frame = pd.DataFrame({
+        'timestamp': pd.DatetimeIndex(timestamps).as_unit('ns'),
+        'height': np.asarray(heights, dtype=np.float32),
+        'tide_type': np.full(len(heights), -1, dtype=np.int8)
+    })
+    pq.write_table(pa.Table.from_pandas(frame, schema=SCHEMA, preserve_index=False), path)
+
+@pytest.fixture
+def store_dir(tmp_path):
+    """Two stations of hourly data over a year boundary, with a gap at station B."""
+    store_dir = tmp_path / "water_levels"
+    for year, first, periods in ((2020, "2020-12-31 20:00", 4), (2021, "2021-01-01", 6)):
+        times = pd.date_range(first, periods=periods, freq='1h', tz='UTC')
+        write_station_year(store_dir, 'A', year, times, np.arange(len(times), dtype=float) + year)
+        heights = np.full(len(times), 10.0)
+        heights[1] = np.nan
+        write_station_year(store_dir, 'B', year, times, heights)
+    return store_dir
+
+@pytest.fixture
+def structure_file(tmp_path):
+    """Imputation structure of two points: one on A and B, one on A, B and a station without data."""
+    structure = pd.DataFrame({
+        'reference_point_id': [1, 1, 2, 2, 2],
+        'county_fips': ['01001'] * 5,
+        'station_id': ['A', 'B', 'A', 'B', 'C'],
+        'weight': [0.75, 0.25, 0.25, 0.25, 0.5],
+        'region': ['gulf_coast'] * 5
+    })
+    path = tmp_path / "imputation_structure.parquet"
+    structure.to_parquet(path, index=False)
+    return path
+
+class TestGaugeMatrix:
+    """Test suite for binning stored observations onto a time grid."""
+
+    def test_build_bins_and_gaps(self, tmp_path, store_dir):
+        """Sub-hourly readings are averaged, gaps stay NaN and the matrix is memory-mapped."""
+        write_station_year(store_dir, 'C', 2021,
+                           pd.to_datetime(['2021-01-01 00:00', '2021-01-01 00:30', '2021-01-01 02:06'], utc=True),
+                           [1.0, 2.0, 5.0])
+        store = WaterLevelStore(store_dir=store_dir, product=PRODUCT)
+        times = GaugeMatrix.time_grid(datetime(2020, 12, 31, 22), datetime(2021, 1, 1, 3), '1h')
+        gauges = GaugeMatrix.build(store, ['A', 'B', 'C', 'D'], times, tmp_path / "gauges.npy")
+
+        assert isinstance(gauges.values, np.memmap)
+        assert gauges.values.dtype == np.float32
+        assert gauges.shape == (4, 6)
+        assert gauges.times.equals(times)
+        np.testing.assert_array_equal(gauges.values[0], [2022, 2023, 2021, 2022, 2023, 2024])
+        np.testing.assert_array_equal(gauges.values[1, :3], [10, 10, 10])
+        assert np.isnan(gauges.values[1, 3])
+        np.testing.assert_array_equal(gauges.values[2], [np.nan, np.nan, 1.5, np.nan, 5.0, np.nan])
+        assert np.isnan(gauges.values[3]).all()
+
+    def test_load_or_build_reuses_until_store_changes(self, tmp_path, store_dir):
+        """A matching matrix is reopened; new station-years trigger a rebuild."""
+        store = WaterLevelStore(store_dir=store_dir, product=PRODUCT)
+        times = GaugeMatrix.time_grid(datetime(2021, 1, 1), datetime(2021, 1, 1, 5), '1h')
+        path = tmp_path / "gauges.npy"
+        GaugeMatrix.load_or_build(store, ['A', 'C'], times, path)
+        built = path.stat().st_mtime_ns
+
+        GaugeMatrix.load_or_build(store, ['A', 'C'], times, path)
+        assert path.stat().st_mtime_ns == built
+
+        write_station_year(store_dir, 'C', 2021, times[:2], [3.0, 4.0])
+        gauges = GaugeMatrix.load_or_build(store, ['A', 'C'], times, path)
+        np.testing.assert_array_equal(gauges.values[1, :2], [3.0, 4.0])
+
+    def test_non_fixed_frequency(self):
+        """Calendar frequencies cannot define a regular grid."""
+        with pytest.raises(ValueError):
+            GaugeMatrix.time_grid(datetime(2020, 1, 1), datetime(2021, 1, 1), 'MS')
+
+class TestWaterLevelProcessor:
+    """Test suite for blockwise imputation streamed to parquet."""
+
+    def test_impute_block_renormalizes(self):
+        """Missing readings drop out of the weighted average; rows without data are NaN."""
+        weights = sparse.csr_matrix(np.array([[0.5, 0.5], [0.0, 1.0]]))
+        block = np.array([[1.0, 2.0, np.nan], [3.0, np.nan, np.nan]], dtype=np.float32)
+        levels = impute_block(weights, block)
+        np.testing.assert_allclose(levels[0], [2.0, 2.0, np.nan])
+        np.testing.assert_allclose(levels[1], [3.0, np.nan, np.nan])
+
+    @pytest.mark.parametrize("block_values", [1, 4, 1000])
+    def test_process_matches_dense_average(self, tmp_path, store_dir, structure_file, block_values):
+        """Streamed output equals a dense NaN-aware weighted average for any block size."""
+        processor = WaterLevelProcessor(structure_file, tmp_path / "output", block_values=block_values)
+        output = processor.process_water_levels(store_dir, tmp_path / "output" / "levels.parquet")
+        result = pd.read_parquet(output)
+
+        assert list(result.columns) == ['reference_point_id', 'timestamp', 'water_level']
+
+        wide = result.pivot(index='timestamp', columns='reference_point_id', values='water_level')
+        assert wide.index.min() == pd.Timestamp('2020-12-31 20:00', tz='UTC')
+        assert wide.index.max() == pd.Timestamp('2021-01-01 05:00', tz='UTC')
+
+        a = pd.Series(np.r_[2020 + np.arange(4), 2021 + np.arange(6)],
+                      index=pd.date_range('2020-12-31 20:00', periods=10, freq='1h', tz='UTC'))
+        b = pd.Series(10.0, index=a.index)
+        b.iloc[[1, 5]] = np.nan
+        for point, (wa, wb) in {1: (0.75, 0.25), 2: (0.25, 0.25)}.items():
+            expected = (wa * a + wb * b.fillna(0)) / (wa + wb * b.notna())
+            present = wide[point].reindex(a.index)
+            np.testing.assert_allclose(present, expected, rtol=1e-6)
+
+        # Hours 2021-01-01 06:00 onwards up to 23:00 have no data at all and are omitted
+        assert len(result) == 2 * 10
+
+    def test_counties_and_date_window(self, tmp_path, store_dir, structure_file):
+        """County weights aggregate every row of the county over the requested window."""
+        processor = WaterLevelProcessor(structure_file, tmp_path / "output", kind='counties')
+        output = processor.process_water_levels(store_dir, tmp_path / "counties.parquet",
+                                                start_date=datetime(2021, 1, 1, 1),
+                                                end_date=datetime(2021, 1, 1, 2))
+        result = pd.read_parquet(output)
+
+        assert list(result['county_fips']) == ['01001', '01001']
+        # A: weight 1.0, B: weight 0.5 (missing at 01:00), C: no data
+        np.testing.assert_allclose(result['water_level'], [2022.0, (2023.0 + 0.5 * 10) / 1.5], rtol=1e-6)
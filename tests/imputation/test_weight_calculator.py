@@ -0,0 +1,94 @@
+"""Tests for batch gauge weighting."""
+
+import numpy as np
+import pytest
+
+from src.imputation.weight_calculator import WEIGHT_METHODS, WeightCalculator
+
+def reference_idw(distances, max_distance, power, min_weight):
+    """Per-row inverse distance weights as computed one mapping at a time."""
+    keep = distances <= max_distance
+    if not keep.any():
+        keep = np.ones_like(distances, dtype=bool)
+    weights = 1 / np.maximum(distances[keep], 1.0) ** power
+    weights = weights / weights.sum()
+    weights = np.maximum(weights, min_weight)
+    return keep, weights / weights.sum()
+
+@pytest.fixture
+def distance_matrix():
+    """Sorted neighbor distances with padding and out-of-range rows."""
+    rng = np.random.default_rng(0)
+    distances = np.sort(rng.uniform(0, 250000, (500, 3)), axis=1)
+    distances[:10] = [150000, 200000, 250000]   # nothing in range
+    distances[10:20, 0] = 0.0                     # station at the point
+    distances[20:40, 2] = np.inf                  # only two neighbors
+    return distances
+
+class TestWeightCalculator:
+    """Test suite for WeightCalculator.calculate_weight_matrix."""
+
+    def test_idw_matches_per_row(self, distance_matrix):
+        """Batch IDW reproduces the row-by-row rules."""
+        calculator = WeightCalculator(max_distance_meters=100000, power=2, min_weight=0.1)
+        weights, keep = calculator.calculate_weight_matrix(distance_matrix)
+
+        for row, distances in enumerate(distance_matrix):
+            finite = np.isfinite(distances)
+            expected_keep, expected = reference_idw(distances[finite], 100000, 2, 0.1)
+            np.testing.assert_array_equal(keep[row, finite], expected_keep)
+            np.testing.assert_allclose(weights[row, finite][expected_keep], expected)
+        assert not keep[~np.isfinite(distance_matrix)].any()
+
+    @pytest.mark.parametrize("method", WEIGHT_METHODS)
+    def test_rows_normalized_and_decreasing(self, distance_matrix, method):
+        """Every method gives normalized, non-increasing weights over sorted distances."""
+        calculator = WeightCalculator(max_distance_meters=100000, min_weight=0.0, method=method)
+        weights, keep = calculator.calculate_weight_matrix(distance_matrix)
+
+        np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+        assert (weights[~keep] == 0).all()
+        kept = np.where(keep, weights, -np.inf)
+        assert (np.diff(kept[keep.all(axis=1)], axis=1) <= 1e-12).all()
+
+    def test_kernels(self):
+        """Gaussian, linear and hybrid kernels follow their definitions."""
+        distances = np.array([[10000.0, 30000.0, 60000.0]])
+        calculator = WeightCalculator(max_distance_meters=100000, power=2, min_weight=0.0,
+                                      bandwidth_meters=40000)
+
+        gaussian = np.exp(-0.5 * (distances[0] / 40000) ** 2)
+        linear = 1 - distances[0] / 100000
+        hybrid = distances[0] ** -2 * gaussian
+        for method, raw in [('gaussian', gaussian), ('linear', linear), ('hybrid', hybrid)]:
+            weights, _ = calculator.calculate_weight_matrix(distances, method=method)
+            np.testing.assert_allclose(weights[0], raw / raw.sum())
+
+    def test_linear_out_of_range_falls_back_to_idw(self):
+        """Points whose stations are all beyond range still get distance-based weights."""
+        distances = np.array([[150000.0, 300000.0]])
+        linear = WeightCalculator(max_distance_meters=100000, min_weight=0.0, method='linear')
+        idw = WeightCalculator(max_distance_meters=100000, min_weight=0.0)
+
+        np.testing.assert_allclose(linear.calculate_weight_matrix(distances)[0],
+                                   idw.calculate_weight_matrix(distances)[0])
+
+    def test_calculate_weights_batches_mappings(self):
+        """List-of-mappings weighting uses the matrix path and drops empty mappings."""
+        mappings = [
+            {'county_fips': '1', 'mappings': [{'station_id': 'a', 'distance_meters': 1000.0},
+                                              {'station_id': 'b', 'distance_meters': 250000.0}]},
+            {'county_fips': '2', 'mappings': []},
+            {'county_fips': '3', 'mappings': [{'station_id': 'c', 'distance_meters': 5000.0}]},
+        ]
+        result = WeightCalculator(max_distance_meters=100000).calculate_weights(mappings)
+
+        assert [m['county_fips'] for m in result] == ['1', '3']
+        assert [m['station_id'] for m in result[0]['mappings']] == ['a']
+        assert result[0]['mappings'][0]['weight'] == 1.0
+        assert result[1]['mappings'][0]['weight'] == 1.0
+
+    def test_unknown_method(self):
+        """Undeclared methods are rejected."""
+        with pytest.raises(ValueError):
+            WeightCalculator(method='kriging')
@@ -0,0 +1,97 @@
+"""Tests for sparse imputation weight matrices."""
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.assignment.historical.combine_imputation import combine_imputation_files
+from src.imputation.data_loader import GaugeStationLoader
+from src.imputation.main import process_region
+from src.imputation.weight_matrix import MATRIX_FILES, WeightMatrix
+
+@pytest.fixture(scope="module")
+def structure():
+    """Imputation structure for random Alaska and Hawaii points."""
+    rng = np.random.default_rng(0)
+    stations = GaugeStationLoader().load()
+    frames = []
+    for region, state_code, lat_range, lon_range in [
+        ('alaska', 'AK', (55, 65), (-165, -135)),
+        ('hawaii', 'HI', (19.5, 21.5), (-159, -155)),
+    ]:
+        points = gpd.GeoDataFrame(
+            {'county_fips': rng.choice([f'{state_code}{i}' for i in range(8)], 200), 'state_code': state_code},
+            geometry=gpd.points_from_xy(rng.uniform(*lon_range, 200), rng.uniform(*lat_range, 200)),
+            index=pd.RangeIndex(len(frames) * 1000, len(frames) * 1000 + 200),
+            crs="EPSG:4326"
+        )
+        frames.append(process_region(region, {'name': region, 'state_codes': [state_code]}, points, stations))
+    return pd.concat(frames, ignore_index=True)
+
+@pytest.fixture(scope="module")
+def flood_days(structure):
+    """Station x year flood days with some gaps."""
+    rng = np.random.default_rng(1)
+    stations = structure['station_id'].unique()
+    frame = pd.DataFrame({
+        'station_id': np.repeat(stations, 3),
+        'year': np.tile([2000, 2010, 2020], len(stations)),
+        'flood_days': rng.integers(0, 20, 3 * len(stations)).astype(float)
+    })
+    frame.loc[rng.random(len(frame)) < 0.2, 'flood_days'] = np.nan
+    return frame
+
+class TestWeightMatrix:
+    """Test suite for WeightMatrix construction, persistence and aggregation."""
+
+    def test_points_matrix(self, structure):
+        """Point rows hold the summed weights of every mapping row of the point."""
+        matrix = WeightMatrix.from_structure(structure, 'points')
+        expected = structure.groupby('reference_point_id')['weight'].sum()
+
+        assert matrix.shape == (structure['reference_point_id'].nunique(), structure['station_id'].nunique())
+        np.testing.assert_array_equal(matrix.row_ids, expected.index)
+        np.testing.assert_allclose(np.asarray(matrix.matrix.sum(axis=1)).ravel(), expected.to_numpy())
+
+    def test_county_aggregation_matches_merge(self, structure, flood_days):
+        """One sparse product reproduces the merge-and-groupby weighted average."""
+        matrix = WeightMatrix.from_structure(structure, 'counties')
+        result = matrix.aggregate_long(flood_days, 'flood_days', 'year')
+
+        merged = structure.merge(flood_days.dropna(), on='station_id')
+        merged['weighted'] = merged['weight'] * merged['flood_days']
+        expected = merged.groupby(['county_fips', 'year'])[['weighted', 'weight']].sum()
+        expected = (expected['weighted'] / expected['weight']).rename('flood_days').reset_index()
+
+        result = result.sort_values(['county_fips', 'year']).reset_index(drop=True)
+        expected = expected.sort_values(['county_fips', 'year']).reset_index(drop=True)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_names=False)
+
+    def test_roundtrip(self, tmp_path, structure):
+        """Saved matrices load with identical weights and index arrays."""
+        matrix = WeightMatrix.from_structure(structure, 'counties')
+        loaded = WeightMatrix.load(matrix.save(tmp_path / "counties.npz"))
+
+        assert loaded.row_label == 'county_fips'
+        np.testing.assert_array_equal(loaded.row_ids, matrix.row_ids)
+        np.testing.assert_array_equal(loaded.station_ids, matrix.station_ids)
+        assert (loaded.matrix != matrix.matrix).nnz == 0
+
+    def test_combine_emits_matrices(self, tmp_path, structure):
+        """Combining regional files also writes both matrices beside the combined table."""
+        data_dir = tmp_path / "data"
+        data_dir.mkdir()
+        for region, frame in structure.groupby('region'):
+            frame.to_parquet(data_dir / f"imputation_structure_{region}_20250101_000000.parquet")
+
+        combine_imputation_files(data_dir, tmp_path / "imputation_structure_all_regions.parquet")
+        for kind, filename in MATRIX_FILES.items():
+            loaded = WeightMatrix.load(tmp_path / filename)
+            assert loaded.matrix.nnz > 0
+            assert loaded.shape[1] == structure['station_id'].nunique()
+
+    def test_unknown_kind(self, structure):
+        """Unknown matrix kinds are rejected."""
+        with pytest.raises(ValueError):
+            WeightMatrix.from_structure(structure, 'states')
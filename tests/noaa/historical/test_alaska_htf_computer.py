@@ -0,0 +1,117 @@
+"""Tests for Alaska flood day computation from stored water levels."""
+
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+
+from src.noaa.core.noaa_client import NOAAApiError
+from src.noaa.historical.alaska_htf_computer import AlaskaHTFComputer
+from src.noaa.historical.water_level_store import WaterLevelStore
+
+def high_low_records(year, peak=20.0):
+    """Two tides per day for January with one peak day."""
+    records = []
+    for day in range(1, 32):
+        high = peak if day == 15 else 10.0
+        records.append({'t': f'{year}-01-{day:02d} 04:00', 'v': f'{high:.3f}', 'ty': 'HH', 'f': '0,0'})
+        records.append({'t': f'{year}-01-{day:02d} 10:00', 'v': '1.000', 'ty': ' L', 'f': '0,0'})
+    records.append({'t': f'{year}-01-31 16:00', 'v': '', 'ty': 'H ', 'f': '1,0'})
+    return records
+
+@pytest.fixture
+def client():
+    """Mock client with data for every year except 1995 and a failure for 1996."""
+    client = Mock()
+    def fetch(station, begin_date, end_date, **kwargs):
+        year = int(begin_date[:4])
+        if year == 1995:
+            return []
+        if year == 1996:
+            raise NOAAApiError("Service unavailable")
+        return high_low_records(year)
+    client.fetch_water_levels.side_effect = fetch
+    return client
+
+class TestAlaskaHTFComputer:
+    """Test suite for AlaskaHTFComputer."""
+
+    def test_reads_through_store(self, tmp_path, client):
+        """Reference and target years overlapping are fetched only once."""
+        store = WaterLevelStore(store_dir=tmp_path, client=client)
+        computer = AlaskaHTFComputer(reference_start=2000, reference_end=2004, store=store)
+
+        df = computer.compute_all_stations(2003, 2006, station_ids=['9455920'])
+
+        fetched = [c.args for c in client.fetch_water_levels.call_args_list if c.args[0] == '9455920']
+        assert len(fetched) == 7
+        assert computer.stations['9455920'].threshold_source == 'percentile_99'
+        assert list(df['flood_days']) == [1, 1, 1, 1]
+
+    def test_concurrent_output_is_deterministic(self, tmp_path, client):
+        """Concurrent station processing returns the same rows in the same order as a serial run."""
+        station_ids = ['9455920', '9451054', '9462620']
+        serial = AlaskaHTFComputer(reference_start=2000, reference_end=2004, max_workers=1,
+                                   store=WaterLevelStore(store_dir=tmp_path / "a", client=client))
+        threaded = AlaskaHTFComputer(reference_start=2000, reference_end=2004, max_workers=4,
+                                     store=WaterLevelStore(store_dir=tmp_path / "b", client=client))
+
+        expected = serial.compute_all_stations(2001, 2004, station_ids=station_ids)
+        result = threaded.compute_all_stations(2001, 2004, station_ids=station_ids)
+
+        pd.testing.assert_frame_equal(result, expected)
+        assert list(result['station_id'].unique()) == station_ids
+
+    def test_checkpoint_and_resume(self, tmp_path, client):
+        """Finished stations are checkpointed; resume reuses them and retries incomplete ones."""
+        station_ids = ['9455920', '9451054']
+        store = WaterLevelStore(store_dir=tmp_path / "store", client=client)
+        computer = AlaskaHTFComputer(reference_start=2000, reference_end=2004, store=store,
+                                     checkpoint_dir=tmp_path / "checkpoints")
+        expected = computer.compute_all_stations(2001, 2004, station_ids=station_ids)
+        assert computer.checkpoint_path('9455920').exists()
+
+        calls = client.fetch_water_levels.call_count
+        resumed = AlaskaHTFComputer(reference_start=2000, reference_end=2004, store=store,
+                                    checkpoint_dir=tmp_path / "checkpoints")
+        result = resumed.compute_all_stations(2001, 2004, station_ids=station_ids, resume=True)
+        pd.testing.assert_frame_equal(result, expected)
+        assert client.fetch_water_levels.call_count == calls
+
+        # A failed year (1996) leaves the station without a checkpoint
+        computer.checkpoint_dir = tmp_path / "retry"
+        computer.compute_all_stations(1996, 1997, station_ids=['9451054', '9455920'], compute_thresholds=False)
+        assert not computer.checkpoint_path('9451054').exists()
+        assert not computer.checkpoint_path('9455920').exists()
+
+    def test_checkpoint_tracks_tier_thresholds(self, tmp_path, client):
+        """Checkpoints computed with other severity offsets are not resumed."""
+        store = WaterLevelStore(store_dir=tmp_path / "store", client=client)
+        computer = AlaskaHTFComputer(reference_start=2000, reference_end=2004, store=store,
+                                     checkpoint_dir=tmp_path / "checkpoints",
+                                     severity_offsets={'moderate': 3.0})
+        computer.compute_all_stations(2001, 2002, station_ids=['9451054'])
+        assert computer._load_checkpoint('9451054', [2001, 2002]) is not None
+
+        computer.severity_offsets['moderate'] = 2.0
+        assert computer._load_checkpoint('9451054', [2001, 2002]) is None
+        computer.severity_offsets['moderate'] = 3.0
+        computer.stations['9451054'].threshold_used += 0.5
+        assert computer._load_checkpoint('9451054', [2001, 2002]) is None
+
+    def test_severity_tiers(self, tmp_path, client):
+        """Severity offsets add NOAA-style tier counts that sum to flood days."""
+        store = WaterLevelStore(store_dir=tmp_path, client=client)
+        computer = AlaskaHTFComputer(reference_start=2000, reference_end=2004, store=store,
+                                     severity_offsets={'moderate': 3.0, 'king': 20.0})
+        df = computer.compute_all_stations(2003, 2004, station_ids=['9451054', '9455920'])
+
+        # Sitka's NWS minor threshold is 16.76 ft; the January peak is 20 ft
+        sitka = df[df['station_id'] == '9451054']
+        assert list(sitka['minCount']) == [0, 0]
+        assert list(sitka['modCount']) == [1, 1]
+        assert sitka['majCount'].isna().all()
+        assert list(sitka['nanCount']) == [365 - 31, 366 - 31]
+        assert (df['minCount'] + df['modCount'] + df['kingCount'] == df['flood_days']).all()
+
+        with pytest.raises(ValueError):
+            AlaskaHTFComputer(store=store, severity_offsets={'moderate': -1.0})
@@ -0,0 +1,83 @@
+"""Tests for mergeable high tide height sketches."""
+
+import numpy as np
+import pytest
+from unittest.mock import Mock
+
+from src.noaa.historical.alaska_htf_computer import AlaskaHTFComputer
+from src.noaa.historical.height_sketch import HeightSketch, merge_sketches
+from src.noaa.historical.water_level_store import WaterLevelStore
+
+def yearly_records(station, year):
+    """One high and one low tide per day."""
+    rng = np.random.default_rng(year)
+    records = []
+    for day, height in enumerate(rng.normal(12.0, 2.0, 365)):
+        date = np.datetime64(f'{year}-01-01') + day
+        records.append({'t': f'{date} 03:00', 'v': f'{height:.3f}', 'ty': 'HH'})
+        records.append({'t': f'{date} 09:00', 'v': '0.500', 'ty': 'LL'})
+    return records
+
+@pytest.fixture
+def store(tmp_path):
+    """Store backed by a mock client."""
+    client = Mock()
+    client.fetch_water_levels.side_effect = lambda station, begin_date, end_date, **kw: (
+        yearly_records(station, int(begin_date[:4]))
+    )
+    return WaterLevelStore(store_dir=tmp_path, client=client)
+
+class TestHeightSketch:
+    """Test suite for HeightSketch."""
+
+    def test_quantiles_within_error_bound(self):
+        """Estimates stay within half a bin of np.percentile."""
+        heights = np.random.default_rng(0).gamma(2.0, 3.0, 20000)
+        sketch = HeightSketch.from_heights(np.r_[heights, np.nan], resolution=0.05)
+        percentiles = [0, 1, 25, 50, 90, 99, 99.9, 100]
+
+        assert sketch.count == len(heights)
+        assert sketch.error_bound == pytest.approx(0.025)
+        error = np.abs(sketch.quantiles(percentiles) - np.percentile(heights, percentiles))
+        assert (error <= sketch.error_bound + 1e-9).all()
+        assert sketch.quantiles([0, 100]).tolist() == [heights.min(), heights.max()]
+
+    def test_merge_equals_sketch_of_union(self):
+        """Merging yearly sketches gives the sketch of all observations."""
+        rng = np.random.default_rng(1)
+        parts = [rng.normal(10 + i, 2, 500) for i in range(3)]
+        merged = merge_sketches(HeightSketch.from_heights(p) for p in parts)
+        whole = HeightSketch.from_heights(np.concatenate(parts))
+
+        np.testing.assert_array_equal(merged.bins, whole.bins)
+        np.testing.assert_array_equal(merged.counts, whole.counts)
+        assert (merged.minimum, merged.maximum) == (whole.minimum, whole.maximum)
+        assert np.isnan(HeightSketch.empty().quantiles([99])).all()
+
+        with pytest.raises(ValueError):
+            HeightSketch.from_heights(parts[0], 0.1).merge(HeightSketch.from_heights(parts[1], 0.01))
+
+    def test_store_keeps_sketch_per_station_year(self, store):
+        """Sketches are written with each station-year and record their error bound."""
+        store.get_year('9455920', 2001)
+        path = store.sketch_path('9455920', 2001)
+        assert path.exists()
+        assert float(np.load(path)['error_bound']) == pytest.approx(0.005)
+
+        # Rebuilt from stored observations when missing
+        path.unlink()
+        sketch = store.get_sketch('9455920', 2001)
+        assert path.exists() and sketch.count == 365
+        assert store.client.fetch_water_levels.call_count == 1
+
+    def test_computer_sketch_thresholds(self, store, tmp_path):
+        """Sketch thresholds match exact thresholds within the error bound."""
+        exact = AlaskaHTFComputer(reference_start=2000, reference_end=2003, store=store)
+        sketched = AlaskaHTFComputer(reference_start=2000, reference_end=2003, store=store, use_sketches=True)
+
+        threshold = sketched.compute_percentile_threshold('9455920')
+        assert threshold == pytest.approx(exact.compute_percentile_threshold('9455920'), abs=0.005)
+
+        sketched.compute_all_thresholds()
+        report = sketched.save_threshold_report(tmp_path)
+        assert 'percentile_error_bound_ft' in report.read_text().splitlines()[0]
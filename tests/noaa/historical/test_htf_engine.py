@@ -0,0 +1,135 @@
+"""Tests for the threshold-exceedance HTF engine."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from unittest.mock import Mock
+
+from src.noaa.core.cache_manager import NOAACache
+from src.noaa.historical.htf_engine import HTFEngine, ThresholdSpec
+from src.noaa.historical.water_level_store import WaterLevelStore
+
+STATION_IDS = ['8638610', '8571892']
+
+def daily_heights(station, year):
+    """Deterministic daily peak heights for a station-year."""
+    days = pd.date_range(f'{year}-01-01', f'{year}-12-31', freq='D')
+    rng = np.random.default_rng(int(station) % 997 + year)
+    return days, np.round(rng.normal(11.0, 1.0, len(days)), 3)
+
+def high_low_records(station, begin_date, end_date, product='high_low', **kwargs):
+    """Two high tides and one low tide per day; the second high is the daily peak."""
+    days, peaks = daily_heights(station, int(begin_date[:4]))
+    records = []
+    for day, peak in zip(days, peaks):
+        if product == 'hourly_height':
+            records.extend({'t': f'{day:%Y-%m-%d} {hour:02d}:00', 'v': f'{peak - abs(hour - 12) * 0.1:.3f}'}
+                           for hour in range(24))
+        else:
+            records.append({'t': f'{day:%Y-%m-%d} 02:00', 'v': f'{peak - 1:.3f}', 'ty': 'H '})
+            records.append({'t': f'{day:%Y-%m-%d} 08:00', 'v': '1.000', 'ty': 'LL'})
+            records.append({'t': f'{day:%Y-%m-%d} 14:00', 'v': f'{peak:.3f}', 'ty': 'HH'})
+    return records
+
+@pytest.fixture
+def cache(tmp_path):
+    """Cache with a two-station registry."""
+    config_dir = tmp_path / "config"
+    (config_dir / "tide_stations").mkdir(parents=True)
+    with open(config_dir / "noaa_api_settings.yaml", 'w') as f:
+        yaml.dump({'cache': {'directory': 'data/cache', 'data_types': ['historical', 'projected']}}, f)
+    stations = {sid: {'name': f'Station {sid}', 'location': {'lat': 0.0, 'lon': 0.0}, 'region': 'Test'}
+                for sid in STATION_IDS}
+    with open(config_dir / "tide_stations" / "test_tide_stations.yaml", 'w') as f:
+        yaml.dump({'stations': stations}, f)
+    return NOAACache(config_dir=config_dir)
+
+@pytest.fixture
+def client():
+    """Mock client with water levels and metadata (no moderate NWS level)."""
+    client = Mock()
+    client.fetch_water_levels.side_effect = high_low_records
+    client.fetch_station_metadata.return_value = {
+        'datums': {'MHHW': 10.0, 'MSL': 6.0},
+        'flood_levels': {'nws_minor': 12.0, 'nws_moderate': None, 'nws_major': 14.0}
+    }
+    return client
+
+class TestHTFEngine:
+    """Test suite for HTFEngine."""
+
+    def test_threshold_spec(self):
+        """Specs parse from the command line form and validate their fields."""
+        assert ThresholdSpec.parse('nws:moderate') == ThresholdSpec('nws', tier='moderate')
+        assert ThresholdSpec.parse('percentile:99@2000-2010').reference_end == 2010
+        assert ThresholdSpec.parse('mhhw_offset:1.5').label == 'mhhw_offset_1.5'
+        assert ThresholdSpec('percentile', 99.0).label == 'percentile_99'
+
+        with pytest.raises(ValueError):
+            ThresholdSpec('nws', tier='extreme')
+        with pytest.raises(ValueError):
+            ThresholdSpec.parse('mhhw_offset')
+        with pytest.raises(ValueError):
+            ThresholdSpec('median', 50)
+
+    def test_counts_match_daily_maxima(self, tmp_path, cache, client):
+        """Every threshold kind matches a direct count of daily peaks."""
+        specs = [ThresholdSpec('nws'), ThresholdSpec('nws', tier='moderate'),
+                 ThresholdSpec('mhhw_offset', 1.5), ThresholdSpec.parse('percentile:90@2000-2001')]
+        engine = HTFEngine(cache=cache, store=WaterLevelStore(store_dir=tmp_path / "store", client=client),
+                           max_workers=2)
+        df = engine.compute(specs, 2002, 2003, station_ids=STATION_IDS)
+
+        assert len(df) == len(STATION_IDS) * len(specs) * 2
+        assert list(df['station_name'].unique()) == [f'Station {sid}' for sid in STATION_IDS]
+        assert df.loc[df['threshold'] == 'nws_moderate', 'flood_days'].isna().all()
+        assert (df['observations'] == 2 * 365).all()
+
+        for row in df[df['flood_days'].notna()].itertuples(index=False):
+            if row.threshold == 'percentile_90':
+                reference = np.concatenate([np.r_[p - 1, p] for year in (2000, 2001)
+                                            for p in [daily_heights(row.station_id, year)[1]]])
+                assert row.threshold_ft == pytest.approx(np.percentile(reference.astype(np.float32), 90))
+            else:
+                assert row.threshold_ft == {'nws_minor': 12.0, 'mhhw_offset_1.5': 11.5}[row.threshold]
+            peaks = daily_heights(row.station_id, row.year)[1].astype(np.float32)
+            assert row.flood_days == int((peaks >= np.float32(row.threshold_ft)).sum())
+
+        # Metadata is fetched once per station and then served from cache
+        assert client.fetch_station_metadata.call_count == len(STATION_IDS)
+        HTFEngine(cache=cache, store=engine.store).compute(specs[:1], 2002, 2002, station_ids=STATION_IDS)
+        assert client.fetch_station_metadata.call_count == len(STATION_IDS)
+
+    def test_hourly_product(self, tmp_path, cache, client):
+        """Hourly heights use every observation's daily maximum."""
+        store = WaterLevelStore(store_dir=tmp_path / "store", client=client, product='hourly_height')
+        df = HTFEngine(cache=cache, store=store).compute([ThresholdSpec('mhhw_offset', 1.0)], 2005, 2005,
+                                                         station_ids=STATION_IDS[:1])
+
+        peaks = daily_heights(STATION_IDS[0], 2005)[1].astype(np.float32)
+        assert df['flood_days'].iloc[0] == int((peaks >= 11.0).sum())
+        assert df['observations'].iloc[0] == 24 * 365
+        assert client.fetch_water_levels.call_args.kwargs['product'] == 'hourly_height'
+
+    def test_severity_counts(self, tmp_path, cache, client):
+        """Severity tiers come out of one pass with NOAA annual columns."""
+        engine = HTFEngine(cache=cache, store=WaterLevelStore(store_dir=tmp_path / "store", client=client))
+        df = engine.compute_severity(2004, 2005, station_ids=STATION_IDS)
+
+        assert list(df.columns) == ['station_id', 'station_name', 'region', 'year',
+                                    'minCount', 'modCount', 'majCount', 'nanCount']
+        assert df['modCount'].isna().all()
+        assert (df['nanCount'] == 0).all()
+
+        for row in df.itertuples(index=False):
+            peaks = daily_heights(row.station_id, row.year)[1].astype(np.float32)
+            # Moderate is undefined, so minor runs up to major
+            assert row.minCount == int(((peaks >= 12.0) & (peaks < 14.0)).sum())
+            assert row.majCount == int((peaks >= 14.0).sum())
+
+        custom = engine.compute_severity(2004, 2004, station_ids=STATION_IDS[:1], tiers={
+            'minor': ThresholdSpec('nws'), 'nuisance': ThresholdSpec('mhhw_offset', 1.0)})
+        peaks = daily_heights(STATION_IDS[0], 2004)[1].astype(np.float32)
+        assert custom['nuisanceCount'].iloc[0] == int(((peaks >= 11.0) & (peaks < 12.0)).sum())
+        assert custom['minCount'].iloc[0] == int((peaks >= 12.0).sum())
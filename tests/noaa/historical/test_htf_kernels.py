@@ -0,0 +1,81 @@
+"""Tests for the vectorized flood-day kernels."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.noaa.historical.htf_kernels import (
+    TideArrays, count_exceedance_days, count_high_tides, count_tier_days, daily_high_maxima
+)
+
+@pytest.fixture
+def tide_frame():
+    """Random high/low tides (four per day) for 2019-2021 in the store layout."""
+    rng = np.random.default_rng(0)
+    timestamps = pd.date_range('2019-01-01 02:00', '2021-12-31 23:00', freq='6h', tz='UTC')
+    heights = rng.normal(10, 2, len(timestamps)).astype(np.float32)
+    heights[::97] = np.nan
+    tide_type = np.tile(np.array([1, 3, 0, 2], dtype=np.int8), len(timestamps) // 4 + 1)[:len(timestamps)]
+    return pd.DataFrame({'timestamp': timestamps, 'height': heights, 'tide_type': tide_type})
+
+def naive_flood_days(frame, threshold, year):
+    """Reference implementation: set of dates with a high tide at or above threshold."""
+    dates = set()
+    for row in frame.itertuples():
+        if row.tide_type in (0, 1) and row.timestamp.year == year and row.height >= np.float32(threshold):
+            dates.add(row.timestamp.date())
+    return len(dates)
+
+class TestHTFKernels:
+    """Test suite for the flood-day kernels."""
+
+    def test_matches_record_loop(self, tide_frame):
+        """Counts for every threshold and year match a per-record loop."""
+        arrays = TideArrays.from_frame(tide_frame)
+        thresholds = [9.0, 11.5, 13.0, 20.0]
+        years = [2019, 2020, 2021]
+
+        counts = count_exceedance_days(arrays, thresholds, years)
+
+        assert counts.shape == (4, 3)
+        for i, threshold in enumerate(thresholds):
+            for j, year in enumerate(years):
+                assert counts[i, j] == naive_flood_days(tide_frame, threshold, year)
+
+    def test_daily_maxima_and_high_tide_counts(self, tide_frame):
+        """Daily maxima are one per day and high tide counts include missing heights."""
+        arrays = TideArrays.from_frame(tide_frame)
+        days, maxima = daily_high_maxima(arrays)
+
+        assert np.all(np.diff(days) > 0)
+        assert maxima.dtype == np.float32
+        assert list(count_high_tides(arrays, [2019, 2020, 2022])) == [365 * 2, 366 * 2, 0]
+
+    def test_years_outside_data(self, tide_frame):
+        """Requested years without observations count zero; empty input is handled."""
+        arrays = TideArrays.from_frame(tide_frame)
+        assert count_exceedance_days(arrays, [0.0], [2018, 2020])[:, 0].tolist() == [0]
+
+        empty = TideArrays.from_frame(tide_frame.iloc[:0])
+        assert count_exceedance_days(empty, [0.0, 1.0], [2020]).tolist() == [[0], [0]]
+
+    def test_tier_days_are_exclusive_exceedance_differences(self, tide_frame):
+        """Each day counts in the highest tier reached; missing days fill the year."""
+        arrays = TideArrays.from_frame(tide_frame[tide_frame['timestamp'] >= '2019-01-03'])
+        years = [2019, 2020, 2021, 2022]
+        # Unsorted tiers with an undefined one
+        thresholds = [13.0, 11.0, np.nan, 15.0]
+
+        counts, missing = count_tier_days(arrays, thresholds, years)
+        exceed = count_exceedance_days(arrays, [11.0, 13.0, 15.0], years)
+
+        np.testing.assert_array_equal(counts[1], exceed[0] - exceed[1])
+        np.testing.assert_array_equal(counts[0], exceed[1] - exceed[2])
+        np.testing.assert_array_equal(counts[3], exceed[2])
+        assert not counts[2].any()
+
+        days, _ = daily_high_maxima(arrays)
+        day_years = pd.DatetimeIndex(days.astype('datetime64[D]')).year.to_numpy()
+        observed = np.array([(day_years == year).sum() for year in years])
+        np.testing.assert_array_equal(missing, [365, 366, 365, 365] - observed)
+        assert missing[0] >= 2 and missing[-1] == 365
@@ -0,0 +1,131 @@
+"""Tests for single-pass processing of raw historical flood data."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from src.noaa.core.region_dataset import read_region_dataset, read_region_records
+from src.noaa.historical.process_raw_flood_data import DATASET_NAME, process_all_regions
+from src.assignment.data_loader import load_historical_htf
+
+REGIONS_CONFIG = {
+    'hawaii': {'name': 'hawaii'},
+    'mid_atlantic': {'name': 'mid_atlantic'},
+    'gulf_coast': {'name': 'gulf_coast'}
+}
+
+STATION_REGIONS = {
+    '1612340': 'hawaii',
+    '8638610': 'mid_atlantic',
+    '8518750': 'mid_atlantic',
+    '9999999': 'not_a_region'
+}
+
+def _annual_records(station_id, years, min_count):
+    return [
+        {
+            'stnId': station_id,
+            'stnName': f'Station {station_id}',
+            'year': year,
+            'majCount': 0,
+            'modCount': 0,
+            'minCount': min_count,
+            'nanCount': 0
+        }
+        for year in years
+    ]
+
+@pytest.fixture
+def raw_data_dir(tmp_path):
+    """Create raw station JSON files."""
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    for station_id, min_count in [('1612340', 3), ('8638610', 7), ('8518750', None), ('9999999', 1)]:
+        with open(raw_dir / f"{station_id}.json", 'w') as f:
+            json.dump(_annual_records(station_id, [2020, 2021], min_count), f)
+    return raw_dir
+
+class TestProcessAllRegions:
+    """Test suite for process_all_regions."""
+
+    def test_writes_hive_partitioned_dataset(self, raw_data_dir, tmp_path):
+        """Each configured region is written to its own partition."""
+        output_dir = tmp_path / "output"
+        dataset_dir = process_all_regions(
+            REGIONS_CONFIG, raw_data_dir, output_dir,
+            station_regions=STATION_REGIONS, max_workers=1
+        )
+
+        assert dataset_dir == output_dir / "historical_htf"
+        partitions = sorted(p.name for p in dataset_dir.iterdir())
+        assert partitions == ['region=hawaii', 'region=mid_atlantic']
+
+        df = pd.read_parquet(dataset_dir)
+        assert len(df) == 6
+        assert set(df['station_id']) == {'1612340', '8638610', '8518750'}
+        mid_atlantic = df[df['region'] == 'mid_atlantic'].set_index(['station_id', 'year'])
+        assert mid_atlantic.loc[('8638610', 2020), 'flood_days'] == 7
+        # Missing minor counts are treated as zero flood days
+        assert mid_atlantic.loc[('8518750', 2021), 'flood_days'] == 0
+
+    def test_no_station_map(self, raw_data_dir, tmp_path):
+        """Nothing is written without a station to region map."""
+        assert process_all_regions(
+            REGIONS_CONFIG, raw_data_dir, tmp_path / "output", station_regions={}
+        ) is None
+
+    def test_assignment_loader_reads_dataset(self, raw_data_dir, tmp_path):
+        """The assignment loader combines the dataset with standalone regional files."""
+        output_dir = tmp_path / "output"
+        process_all_regions(
+            REGIONS_CONFIG, raw_data_dir, output_dir,
+            station_regions=STATION_REGIONS, max_workers=1
+        )
+        pd.DataFrame({
+            'station_id': ['9455920'], 'year': [2020],
+            'flood_days': [2], 'missing_days': [0], 'region': ['alaska']
+        }).to_parquet(output_dir / "historical_htf_alaska.parquet")
+
+        df = load_historical_htf(output_dir)
+        assert len(df) == 7
+        assert set(df['region']) == {'hawaii', 'mid_atlantic', 'alaska'}
+
+    def test_region_records_filter(self, raw_data_dir, tmp_path):
+        """Single-region reads come from the dataset or the matching standalone file."""
+        output_dir = tmp_path / "output"
+        process_all_regions(
+            REGIONS_CONFIG, raw_data_dir, output_dir,
+            station_regions=STATION_REGIONS, max_workers=1
+        )
+        pd.DataFrame({
+            'station_id': ['9455920'], 'year': [2020],
+            'flood_days': [2], 'missing_days': [0]
+        }).to_parquet(output_dir / "historical_htf_alaska.parquet")
+
+        hawaii = read_region_records(output_dir, DATASET_NAME, regions=['hawaii'])
+        assert set(hawaii['station_id']) == {'1612340'}
+        alaska = read_region_records(output_dir, DATASET_NAME, regions=['alaska'])
+        assert list(alaska['region']) == ['alaska']
+        with pytest.raises(FileNotFoundError):
+            read_region_records(tmp_path / "missing", DATASET_NAME)
+
+    def test_region_without_records_loses_partition(self, raw_data_dir, tmp_path):
+        """A processed region that no longer has records does not keep its old partition."""
+        output_dir = tmp_path / "output"
+        process_all_regions(
+            REGIONS_CONFIG, raw_data_dir, output_dir,
+            station_regions=STATION_REGIONS, max_workers=1
+        )
+        other = output_dir / DATASET_NAME / "region=west_coast"
+        other.mkdir()
+
+        station_regions = {station: region for station, region in STATION_REGIONS.items() if region != 'hawaii'}
+        dataset_dir = process_all_regions(
+            REGIONS_CONFIG, raw_data_dir, output_dir,
+            station_regions=station_regions, max_workers=1
+        )
+
+        assert not (dataset_dir / "region=hawaii").exists()
+        assert other.is_dir()
+        assert set(read_region_dataset(dataset_dir)['region']) == {'mid_atlantic'}
@@ -0,0 +1,95 @@
+"""Tests for the Alaska threshold sensitivity sweep."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+
+from src.noaa.historical.alaska_htf_sensitivity import run_sensitivity_analysis
+from src.noaa.historical import water_level_store
+from src.noaa.historical.sensitivity_sweep import run_sweep, sorted_percentiles
+from src.noaa.historical.water_level_store import WaterLevelStore, count_flood_days
+
+def yearly_records(station, year):
+    """One high and one low tide per day with a deterministic trend."""
+    rng = np.random.default_rng(int(station) % 1000 + year)
+    days = pd.date_range(f'{year}-01-01', f'{year}-12-31', freq='D')
+    records = []
+    for day, height in zip(days, rng.normal(10 + (year - 2000) * 0.05, 1.0, len(days))):
+        records.append({'t': f'{day:%Y-%m-%d} 03:00', 'v': f'{height:.3f}', 'ty': 'HH'})
+        records.append({'t': f'{day:%Y-%m-%d} 09:00', 'v': '0.500', 'ty': 'LL'})
+    return records
+
+@pytest.fixture
+def store(tmp_path):
+    """Store backed by a mock client."""
+    client = Mock()
+    client.fetch_water_levels.side_effect = lambda station, begin_date, end_date, **kw: (
+        yearly_records(station, int(begin_date[:4]))
+    )
+    return WaterLevelStore(store_dir=tmp_path, client=client)
+
+class TestSensitivitySweep:
+    """Test suite for the parameter sweep engine."""
+
+    def test_sorted_percentiles(self):
+        """Percentiles of sorted data match np.percentile."""
+        values = np.sort(np.random.default_rng(1).normal(size=1001)).astype(np.float32)
+        q = [1, 50, 99, 99.5, 100]
+        np.testing.assert_allclose(sorted_percentiles(values, q), np.percentile(values.astype(np.float64), q))
+
+    def test_cube_matches_direct_computation(self, store):
+        """Every cell equals a from-scratch percentile and flood-day count."""
+        periods = [(2000, 2002, "2000-2002"), (2001, 2004, "2001-2004")]
+        cube = run_sweep(['9455920', '9462620'], [98, 99.5], periods, [2010, 2005],
+                         store=store, max_workers=2)
+
+        assert len(cube) == 2 * 2 * 2 * 2
+        assert list(cube['test_year'].iloc[:2]) == [2010, 2005]
+
+        for row in cube.itertuples(index=False):
+            highs = store.high_tide_heights(row.station_id, row.ref_start, row.ref_end)
+            expected = np.percentile(highs.astype(np.float64), row.percentile)
+            assert row.threshold_ft == pytest.approx(expected)
+            assert row.flood_days == count_flood_days(store.get_year(row.station_id, row.test_year),
+                                                      row.threshold_ft)[0]
+
+    def test_insufficient_data_and_single_fetch(self, store):
+        """Short periods give NA thresholds and every station-year is fetched once."""
+        cube = run_sweep(['9455920'], [99], [(2000, 2000, "2000"), (1999, 1999, "1999")], [2000],
+                         store=store, max_workers=1)
+        assert cube['threshold_ft'].notna().all()
+
+        store.client.fetch_water_levels.side_effect = lambda *a, **kw: []
+        cube = run_sweep(['9455920'], [99], [(1980, 1980, "1980")], [2000], store=store, max_workers=1)
+        assert cube['threshold_ft'].isna().all()
+        assert cube['flood_days'].isna().all()
+        assert store.client.fetch_water_levels.call_count == 3
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_unstored_and_missing_test_years(self, store, monkeypatch, max_workers):
+        """Years the store keeps in memory reach the workers; test years without data are NA."""
+        monkeypatch.setattr(water_level_store, 'current_utc_year', lambda: 2010)
+        fetch = store.client.fetch_water_levels.side_effect
+        store.client.fetch_water_levels.side_effect = lambda station, begin_date, end_date, **kw: (
+            [] if begin_date.startswith('1990') else fetch(station, begin_date, end_date)
+        )
+        cube = run_sweep(['9455920'], [99], [(2000, 2002, "2000-2002")], [2010, 1990],
+                         store=store, max_workers=max_workers)
+
+        assert not store.has('9455920', 2010)
+        expected = count_flood_days(store.get_year('9455920', 2010), cube['threshold_ft'].iloc[0])[0]
+        assert expected > 0
+        assert cube['flood_days'].iloc[0] == expected
+        assert pd.isna(cube['flood_days'].iloc[1])
+
+    def test_sensitivity_analysis_uses_sweep(self, store, tmp_path):
+        """The sensitivity analysis keeps its output format."""
+        df = run_sensitivity_analysis(test_stations=['9455920'], test_year=2004,
+                                      reference_periods=[(2000, 2001, "2000-2001"), (2000, 2003, "2000-2003")],
+                                      output_dir=tmp_path, store=store, max_workers=1)
+
+        assert list(df.columns) == ['station_id', 'station_name', 'reference_period', 'ref_start',
+                                    'ref_end', 'threshold_99pct_ft', 'test_year', 'flood_days']
+        assert list(df['station_name']) == ['Anchorage', 'Anchorage']
+        assert (tmp_path / "alaska_htf_sensitivity_2004.csv").exists()
@@ -0,0 +1,146 @@
+"""Tests for block bootstrap threshold confidence intervals."""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+
+from src.noaa.historical.alaska_htf_computer import AlaskaHTFComputer
+from src.noaa.historical import threshold_bootstrap
+from src.noaa.historical.height_sketch import HeightSketch
+from src.noaa.historical.threshold_bootstrap import (
+    bootstrap_thresholds, resample_year_weights, resampled_percentiles, sketch_matrix
+)
+from src.noaa.historical.water_level_store import WaterLevelStore
+
+def yearly_records(station, year):
+    """One high and one low tide per day with a year-specific mean."""
+    rng = np.random.default_rng(int(station) % 1000 + year)
+    offset = (year % 5) * 0.3
+    records = []
+    for day, height in enumerate(rng.normal(12.0 + offset, 1.5, 365)):
+        date = np.datetime64(f'{year}-01-01') + day
+        records.append({'t': f'{date} 03:00', 'v': f'{height:.3f}', 'ty': 'HH'})
+        records.append({'t': f'{date} 09:00', 'v': '0.500', 'ty': 'LL'})
+    return records
+
+@pytest.fixture
+def store(tmp_path):
+    """Store backed by a mock client."""
+    client = Mock()
+    client.fetch_water_levels.side_effect = lambda station, begin_date, end_date, **kw: (
+        yearly_records(station, int(begin_date[:4]))
+    )
+    return WaterLevelStore(store_dir=tmp_path, client=client)
+
+class TestThresholdBootstrap:
+    """Test suite for the threshold bootstrap."""
+
+    def test_resample_weights(self):
+        """Every resample draws as many years as the period holds."""
+        weights = resample_year_weights(11, 500, np.random.default_rng(0))
+        assert weights.shape == (500, 11)
+        assert (weights.sum(axis=1) == 11).all()
+        assert (weights.mean(axis=0) > 0.8).all()
+
+    def test_matches_percentile_of_resampled_years(self):
+        """Resampled percentiles match np.percentile on the resampled observations."""
+        rng = np.random.default_rng(1)
+        years = [rng.normal(10 + i * 0.2, 1.0, 400) for i in range(6)]
+        midpoints, counts = sketch_matrix([HeightSketch.from_heights(h) for h in years])
+        weights = resample_year_weights(len(years), 50, rng)
+
+        result = resampled_percentiles(midpoints, counts, weights.astype(float), 99)
+        for b, row in enumerate(weights):
+            sample = np.concatenate([np.repeat(years[i], k) for i, k in enumerate(row)])
+            assert result[b] == pytest.approx(np.percentile(sample, 99), abs=0.005 + 1e-9)
+
+    def test_intervals_and_report(self, store, tmp_path):
+        """Intervals bracket the point estimates and flood days per station-year."""
+        station_ids = ['9455920', '9462620', '9468756']
+        thresholds, flood_days = bootstrap_thresholds(
+            station_ids, [2010, 2011], reference_start=2000, reference_end=2009,
+            n_resamples=2000, seed=7, store=store)
+        again, _ = bootstrap_thresholds(station_ids, [2010, 2011], reference_start=2000,
+                                        reference_end=2009, n_resamples=2000, seed=7, store=store)
+
+        pd.testing.assert_frame_equal(thresholds, again)
+        assert (thresholds['ci_lower_ft'] < thresholds['threshold_ft']).all()
+        assert (thresholds['threshold_ft'] < thresholds['ci_upper_ft']).all()
+        assert (thresholds['n_dropped'] == 0).all()
+        assert len(flood_days) == 6
+        assert (flood_days['flood_days_ci_lower'] <= flood_days['flood_days']).all()
+        assert (flood_days['flood_days'] <= flood_days['flood_days_ci_upper']).all()
+
+        computer = AlaskaHTFComputer(store=store)
+        report = pd.read_csv(computer.save_threshold_report(tmp_path, intervals=thresholds))
+        report = report.set_index('station_id')
+        assert report.loc[9455920, 'percentile_ci_upper_ft'] == pytest.approx(thresholds['ci_upper_ft'][0])
+        assert np.isnan(report.loc[9451054, 'percentile_ci_lower_ft'])
+
+    def test_ten_thousand_resamples_is_fast(self, store):
+        """10,000 resamples across several stations finishes in seconds."""
+        station_ids = ['9455920', '9462620', '9468756', '9457292']
+        bootstrap_thresholds(station_ids, [2010], reference_start=2000, reference_end=2010,
+                             n_resamples=10, store=store)
+
+        start = time.perf_counter()
+        thresholds, _ = bootstrap_thresholds(station_ids, [2010], reference_start=2000,
+                                             reference_end=2010, n_resamples=10_000, store=store)
+        assert time.perf_counter() - start < 10
+        assert thresholds['ci_lower_ft'].notna().all()
+
+    def test_all_resamples_dropped(self, store, monkeypatch):
+        """Resamples below MIN_OBSERVATIONS are counted; if all are dropped the interval is NaN."""
+        # Every resample draws only the first reference year, which has too few high tides
+        def first_year_only(n_years, n_resamples, rng):
+            weights = np.zeros((n_resamples, n_years), dtype=np.int64)
+            weights[:, 0] = n_years
+            return weights
+        monkeypatch.setattr(threshold_bootstrap, 'resample_year_weights', first_year_only)
+        store.client.fetch_water_levels.side_effect = lambda station, begin_date, end_date, **kw: (
+            yearly_records(station, int(begin_date[:4]))[:2 * (1 if begin_date.startswith('2000') else 365)]
+        )
+
+        thresholds, flood_days = bootstrap_thresholds(['9455920'], [2010], reference_start=2000,
+                                                      reference_end=2009, n_resamples=50, store=store)
+
+        row = thresholds.iloc[0]
+        assert row['n_dropped'] == 50
+        assert not np.isnan(row['threshold_ft'])
+        assert np.isnan([row['ci_lower_ft'], row['ci_upper_ft'], row['bootstrap_se_ft']]).all()
+        assert flood_days['flood_days_ci_lower'].isna().all()
+        assert flood_days['flood_days'].notna().all()
+
+    def test_test_years_without_data(self, store):
+        """Test years without tide data are NaN and only requested test years are fetched."""
+        fetch = store.client.fetch_water_levels.side_effect
+        store.client.fetch_water_levels.side_effect = lambda station, begin_date, end_date, **kw: (
+            [] if begin_date.startswith('2012') else fetch(station, begin_date, end_date)
+        )
+        _, flood_days = bootstrap_thresholds(['9455920'], [2010, 2012, 2015], reference_start=2000,
+                                             reference_end=2009, n_resamples=100, seed=1, store=store)
+
+        fetched = sorted(int(c.kwargs['begin_date'][:4]) for c in store.client.fetch_water_levels.call_args_list)
+        assert fetched == list(range(2000, 2010)) + [2010, 2012, 2015]
+        missing = flood_days[flood_days['year'] == 2012].iloc[0]
+        assert np.isnan([missing['flood_days'], missing['flood_days_ci_lower'],
+                         missing['flood_days_ci_upper']]).all()
+        assert flood_days[flood_days['year'] != 2012]['flood_days'].notna().all()
+
+    def test_computer_threshold_intervals(self, store, tmp_path):
+        """The computer bootstraps its percentile-threshold stations for the threshold report."""
+        computer = AlaskaHTFComputer(reference_start=2000, reference_end=2009, store=store)
+        computer.compute_all_stations(2010, 2010, station_ids=['9455920', '9451054'])
+
+        intervals = computer.threshold_intervals(200, seed=3)
+        expected = [sid for sid, station in computer.stations.items() if station.percentile_threshold is not None]
+        assert list(intervals['station_id']) == expected
+        assert '9455920' in expected and '9451054' not in expected
+        assert intervals['threshold_ft'][0] == pytest.approx(computer.stations['9455920'].percentile_threshold,
+                                                             abs=intervals['error_bound_ft'][0] + 1e-6)
+
+        report = pd.read_csv(computer.save_threshold_report(tmp_path, intervals=intervals)).set_index('station_id')
+        assert report.loc[9455920, 'percentile_ci_lower_ft'] < report.loc[9455920, 'percentile_ci_upper_ft']
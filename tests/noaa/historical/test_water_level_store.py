@@ -0,0 +1,100 @@
+"""Tests for the raw water level store."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+
+from src.noaa.core.noaa_client import NOAAApiError
+from src.noaa.historical import water_level_store
+from src.noaa.historical.water_level_store import WaterLevelStore, count_flood_days
+
+def high_low_records(year, peak=20.0):
+    """Two tides per day for January with one peak day."""
+    records = []
+    for day in range(1, 32):
+        high = peak if day == 15 else 10.0
+        records.append({'t': f'{year}-01-{day:02d} 04:00', 'v': f'{high:.3f}', 'ty': 'HH', 'f': '0,0'})
+        records.append({'t': f'{year}-01-{day:02d} 10:00', 'v': '1.000', 'ty': ' L', 'f': '0,0'})
+    records.append({'t': f'{year}-01-31 16:00', 'v': '', 'ty': 'H ', 'f': '1,0'})
+    return records
+
+@pytest.fixture
+def client():
+    """Mock client with data for every year except 1995 and a failure for 1996."""
+    client = Mock()
+    def fetch(station, begin_date, end_date, **kwargs):
+        year = int(begin_date[:4])
+        if year == 1995:
+            return []
+        if year == 1996:
+            raise NOAAApiError("Service unavailable")
+        return high_low_records(year)
+    client.fetch_water_levels.side_effect = fetch
+    return client
+
+class TestWaterLevelStore:
+    """Test suite for WaterLevelStore."""
+
+    def test_typed_layout_and_fetch_once(self, tmp_path, client):
+        """Station-years are stored with typed columns and fetched once."""
+        store = WaterLevelStore(store_dir=tmp_path, client=client)
+
+        frame = store.get_year('9455920', 2020)
+        assert store.path('9455920', 2020) == tmp_path / "high_low" / "STND" / "9455920" / "2020.parquet"
+        assert frame['height'].dtype == np.float32
+        assert frame['tide_type'].dtype == np.int8
+        assert str(frame['timestamp'].dt.tz) == 'UTC'
+        assert list(frame['tide_type'].iloc[:2]) == [1, 2]
+        assert np.isnan(frame['height'].iloc[-1])
+
+        reread = WaterLevelStore(store_dir=tmp_path, client=client).get_year('9455920', 2020)
+        pd.testing.assert_frame_equal(reread, frame)
+        assert client.fetch_water_levels.call_count == 1
+
+        # Another datum is stored separately
+        mllw = WaterLevelStore(store_dir=tmp_path, client=client, datum='MLLW')
+        assert mllw.path('9455920', 2020) == tmp_path / "high_low" / "MLLW" / "9455920" / "2020.parquet"
+        assert not mllw.has('9455920', 2020)
+
+    def test_no_data_stored_but_failures_retried(self, tmp_path, client):
+        """Explicit no-data years are persisted; failed requests are not."""
+        store = WaterLevelStore(store_dir=tmp_path, client=client)
+
+        assert store.get_year('9455920', 1995).empty
+        assert store.has('9455920', 1995)
+        assert store.get_year('9455920', 1996).empty
+        assert not store.has('9455920', 1996)
+
+        heights = store.high_tide_heights('9455920', 1994, 1997)
+        assert len(heights) == 2 * 31
+        assert heights.dtype == np.float32
+
+    def test_recent_years_not_stored(self, tmp_path, client, monkeypatch):
+        """The current year and recent no-data years are kept in memory only."""
+        monkeypatch.setattr(water_level_store, 'current_utc_year', lambda: 2021)
+        client.fetch_water_levels.side_effect = lambda station, begin_date, end_date, **kwargs: (
+            [] if begin_date.startswith('2020') else high_low_records(int(begin_date[:4]))
+        )
+        store = WaterLevelStore(store_dir=tmp_path, client=client)
+
+        assert len(store.get_year('9455920', 2021)) == 63
+        assert not store.has('9455920', 2021)
+        assert store.get_year('9455920', 2020).empty
+        assert not store.has('9455920', 2020)
+        assert store.get_sketch('9455920', 2021).count == 31
+        assert store.prefetch(['9455920'], [2020, 2021]) == 0
+        assert client.fetch_water_levels.call_count == 2
+
+        store.get_year('9455920', 2019)
+        assert store.has('9455920', 2019)
+
+        # A new store (e.g. the next run) requests unstored years again
+        WaterLevelStore(store_dir=tmp_path, client=client).get_year('9455920', 2021)
+        assert client.fetch_water_levels.call_count == 4
+
+    def test_count_flood_days(self, tmp_path, client):
+        """Flood days count days with a high tide at or above the threshold."""
+        frame = WaterLevelStore(store_dir=tmp_path, client=client).get_year('9455920', 2020)
+        assert count_flood_days(frame, 20.0) == (1, 32)
+        assert count_flood_days(frame, 9.0) == (31, 32)
@@ -0,0 +1,69 @@
+"""Tests for annual interpolation of decadal projections."""
+
+import numpy as np
+import pytest
+
+from src.noaa.projected.interpolation import interpolate_annual
+from src.noaa.projected.projection_tensor import ProjectionTensor, SCENARIO_COLUMNS
+
+@pytest.fixture
+def decadal_tensor():
+    """Two stations over 2020-2100; the second is missing 2050."""
+    decades = np.arange(2020, 2101, 10)
+    values = np.empty((2, len(decades), len(SCENARIO_COLUMNS)), dtype=np.float32)
+    for i in range(len(SCENARIO_COLUMNS)):
+        values[0, :, i] = (decades - 2020) / 10 * (i + 1)
+        values[1, :, i] = ((decades - 2020) / 10) ** 2 + i
+    values[1, 3, :] = np.nan
+    return ProjectionTensor(values, ['8638610', '9414290'], decades)
+
+class TestInterpolateAnnual:
+    """Test suite for interpolate_annual."""
+
+    def test_linear(self, decadal_tensor):
+        """Linear interpolation reproduces a linear series exactly."""
+        annual = interpolate_annual(decadal_tensor, method='linear')
+
+        assert annual.shape == (2, 81, 5)
+        assert list(annual.years[[0, -1]]) == [2020, 2100]
+        np.testing.assert_allclose(annual.values[0, :, 0], np.arange(81) / 10, rtol=1e-6)
+        assert annual.scenario('intHigh')[0, 15] == pytest.approx(6.0)
+
+    def test_pchip_monotone_and_matches_decades(self, decadal_tensor):
+        """Monotone cubic hits the decade values and never decreases."""
+        annual = interpolate_annual(decadal_tensor, method='pchip')
+        series = annual.values[0, :, 4]
+
+        np.testing.assert_allclose(series[::10], decadal_tensor.values[0, :, 4], rtol=1e-6)
+        assert np.all(np.diff(series) >= 0)
+
+    def test_missing_decade_falls_back_to_linear(self, decadal_tensor):
+        """Series with a missing decade are NaN only next to the gap."""
+        annual = interpolate_annual(decadal_tensor, method='pchip')
+        series = annual.values[1, :, 0]
+
+        assert series[10] == pytest.approx(1.0)
+        assert series[15] == pytest.approx(2.5)
+        assert series[20] == pytest.approx(4.0)
+        assert np.isnan(series[25])
+        assert np.isnan(series[35])
+        assert series[40] == pytest.approx(16.0)
+
+    @pytest.mark.parametrize("method", ['linear', 'pchip'])
+    def test_missing_penultimate_decade_keeps_last(self, decadal_tensor, method):
+        """The last decade keeps its own value when the decade before it is missing."""
+        values = np.array(decadal_tensor.values)
+        values[0, -2, :] = np.nan
+        tensor = ProjectionTensor(values, decadal_tensor.station_ids, decadal_tensor.years)
+
+        series = interpolate_annual(tensor, method=method).values[0, :, 0]
+        assert series[-1] == pytest.approx(8.0)
+        assert np.isnan(series[-5])
+        assert series[-21] == pytest.approx(6.0)
+
+    def test_out_of_range(self, decadal_tensor):
+        """Years outside the decade axis are rejected."""
+        with pytest.raises(ValueError):
+            interpolate_annual(decadal_tensor, start_year=2015)
+        with pytest.raises(ValueError):
+            interpolate_annual(decadal_tensor, method='spline')
@@ -0,0 +1,82 @@
+"""Tests for single-pass processing of raw projected flood data."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.noaa.core.region_dataset import read_region_dataset
+from src.noaa.projected.process_raw_projected_data import DATASET_NAME, TENSOR_NAME, process_all_projections
+from src.noaa.projected.projection_tensor import ProjectionTensor, SCENARIO_COLUMNS
+
+REGIONS_CONFIG = {
+    'hawaii': {'name': 'hawaii'},
+    'mid_atlantic': {'name': 'mid_atlantic'},
+    'gulf_coast': {'name': 'gulf_coast'}
+}
+
+STATION_REGIONS = {
+    '1612340': 'hawaii',
+    '8638610': 'mid_atlantic',
+    '8518750': 'mid_atlantic',
+    '9999999': 'not_a_region'
+}
+
+def _decadal_records(station_ids, decades):
+    rows = []
+    for i, station_id in enumerate(station_ids):
+        for decade in decades:
+            row = {'station': station_id, 'decade': decade}
+            for j, column in enumerate(SCENARIO_COLUMNS):
+                row[column] = float(10 * i + (decade - 2020) / 10 + j)
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+@pytest.fixture
+def raw_data_dir(tmp_path):
+    """Create raw regional projection files."""
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    _decadal_records(['1612340'], [2020, 2030]).to_parquet(raw_dir / "projected_htf_hawaii.parquet")
+    _decadal_records(['8638610', '8518750', '9999999'], [2020, 2030]).to_parquet(
+        raw_dir / "projected_htf_mid_atlantic.parquet"
+    )
+    return raw_dir
+
+class TestProcessAllProjections:
+    """Test suite for process_all_projections."""
+
+    def test_writes_hive_partitioned_dataset(self, raw_data_dir, tmp_path):
+        """Each configured region is written to its own partition, with a matching tensor."""
+        output_dir = tmp_path / "output"
+        dataset_dir = process_all_projections(
+            REGIONS_CONFIG, raw_data_dir, output_dir, station_regions=STATION_REGIONS
+        )
+
+        assert dataset_dir == output_dir / DATASET_NAME
+        partitions = sorted(p.name for p in dataset_dir.iterdir())
+        assert partitions == ['region=hawaii', 'region=mid_atlantic']
+
+        df = read_region_dataset(dataset_dir)
+        assert len(df) == 6
+        assert set(df['station']) == {'1612340', '8638610', '8518750'}
+        mid_atlantic = df[df['region'] == 'mid_atlantic'].set_index(['station', 'decade'])
+        assert mid_atlantic.loc[('8518750', 2030), 'intermediate_scenario'] == pytest.approx(13.0)
+        assert list(read_region_dataset(dataset_dir, ['hawaii'])['station'].unique()) == ['1612340']
+
+        tensor = ProjectionTensor.load(output_dir / TENSOR_NAME)
+        assert list(tensor.station_ids) == ['1612340', '8518750', '8638610']
+        assert list(tensor.years) == [2020, 2030]
+        np.testing.assert_allclose(tensor.scenario('intermediate')[1], [12.0, 13.0])
+
+    def test_no_station_map(self, raw_data_dir, tmp_path):
+        """Nothing is written without a station to region map."""
+        assert process_all_projections(
+            REGIONS_CONFIG, raw_data_dir, tmp_path / "output", station_regions={}
+        ) is None
+
+    def test_no_raw_files(self, tmp_path):
+        """Nothing is written when no regional raw file exists."""
+        (tmp_path / "empty").mkdir()
+        assert process_all_projections(
+            REGIONS_CONFIG, tmp_path / "empty", tmp_path / "output", station_regions=STATION_REGIONS
+        ) is None
@@ -188,4 +188,60 @@ class TestProjectedHTFFetcher:
             output_file = fetcher.generate_dataset(output_dir, ['8638610'])
             
             assert output_file.exists()
-            assert output_file.name == 'projected_htf.parquet' 
\ No newline at end of file
+            assert output_file.name == 'projected_htf.parquet' 
+
+@pytest.fixture
+def regional_config_files(setup_config_files):
+    """Extend the test config with data settings and region mappings."""
+    config_dir = setup_config_files
+    settings_file = config_dir / "noaa_api_settings.yaml"
+    with open(settings_file) as f:
+        settings = yaml.safe_load(f)
+    settings['cache']['retention'] = {'historical': 30, 'projected': 90, 'metadata': 7}
+    settings['cache']['update_frequency'] = {'historical': 24, 'projected': 168, 'metadata': 12}
+    settings['data'] = {
+        'projected': {
+            'start_decade': 2020,
+            'end_decade': 2100
+        }
+    }
+    with open(settings_file, 'w') as f:
+        yaml.dump(settings, f)
+
+    with open(config_dir / "region_mappings.yaml", 'w') as f:
+        yaml.dump({'regions': {'mid_atlantic': {'name': 'mid_atlantic', 'state_codes': ['VA']}}}, f)
+
+    return config_dir
+
+
+class TestProjectedHTFFetcherRegional:
+    """Test suite for regional loading with per-station indexing."""
+
+    def test_regional_dataset_reads_each_station_once(self, regional_config_files):
+        """A station's projections are fetched and read once for all decades."""
+        cache = NOAACache(config_dir=regional_config_files)
+        fetcher = ProjectedHTFFetcher(cache=cache, region='mid_atlantic')
+
+        with patch('src.noaa.core.noaa_client.NOAAClient.fetch_decadal_projections') as mock_fetch, \
+                patch.object(cache, 'get_projected_data', wraps=cache.get_projected_data) as mock_read:
+            mock_fetch.return_value = SAMPLE_PROJECTED_RESPONSE['DecadalProjection']
+            dataset = fetcher.get_regional_dataset(2020, 2100)
+
+            assert mock_fetch.call_count == 1
+            assert mock_read.call_count == 1
+
+        assert [r['decade'] for r in dataset['8638610']] == [2050, 2060]
+
+    def test_regional_dataset_slices_decades(self, regional_config_files):
+        """The requested decade range is sliced from the cached projections."""
+        cache = NOAACache(config_dir=regional_config_files)
+        cache.save_projected_records('8638610', SAMPLE_PROJECTED_RESPONSE['DecadalProjection'])
+        fetcher = ProjectedHTFFetcher(cache=cache, region='mid_atlantic')
+
+        with patch('src.noaa.core.noaa_client.NOAAClient.fetch_decadal_projections') as mock_fetch:
+            dataset = fetcher.get_regional_dataset(2060, 2100)
+            mock_fetch.assert_not_called()
+
+        assert [r['decade'] for r in dataset['8638610']] == [2060]
+        assert fetcher.get_station_data('8638610', 2050)[0]['low'] == 85
+        assert fetcher.get_station_data('8638610', 2070) == []
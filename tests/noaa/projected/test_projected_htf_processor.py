@@ -0,0 +1,106 @@
+"""Tests for the Projected HTF Processor."""
+
+import pytest
+import pandas as pd
+from unittest.mock import patch
+import yaml
+
+from src.noaa.projected.projected_htf_processor import ProjectedHTFProcessor, OUTPUT_COLUMNS
+from src.noaa.projected.projection_tensor import SCENARIO_COLUMNS
+
+SAMPLE_RECORDS = [
+    {'stnId': '8638610', 'stnName': 'Sewells Point, VA', 'decade': decade, 'source': 'NOAA',
+     'low': 10 * i, 'intLow': 10 * i + 1, 'intermediate': 10 * i + 2,
+     'intHigh': 10 * i + 3, 'high': None}
+    for i, decade in enumerate([2050, 2060, 2070])
+]
+
+@pytest.fixture
+def setup_config_files(tmp_path):
+    """Create temporary config files for testing."""
+    config_dir = tmp_path / "config"
+    (config_dir / "tide_stations").mkdir(parents=True)
+
+    settings = {
+        'api': {
+            'base_url': 'https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi',
+            'requests_per_second': 2.0,
+            'endpoints': {'projected': '/htf/htf_projection_decadal.json'}
+        },
+        'cache': {
+            'directory': 'data/cache',
+            'data_types': ['historical', 'projected', 'metadata'],
+            'retention': {'historical': 30, 'projected': 90, 'metadata': 7},
+            'update_frequency': {'historical': 24, 'projected': 168, 'metadata': 12}
+        },
+        'data': {'projected': {'start_decade': 2020, 'end_decade': 2100}}
+    }
+    with open(config_dir / "noaa_api_settings.yaml", 'w') as f:
+        yaml.dump(settings, f)
+
+    with open(config_dir / "region_mappings.yaml", 'w') as f:
+        yaml.dump({'regions': {'mid_atlantic': {'name': 'mid_atlantic', 'state_codes': ['VA']}}}, f)
+
+    stations = {
+        'stations': {
+            '8638610': {'name': 'Sewells Point, VA', 'latitude': '36.9467', 'longitude': '-76.3300'},
+            '8571892': {'name': 'Cambridge, MD', 'latitude': '38.5725', 'longitude': '-76.0617'}
+        }
+    }
+    with open(config_dir / "tide_stations" / "mid_atlantic_tide_stations.yaml", 'w') as f:
+        yaml.dump(stations, f)
+
+    return config_dir
+
+@pytest.fixture
+def processor(setup_config_files):
+    """Processor with one station cached and one station without projections."""
+    processor = ProjectedHTFProcessor(config_dir=setup_config_files)
+    processor.cache.save_projected_records('8638610', SAMPLE_RECORDS)
+    return processor
+
+class TestProjectedHTFProcessor:
+    """Test suite for ProjectedHTFProcessor."""
+
+    def test_process_region_long_format(self, processor):
+        """Projections are melted to one row per station, decade and scenario."""
+        with patch('src.noaa.core.noaa_client.NOAAClient.fetch_decadal_projections', return_value=[]):
+            df = processor.process_region('mid_atlantic', 2050, 2060)
+
+        assert list(df.columns) == OUTPUT_COLUMNS
+        assert len(df) == 2 * len(SCENARIO_COLUMNS)
+        assert list(df['scenario'].iloc[:5]) == list(SCENARIO_COLUMNS)
+        assert (df['region'] == 'mid_atlantic').all()
+
+        row = df[(df['decade'] == 2060) & (df['scenario'] == 'intermediate_scenario')]
+        assert row['flood_days'].iloc[0] == 12
+        assert df[df['scenario'] == 'high_scenario']['flood_days'].eq(0).all()
+
+    def test_matches_cli_dataset(self, processor, tmp_path):
+        """Pivoting the processed output reproduces the projected CLI dataset."""
+        with patch('src.noaa.core.noaa_client.NOAAClient.fetch_decadal_projections', return_value=[]):
+            long_df = processor.process_region('mid_atlantic', 2020, 2100)
+            output_file = processor.get_fetcher('mid_atlantic').generate_dataset(tmp_path / "out")
+
+        cli_df = pd.read_parquet(output_file).set_index(['station', 'decade'])[list(SCENARIO_COLUMNS)]
+        pivoted = long_df.pivot(index=['station_id', 'decade'], columns='scenario', values='flood_days')
+        pivoted = pivoted[list(SCENARIO_COLUMNS)]
+
+        assert pivoted.to_numpy().tolist() == cli_df.to_numpy().tolist()
+        assert list(pivoted.index) == list(cli_df.index)
+
+    def test_invalid_records_dropped(self, processor):
+        """Out-of-range projections are removed by the vectorized checks."""
+        records = [dict(record) for record in SAMPLE_RECORDS]
+        records[1]['intHigh'] = 400
+        processor.cache.save_projected_records('8638610', records)
+
+        with patch('src.noaa.core.noaa_client.NOAAClient.fetch_decadal_projections', return_value=[]):
+            df = processor.process_region('mid_atlantic', 2050, 2070)
+
+        assert sorted(df['decade'].unique()) == [2050, 2070]
+
+    def test_invalid_region(self, processor):
+        """Unknown regions are rejected."""
+        with pytest.raises(ValueError):
+            processor.process_region('atlantis', 2050, 2060)
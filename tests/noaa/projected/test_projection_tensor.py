@@ -0,0 +1,89 @@
+"""Tests for the memory-mapped projection tensor."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.noaa.projected.projection_tensor import ProjectionTensor, SCENARIO_COLUMNS
+
+@pytest.fixture
+def projection_frame():
+    """Wide projection frame with one missing station/decade pair."""
+    rows = []
+    for station, base in [('8638610', 10.0), ('1612340', 1.0)]:
+        for decade in [2020, 2030, 2040]:
+            if station == '1612340' and decade == 2040:
+                continue
+            row = {'station': station, 'decade': decade}
+            for i, column in enumerate(SCENARIO_COLUMNS):
+                row[column] = base + (decade - 2020) / 10 + i
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+class TestProjectionTensor:
+    """Test suite for ProjectionTensor."""
+
+    def test_from_frame(self, projection_frame):
+        """Frames are pivoted into a sorted stations x decades x scenarios array."""
+        tensor = ProjectionTensor.from_frame(projection_frame)
+
+        assert tensor.shape == (2, 3, 5)
+        assert tensor.values.dtype == np.float32
+        assert list(tensor.station_ids) == ['1612340', '8638610']
+        assert list(tensor.years) == [2020, 2030, 2040]
+        assert tensor.scenario('intHigh')[1, 2] == pytest.approx(15.0)
+        assert np.isnan(tensor.scenario('high_scenario')[0, 2])
+
+    def test_duplicate_rows_rejected(self, projection_frame):
+        """Repeated station/decade pairs raise instead of overwriting each other."""
+        duplicated = pd.concat([projection_frame, projection_frame.iloc[[1]]], ignore_index=True)
+        with pytest.raises(ValueError, match="8638610"):
+            ProjectionTensor.from_frame(duplicated)
+
+    def test_from_dataset(self):
+        """Raw API records are accepted directly."""
+        dataset = {
+            '8638610': [
+                {'stnId': '8638610', 'decade': 2050, 'low': 85, 'intLow': 100,
+                 'intermediate': 125, 'intHigh': 150, 'high': None}
+            ]
+        }
+        tensor = ProjectionTensor.from_dataset(dataset)
+        assert tensor.scenario('intermediate')[0, 0] == 125
+        assert np.isnan(tensor.scenario('high')[0, 0])
+
+    def test_save_and_load_memory_mapped(self, projection_frame, tmp_path):
+        """Saved tensors round-trip and load as read-only memory maps."""
+        tensor = ProjectionTensor.from_frame(projection_frame)
+        tensor.save(tmp_path / "tensor")
+
+        loaded = ProjectionTensor.load(tmp_path / "tensor")
+        assert isinstance(loaded.values, np.memmap)
+        assert not loaded.values.flags.writeable
+        np.testing.assert_array_equal(loaded.values, tensor.values)
+        assert list(loaded.station_ids) == list(tensor.station_ids)
+
+    def test_station_and_year_subsets(self, projection_frame):
+        """Station subsets keep the requested order and year ranges are inclusive."""
+        tensor = ProjectionTensor.from_frame(projection_frame)
+
+        subset = tensor.select_stations(['8638610'])
+        assert subset.shape == (1, 3, 5)
+        assert subset.scenario('low')[0, 0] == 10.0
+
+        decades = tensor.select_years(2030, 2040)
+        assert list(decades.years) == [2030, 2040]
+
+        with pytest.raises(KeyError):
+            tensor.select_stations(['0000000'])
+
+    def test_to_frame_long(self, projection_frame):
+        """Long output has one row per station, decade and scenario."""
+        tensor = ProjectionTensor.from_frame(projection_frame)
+        long_df = tensor.to_frame(long=True)
+
+        assert len(long_df) == 2 * 3 * 5
+        row = long_df[(long_df['station_id'] == '8638610') &
+                      (long_df['decade'] == 2030) &
+                      (long_df['scenario'] == 'intermediate_scenario')]
+        assert row['flood_days'].iloc[0] == pytest.approx(13.0)
@@ -198,4 +198,59 @@ class TestNOAAClient:
         )
 
         with pytest.raises(NOAAApiError):
-            client.fetch_annual_flood_counts(station="8638610") 
\ No newline at end of file
+            client.fetch_annual_flood_counts(station="8638610") 
+    @responses.activate
+    def test_fetch_water_levels(self, client):
+        """Test raw water level fetch and explicit no-data handling."""
+        from src.noaa.core.noaa_client import DATAGETTER_URL
+        responses.add(
+            responses.GET,
+            DATAGETTER_URL,
+            json={"data": [{"t": "2020-01-01 05:18", "v": "14.912", "ty": "HH", "f": "0,0"}]},
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            DATAGETTER_URL,
+            json={"error": {"message": "No data was found. This product may not be offered at this station at the requested time."}},
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            DATAGETTER_URL,
+            json={"error": {"message": "Wrong Station ID"}},
+            status=200
+        )
+
+        result = client.fetch_water_levels("9455920", "20200101", "20201231")
+        assert result[0]["ty"] == "HH"
+        assert client.fetch_water_levels("9455920", "19900101", "19901231") == []
+        with pytest.raises(NOAAApiError):
+            client.fetch_water_levels("0000000", "20200101", "20201231")
+
+    @responses.activate
+    def test_fetch_station_metadata(self, client):
+        """Test datum and flood level metadata parsing."""
+        from src.noaa.core.noaa_client import METADATA_URL
+        responses.add(
+            responses.GET,
+            f"{METADATA_URL}/8638610/datums.json",
+            json={"datums": [{"name": "MHHW", "value": 7.61}, {"name": "MSL", "value": 6.2},
+                             {"name": "HAT", "value": None}], "units": "feet"},
+            status=200
+        )
+        responses.add(
+            responses.GET,
+            f"{METADATA_URL}/8638610/floodlevels.json",
+            json={"nws_minor": 9.61, "nws_moderate": 10.61, "nws_major": None, "nos_minor": 9.41,
+                  "self": "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations/8638610"},
+            status=200
+        )
+        responses.add(responses.GET, f"{METADATA_URL}/0000000/datums.json", status=404)
+
+        metadata = client.fetch_station_metadata("8638610")
+        assert metadata["datums"] == {"MHHW": 7.61, "MSL": 6.2}
+        assert metadata["flood_levels"] == {"nws_minor": 9.61, "nws_moderate": 10.61, "nws_major": None,
+                                            "nos_minor": 9.41}
+        with pytest.raises(NOAAApiError):
+            client.fetch_station_metadata("0000000")
@@ -0,0 +1,49 @@
+"""Tests for the NOAA API rate limiters."""
+
+import threading
+import time
+import pytest
+
+from src.noaa.core.rate_limiter import TokenBucketRateLimiter
+
+class TestTokenBucketRateLimiter:
+    """Test suite for TokenBucketRateLimiter."""
+
+    def test_burst_then_rate(self):
+        """The bucket allows a burst and then paces requests at the configured rate."""
+        limiter = TokenBucketRateLimiter(requests_per_second=20, burst=2)
+
+        start = time.monotonic()
+        for _ in range(2):
+            limiter.wait()
+        assert time.monotonic() - start < 0.05
+
+        for _ in range(4):
+            limiter.wait()
+        assert time.monotonic() - start >= 4 / 20 * 0.9
+
+    def test_shared_across_threads(self):
+        """Concurrent threads share one request budget."""
+        limiter = TokenBucketRateLimiter(requests_per_second=50, burst=1)
+        timestamps = []
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(5):
+                limiter.wait()
+                with lock:
+                    timestamps.append(time.monotonic())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(timestamps) == 20
+        assert max(timestamps) - min(timestamps) >= 19 / 50 * 0.9
+
+    def test_invalid_rate(self):
+        """Non-positive rates are rejected."""
+        with pytest.raises(ValueError):
+            TokenBucketRateLimiter(requests_per_second=0)
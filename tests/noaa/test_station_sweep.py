@@ -0,0 +1,132 @@
+"""Tests for the combined historical + projected station sweep."""
+
+import json
+import pytest
+import yaml
+from unittest.mock import Mock, patch
+
+from src.noaa.core.cache_manager import NOAACache
+from src.noaa.core.noaa_client import NOAAApiError
+from src.noaa.station_sweep import StationSweep, summarize_region_coverage, write_coverage_report
+
+STATIONS = {
+    'mid_atlantic': ['8638610', '8571892', '8557380'],
+    'hawaii': ['1612340']
+}
+
+def historical_records(station_id):
+    return [{'stnId': station_id, 'stnName': 'Test', 'year': year,
+             'majCount': 0, 'modCount': 0, 'minCount': 3, 'nanCount': 0}
+            for year in (2019, 2020)]
+
+def projected_records(station_id):
+    return [{'stnId': station_id, 'stnName': 'Test', 'decade': decade, 'source': 'NOAA',
+             'low': 10, 'intLow': 20, 'intermediate': 30, 'intHigh': 40, 'high': 50}
+            for decade in (2050, 2060)]
+
+@pytest.fixture
+def setup_config_files(tmp_path):
+    """Create temporary config files for testing."""
+    config_dir = tmp_path / "config"
+    (config_dir / "tide_stations").mkdir(parents=True)
+
+    settings = {
+        'api': {'base_url': 'https://api.tidesandcurrents.noaa.gov/dpapi/prod/webapi',
+                'requests_per_second': 2.0},
+        'cache': {'directory': 'data/cache', 'data_types': ['historical', 'projected']}
+    }
+    with open(config_dir / "noaa_api_settings.yaml", 'w') as f:
+        yaml.dump(settings, f)
+
+    with open(config_dir / "region_mappings.yaml", 'w') as f:
+        yaml.dump({'regions': {region: {'name': region} for region in STATIONS}}, f)
+
+    for region, station_ids in STATIONS.items():
+        stations = {sid: {'name': 'Test', 'location': {'lat': 0.0, 'lon': 0.0}} for sid in station_ids}
+        with open(config_dir / "tide_stations" / f"{region}_tide_stations.yaml", 'w') as f:
+            yaml.dump({'stations': stations}, f)
+
+    return config_dir
+
+@pytest.fixture
+def client():
+    """Mock client; 8557380 has no projections and 1612340 has no historical data."""
+    client = Mock()
+    def fetch_historical(station):
+        if station == '1612340':
+            raise NOAAApiError("No flood count data in response")
+        return historical_records(station)
+    client.fetch_annual_flood_counts.side_effect = fetch_historical
+    client.fetch_decadal_projections.side_effect = (
+        lambda station: [] if station == '8557380' else projected_records(station)
+    )
+    return client
+
+class TestStationSweep:
+    """Test suite for StationSweep."""
+
+    def test_sweep_fetches_both_and_commits(self, setup_config_files, client):
+        """Each station is requested once per endpoint and both results are cached."""
+        cache = NOAACache(config_dir=setup_config_files)
+        sweep = StationSweep(cache, client=client, max_workers=2)
+
+        historical, projected, errors = sweep.sweep()
+
+        assert client.fetch_annual_flood_counts.call_count == 4
+        assert client.fetch_decadal_projections.call_count == 4
+        assert sorted(historical) == ['8557380', '8571892', '8638610']
+        assert sorted(projected) == ['1612340', '8571892', '8638610']
+        assert list(errors) == ['1612340']
+
+        with open(cache.cache_dir / "historical" / "8638610.json") as f:
+            assert json.load(f) == historical_records('8638610')
+        assert cache.get_projected_data('8638610') == projected_records('8638610')
+        assert not list((cache.cache_dir / "projected").glob(".*.tmp"))
+
+    def test_fresh_cache_is_reused(self, setup_config_files, client):
+        """A second sweep is served from the cache without API requests."""
+        cache = NOAACache(config_dir=setup_config_files)
+        StationSweep(cache, client=client).sweep(stations=['8638610'])
+
+        second = Mock()
+        historical, projected, errors = StationSweep(cache, client=second).sweep(stations=['8638610'])
+
+        second.fetch_annual_flood_counts.assert_not_called()
+        second.fetch_decadal_projections.assert_not_called()
+        assert historical['8638610'] == historical_records('8638610')
+        assert projected['8638610'] == projected_records('8638610')
+
+    def test_failed_commit_keeps_previous_cache(self, setup_config_files, client):
+        """If one file cannot be written, neither file is replaced."""
+        cache = NOAACache(config_dir=setup_config_files)
+        cache.save_station_records('8638610', historical=[], projected=projected_records('8638610'))
+
+        with patch('src.noaa.core.cache_manager.json.dump', side_effect=[None, OSError("disk full")]):
+            with pytest.raises(OSError):
+                cache.save_station_records('8638610', historical=historical_records('8638610'),
+                                           projected=projected_records('8638610'))
+
+        assert cache.get_historical_data('8638610') == []
+        assert not list((cache.cache_dir / "historical").glob(".*.tmp"))
+
+    def test_coverage_report(self, setup_config_files, client, tmp_path):
+        """Coverage is summarized by region and written as markdown."""
+        cache = NOAACache(config_dir=setup_config_files)
+        sweep = StationSweep(cache, client=client)
+        historical, projected, _ = sweep.sweep()
+
+        station_coverage = sweep.build_station_coverage(historical, projected)
+        region_coverage = summarize_region_coverage(station_coverage).set_index('region')
+
+        assert region_coverage.loc['mid_atlantic', 'historical_stations'] == 3
+        assert region_coverage.loc['mid_atlantic', 'projected_stations'] == 2
+        assert region_coverage.loc['mid_atlantic', 'coverage_pct'] == 67
+        assert region_coverage.loc['mid_atlantic', 'category'] == 'Moderate'
+        assert region_coverage.loc['hawaii', 'category'] == 'N/A'
+
+        report = write_coverage_report(region_coverage.reset_index(), projected, sweep.station_regions,
+                                       tmp_path / "station_coverage_report.md")
+        text = report.read_text()
+        assert "| Mid Atlantic | 3 stations | 2 stations | 2 | Moderate - 67% |" in text
+        assert "Mid Atlantic: Lost 1 station (33% reduction)" in text
+        assert "    - Intermediate: 30.0" in text